@@ -4,15 +4,19 @@ YunMin Trading Dashboard Server
 Standalone entry point for running the real-time trading dashboard.
 
 Usage:
-    python dashboard_server.py [--host HOST] [--port PORT]
+    python dashboard_server.py [--host HOST] [--port PORT] [--state-bridge NAME]
+                               [--db-url URL] [--candle-store DIR] [--workers N]
 
 Examples:
     python dashboard_server.py
     python dashboard_server.py --port 8080
     python dashboard_server.py --host 0.0.0.0 --port 5000
+    python dashboard_server.py --state-bridge yunmin_state --workers 4
+    python dashboard_server.py --db-url sqlite:///data/yunmin.db --candle-store data/features
 """
 
 import argparse
+import os
 import sys
 from pathlib import Path
 
@@ -39,6 +43,10 @@ Examples:
   python dashboard_server.py                    # Start on localhost:5000
   python dashboard_server.py --port 8080        # Start on localhost:8080
   python dashboard_server.py --host 0.0.0.0     # Listen on all interfaces
+  python dashboard_server.py --state-bridge yunmin_state --workers 4
+                                                # Read bot state from shared memory
+  python dashboard_server.py --db-url sqlite:///data/yunmin.db --candle-store data/features
+                                                # Equity curve and candles from the bot's stores
         """
     )
     parser.add_argument(
@@ -58,6 +66,35 @@ Examples:
         action="store_true",
         help="Enable auto-reload for development"
     )
+    parser.add_argument(
+        "--state-bridge",
+        type=str,
+        default=os.environ.get("YUNMIN_DASHBOARD_STATE_BRIDGE", ""),
+        metavar="NAME",
+        help="Shared-memory name the bot publishes its state to "
+             "(YUNMIN_DASHBOARD_STATE_BRIDGE in the bot's environment)"
+    )
+    parser.add_argument(
+        "--db-url",
+        type=str,
+        default=os.environ.get("YUNMIN_DASHBOARD_DB_URL", ""),
+        metavar="URL",
+        help="Bot database for the equity curve (the bot's database.db_url)"
+    )
+    parser.add_argument(
+        "--candle-store",
+        type=str,
+        default=os.environ.get("YUNMIN_DASHBOARD_CANDLE_STORE", ""),
+        metavar="DIR",
+        help="FeatureStore directory the bot writes candles to "
+             "(YUNMIN_DASHBOARD_CANDLE_STORE in the bot's environment)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of API worker processes (default: 1)"
+    )
     parser.add_argument(
         "--log-level",
         type=str,
@@ -68,12 +105,29 @@ Examples:
     
     args = parser.parse_args()
     
+    if args.reload and args.workers > 1:
+        parser.error("--reload and --workers are mutually exclusive")
+    
+    # Inherited by every worker process; yunmin.web.api attaches on import
+    if args.state_bridge:
+        os.environ["YUNMIN_DASHBOARD_STATE_BRIDGE"] = args.state_bridge
+    if args.db_url:
+        os.environ["YUNMIN_DASHBOARD_DB_URL"] = args.db_url
+    if args.candle_store:
+        os.environ["YUNMIN_DASHBOARD_CANDLE_STORE"] = args.candle_store
+    
     # Print startup banner
     print_banner(args.host, args.port)
     
     # Configure logging
     logger.info(f"Starting YunMin Trading Dashboard...")
     logger.info(f"Dashboard URL: http://{args.host}:{args.port}")
+    if args.state_bridge:
+        logger.info(f"Reading bot state from shared memory: {args.state_bridge}")
+    if args.db_url:
+        logger.info(f"Equity curve from database: {args.db_url}")
+    if args.candle_store:
+        logger.info(f"Candles from feature store: {args.candle_store}")
     
     # Run the server
     try:
@@ -82,6 +136,7 @@ Examples:
             host=args.host,
             port=args.port,
             reload=args.reload,
+            workers=args.workers,
             log_level=args.log_level,
             access_log=True
         )
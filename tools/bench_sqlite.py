@@ -0,0 +1,129 @@
+"""
+SQLite benchmark - write throughput and read latency under concurrent load.
+
+A writer thread records trades through TradeRepository (one commit per row,
+as the bot does without write-behind) while reader threads run dashboard-style
+queries. Compares the legacy profile (single shared connection, default
+journal) with the tuned one (WAL, pragmas, read-only pool). Usage:
+
+    python tools/bench_sqlite.py
+    python tools/bench_sqlite.py --rows 5000 --readers 8 --json
+    python tools/bench_sqlite.py --write-behind     # writer uses WriteBehindWriter
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from yunmin.store import database  # noqa: E402
+from yunmin.store.repository import TradeRepository  # noqa: E402
+from yunmin.store.write_behind import WriteBehindWriter  # noqa: E402
+
+
+def percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_profile(tuned: bool, rows: int, readers: int, write_behind: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        database.init_db(f"sqlite:///{tmp}/bench.db", tuned=tuned)
+        writer = WriteBehindWriter().start() if write_behind else None
+        done = threading.Event()
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def read_loop():
+            local = []
+            while not done.is_set():
+                start = time.perf_counter()
+                try:
+                    session = database.get_read_session()
+                    try:
+                        repo = TradeRepository(session)
+                        repo.get_recent_trades(symbol='BTC/USDT', limit=50)
+                        repo.get_total_volume()
+                    finally:
+                        session.close()
+                except Exception as e:  # locked / busy under the legacy profile
+                    errors.append(str(e))
+                local.append((time.perf_counter() - start) * 1000)
+            with lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=read_loop, daemon=True) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+
+        session = database.get_session()
+        repo = TradeRepository(session, writer=writer)
+        start = time.perf_counter()
+        for i in range(rows):
+            repo.create(
+                symbol='BTC/USDT' if i % 2 else 'ETH/USDT',
+                side='buy', price=100.0 + i % 50, amount=0.1, fee=0.01
+            )
+        if writer is not None:
+            writer.stop()
+        write_seconds = time.perf_counter() - start
+
+        done.set()
+        for thread in threads:
+            thread.join()
+        database.close_db()
+
+    return {
+        'profile': 'tuned' if tuned else 'legacy',
+        'write_rows_per_s': round(rows / write_seconds, 1),
+        'reads': len(latencies),
+        'read_p50_ms': round(percentile(latencies, 0.50), 2),
+        'read_p95_ms': round(percentile(latencies, 0.95), 2),
+        'read_p99_ms': round(percentile(latencies, 0.99), 2),
+        'read_mean_ms': round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        'read_errors': len(errors),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SQLite store profiles")
+    parser.add_argument("--rows", type=int, default=2000, help="Trades written per profile")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent reader threads")
+    parser.add_argument("--write-behind", action="store_true", help="Batch writes via WriteBehindWriter")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    # Benchmark output only - keep the repository's per-row debug logging quiet
+    from loguru import logger
+    logger.remove()
+
+    results = [
+        run_profile(tuned, args.rows, args.readers, args.write_behind)
+        for tuned in (False, True)
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'profile':<10}{'writes/s':>12}{'reads':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+        for r in results:
+            print(
+                f"{r['profile']:<10}{r['write_rows_per_s']:>12.1f}{r['reads']:>8}"
+                f"{r['read_p50_ms']:>7.2f}ms{r['read_p95_ms']:>7.2f}ms"
+                f"{r['read_p99_ms']:>7.2f}ms{r['read_errors']:>8}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Startup benchmark - cold-start time of `import yunmin` and the CLI.
+
+Each measurement runs in a fresh interpreter, so module caches do not hide
+import cost. Usage:
+
+    python tools/bench_startup.py
+    python tools/bench_startup.py --repeat 10 --json
+    python tools/bench_startup.py --max-ms 500   # exit 1 if any median is slower
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TARGETS = {
+    "import yunmin": [sys.executable, "-c", "import yunmin"],
+    "import yunmin.ml": [sys.executable, "-c", "import yunmin.ml"],
+    "import yunmin.memory": [sys.executable, "-c", "import yunmin.memory"],
+    "import yunmin.core": [sys.executable, "-c", "import yunmin.core"],
+    "yunmin.cli --help": [sys.executable, "-m", "yunmin.cli", "--help"],
+}
+
+
+def measure(cmd, repeat: int) -> dict:
+    """Run cmd `repeat` times in a fresh process; wall time in ms."""
+    samples = []
+    ok = True
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(cmd, cwd=ROOT, capture_output=True)
+        samples.append((time.perf_counter() - start) * 1000)
+        ok = ok and result.returncode == 0
+    return {
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": round(min(samples), 1),
+        "max_ms": round(max(samples), 1),
+        "ok": ok,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure yunmin cold-start time")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per target")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--max-ms", type=float, help="Fail if any median exceeds this")
+    args = parser.parse_args()
+
+    baseline = measure([sys.executable, "-c", "pass"], args.repeat)
+    results = {"python": baseline}
+    for name, cmd in TARGETS.items():
+        results[name] = measure(cmd, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'target':<24}{'median':>10}{'min':>10}{'max':>10}  status")
+        for name, r in results.items():
+            status = "ok" if r["ok"] else "FAILED"
+            print(
+                f"{name:<24}{r['median_ms']:>9.1f}ms{r['min_ms']:>8.1f}ms"
+                f"{r['max_ms']:>8.1f}ms  {status}"
+            )
+
+    if args.max_ms is not None:
+        slow = [n for n, r in results.items() if n != "python" and r["median_ms"] > args.max_ms]
+        if slow:
+            print(f"Slower than {args.max_ms}ms: {', '.join(slow)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+StateManager benchmark - per-save cost as the trade history grows.
+
+Simulates the bot: after every closed trade it calls save_trades() with the
+full history and save_positions(). With the journaled StateManager the cost
+stays flat; the legacy full JSON rewrite (measured for comparison) grows
+linearly with history. Also times recovery (snapshot + journal replay).
+Usage:
+
+    python tools/bench_state.py
+    python tools/bench_state.py --trades 20000 --no-fsync --json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from yunmin.core.pnl_tracker import Trade  # noqa: E402
+from yunmin.store.state_manager import StateManager, _trade_record  # noqa: E402
+
+
+def make_trade(i: int) -> Trade:
+    opened = datetime(2025, 1, 1) + timedelta(minutes=i)
+    return Trade(
+        symbol='BTC/USDT', side='LONG' if i % 2 else 'SHORT',
+        entry_price=50000.0 + i, exit_price=50010.0 + i, amount=0.01,
+        entry_fee=0.5, exit_fee=0.5, pnl=0.0, pnl_pct=0.0,
+        opened_at=opened, closed_at=opened + timedelta(minutes=5)
+    )
+
+
+def legacy_save(path: Path, trades) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([_trade_record(t) for t in trades], f, indent=2, ensure_ascii=False)
+
+
+def checkpoints(total: int):
+    return sorted({max(1, total * k // 10) for k in range(1, 11)})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark StateManager saves")
+    parser.add_argument("--trades", type=int, default=10000, help="History length")
+    parser.add_argument("--no-fsync", action="store_true", help="Disable fsync per journal write")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    from loguru import logger
+    logger.remove()
+
+    trades = [make_trade(i) for i in range(args.trades)]
+    marks = set(checkpoints(args.trades))
+    results = {'journal_ms': {}, 'legacy_ms': {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = StateManager(tmp, fsync=not args.no_fsync)
+        window = []
+        for n in range(1, args.trades + 1):
+            start = time.perf_counter()
+            manager.save_trades(trades[:n])
+            manager.save_positions({'BTC/USDT': {'side': 'LONG', 'entry_price': float(n), 'amount': 0.01}})
+            window.append((time.perf_counter() - start) * 1000)
+            if n in marks:
+                results['journal_ms'][n] = round(statistics.median(window), 3)
+                start = time.perf_counter()
+                legacy_save(Path(tmp) / 'legacy_trades.json', trades[:n])
+                results['legacy_ms'][n] = round((time.perf_counter() - start) * 1000, 3)
+                window = []
+        manager.close()
+
+        start = time.perf_counter()
+        recovered = StateManager(tmp)
+        results['recovery_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        results['recovered_trades'] = len(recovered.load_trades())
+        recovered.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'history':>10}{'journal save':>16}{'legacy save':>16}")
+        for n in sorted(marks):
+            print(f"{n:>10}{results['journal_ms'][n]:>14.3f}ms{results['legacy_ms'][n]:>14.3f}ms")
+        print(f"recovery: {results['recovery_ms']}ms ({results['recovered_trades']} trades)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,10 +7,17 @@ A modular cryptocurrency trading system with ML/AI capabilities.
 __version__ = "0.1.0"
 __author__ = "Yun Min Team"
 
-# Try to import core config, but don't fail if dependencies missing
-try:
-    from yunmin.core.config import load_config
-    __all__ = ["__version__", "__author__", "load_config"]
-except ImportError:
-    # Allow module imports even if full dependencies not installed
-    __all__ = ["__version__", "__author__"]
+__all__ = ["__version__", "__author__", "load_config"]
+
+
+def __getattr__(name):
+    # Config (pydantic, yaml) is loaded on first use, not on `import yunmin`
+    if name == "load_config":
+        try:
+            from yunmin.core.config import load_config
+        except ImportError as e:
+            # Allow module imports even if full dependencies not installed
+            raise AttributeError(f"load_config unavailable: {e}") from e
+        globals()["load_config"] = load_config
+        return load_config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,175 @@
+"""
+Trade Journal Store - Single-file indexed SQLite storage for TradeJournal
+
+One row per trade: indexed columns (symbol, open/close time, outcome, pnl)
+for filtering and paging, plus the full record as compact JSON. Replaces one
+indented JSON file per trade, so startup no longer parses the whole history.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from loguru import logger
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal_trades (
+    trade_id TEXT PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    opened_at TEXT NOT NULL,
+    closed_at TEXT,
+    outcome TEXT,
+    pnl REAL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_journal_symbol_opened ON journal_trades (symbol, opened_at);
+CREATE INDEX IF NOT EXISTS ix_journal_closed ON journal_trades (closed_at, outcome, pnl);
+"""
+
+
+class TradeJournalStore:
+    """
+    SQLite-backed storage for TradeRecord dicts.
+
+    Rows keep insertion order (rowid is preserved on update), which is the
+    order get_all_trades() returned before.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize journal store.
+
+        Args:
+            db_path: SQLite file path (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _row_values(record: Dict[str, Any]) -> tuple:
+        post_trade = record.get('post_trade')
+        return (
+            record['trade_id'],
+            record['symbol'],
+            record.get('side'),
+            record['pre_trade']['timestamp'],
+            post_trade['timestamp'] if post_trade else None,
+            record.get('outcome'),
+            post_trade['pnl'] if post_trade else None,
+            json.dumps(record, separators=(',', ':'), default=str),
+        )
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        """Insert or update one trade record (TradeRecord.to_dict())."""
+        self.upsert_many([record])
+
+    def upsert_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert or update many records in one transaction."""
+        rows = [self._row_values(record) for record in records]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO journal_trades "
+                "(trade_id, symbol, side, opened_at, closed_at, outcome, pnl, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(trade_id) DO UPDATE SET "
+                "symbol = excluded.symbol, side = excluded.side, "
+                "opened_at = excluded.opened_at, closed_at = excluded.closed_at, "
+                "outcome = excluded.outcome, pnl = excluded.pnl, record = excluded.record",
+                rows
+            )
+        return len(rows)
+
+    def get(self, trade_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch one record by id."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record FROM journal_trades WHERE trade_id = ?", (trade_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def _where(
+        symbol: Optional[str],
+        closed: Optional[bool],
+        closed_from: Optional[str],
+        closed_to: Optional[str],
+        outcome: Optional[str]
+    ) -> Tuple[str, list]:
+        clauses, params = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if closed is True:
+            clauses.append("closed_at IS NOT NULL")
+        elif closed is False:
+            clauses.append("closed_at IS NULL")
+        if closed_from is not None:
+            clauses.append("closed_at >= ?")
+            params.append(closed_from)
+        if closed_to is not None:
+            clauses.append("closed_at < ?")
+            params.append(closed_to)
+        if outcome is not None:
+            clauses.append("outcome = ?")
+            params.append(outcome)
+        sql = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return sql, params
+
+    def query(
+        self,
+        symbol: Optional[str] = None,
+        closed: Optional[bool] = None,
+        closed_from: Optional[str] = None,
+        closed_to: Optional[str] = None,
+        outcome: Optional[str] = None,
+        order_by: str = "rowid",
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Filtered, paged records.
+
+        order_by: 'rowid' (insertion order), 'pnl', 'pnl DESC', 'closed_at' ...
+        closed_from / closed_to: ISO timestamps, [from, to)
+        """
+        if order_by.split()[0] not in ('rowid', 'pnl', 'opened_at', 'closed_at'):
+            raise ValueError(f"Unsupported order_by: {order_by}")
+        where, params = self._where(symbol, closed, closed_from, closed_to, outcome)
+        sql = f"SELECT record FROM journal_trades{where} ORDER BY {order_by}"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(
+        self,
+        symbol: Optional[str] = None,
+        closed: Optional[bool] = None,
+        closed_from: Optional[str] = None,
+        closed_to: Optional[str] = None,
+        outcome: Optional[str] = None
+    ) -> int:
+        where, params = self._where(symbol, closed, closed_from, closed_to, outcome)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM journal_trades{where}", params).fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+        logger.debug(f"Closed trade journal store {self.db_path}")
@@ -13,6 +13,8 @@ import json
 from pathlib import Path
 from loguru import logger
 
+from yunmin.analytics.journal_store import TradeJournalStore
+
 
 class TradeOutcome(Enum):
     """Trade outcome classification."""
@@ -236,43 +238,67 @@ class TradeJournal:
         """
         Initialize trade journal.
         
+        Records live in a single indexed SQLite file (journal.db) and are
+        read on demand; only open trades are kept in memory.
+        
         Args:
             storage_path: Path to store trade records
         """
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
-        # In-memory cache
+        self.store = TradeJournalStore(str(self.storage_path / "journal.db"))
+        
+        # In-memory cache of open trades (closed ones are paged from the store)
         self.trades: Dict[str, TradeRecord] = {}
         
-        # Load existing trades
+        # Import legacy per-trade JSON files once, then load open trades
+        if len(self.store) == 0:
+            self._import_legacy_files()
         self._load_trades()
         
-        logger.info("TradeJournal initialized with {} trades", len(self.trades))
-    
-    def _get_trade_file(self, trade_id: str) -> Path:
-        """Get file path for a trade."""
-        return self.storage_path / f"{trade_id}.json"
+        logger.info(
+            "TradeJournal initialized with {} trades ({} open)",
+            len(self.store), len(self.trades)
+        )
     
     def _save_trade(self, trade: TradeRecord):
-        """Save trade to disk."""
-        file_path = self._get_trade_file(trade.trade_id)
-        with open(file_path, 'w') as f:
-            json.dump(trade.to_dict(), f, indent=2)
-    
-    def _load_trades(self):
-        """Load all trades from disk."""
-        if not self.storage_path.exists():
-            return
-        
-        for file_path in self.storage_path.glob("*.json"):
+        """Save trade to the store."""
+        self.store.upsert(trade.to_dict())
+    
+    def _import_legacy_files(self, batch_size: int = 1000):
+        """Import <trade_id>.json files written by older versions (left in place)."""
+        batch = []
+        imported = 0
+        for file_path in sorted(self.storage_path.glob("*.json")):
             try:
                 with open(file_path, 'r') as f:
                     data = json.load(f)
-                    trade = TradeRecord.from_dict(data)
-                    self.trades[trade.trade_id] = trade
+                # Round-trip to validate the record
+                batch.append(TradeRecord.from_dict(data).to_dict())
             except Exception as e:
                 logger.error(f"Failed to load trade from {file_path}: {e}")
+                continue
+            if len(batch) >= batch_size:
+                imported += self.store.upsert_many(batch)
+                batch = []
+        if batch:
+            imported += self.store.upsert_many(batch)
+        if imported:
+            logger.info("Imported {} legacy trade files into {}", imported, self.store.db_path)
+    
+    def _load_trades(self):
+        """Load open trades into the in-memory cache."""
+        for data in self.store.query(closed=False):
+            try:
+                trade = TradeRecord.from_dict(data)
+                self.trades[trade.trade_id] = trade
+            except Exception as e:
+                logger.error(f"Failed to load trade {data.get('trade_id')}: {e}")
+    
+    @staticmethod
+    def _to_records(rows: List[Dict[str, Any]]) -> List[TradeRecord]:
+        return [TradeRecord.from_dict(data) for data in rows]
     
     def log_trade_entry(
         self,
@@ -372,12 +398,11 @@ class TradeJournal:
         Returns:
             Updated TradeRecord or None if trade not found
         """
-        if trade_id not in self.trades:
+        trade = self.get_trade(trade_id)
+        if trade is None:
             logger.error("Trade {} not found", trade_id)
             return None
         
-        trade = self.trades[trade_id]
-        
         # Calculate P&L
         entry_value = trade.pre_trade.price * trade.size
         exit_value = exit_price * trade.size
@@ -418,6 +443,7 @@ class TradeJournal:
         trade.outcome = outcome
         
         self._save_trade(trade)
+        self.trades.pop(trade_id, None)
         
         logger.info(
             "Trade exit logged: {} - P&L: ${:.2f} ({:.2f}%) - {}",
@@ -428,26 +454,44 @@ class TradeJournal:
     
     def get_trade(self, trade_id: str) -> Optional[TradeRecord]:
         """Get a specific trade."""
-        return self.trades.get(trade_id)
+        trade = self.trades.get(trade_id)
+        if trade is None:
+            data = self.store.get(trade_id)
+            trade = TradeRecord.from_dict(data) if data else None
+        return trade
     
-    def get_all_trades(self, closed_only: bool = False) -> List[TradeRecord]:
+    def get_all_trades(
+        self,
+        closed_only: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[TradeRecord]:
         """
-        Get all trades.
+        Get all trades (in logging order).
         
         Args:
             closed_only: Only return closed trades
+            limit: Page size (None = all remaining)
+            offset: Number of trades to skip
             
         Returns:
             List of TradeRecords
         """
-        trades = list(self.trades.values())
-        if closed_only:
-            trades = [t for t in trades if t.is_closed]
-        return trades
+        rows = self.store.query(closed=True if closed_only else None, limit=limit, offset=offset)
+        return self._to_records(rows)
     
-    def get_trades_by_symbol(self, symbol: str) -> List[TradeRecord]:
-        """Get all trades for a specific symbol."""
-        return [t for t in self.trades.values() if t.symbol == symbol]
+    def get_trades_by_symbol(
+        self,
+        symbol: str,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[TradeRecord]:
+        """Get trades for a specific symbol (paged like get_all_trades)."""
+        return self._to_records(self.store.query(symbol=symbol, limit=limit, offset=offset))
+    
+    def count_trades(self, symbol: Optional[str] = None, closed_only: bool = False) -> int:
+        """Number of journaled trades (without loading them)."""
+        return self.store.count(symbol=symbol, closed=True if closed_only else None)
     
     def generate_weekly_review(
         self,
@@ -470,11 +514,11 @@ class TradeJournal:
         
         week_end = week_start + timedelta(days=7)
         
-        # Filter trades for this week
-        week_trades = [
-            t for t in self.trades.values()
-            if t.is_closed and week_start <= t.post_trade.timestamp < week_end
-        ]
+        # Only this week's closed trades, via the closed_at index
+        week_trades = self._to_records(self.store.query(
+            closed_from=week_start.isoformat(),
+            closed_to=week_end.isoformat()
+        ))
         
         if not week_trades:
             return WeeklyReview(
@@ -626,3 +670,7 @@ class TradeJournal:
             f.write(markdown)
         
         logger.info("Weekly review exported to {}", output_path)
+    
+    def close(self):
+        """Close the underlying store."""
+        self.store.close()
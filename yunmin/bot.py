@@ -4,13 +4,16 @@ Yun Min Trading Bot - Main Entry Point
 Coordinates all components: data ingestion, strategy, risk management, and execution.
 """
 
+import math
 import os
 import time
 import asyncio
+from datetime import datetime, timedelta, UTC
 from typing import Optional
 import pandas as pd
 from loguru import logger
 
+from yunmin import __version__
 from yunmin.core.config import YunMinConfig, load_config
 from yunmin.data_ingest.exchange_adapter import ExchangeAdapter
 from yunmin.strategy.ema_crossover import EMACrossoverStrategy
@@ -25,7 +28,7 @@ from yunmin.core.pnl_tracker import PnLTracker
 from yunmin.store import (
     init_db, get_session, close_db,
     PositionRepository, TradeRepository, PortfolioRepository,
-    PositionSide, StateManager
+    PositionSide, StateManager, WriteBehindWriter
 )
 from yunmin.notifications.telegram_bot import get_telegram_bot
 
@@ -130,9 +133,18 @@ class YunMinBot:
         
         init_db(db_url)
         self.db_session = get_session()
-        self.pos_repo = PositionRepository(self.db_session)
-        self.trade_repo = TradeRepository(self.db_session)
-        self.portfolio_repo = PortfolioRepository(self.db_session)
+        
+        # Write-behind (opt-in): торговый поток не ждёт commit/fsync на каждую запись,
+        # но записи за последний flush_interval_ms теряются при падении процесса
+        db_config = getattr(config, 'database', None)
+        self.db_writer = None
+        if db_config is not None and db_config.write_behind:
+            interval_ms = db_config.flush_interval_ms
+            self.db_writer = WriteBehindWriter(flush_interval=interval_ms / 1000).start()
+        
+        self.pos_repo = PositionRepository(self.db_session, writer=self.db_writer)
+        self.trade_repo = TradeRepository(self.db_session, writer=self.db_writer)
+        self.portfolio_repo = PortfolioRepository(self.db_session, writer=self.db_writer)
         logger.info(f"💾 Database initialized: {db_url}")
         
         # � JSON StateManager для быстрого бэкапа (дополнительно к DB)
@@ -163,6 +175,28 @@ class YunMinBot:
         self.capital = config.trading.initial_capital
         self.current_position: Optional[PositionInfo] = None
         self.is_running = False
+        self.started_at = time.time()
+        self.last_price: Optional[float] = None
+        
+        # 📡 Dashboard state bridge: snapshots for dashboard_server.py workers
+        dashboard_config = getattr(config, 'dashboard', None)
+        self.state_bridge = None
+        if dashboard_config is not None and dashboard_config.state_bridge:
+            from yunmin.web.state_bridge import StateBridgePublisher
+            self.state_bridge = StateBridgePublisher(
+                self.dashboard_snapshot,
+                name=dashboard_config.state_bridge,
+                interval=dashboard_config.publish_interval_ms / 1000,
+                capacity=dashboard_config.bridge_capacity
+            ).start()
+            logger.info(f"📡 Dashboard state bridge: {dashboard_config.state_bridge}")
+        
+        # 📈 Closed candles for the dashboard charts (dashboard_server.py --candle-store)
+        self.candle_store = None
+        if dashboard_config is not None and dashboard_config.candle_store:
+            from yunmin.features.store import FeatureStore
+            self.candle_store = FeatureStore(root=dashboard_config.candle_store)
+            logger.info(f"📈 Dashboard candle store: {dashboard_config.candle_store}")
         
         logger.info(
             f"Bot initialized - Mode: {config.trading.mode}, "
@@ -224,6 +258,18 @@ class YunMinBot:
             logger.error(f"Failed to fetch market data: {e}")
             return pd.DataFrame()
             
+    def store_candles(self, df: pd.DataFrame) -> None:
+        """Append newly closed candles to the dashboard candle store."""
+        if self.candle_store is None or df.empty:
+            return
+        try:
+            self.candle_store.update(
+                'technical', self.config.trading.symbol, self.config.trading.timeframe, df
+            )
+        except Exception as e:
+            # Charts only - never interrupt trading
+            logger.warning(f"Failed to store candles: {e}")
+            
     def get_current_price(self) -> Optional[float]:
         """Get current market price."""
         if self.exchange is None:
@@ -651,10 +697,13 @@ class YunMinBot:
         if df.empty:
             logger.warning("No market data available")
             return
+        self.store_candles(df)
             
         # Get current price
         current_price = self.get_current_price()
         logger.info(f"Current price: {current_price}")
+        if current_price:
+            self.last_price = current_price
         
         # Update position
         self.update_position()
@@ -757,8 +806,15 @@ class YunMinBot:
         if hasattr(self, 'position_monitor') and self.position_monitor:
             self.position_monitor.stop()
         
+        # Final dashboard snapshot (bot_state=STOPPED), then release the bridge
+        if self.state_bridge is not None:
+            self.state_bridge.stop()
+            self.state_bridge = None
+        
         # Close database connection
         if hasattr(self, 'db_session'):
+            if self.db_writer is not None:
+                self.db_writer.stop()
             close_db()
             logger.info("💾 Database connection closed")
         
@@ -792,6 +848,95 @@ class YunMinBot:
             'current_capital': self.capital + summary['total_pnl']
         }
     
+    def dashboard_snapshot(self) -> dict:
+        """
+        Compact state snapshot for the dashboard state bridge.
+        
+        Called from the bridge publisher thread; sections match the
+        dashboard API models (portfolio, positions, trades, performance, status).
+        
+        Returns:
+            JSON-serialisable dictionary
+        """
+        tracker = self.pnl_tracker
+        summary = tracker.get_summary()
+        initial_capital = self.config.trading.initial_capital
+        total_pnl = summary['total_pnl']
+        now = datetime.now()
+        
+        positions = []
+        for symbol, pos in list(tracker.open_positions.items()):
+            price = self.last_price if symbol == self.config.trading.symbol and self.last_price else pos['entry_price']
+            unrealized = tracker.calculate_unrealized_pnl(symbol, price) or 0.0
+            notional = pos['entry_price'] * pos['amount']
+            positions.append({
+                'symbol': symbol,
+                'side': pos['side'],
+                'entry_price': pos['entry_price'],
+                'current_price': price,
+                'amount': pos['amount'],
+                'unrealized_pnl': round(unrealized, 2),
+                'unrealized_pnl_pct': round(unrealized / notional * 100, 2) if notional else 0.0,
+                'entry_time': pos['opened_at'].isoformat()
+            })
+        
+        trades = [
+            {
+                'symbol': t.symbol,
+                'side': t.side,
+                'entry_price': t.entry_price,
+                'exit_price': t.exit_price,
+                'amount': t.amount,
+                'pnl': round(t.pnl, 2),
+                'pnl_pct': round(t.pnl_pct, 2),
+                'entry_time': t.opened_at.isoformat(),
+                'exit_time': t.closed_at.isoformat(),
+                'duration_minutes': int((t.closed_at - t.opened_at).total_seconds() // 60)
+            }
+            for t in tracker.get_recent_trades(limit=50)
+        ]
+        
+        def closed_since(days: int) -> list:
+            since = now - timedelta(days=days)
+            return [t.pnl for t in list(tracker.trades) if t.closed_at >= since]
+        
+        week = closed_since(7)
+        
+        return {
+            'portfolio': {
+                'current_equity': round(self.capital + total_pnl, 2),
+                'initial_capital': initial_capital,
+                'total_pnl': total_pnl,
+                'total_pnl_pct': round(total_pnl / initial_capital * 100, 2) if initial_capital > 0 else 0.0,
+                'realized_pnl': summary['total_realized_pnl'],
+                'unrealized_pnl': summary['total_unrealized_pnl'],
+                'open_positions': summary['open_positions'],
+                'total_trades': summary['total_trades'],
+                'win_rate': summary['win_rate'],
+                'timestamp': datetime.now(UTC).isoformat()
+            },
+            'positions': positions,
+            'trades': trades,
+            'performance': {
+                'daily_pnl': round(sum(closed_since(1)), 2),
+                'weekly_pnl': round(sum(week), 2),
+                'monthly_pnl': round(sum(closed_since(30)), 2),
+                'win_rate_7d': round(sum(1 for pnl in week if pnl > 0) / len(week) * 100, 2) if week else 0.0,
+                'avg_win': summary['avg_win'],
+                'avg_loss': summary['avg_loss'],
+                # No losing trades yet: inf isn't valid JSON
+                'profit_factor': summary['profit_factor'] if math.isfinite(summary['profit_factor']) else None
+            },
+            'status': {
+                'bot_state': 'RUNNING' if self.is_running else 'STOPPED',
+                'uptime_seconds': int(time.time() - self.started_at),
+                'binance_connected': self.exchange is not None,
+                'openai_connected': self.llm_analyzer is not None,
+                'last_heartbeat': datetime.now(UTC).isoformat(),
+                'version': __version__
+            }
+        }
+    
     def _restore_positions(self):
         """
         🔄 Restore open positions from database (crash recovery).
@@ -1,36 +1,39 @@
-"""Core module initialization."""
-
-from yunmin.core.error_recovery import (
-    ErrorRecoveryManager,
-    RecoveryConfig,
-    RecoveryState,
-    ExponentialBackoff,
-    NetworkErrorHandler,
-    ExchangeAPIErrorHandler
-)
-
-from yunmin.core.alert_manager import (
-    AlertManager,
-    AlertConfig,
-    AlertLevel,
-    AlertChannel,
-    Alert,
-    TradingAlerts
-)
-
-__all__ = [
+"""Core module initialization.
+
+Exports are resolved lazily (PEP 562) so importing a single core submodule
+does not pull in every other one.
+"""
+
+import importlib
+
+_LAZY_IMPORTS = {
     # Error Recovery
-    'ErrorRecoveryManager',
-    'RecoveryConfig',
-    'RecoveryState',
-    'ExponentialBackoff',
-    'NetworkErrorHandler',
-    'ExchangeAPIErrorHandler',
+    'ErrorRecoveryManager': 'yunmin.core.error_recovery',
+    'RecoveryConfig': 'yunmin.core.error_recovery',
+    'RecoveryState': 'yunmin.core.error_recovery',
+    'ExponentialBackoff': 'yunmin.core.error_recovery',
+    'NetworkErrorHandler': 'yunmin.core.error_recovery',
+    'ExchangeAPIErrorHandler': 'yunmin.core.error_recovery',
     # Alerts
-    'AlertManager',
-    'AlertConfig',
-    'AlertLevel',
-    'AlertChannel',
-    'Alert',
-    'TradingAlerts',
-]
+    'AlertManager': 'yunmin.core.alert_manager',
+    'AlertConfig': 'yunmin.core.alert_manager',
+    'AlertLevel': 'yunmin.core.alert_manager',
+    'AlertChannel': 'yunmin.core.alert_manager',
+    'Alert': 'yunmin.core.alert_manager',
+    'TradingAlerts': 'yunmin.core.alert_manager',
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -107,6 +107,10 @@ class DatabaseConfig(BaseSettings):
     model_config = ConfigDict(env_prefix="YUNMIN_DB_")
     
     db_url: str = Field(default="sqlite:///yunmin.db", description="Database URL")
+    # Opt-in: the trading loop stops waiting for commits, but writes queued in the
+    # last flush_interval_ms (orders, fills, positions) are lost if the process crashes
+    write_behind: bool = Field(default=False, description="Batch repository writes in a background writer (may lose the last flush interval on a crash)")
+    flush_interval_ms: int = Field(default=200, description="Max delay before queued writes are committed")
     redis_url: str = Field(default="redis://localhost:6379/0", description="Redis URL")
 
 
@@ -120,6 +124,17 @@ class NotificationConfig(BaseSettings):
     telegram_chat_id: str = Field(default="", description="Telegram chat ID")
 
 
+class DashboardConfig(BaseSettings):
+    """Dashboard state bridge and chart data configuration."""
+    
+    model_config = ConfigDict(env_prefix="YUNMIN_DASHBOARD_")
+    
+    state_bridge: str = Field(default="", description="Shared-memory name for dashboard state snapshots (empty = disabled)")
+    publish_interval_ms: int = Field(default=250, description="Interval between state snapshots")
+    bridge_capacity: int = Field(default=1 << 20, description="Max encoded snapshot size in bytes")
+    candle_store: str = Field(default="", description="FeatureStore directory the bot writes OHLCV to for dashboard charts (empty = disabled)")
+
+
 class YunMinConfig(BaseSettings):
     """Main configuration class for Yun Min trading agent."""
     
@@ -134,6 +149,7 @@ class YunMinConfig(BaseSettings):
     llm: LLMConfig = Field(default_factory=LLMConfig)
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
     notification: NotificationConfig = Field(default_factory=NotificationConfig)
+    dashboard: DashboardConfig = Field(default_factory=DashboardConfig)
     
     # General settings
     log_level: str = Field(default="INFO", description="Logging level")
@@ -1,3 +1,30 @@
-"""Features module - Technical indicators and feature engineering."""
+"""Features module - Technical indicators and feature engineering.
 
-__all__ = []
+Named, versioned feature definitions and an offline FeatureStore that
+materialises them per symbol/timeframe for training and live inference.
+"""
+
+import importlib
+
+_LAZY_IMPORTS = {
+    'FeatureStore': 'yunmin.features.store',
+    'timeframe_delta': 'yunmin.features.store',
+    'FeatureDefinition': 'yunmin.features.definitions',
+    'DEFAULT_DEFINITIONS': 'yunmin.features.definitions',
+    'add_technical_features': 'yunmin.features.definitions',
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,147 @@
+"""
+Feature definitions - named, versioned feature sets computed from candles.
+
+A definition maps an OHLCV frame (timestamp, open, high, low, close, volume)
+to numeric feature columns of the same length, using only past and current
+bars. Bump `version` whenever the computation changes: the FeatureStore keeps
+each version in its own partition.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class FeatureDefinition:
+    """Named feature set."""
+    name: str
+    version: int
+    compute: Callable[[pd.DataFrame], pd.DataFrame]
+    warmup: int = 200  # raw bars needed before a new bar for an exact incremental update
+    description: str = ""
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}/v{self.version}"
+
+
+def add_technical_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Engineer features from OHLCV data (used by LSTMPricePredictor).
+
+    Args:
+        df: DataFrame with OHLCV data
+
+    Returns:
+        Copy of df with engineered feature columns added
+    """
+    data = df.copy()
+
+    # Normalized price changes
+    data['price_change_pct'] = data['close'].pct_change()
+    data['high_low_pct'] = (data['high'] - data['low']) / data['close']
+    data['open_close_pct'] = (data['close'] - data['open']) / data['open']
+
+    # RSI (Relative Strength Index)
+    delta = data['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    data['rsi'] = 100 - (100 / (1 + rs))
+
+    # MACD
+    exp1 = data['close'].ewm(span=12, adjust=False).mean()
+    exp2 = data['close'].ewm(span=26, adjust=False).mean()
+    data['macd'] = exp1 - exp2
+    data['macd_signal'] = data['macd'].ewm(span=9, adjust=False).mean()
+    data['macd_diff'] = data['macd'] - data['macd_signal']
+
+    # Bollinger Bands
+    bb_period = 20
+    data['bb_middle'] = data['close'].rolling(window=bb_period).mean()
+    bb_std = data['close'].rolling(window=bb_period).std()
+    data['bb_upper'] = data['bb_middle'] + (bb_std * 2)
+    data['bb_lower'] = data['bb_middle'] - (bb_std * 2)
+    data['bb_width'] = (data['bb_upper'] - data['bb_lower']) / data['bb_middle']
+    data['bb_position'] = (data['close'] - data['bb_lower']) / (data['bb_upper'] - data['bb_lower'])
+
+    # ATR (Average True Range)
+    high_low = data['high'] - data['low']
+    high_close = np.abs(data['high'] - data['close'].shift())
+    low_close = np.abs(data['low'] - data['close'].shift())
+    ranges = pd.concat([high_low, high_close, low_close], axis=1)
+    true_range = ranges.max(axis=1)
+    data['atr'] = true_range.rolling(14).mean()
+    data['atr_pct'] = data['atr'] / data['close']
+
+    # Volume indicators
+    data['volume_sma'] = data['volume'].rolling(window=20).mean()
+    data['volume_ratio'] = data['volume'] / data['volume_sma']
+    data['volume_change_pct'] = data['volume'].pct_change()
+
+    # Time-based features (if timestamp available)
+    if 'timestamp' in data.columns:
+        data['timestamp'] = pd.to_datetime(data['timestamp'])
+        data['hour'] = data['timestamp'].dt.hour
+        data['day_of_week'] = data['timestamp'].dt.dayofweek
+        # Cyclical encoding
+        data['hour_sin'] = np.sin(2 * np.pi * data['hour'] / 24)
+        data['hour_cos'] = np.cos(2 * np.pi * data['hour'] / 24)
+        data['day_sin'] = np.sin(2 * np.pi * data['day_of_week'] / 7)
+        data['day_cos'] = np.cos(2 * np.pi * data['day_of_week'] / 7)
+
+    # Moving averages
+    data['sma_20'] = data['close'].rolling(window=20).mean()
+    data['sma_50'] = data['close'].rolling(window=50).mean()
+    data['sma_20_pct'] = (data['close'] - data['sma_20']) / data['sma_20']
+    data['sma_50_pct'] = (data['close'] - data['sma_50']) / data['sma_50']
+
+    return data
+
+
+RAW_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+def technical_features(candles: pd.DataFrame) -> pd.DataFrame:
+    """Indicator columns of add_technical_features (raw OHLCV dropped)."""
+    data = add_technical_features(candles)
+    return data.drop(columns=[c for c in RAW_COLUMNS if c in data.columns])
+
+
+def regime_features(candles: pd.DataFrame) -> pd.DataFrame:
+    """
+    RegimeDetector batch labels as numeric columns: adx, bb_width,
+    pattern_score, trend (+1/-1/0), regime code, confidence, position_multiplier.
+    """
+    from yunmin.ml.regime_detector import MarketRegime, RegimeDetector
+
+    labels = RegimeDetector().label_history(candles)
+    regime_codes = {regime.value: code for code, regime in enumerate(MarketRegime)}
+    trend_codes = {'bullish': 1.0, 'bearish': -1.0, 'sideways': 0.0}
+    return pd.DataFrame({
+        'adx': labels['adx'],
+        'bb_width': labels['bb_width'],
+        'pattern_score': labels['pattern_score'],
+        'trend': labels['trend'].map(trend_codes),
+        'regime': labels['regime'].map(regime_codes).astype(float),
+        'confidence': labels['confidence'],
+        'position_multiplier': labels['position_multiplier'],
+    }, index=candles.index)
+
+
+DEFAULT_DEFINITIONS: Dict[str, FeatureDefinition] = {
+    definition.name: definition
+    for definition in (
+        FeatureDefinition(
+            'technical', 1, technical_features, warmup=400,
+            description="LSTM inputs: returns, RSI, MACD, BB, ATR, volume, SMA, time encodings"
+        ),
+        FeatureDefinition(
+            'regime', 1, regime_features, warmup=500,
+            description="Wilder ADX, BB width, price-action trend and regime labels"
+        ),
+    )
+}
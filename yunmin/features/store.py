@@ -0,0 +1,384 @@
+"""
+Feature Store - Offline, versioned features shared by training and live inference.
+
+Layout (one partition per feature set version / symbol / timeframe):
+    <root>/<set>/v<version>/<SYMBOL>/<timeframe>/
+        meta.json           columns, row count, last timestamp
+        timestamp.i64       bar open time (ns since epoch)
+        <column>.f64        one append-only float64 file per raw/feature column
+
+Closed bars are appended column-wise; features for them are computed from the
+stored raw tail (definition.warmup bars), so nothing is recomputed from scratch.
+Reads are point-in-time: as_of=T returns only bars that had closed by T.
+"""
+
+from typing import Dict, Iterable, List, Optional, Union
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from yunmin.features.definitions import DEFAULT_DEFINITIONS, FeatureDefinition
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+_TIMEFRAME_UNITS = {'s': 's', 'm': 'min', 'h': 'h', 'd': 'D', 'w': 'W'}
+
+
+def timeframe_delta(timeframe: str) -> pd.Timedelta:
+    """Bar duration of an exchange timeframe string ('1m', '5m', '4h', '1d')."""
+    match = re.fullmatch(r'(\d+)([smhdw])', timeframe.strip().lower())
+    if not match:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return pd.Timedelta(int(match.group(1)), unit=_TIMEFRAME_UNITS[match.group(2)])
+
+
+def _to_ns(values) -> np.ndarray:
+    return pd.to_datetime(values).values.astype('datetime64[ns]').astype(np.int64)
+
+
+class _Partition:
+    """Column files of one (set version, symbol, timeframe)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.meta_path = path / 'meta.json'
+        self.meta = {'rows': 0, 'columns': [], 'last_timestamp': None}
+        self._meta_mtime = None
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-read meta.json if it changed (rows committed by another process)."""
+        try:
+            mtime = self.meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._meta_mtime:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+            self._meta_mtime = mtime
+
+    @property
+    def rows(self) -> int:
+        return self.meta['rows']
+
+    @property
+    def columns(self) -> List[str]:
+        return self.meta['columns']
+
+    def _file(self, column: str) -> Path:
+        return self.path / ('timestamp.i64' if column == 'timestamp' else f'{column}.f64')
+
+    def timestamps(self) -> np.ndarray:
+        """Read-only memory map of the timestamp column (no copy, for searchsorted)."""
+        if self.rows == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.memmap(self._file('timestamp'), dtype=np.int64, mode='r', shape=(self.rows,))
+
+    def column(self, column: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Rows [start, stop) of one column (memory-mapped, then copied)."""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        if stop <= start:
+            return np.empty(0, dtype=np.int64 if column == 'timestamp' else np.float64)
+        dtype = np.int64 if column == 'timestamp' else np.float64
+        data = np.memmap(self._file(column), dtype=dtype, mode='r', shape=(self.rows,))
+        return np.array(data[start:stop])
+
+    def append(self, timestamps: np.ndarray, values: Dict[str, np.ndarray]) -> None:
+        """Append rows to every column file, then commit the new row count."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        if self.rows == 0:
+            self.meta['columns'] = list(values)
+        elif list(values) != self.columns:
+            raise ValueError(f"Column mismatch for {self.path}: {list(values)} != {self.columns}")
+
+        for column, array, dtype in [('timestamp', timestamps, np.int64)] + [
+            (name, values[name], np.float64) for name in self.columns
+        ]:
+            path = self._file(column)
+            with open(path, 'ab') as f:
+                # Drop bytes past the committed row count (interrupted append)
+                f.truncate(self.rows * np.dtype(dtype).itemsize)
+                np.asarray(array, dtype=dtype).tofile(f)
+
+        self.meta['rows'] += len(timestamps)
+        self.meta['last_timestamp'] = int(timestamps[-1])
+        tmp = self.meta_path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.meta_path)
+
+
+class FeatureStore:
+    """
+    Materialised features per symbol/timeframe.
+
+    Usage:
+        store = FeatureStore()
+        store.update('technical', 'BTC/USDT', '5m', candles)      # new bars only
+        train_df = store.read('technical', 'BTC/USDT', '5m', end='2025-06-01')
+        live_row = store.latest('technical', 'BTC/USDT', '5m')
+        trades = store.join_asof(trades, 'regime', 'BTC/USDT', '5m')
+    """
+
+    def __init__(
+        self,
+        root: str = 'data/features',
+        definitions: Optional[Iterable[FeatureDefinition]] = None
+    ):
+        """
+        Initialize feature store.
+
+        Args:
+            root: Store directory
+            definitions: Feature definitions (default: technical + regime)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.definitions: Dict[str, FeatureDefinition] = dict(DEFAULT_DEFINITIONS)
+        for definition in definitions or ():
+            self.register(definition)
+        self._partitions: Dict[Path, _Partition] = {}
+        self._lock = threading.RLock()
+
+    def register(self, definition: FeatureDefinition) -> None:
+        """Add or replace a feature definition (latest registered version wins)."""
+        self.definitions[definition.name] = definition
+
+    def _partition(self, name: str, symbol: str, timeframe: str) -> _Partition:
+        definition = self.definitions[name]
+        path = self.root / name / f"v{definition.version}" / symbol.replace('/', '-') / timeframe
+        partition = self._partitions.get(path)
+        if partition is None:
+            partition = self._partitions[path] = _Partition(path)
+        else:
+            partition.refresh()
+        return partition
+
+    @staticmethod
+    def _normalise_candles(candles: pd.DataFrame) -> pd.DataFrame:
+        if 'timestamp' in candles.columns:
+            frame = candles[['timestamp', *OHLCV]].copy()
+        elif isinstance(candles.index, pd.DatetimeIndex):
+            frame = candles[list(OHLCV)].copy()
+            frame.insert(0, 'timestamp', candles.index)
+        else:
+            raise ValueError("candles need a 'timestamp' column or a DatetimeIndex")
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'])
+        return frame.sort_values('timestamp').reset_index(drop=True)
+
+    def _compute(self, definition: FeatureDefinition, candles: pd.DataFrame) -> pd.DataFrame:
+        features = definition.compute(candles)
+        numeric = features.select_dtypes(include=[np.number, bool])
+        return numeric.astype(np.float64)
+
+    def update(
+        self,
+        name: str,
+        symbol: str,
+        timeframe: str,
+        candles: pd.DataFrame,
+        now: Optional[Union[str, pd.Timestamp]] = None
+    ) -> int:
+        """
+        Append features for closed bars newer than the stored ones.
+
+        Feature values for new bars are computed over the stored raw tail
+        (definition.warmup bars) plus the new candles. Bars still forming at
+        `now` are skipped - stored rows are never rewritten, so they are
+        picked up by a later update once closed.
+
+        Args:
+            name: Feature set name
+            symbol: Trading pair
+            timeframe: Candle timeframe
+            candles: OHLCV with 'timestamp' column or DatetimeIndex; may overlap
+                already stored bars
+            now: Current time, UTC (default: wall clock)
+
+        Returns:
+            Number of bars appended
+        """
+        definition = self.definitions[name]
+        candles = self._normalise_candles(candles)
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+
+        with self._lock:
+            partition = self._partition(name, symbol, timeframe)
+            last = partition.meta['last_timestamp']
+            timestamps = _to_ns(candles['timestamp'])
+            new_mask = timestamps + timeframe_delta(timeframe).value <= now.value
+            if last is not None:
+                new_mask &= timestamps > last
+            new = candles[new_mask]
+            if new.empty:
+                return 0
+
+            if partition.rows > 0:
+                start = max(0, partition.rows - definition.warmup)
+                history = pd.DataFrame({
+                    'timestamp': pd.to_datetime(partition.column('timestamp', start)),
+                    **{col: partition.column(col, start) for col in OHLCV},
+                })
+                frame = pd.concat([history, new], ignore_index=True)
+            else:
+                frame = new.reset_index(drop=True)
+
+            features = self._compute(definition, frame).iloc[-len(new):]
+            values = {col: new[col].to_numpy(dtype=np.float64) for col in OHLCV}
+            for col in features.columns:
+                if col not in values:
+                    values[col] = features[col].to_numpy()
+            if partition.rows > 0:
+                values = {col: values.get(col, np.full(len(new), np.nan)) for col in partition.columns}
+
+            partition.append(_to_ns(new['timestamp']), values)
+
+        logger.debug(f"Feature store {definition.key} {symbol} {timeframe}: +{len(new)} bars")
+        return len(new)
+
+    def materialize(
+        self,
+        name: str,
+        symbol: str,
+        timeframe: str,
+        candles: pd.DataFrame,
+        now: Optional[Union[str, pd.Timestamp]] = None
+    ) -> int:
+        """Rebuild a partition from scratch over the full (closed) candle history."""
+        with self._lock:
+            partition = self._partition(name, symbol, timeframe)
+            if partition.path.exists():
+                for path in partition.path.iterdir():
+                    path.unlink()
+            self._partitions.pop(partition.path, None)
+            return self.update(name, symbol, timeframe, candles, now=now)
+
+    def read(
+        self,
+        name: str,
+        symbol: str,
+        timeframe: str,
+        start: Optional[Union[str, pd.Timestamp]] = None,
+        end: Optional[Union[str, pd.Timestamp]] = None,
+        as_of: Optional[Union[str, pd.Timestamp]] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Read stored bars as a DataFrame indexed by bar open time.
+
+        Args:
+            start, end: Bar open time range [start, end)
+            as_of: Point-in-time cut: only bars whose close (open + timeframe)
+                is <= as_of, i.e. what was known at that moment
+            columns: Subset of columns (default: all raw + feature columns)
+        """
+        with self._lock:
+            partition = self._partition(name, symbol, timeframe)
+            if partition.rows == 0:
+                return pd.DataFrame(columns=columns or [])
+
+            timestamps = partition.timestamps()
+            lo, hi = 0, len(timestamps)
+            if start is not None:
+                lo = int(np.searchsorted(timestamps, pd.Timestamp(start).value, side='left'))
+            if end is not None:
+                hi = min(hi, int(np.searchsorted(timestamps, pd.Timestamp(end).value, side='left')))
+            if as_of is not None:
+                cutoff = (pd.Timestamp(as_of) - timeframe_delta(timeframe)).value
+                hi = min(hi, int(np.searchsorted(timestamps, cutoff, side='right')))
+
+            selected = columns or partition.columns
+            data = {col: partition.column(col, lo, hi) for col in selected}
+            index = np.array(timestamps[lo:hi]).astype('datetime64[ns]')
+        return pd.DataFrame(data, index=pd.DatetimeIndex(index, name='timestamp'))
+
+    def latest(
+        self,
+        name: str,
+        symbol: str,
+        timeframe: str,
+        as_of: Optional[Union[str, pd.Timestamp]] = None
+    ) -> Optional[pd.Series]:
+        """Most recent closed bar's features (None if nothing stored)."""
+        with self._lock:
+            partition = self._partition(name, symbol, timeframe)
+            if partition.rows == 0:
+                return None
+            if as_of is None:
+                row = partition.rows - 1
+                timestamp = partition.column('timestamp', row, row + 1)[0]
+                return pd.Series(
+                    {col: partition.column(col, row, row + 1)[0] for col in partition.columns},
+                    name=pd.Timestamp(timestamp)
+                )
+        frame = self.read(name, symbol, timeframe, as_of=as_of)
+        return frame.iloc[-1] if len(frame) else None
+
+    def join_asof(
+        self,
+        events: pd.DataFrame,
+        name: str,
+        symbol: str,
+        timeframe: str,
+        on: str = 'timestamp',
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Attach to each event the features of the last bar closed at event time.
+
+        Point-in-time join for building training sets (e.g. trade entries),
+        so no event sees a bar that had not finished yet.
+        """
+        features = self.read(name, symbol, timeframe, columns=columns)
+        if features.empty:
+            return events.copy()
+        features = features.reset_index()
+        features['_available_at'] = features['timestamp'] + timeframe_delta(timeframe)
+        features = features.drop(columns=['timestamp'])
+
+        left = events.copy()
+        left['_event_time'] = pd.to_datetime(left[on]).astype('datetime64[ns]')
+        left['_order'] = np.arange(len(left))
+        merged = pd.merge_asof(
+            left.sort_values('_event_time'),
+            features.sort_values('_available_at'),
+            left_on='_event_time',
+            right_on='_available_at',
+            direction='backward',
+            suffixes=('', f'_{name}')
+        )
+        merged = merged.sort_values('_order').drop(columns=['_event_time', '_order', '_available_at'])
+        merged.index = events.index
+        return merged
+
+    def timeframes(self, name: str, symbol: str) -> List[str]:
+        """Timeframes with stored bars for a symbol (e.g. ['1m', '1h'])."""
+        definition = self.definitions[name]
+        path = self.root / name / f"v{definition.version}" / symbol.replace('/', '-')
+        if not path.is_dir():
+            return []
+        with self._lock:
+            return sorted(
+                child.name for child in path.iterdir()
+                if (child / 'meta.json').exists() and self._partition(name, symbol, child.name).rows > 0
+            )
+
+    def info(self, name: str, symbol: str, timeframe: str) -> Dict:
+        """Partition metadata (version, rows, columns, last bar)."""
+        with self._lock:
+            partition = self._partition(name, symbol, timeframe)
+            last = partition.meta['last_timestamp']
+            first = int(partition.timestamps()[0]) if partition.rows else None
+            return {
+                'definition': self.definitions[name].key,
+                'rows': partition.rows,
+                'columns': list(partition.columns),
+                'first_timestamp': pd.Timestamp(first).isoformat() if first is not None else None,
+                'last_timestamp': pd.Timestamp(last).isoformat() if last is not None else None,
+            }
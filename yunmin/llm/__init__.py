@@ -1,5 +1,6 @@
 """LLM module - Language model integration for analysis."""
 
 from yunmin.llm.openai_analyzer import OpenAIAnalyzer
+from yunmin.llm.model_router import ModelRouter, RouteDecision
 
-__all__ = ["OpenAIAnalyzer"]
+__all__ = ["OpenAIAnalyzer", "ModelRouter", "RouteDecision"]
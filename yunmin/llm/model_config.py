@@ -199,6 +199,27 @@ def get_models_by_tier(tier: ModelTier) -> dict[str, ModelConfig]:
     }
 
 
+def is_reasoning_model(model_name: str) -> bool:
+    """Модель из O-серии (o1, o3, o4-mini...)?"""
+    return model_name.startswith("o") and model_name[1:2].isdigit()
+
+
+def get_quality_rank(model_name: str) -> int:
+    """
+    Грубая оценка качества модели для маршрутизации.
+
+    Returns:
+        1 = nano, 2 = mini, 3 = флагман, 4 = reasoning (O-серия)
+    """
+    if is_reasoning_model(model_name):
+        return 4
+    if model_name.endswith("-nano"):
+        return 1
+    if model_name.endswith("-mini"):
+        return 2
+    return 3
+
+
 def calculate_daily_usage(
     model_name: str,
     decisions_per_day: int = 288,  # 5-min candles = 288/day
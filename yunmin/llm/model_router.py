@@ -0,0 +1,294 @@
+"""
+Token-Budget-Aware Model Router
+
+Runtime companion to `model_config.py`: выбирает модель для каждого запроса
+на основе фактического расхода токенов (из `response.usage`) и наблюдаемой
+задержки.
+
+Routing rules:
+- Cheapest model first (cost = expected tokens / daily token limit)
+- Must meet the quality target and the p95 latency target
+- Reasoning models (o1/o3/o4) only for high-stakes decisions
+- Models near their daily limit are skipped, quality degrades automatically
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from yunmin.llm.model_config import (
+    AVAILABLE_MODELS,
+    ModelConfig,
+    get_model_config,
+    get_quality_rank,
+    is_reasoning_model,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RouteDecision:
+    """Результат маршрутизации одного запроса."""
+    model: str
+    expected_tokens: int
+    budget_used_pct: float
+    degraded: bool
+    reason: str
+
+
+class _ModelStats:
+    """Дневной расход токенов и скользящее окно задержек одной модели."""
+
+    def __init__(self, latency_window: int):
+        self.day = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.requests = 0
+        self.failures = 0
+        self.latencies_ms = deque(maxlen=latency_window)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def roll_day(self, day) -> None:
+        """Сбросить дневные счётчики при смене суток (UTC)."""
+        if self.day != day:
+            self.day = day
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.requests = 0
+            self.failures = 0
+
+    def p95_latency_ms(self) -> Optional[float]:
+        if not self.latencies_ms:
+            return None
+        return float(np.percentile(self.latencies_ms, 95))
+
+
+class ModelRouter:
+    """
+    Route LLM requests to the cheapest model meeting latency/quality targets.
+
+    Usage:
+        router = ModelRouter(quality_target=2, latency_target_ms=3000)
+        decision = router.route(high_stakes=False)
+        start = time.perf_counter()
+        response = client.chat.completions.create(model=decision.model, ...)
+        router.record_response(decision.model, response, time.perf_counter() - start)
+    """
+
+    def __init__(
+        self,
+        models: Optional[List[str]] = None,
+        quality_target: int = 2,
+        high_stakes_quality_target: int = 4,
+        latency_target_ms: float = 5000.0,
+        degrade_threshold: float = 0.9,
+        latency_window: int = 200,
+    ):
+        """
+        Initialize model router.
+
+        Args:
+            models: Candidate model names (default: all models from AVAILABLE_MODELS)
+            quality_target: Minimum quality rank for routine decisions (1=nano .. 4=reasoning)
+            high_stakes_quality_target: Minimum quality rank for high-stakes decisions
+            latency_target_ms: p95 latency target per request
+            degrade_threshold: Fraction of daily limit after which a model is skipped
+            latency_window: Number of recent latencies kept per model
+        """
+        names = models if models is not None else list(AVAILABLE_MODELS.keys())
+        self.models: Dict[str, ModelConfig] = {}
+        for name in names:
+            config = get_model_config(name)
+            if config is None:
+                logger.warning(f"⚠️ Unknown model '{name}' ignored by router")
+                continue
+            self.models[name] = config
+
+        if not self.models:
+            raise ValueError("ModelRouter needs at least one known model")
+
+        self.quality_target = quality_target
+        self.high_stakes_quality_target = high_stakes_quality_target
+        self.latency_target_ms = latency_target_ms
+        self.degrade_threshold = degrade_threshold
+
+        self._stats = {name: _ModelStats(latency_window) for name in self.models}
+        self._lock = threading.Lock()
+
+        # Порядок по стоимости считаем один раз - лимиты статичны
+        self._by_cost = sorted(
+            self.models,
+            key=lambda n: (
+                self.models[n].recommended_request_tokens / self.models[n].max_tokens_per_day,
+                get_quality_rank(n),
+            ),
+        )
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).date()
+
+    def _expected_tokens(self, name: str) -> int:
+        """Средний фактический расход на запрос, иначе рекомендованный размер."""
+        stats = self._stats[name]
+        if stats.requests:
+            return max(1, stats.total_tokens // stats.requests)
+        return self.models[name].recommended_request_tokens
+
+    def _has_budget(self, name: str, expected: int) -> bool:
+        limit = self.models[name].max_tokens_per_day * self.degrade_threshold
+        return self._stats[name].total_tokens + expected <= limit
+
+    def _meets_latency(self, name: str) -> bool:
+        p95 = self._stats[name].p95_latency_ms()
+        return p95 is None or p95 <= self.latency_target_ms
+
+    def route(self, high_stakes: bool = False) -> Optional[RouteDecision]:
+        """
+        Choose a model for the next request.
+
+        Args:
+            high_stakes: Allow (and require) reasoning-grade models
+
+        Returns:
+            RouteDecision, or None if every model is out of daily budget
+        """
+        target = self.high_stakes_quality_target if high_stakes else self.quality_target
+        today = self._today()
+
+        with self._lock:
+            eligible = []
+            for name in self._by_cost:
+                stats = self._stats[name]
+                stats.roll_day(today)
+                if is_reasoning_model(name) and not high_stakes:
+                    continue
+                expected = self._expected_tokens(name)
+                if self._has_budget(name, expected):
+                    eligible.append((name, expected))
+
+            if not eligible:
+                logger.error("❌ All models exhausted their daily token budget")
+                return None
+
+            # 1. Cheapest model meeting quality and latency targets
+            for name, expected in eligible:
+                if get_quality_rank(name) >= target and self._meets_latency(name):
+                    return self._decision(name, expected, False, "cheapest meeting targets")
+
+            # 2. Quality met but latency not - take the fastest of those
+            qualified = [item for item in eligible if get_quality_rank(item[0]) >= target]
+            if qualified:
+                name, expected = min(
+                    qualified, key=lambda item: self._stats[item[0]].p95_latency_ms() or 0.0
+                )
+                return self._decision(name, expected, False, "latency target missed")
+
+            # 3. Degrade: highest quality still within budget
+            name, expected = max(eligible, key=lambda item: get_quality_rank(item[0]))
+            return self._decision(name, expected, True, "degraded near daily limits")
+
+    def _decision(self, name: str, expected: int, degraded: bool, reason: str) -> RouteDecision:
+        used_pct = self._stats[name].total_tokens / self.models[name].max_tokens_per_day * 100
+        if degraded:
+            logger.warning(f"⚠️ Router degraded to {name} ({used_pct:.1f}% of daily budget used)")
+        return RouteDecision(
+            model=name,
+            expected_tokens=expected,
+            budget_used_pct=round(used_pct, 2),
+            degraded=degraded,
+            reason=reason,
+        )
+
+    def record_usage(
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency_s: Optional[float] = None,
+    ) -> None:
+        """Record actual token usage and latency of a completed request."""
+        if model not in self._stats:
+            return
+        with self._lock:
+            stats = self._stats[model]
+            stats.roll_day(self._today())
+            stats.prompt_tokens += int(prompt_tokens or 0)
+            stats.completion_tokens += int(completion_tokens or 0)
+            stats.requests += 1
+            if latency_s is not None:
+                stats.latencies_ms.append(latency_s * 1000.0)
+
+    def record_response(self, model: str, response, latency_s: Optional[float] = None) -> None:
+        """Record usage from an OpenAI chat completion response."""
+        usage = getattr(response, 'usage', None)
+        prompt = getattr(usage, 'prompt_tokens', 0) if usage else 0
+        completion = getattr(usage, 'completion_tokens', 0) if usage else 0
+        self.record_usage(model, prompt, completion, latency_s)
+
+    def record_failure(self, model: str, latency_s: Optional[float] = None) -> None:
+        """Record a failed request (timeouts count against latency)."""
+        if model not in self._stats:
+            return
+        with self._lock:
+            stats = self._stats[model]
+            stats.roll_day(self._today())
+            stats.failures += 1
+            if latency_s is not None:
+                stats.latencies_ms.append(latency_s * 1000.0)
+
+    def get_usage_report(self) -> Dict[str, dict]:
+        """Per-model daily usage, remaining budget and latency percentiles."""
+        today = self._today()
+        report = {}
+        with self._lock:
+            for name, stats in self._stats.items():
+                stats.roll_day(today)
+                if not stats.requests and not stats.failures:
+                    continue
+                limit = self.models[name].max_tokens_per_day
+                latencies = np.asarray(stats.latencies_ms) if stats.latencies_ms else None
+                report[name] = {
+                    'requests': stats.requests,
+                    'failures': stats.failures,
+                    'prompt_tokens': stats.prompt_tokens,
+                    'completion_tokens': stats.completion_tokens,
+                    'total_tokens': stats.total_tokens,
+                    'max_tokens_per_day': limit,
+                    'remaining_tokens': max(0, limit - stats.total_tokens),
+                    'avg_tokens_per_request': self._expected_tokens(name),
+                    'p50_latency_ms': float(np.percentile(latencies, 50)) if latencies is not None else None,
+                    'p95_latency_ms': float(np.percentile(latencies, 95)) if latencies is not None else None,
+                }
+        return report
+
+
+def timed_completion(router: ModelRouter, client, high_stakes: bool = False, **kwargs):
+    """
+    Route, call `client.chat.completions.create` and record usage in one step.
+
+    Returns:
+        (response, RouteDecision) - response is None if no model has budget left
+    """
+    decision = router.route(high_stakes=high_stakes)
+    if decision is None:
+        return None, None
+
+    start = time.perf_counter()
+    try:
+        response = client.chat.completions.create(model=decision.model, **kwargs)
+    except Exception:
+        router.record_failure(decision.model, time.perf_counter() - start)
+        raise
+    router.record_response(decision.model, response, time.perf_counter() - start)
+    return response, decision
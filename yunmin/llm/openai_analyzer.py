@@ -9,10 +9,13 @@ Supports all latest OpenAI models:
 Budget protection via OpenAI dashboard settings.
 """
 import os
+import time
 import logging
 from typing import Dict, Any, Optional
 from openai import OpenAI
 
+from yunmin.llm.model_router import ModelRouter
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,7 +36,8 @@ class OpenAIAnalyzer:
     - gpt-5.1-codex-mini: Latest tech + high volume
     """
     
-    def __init__(self, api_key: str = None, model: str = None):
+    def __init__(self, api_key: str = None, model: str = None,
+                 router: Optional[ModelRouter] = None):
         """
         Initialize OpenAI analyzer.
         
@@ -41,7 +45,10 @@ class OpenAIAnalyzer:
             api_key: OpenAI API key (or from env OPENAI_API_KEY)
             model: Model name (gpt-4o-mini, gpt-5.1, o1-mini, etc.)
                    If None, reads from env YUNMIN_LLM_MODEL or defaults to gpt-4o-mini
+            router: Optional ModelRouter - picks the model per request in
+                    analyze_market() and tracks real token usage
         """
+        self.router = router
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             logger.warning("⚠️ OpenAI API key not found - analyzer disabled")
@@ -96,13 +103,18 @@ class OpenAIAnalyzer:
         
         Args:
             market_data: Current market conditions (price, rsi, ema, volume, etc.)
+                         Set 'high_stakes': True to let the router escalate
+                         to a reasoning model. A pre-built prompt in
+                         'context' is sent as-is instead of the default one.
             
         Returns:
             {
                 'signal': 'BUY' | 'SELL' | 'HOLD',
                 'confidence': float (0-1),
                 'reasoning': str,
-                'model_used': str
+                'model_used': str,
+                'raw_response': str,        # on success
+                'prompt_tokens': int|None   # on success, from response.usage
             }
         """
         if not self.enabled:
@@ -113,13 +125,31 @@ class OpenAIAnalyzer:
                 'model_used': None
             }
         
-        # Build comprehensive prompt
-        prompt = self._build_market_prompt(market_data)
+        model = self.model
+        if self.router is not None:
+            decision = self.router.route(high_stakes=bool(market_data.get('high_stakes')))
+            if decision is None:
+                return {
+                    'signal': 'HOLD',
+                    'confidence': 0.0,
+                    'reasoning': 'Daily token budget exhausted',
+                    'model_used': None
+                }
+            model = decision.model
+        
+        # Caller-compiled prompt (it defines its own reply format) or the default one
+        context = market_data.get('context')
+        prompt = context or self._build_market_prompt(market_data)
+        system_prompt = (
+            "Expert crypto trader. Reply in the format given in the prompt."
+            if context else
+            "Expert crypto trader. Analyze technical data. Format: SIGNAL: [BUY/SELL/HOLD]\nCONFIDENCE: [0-1]\nREASONING: [brief analysis]"
+        )
         
         # ⚠️ DEBUG: Log request details
         try:
             with open("gpt_request_debug.txt", "w", encoding="utf-8") as f:
-                f.write(f"MODEL: {self.model}\n")
+                f.write(f"MODEL: {model}\n")
                 f.write(f"API KEY EXISTS: {bool(self.api_key)}\n")
                 f.write(f"ENABLED: {self.enabled}\n")
                 f.write(f"PROMPT:\n{prompt}\n")
@@ -127,13 +157,14 @@ class OpenAIAnalyzer:
         except Exception as e:
             logger.error(f"Debug request write failed: {e}")
         
+        start = time.perf_counter()
         try:
             response = self.client.chat.completions.create(
-                model=self.model,
+                model=model,
                 messages=[
                     {
                         "role": "system",
-                        "content": "Expert crypto trader. Analyze technical data. Format: SIGNAL: [BUY/SELL/HOLD]\nCONFIDENCE: [0-1]\nREASONING: [brief analysis]"
+                        "content": system_prompt
                     },
                     {
                         "role": "user",
@@ -142,6 +173,8 @@ class OpenAIAnalyzer:
                 ],
                 max_completion_tokens=200  # Reduced from 400 for token economy
             )
+            if self.router is not None:
+                self.router.record_response(model, response, time.perf_counter() - start)
             
             # Parse response
             raw_content = response.choices[0].message.content
@@ -161,12 +194,14 @@ class OpenAIAnalyzer:
                 logger.error(f"Debug file write failed: {e}")
             
             result = self._parse_response(content)
-            result['model_used'] = self.model
+            result['model_used'] = model
+            result['raw_response'] = content
+            result['prompt_tokens'] = response.usage.prompt_tokens if response.usage else None
             
             # Log usage
             tokens_used = response.usage.total_tokens if response.usage else 0
             logger.info(
-                f"📊 OpenAI {self.model}: {result['signal']} "
+                f"📊 OpenAI {model}: {result['signal']} "
                 f"(confidence={result['confidence']:.2f}, tokens={tokens_used})"
             )
             
@@ -174,11 +209,13 @@ class OpenAIAnalyzer:
             
         except Exception as e:
             logger.error(f"❌ OpenAI analysis failed: {e}")
+            if self.router is not None:
+                self.router.record_failure(model, time.perf_counter() - start)
             return {
                 'signal': 'HOLD',
                 'confidence': 0.0,
                 'reasoning': f'Analysis error: {str(e)}',
-                'model_used': self.model
+                'model_used': model
             }
     
     def analyze_market_conditions(self, market_data: Dict[str, Any]) -> str:
@@ -349,12 +386,15 @@ Analyze and decide: BUY/SELL/HOLD?"""
         return result
     
     def get_usage_report(self) -> dict:
-        """Get usage statistics (stub for compatibility)."""
-        return {
-            'model': self.model,
+        """Get usage statistics (per-model token usage when a router is attached)."""
+        report = {
+            'model': getattr(self, 'model', None),
             'enabled': self.enabled,
             'provider': 'openai'
         }
+        if self.router is not None:
+            report['models'] = self.router.get_usage_report()
+        return report
 
 
 if __name__ == "__main__":
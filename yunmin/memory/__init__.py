@@ -5,14 +5,31 @@ This module provides memory capabilities for the AI trading agent:
 - Vector store for similarity search (RAG)
 - Trade history with embeddings
 - Pattern library for recurring market situations
+
+Classes are imported lazily (PEP 562) on first attribute access.
 """
 
-from yunmin.memory.vector_store import VectorStore
-from yunmin.memory.trade_history import TradeHistory
-from yunmin.memory.pattern_library import PatternLibrary
+import importlib
+
+_LAZY_IMPORTS = {
+    'VectorStore': 'yunmin.memory.vector_store',
+    'TradeHistory': 'yunmin.memory.trade_history',
+    'TradeMetadataStore': 'yunmin.memory.trade_metadata',
+    'EmbeddingService': 'yunmin.memory.embeddings',
+    'PatternLibrary': 'yunmin.memory.pattern_library',
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    'VectorStore',
-    'TradeHistory',
-    'PatternLibrary',
-]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,254 @@
+"""
+Embedding Service - Batched, cached embeddings for trade memory
+
+Turns trade contexts into fixed-size vectors:
+- Many texts per backend request (OpenAI accepts lists of inputs)
+- Cache keyed by the canonical context text (memory LRU + optional SQLite)
+- Vectorised resize to the store dimension (chunk-mean / zero-pad)
+- Offline backends: sentence-transformers if installed, hashing otherwise
+"""
+
+from typing import Dict, List, Optional, Sequence
+from collections import OrderedDict
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+
+def resize_embeddings(matrix: np.ndarray, dim: int) -> np.ndarray:
+    """
+    Resize (n, d) embeddings to (n, dim).
+
+    d > dim: mean over `d // dim` consecutive chunks (tail dropped)
+    d < dim: zero-padded
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    n, d = matrix.shape
+    if d == dim:
+        return matrix
+    if d < dim:
+        out = np.zeros((n, dim), dtype=np.float32)
+        out[:, :d] = matrix
+        return out
+    chunk = d // dim
+    return matrix[:, :chunk * dim].reshape(n, dim, chunk).mean(axis=2)
+
+
+class OpenAIEmbeddingBackend:
+    """OpenAI embeddings API, many inputs per request."""
+
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        api_key: Optional[str] = None,
+        batch_size: int = 512
+    ):
+        import openai
+
+        self.model = model
+        self.identity = model
+        self.batch_size = batch_size
+        self.client = openai.OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = list(texts[start:start + self.batch_size])
+            response = self.client.embeddings.create(model=self.model, input=batch)
+            # API may return items out of order - sort by index
+            data = sorted(response.data, key=lambda item: item.index)
+            rows.extend(item.embedding for item in data)
+        return np.asarray(rows, dtype=np.float32)
+
+
+class HashingEmbeddingBackend:
+    """
+    Offline embedding: hashed character trigrams, L2-normalised.
+
+    No dependencies and deterministic, so it is safe for backfills and tests.
+    """
+
+    def __init__(self, dim: int = 384, ngram: int = 3):
+        self.dim = dim
+        self.ngram = ngram
+        self.identity = 'hashing' if ngram == 3 else f'hashing-{ngram}'
+
+    def _hash_ids(self, text: str) -> np.ndarray:
+        text = f" {text.lower()} "
+        grams = {text[i:i + self.ngram] for i in range(len(text) - self.ngram + 1)}
+        return np.fromiter(
+            (int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), 'little') % self.dim
+             for g in grams),
+            dtype=np.int64
+        )
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            out[row] = np.bincount(self._hash_ids(text), minlength=self.dim)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms > 0, norms, 1.0)
+
+
+class LocalEmbeddingBackend:
+    """
+    Offline sentence embeddings via sentence-transformers
+    (all-MiniLM-L6-v2 is natively 384-dim). Falls back to hashing.
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", batch_size: int = 256, dim: int = 384):
+        self.batch_size = batch_size
+        try:
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(model_name)
+            self.fallback = None
+            self.identity = f'sentence-transformers/{model_name}'
+            logger.info(f"✅ Local embedding model loaded: {model_name}")
+        except ImportError:
+            logger.warning("⚠️  sentence-transformers not available, using hashing embeddings")
+            self.model = None
+            self.fallback = HashingEmbeddingBackend(dim=dim)
+            self.identity = self.fallback.identity
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if self.model is None:
+            return self.fallback.embed(texts)
+        return np.asarray(
+            self.model.encode(list(texts), batch_size=self.batch_size, show_progress_bar=False),
+            dtype=np.float32
+        )
+
+
+class EmbeddingService:
+    """
+    Batched, cached text -> vector service.
+
+    Usage:
+        service = EmbeddingService(OpenAIEmbeddingBackend(), dim=384)
+        vectors = service.embed_texts(texts)   # (len(texts), 384)
+    """
+
+    def __init__(
+        self,
+        backend,
+        dim: int = 384,
+        cache_path: Optional[str] = None,
+        memory_cache_size: int = 50_000
+    ):
+        """
+        Initialize embedding service.
+
+        Args:
+            backend: Object with embed(texts) -> (n, d) array
+            dim: Output dimension
+            cache_path: Optional SQLite file for a persistent cache
+            memory_cache_size: Max entries kept in the in-memory LRU
+        """
+        self.backend = backend
+        self.dim = dim
+        self.memory_cache_size = memory_cache_size
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._db = None
+        if cache_path:
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(cache_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)"
+            )
+
+    def _cache_key(self, text: str) -> str:
+        # Vectors from different models live in different spaces - key by the
+        # concrete model ('identity'), not by the backend class
+        name = getattr(self.backend, 'identity', None)
+        if not isinstance(name, str):
+            model = getattr(self.backend, 'model', None)
+            name = model if isinstance(model, str) else type(self.backend).__name__
+        return hashlib.sha1(f"{name}|{self.dim}|{text}".encode('utf-8')).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_cache_size:
+            self._memory.popitem(last=False)
+
+    def _lookup_db(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if self._db is None or not keys:
+            return {}
+        found = {}
+        for start in range(0, len(keys), 900):  # SQLite parameter limit
+            chunk = keys[start:start + 900]
+            rows = self._db.execute(
+                f"SELECT key, vec FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def embed_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed texts, calling the backend only for unseen texts.
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        keys = [self._cache_key(t) for t in texts]
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+
+        with self._lock:
+            missing: Dict[str, List[int]] = {}
+            for row, key in enumerate(keys):
+                cached = self._memory.get(key)
+                if cached is not None:
+                    self._memory.move_to_end(key)
+                    out[row] = cached
+                else:
+                    missing.setdefault(key, []).append(row)
+
+            for key, vector in self._lookup_db(list(missing)).items():
+                out[missing.pop(key)] = vector
+                self._remember(key, vector)
+
+            self.hits += len(texts) - sum(len(rows) for rows in missing.values())
+            self.misses += len(missing)
+
+        if not missing:
+            return out
+
+        # One backend call for all unique unseen texts
+        miss_keys = list(missing)
+        miss_texts = [texts[missing[key][0]] for key in miss_keys]
+        vectors = resize_embeddings(self.backend.embed(miss_texts), self.dim)
+
+        with self._lock:
+            for key, vector in zip(miss_keys, vectors):
+                out[missing[key]] = vector
+                self._remember(key, vector.copy())
+            if self._db is not None:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)",
+                        [(key, vector.tobytes()) for key, vector in zip(miss_keys, vectors)]
+                    )
+
+        logger.debug(f"Embedded {len(miss_keys)} new texts ({len(texts) - len(miss_keys)} cached)")
+        return out
+
+    def get_stats(self) -> Dict[str, int]:
+        """Cache hit/miss counters."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_entries': len(self._memory),
+        }
@@ -11,6 +11,12 @@ import numpy as np
 from loguru import logger
 
 from yunmin.memory.vector_store import VectorStore
+from yunmin.memory.trade_metadata import TradeMetadataStore
+from yunmin.memory.embeddings import (
+    EmbeddingService,
+    LocalEmbeddingBackend,
+    OpenAIEmbeddingBackend,
+)
 
 
 class TradeHistory:
@@ -27,17 +33,30 @@ class TradeHistory:
     def __init__(
         self,
         vector_store: Optional[VectorStore] = None,
-        embedding_model: str = "simple"
+        embedding_model: str = "simple",
+        metadata_path: Optional[str] = None,
+        embedding_service: Optional[EmbeddingService] = None
     ):
         """
         Initialize trade history.
         
         Args:
             vector_store: VectorStore instance for similarity search
-            embedding_model: Model to use for embeddings ("simple", "openai")
+            embedding_model: Model to use for embeddings ("simple", "openai", "local")
+            metadata_path: SQLite file for trade metadata
+                           (default: <vector_store path>/trades.db)
+            embedding_service: Pre-built EmbeddingService for "openai"/"local"
+                               (default: created lazily, cached in embeddings.db)
         """
-        self.vector_store = vector_store or VectorStore(embedding_dim=384)
+        # An empty VectorStore is falsy (len 0) - only default when none given
+        self.vector_store = vector_store if vector_store is not None else VectorStore(embedding_dim=384)
         self.embedding_model = embedding_model
+        self._embedding_service = embedding_service
+        
+        db_path = metadata_path or str(self.vector_store.storage_path / 'trades.db')
+        self.trades = TradeMetadataStore(db_path)
+        self._restore_orphaned_vectors()
+        self._backfill_metadata()
         
         logger.info(f"📚 Trade history initialized with {self.embedding_model} embeddings")
     
@@ -69,17 +88,64 @@ class TradeHistory:
             'outcome': outcome,
         }
         
-        # Store in vector database
-        trade_id = self.vector_store.add(embedding, metadata)
+        # Vector store keeps only a light record; full metadata goes to SQLite.
+        # Vector first, so a committed metadata row always has a saved vector
+        trade_id = self.vector_store.add(embedding, {'timestamp': metadata['timestamp']})
+        self.vector_store.save()
+        self.trades.insert(trade_id, metadata)
         
         logger.debug(f"💾 Remembered trade {trade_id}")
         return trade_id
     
+    def remember_trades(
+        self,
+        trades: List[Dict[str, Any]]
+    ) -> List[int]:
+        """
+        Remember many trades at once (e.g. backfilling history).
+        
+        Embeddings are created in one batch and stored with a single
+        vector-store append and a single SQLite transaction.
+        
+        Args:
+            trades: Dicts with 'context', 'decision', optional 'outcome'
+                    and optional 'timestamp'
+            
+        Returns:
+            Trade IDs in input order
+        """
+        if not trades:
+            return []
+        
+        embeddings = self._create_embeddings([t['context'] for t in trades])
+        now = datetime.now().isoformat()
+        metadata = [
+            {
+                'timestamp': t.get('timestamp', now),
+                'context': t['context'],
+                'decision': t.get('decision', {}),
+                'outcome': t.get('outcome'),
+            }
+            for t in trades
+        ]
+        
+        trade_ids = self.vector_store.add_batch(
+            embeddings, [{'timestamp': m['timestamp']} for m in metadata]
+        )
+        self.vector_store.save()
+        self.trades.insert_many(zip(trade_ids, metadata))
+        
+        logger.info(f"💾 Remembered {len(trade_ids)} trades")
+        return trade_ids
+    
     def recall_similar(
         self,
         current_context: Dict[str, Any],
         top_k: int = 5,
-        min_similarity: float = 0.5
+        min_similarity: float = 0.5,
+        symbol: Optional[str] = None,
+        outcome: Optional[str] = None,
+        since: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Find similar past situations.
@@ -88,6 +154,9 @@ class TradeHistory:
             current_context: Current market conditions
             top_k: Number of similar situations to retrieve
             min_similarity: Minimum similarity threshold (0-1)
+            symbol: Only trades on this symbol
+            outcome: 'closed', 'open', 'win' or 'loss'
+            since: Only trades with ISO timestamp >= since
             
         Returns:
             List of similar past trades with metadata
@@ -95,8 +164,14 @@ class TradeHistory:
         # Create embedding for current context
         query_embedding = self._create_embedding(current_context)
         
-        # Search for similar vectors
-        results = self.vector_store.search(query_embedding, k=top_k)
+        # Indexed pre-filter, then search only the matching vectors
+        ids = None
+        if symbol is not None or outcome is not None or since is not None:
+            ids = self.trades.filter_ids(symbol=symbol, outcome=outcome, since=since)
+            if len(ids) == 0:
+                return []
+        
+        results = self.vector_store.search(query_embedding, k=top_k, ids=ids)
         
         # Filter by similarity threshold
         filtered_results = [
@@ -105,9 +180,10 @@ class TradeHistory:
         ]
         
         # Format results
+        records = self.trades.get_many([r['id'] for r in filtered_results])
         similar_trades = []
         for r in filtered_results:
-            meta = r['metadata']
+            meta = records.get(r['id'], r['metadata'])
             similar_trades.append({
                 'situation': meta.get('context', {}),
                 'decision': meta.get('decision', {}),
@@ -131,48 +207,77 @@ class TradeHistory:
             trade_id: ID of the trade to update
             outcome: Trade outcome (PnL, success/failure, lessons)
         """
-        if trade_id < len(self.vector_store):
-            self.vector_store.metadata[trade_id]['outcome'] = outcome
+        if self.trades.update_outcome(trade_id, outcome):
             logger.debug(f"✏️  Updated outcome for trade {trade_id}")
         else:
             logger.warning(f"Trade {trade_id} not found")
     
-    def get_statistics(self) -> Dict[str, Any]:
+    def get_statistics(
+        self,
+        symbol: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Get statistics about stored trades.
         
+        Computed with one aggregate SQL query over the indexed table.
+        
+        Args:
+            symbol: Only trades on this symbol
+            since: Only trades with ISO timestamp >= since
+        
         Returns:
             Dictionary with trade statistics
         """
-        total_trades = len(self.vector_store)
-        
-        if total_trades == 0:
-            return {
-                'total_trades': 0,
-                'trades_with_outcome': 0,
-                'avg_pnl': 0.0,
-                'win_rate': 0.0
-            }
+        return self.trades.statistics(symbol=symbol, since=since)
+    
+    def _restore_orphaned_vectors(self) -> None:
+        """
+        Re-embed metadata rows whose vector is missing from the store.
         
-        trades_with_outcome = 0
-        total_pnl = 0.0
-        wins = 0
-        
-        for meta in self.vector_store.metadata:
-            outcome = meta.get('outcome')
-            if outcome:
-                trades_with_outcome += 1
-                pnl = outcome.get('pnl', 0.0)
-                total_pnl += pnl
-                if pnl > 0:
-                    wins += 1
-        
-        return {
-            'total_trades': total_trades,
-            'trades_with_outcome': trades_with_outcome,
-            'avg_pnl': total_pnl / trades_with_outcome if trades_with_outcome > 0 else 0.0,
-            'win_rate': wins / trades_with_outcome if trades_with_outcome > 0 else 0.0
-        }
+        Rows can be ahead of the store if VectorStore.save() failed after an
+        add. Their contexts are embedded again and appended under the same
+        ids. Nothing is touched if the store's manifest could not be read -
+        the store is then empty for reasons unrelated to the metadata.
+        """
+        if self.vector_store.manifest_error is not None:
+            logger.error(
+                f"Vector store manifest unusable ({self.vector_store.manifest_error}); "
+                f"{len(self.trades)} trades in metadata left unreconciled"
+            )
+            return
+        
+        size = len(self.vector_store)
+        orphaned = self.trades.ids_from(size)
+        if not orphaned:
+            return
+        if orphaned != list(range(size, size + len(orphaned))):
+            logger.error(
+                f"Trades {orphaned[0]}..{orphaned[-1]} have no vectors and do not follow "
+                f"the store ({size} vectors); left for manual repair"
+            )
+            return
+        
+        records = self.trades.get_many(orphaned)
+        contexts = [records[trade_id]['context'] for trade_id in orphaned]
+        self.vector_store.add_batch(
+            self._create_embeddings(contexts),
+            [{'timestamp': records[trade_id]['timestamp']} for trade_id in orphaned]
+        )
+        self.vector_store.save()
+        logger.warning(f"Re-embedded {len(orphaned)} trades whose vectors were never saved")
+    
+    def _backfill_metadata(self) -> None:
+        """Copy full metadata from older vector stores into the SQLite table once."""
+        if len(self.vector_store) == 0 or len(self.trades) > 0:
+            return
+        records = [
+            (idx, meta) for idx, meta in enumerate(self.vector_store.metadata)
+            if 'context' in meta or 'decision' in meta
+        ]
+        if records:
+            self.trades.insert_many(records)
+            logger.info(f"📦 Backfilled {len(records)} trades into metadata store")
     
     def _create_embedding(self, context: Dict[str, Any]) -> np.ndarray:
         """
@@ -186,11 +291,40 @@ class TradeHistory:
         """
         if self.embedding_model == "simple":
             return self._simple_embedding(context)
-        elif self.embedding_model == "openai":
+        elif self.embedding_model in ("openai", "local"):
             return self._openai_embedding(context)
         else:
             raise ValueError(f"Unknown embedding model: {self.embedding_model}")
     
+    def _create_embeddings(self, contexts: List[Dict[str, Any]]) -> np.ndarray:
+        """Create embeddings for many contexts (one backend call for "openai"/"local")."""
+        if self.embedding_model == "simple":
+            return np.stack([self._simple_embedding(c) for c in contexts])
+        if self.embedding_model not in ("openai", "local"):
+            raise ValueError(f"Unknown embedding model: {self.embedding_model}")
+        
+        try:
+            texts = [self._context_to_text(c) for c in contexts]
+            return self._get_embedding_service().embed_texts(texts)
+        except Exception as e:
+            logger.warning(f"Failed to create {self.embedding_model} embeddings: {e}, falling back to simple")
+            return np.stack([self._simple_embedding(c) for c in contexts])
+    
+    def _get_embedding_service(self) -> EmbeddingService:
+        """Create the embedding service on first use."""
+        if self._embedding_service is None:
+            dim = self.vector_store.embedding_dim
+            if self.embedding_model == "openai":
+                backend = OpenAIEmbeddingBackend()
+            else:
+                backend = LocalEmbeddingBackend(dim=dim)
+            self._embedding_service = EmbeddingService(
+                backend,
+                dim=dim,
+                cache_path=str(self.vector_store.storage_path / 'embeddings.db')
+            )
+        return self._embedding_service
+    
     def _simple_embedding(self, context: Dict[str, Any]) -> np.ndarray:
         """
         Create simple embedding from numerical features.
@@ -224,41 +358,16 @@ class TradeHistory:
     
     def _openai_embedding(self, context: Dict[str, Any]) -> np.ndarray:
         """
-        Create embedding using OpenAI embeddings API.
+        Create embedding using the embedding service (OpenAI or local backend).
         
-        This is more expensive but produces better semantic embeddings.
+        Results are cached by context text, so repeated contexts cost nothing.
         """
         try:
-            import openai
-            import os
-            
-            # Create text description of context
             text = self._context_to_text(context)
-            
-            # Get embedding from OpenAI
-            client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            response = client.embeddings.create(
-                model="text-embedding-3-small",
-                input=text
-            )
-            
-            embedding = np.array(response.data[0].embedding, dtype=np.float32)
-            
-            # Resize if needed (text-embedding-3-small is 1536 dim)
-            if len(embedding) != 384:
-                # Simple resize by averaging chunks
-                chunk_size = len(embedding) // 384
-                resized = []
-                for i in range(384):
-                    start = i * chunk_size
-                    end = start + chunk_size
-                    resized.append(embedding[start:end].mean())
-                embedding = np.array(resized, dtype=np.float32)
-            
-            return embedding
+            return self._get_embedding_service().embed_texts([text])[0]
             
         except Exception as e:
-            logger.warning(f"Failed to create OpenAI embedding: {e}, falling back to simple")
+            logger.warning(f"Failed to create {self.embedding_model} embedding: {e}, falling back to simple")
             return self._simple_embedding(context)
     
     def _context_to_text(self, context: Dict[str, Any]) -> str:
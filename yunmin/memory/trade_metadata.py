@@ -0,0 +1,222 @@
+"""
+Trade Metadata Store - Indexed SQLite table for trade memory
+
+Keeps trade context/decision/outcome next to the vector store, with indexed
+columns (symbol, action, time, outcome) so filtered recall and statistics
+run as SQL queries instead of scans over pickled dicts.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    symbol TEXT,
+    action TEXT,
+    has_outcome INTEGER NOT NULL DEFAULT 0,
+    pnl REAL,
+    context TEXT,
+    decision TEXT,
+    outcome TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_trades_symbol_time ON trades (symbol, timestamp);
+CREATE INDEX IF NOT EXISTS ix_trades_outcome ON trades (has_outcome, pnl);
+CREATE INDEX IF NOT EXISTS ix_trades_time ON trades (timestamp);
+"""
+
+
+class TradeMetadataStore:
+    """
+    SQLite-backed metadata for TradeHistory.
+
+    Row id == vector id in the VectorStore, so filtered similarity search is:
+    ids = store.filter_ids(...); vector_store.search(query, ids=ids)
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize metadata store.
+
+        Args:
+            db_path: SQLite file path (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _row_values(trade_id: int, metadata: Dict[str, Any]) -> tuple:
+        context = metadata.get('context') or {}
+        decision = metadata.get('decision') or {}
+        outcome = metadata.get('outcome')
+        return (
+            trade_id,
+            metadata.get('timestamp', ''),
+            context.get('symbol'),
+            decision.get('action'),
+            1 if outcome else 0,
+            outcome.get('pnl', 0.0) if outcome else None,
+            json.dumps(context, default=str),
+            json.dumps(decision, default=str),
+            json.dumps(outcome, default=str) if outcome is not None else None,
+        )
+
+    def insert(self, trade_id: int, metadata: Dict[str, Any]) -> None:
+        """Insert (or replace) one trade record."""
+        self.insert_many([(trade_id, metadata)])
+
+    def insert_many(self, records: Iterable[tuple]) -> int:
+        """Insert many (trade_id, metadata) pairs in one transaction."""
+        rows = [self._row_values(trade_id, meta) for trade_id, meta in records]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO trades "
+                "(id, timestamp, symbol, action, has_outcome, pnl, context, decision, outcome) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def update_outcome(self, trade_id: int, outcome: Dict[str, Any]) -> bool:
+        """Update a trade's outcome in place. Returns False if the trade is unknown."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE trades SET has_outcome = ?, pnl = ?, outcome = ? WHERE id = ?",
+                (
+                    1 if outcome else 0,
+                    outcome.get('pnl', 0.0) if outcome else None,
+                    json.dumps(outcome, default=str),
+                    trade_id,
+                )
+            )
+        return cursor.rowcount > 0
+
+    def ids_from(self, first_id: int) -> List[int]:
+        """Ids >= first_id, ascending."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM trades WHERE id >= ? ORDER BY id", (first_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _where(
+        symbol: Optional[str],
+        action: Optional[str],
+        outcome: Optional[str],
+        since: Optional[str],
+        until: Optional[str]
+    ) -> tuple:
+        """
+        Build a WHERE clause.
+
+        outcome: None (any), 'closed', 'open', 'win' or 'loss'
+        """
+        clauses, params = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if action is not None:
+            clauses.append("action = ?")
+            params.append(action)
+        if outcome == 'closed':
+            clauses.append("has_outcome = 1")
+        elif outcome == 'open':
+            clauses.append("has_outcome = 0")
+        elif outcome == 'win':
+            clauses.append("has_outcome = 1 AND pnl > 0")
+        elif outcome == 'loss':
+            clauses.append("has_outcome = 1 AND pnl <= 0")
+        elif outcome is not None:
+            raise ValueError(f"Unknown outcome filter: {outcome}")
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        sql = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return sql, params
+
+    def filter_ids(
+        self,
+        symbol: Optional[str] = None,
+        action: Optional[str] = None,
+        outcome: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> np.ndarray:
+        """Trade ids matching the filters (index lookup, no row decoding)."""
+        where, params = self._where(symbol, action, outcome, since, until)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT id FROM trades{where}", params).fetchall()
+        return np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+
+    def get_many(self, trade_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Fetch full records for the given ids."""
+        if not trade_ids:
+            return {}
+        placeholders = ",".join("?" * len(trade_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, timestamp, context, decision, outcome FROM trades "
+                f"WHERE id IN ({placeholders})",
+                list(trade_ids)
+            ).fetchall()
+        return {
+            row[0]: {
+                'timestamp': row[1],
+                'context': json.loads(row[2]) if row[2] else {},
+                'decision': json.loads(row[3]) if row[3] else {},
+                'outcome': json.loads(row[4]) if row[4] else None,
+            }
+            for row in rows
+        }
+
+    def statistics(
+        self,
+        symbol: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Trade count, outcome count, average PnL and win rate in one aggregate query."""
+        where, params = self._where(symbol, None, None, since, until)
+        with self._lock:
+            total, closed, pnl_sum, wins = self._conn.execute(
+                "SELECT COUNT(*), "
+                "COALESCE(SUM(has_outcome), 0), "
+                "COALESCE(SUM(CASE WHEN has_outcome = 1 THEN pnl END), 0.0), "
+                "COALESCE(SUM(CASE WHEN has_outcome = 1 AND pnl > 0 THEN 1 ELSE 0 END), 0) "
+                f"FROM trades{where}",
+                params
+            ).fetchone()
+        return {
+            'total_trades': total,
+            'trades_with_outcome': closed,
+            'avg_pnl': pnl_sum / closed if closed > 0 else 0.0,
+            'win_rate': wins / closed if closed > 0 else 0.0
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+        logger.debug(f"Closed trade metadata store {self.db_path}")
@@ -2,65 +2,219 @@
 Vector Store - Similarity Search for Trading Memory
 
 Implements vector database for finding similar historical situations using RAG.
-Supports both FAISS (local, fast) and ChromaDB (persistent, feature-rich).
+
+Storage layout (append-only, memory-mapped):
+    <storage_path>/manifest.json     - dim, size, segment list
+    <storage_path>/seg_<offset>_<rows>.f32 - raw float32 rows, written once
+    <storage_path>/metadata.jsonl    - one record per add / metadata update
+    <storage_path>/faiss.index       - optional ANN index (FAISS IVF/HNSW)
+
+`save()` only writes rows added since the last save as a new segment, so
+persisting is O(new rows). Segments are memory-mapped lazily on first use
+and merged once there are more than `max_segments` of them.
 """
 
-from typing import Dict, Any, List, Optional, Tuple
-import numpy as np
-from loguru import logger
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+import json
+import os
 import pickle
 from pathlib import Path
-import json
+
+import numpy as np
+from loguru import logger
+
+
+MetadataFilter = Union[Dict[str, Any], Callable[[Dict[str, Any]], bool]]
 
 
 class VectorStore:
     """
     Vector database for similarity search in trading history.
-    
-    Uses FAISS for fast similarity search with embeddings.
-    Falls back to simple in-memory storage if FAISS not available.
+
+    Exact brute-force search runs over memory-mapped float32 segments
+    without copying them. When FAISS is installed and the store is large
+    enough, an approximate index (IVF or HNSW) is used instead.
     """
-    
+
+    MANIFEST = 'manifest.json'
+    METADATA = 'metadata.jsonl'
+    FAISS_INDEX = 'faiss.index'
+
     def __init__(
         self,
         embedding_dim: int = 384,
         storage_path: Optional[str] = None,
-        use_faiss: bool = True
+        use_faiss: bool = True,
+        index_type: str = "flat",
+        ann_min_size: int = 10_000,
+        nlist: int = 256,
+        nprobe: int = 16,
+        max_segments: int = 16
     ):
         """
         Initialize vector store.
-        
+
         Args:
             embedding_dim: Dimension of embedding vectors
             storage_path: Path to persist the vector database
             use_faiss: Whether to use FAISS (if available)
+            index_type: 'flat' (exact), 'ivf' or 'hnsw' (approximate, FAISS only)
+            ann_min_size: Below this many vectors search is always exact
+            nlist: IVF cluster count
+            nprobe: IVF clusters probed per query
+            max_segments: Merge segment files when there are more than this
         """
+        if index_type not in ('flat', 'ivf', 'hnsw'):
+            raise ValueError(f"Unknown index_type: {index_type}")
+
         self.embedding_dim = embedding_dim
         self.storage_path = Path(storage_path) if storage_path else Path("data/vector_store")
         self.storage_path.mkdir(parents=True, exist_ok=True)
-        
+
+        self.index_type = index_type
+        self.ann_min_size = ann_min_size
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.max_segments = max_segments
+
         # Try to import FAISS
         self.use_faiss = use_faiss
+        self.faiss = None
         self.faiss_index = None
-        
+        self._faiss_size = 0
+
         if self.use_faiss:
             try:
                 import faiss
                 self.faiss = faiss
-                # Create FAISS index (L2 distance)
-                self.faiss_index = faiss.IndexFlatL2(embedding_dim)
-                logger.info(f"✅ FAISS vector store initialized (dim={embedding_dim})")
+                logger.info(f"✅ FAISS available for vector store (dim={embedding_dim}, index={index_type})")
             except ImportError:
-                logger.warning("⚠️  FAISS not available, using simple storage")
+                logger.warning("⚠️  FAISS not available, using exact numpy search")
                 self.use_faiss = False
-        
-        # Fallback storage (always maintained)
-        self.vectors: List[np.ndarray] = []
-        self.metadata: List[Dict[str, Any]] = []
-        
-        # Load existing data if available
-        self._load()
-    
+
+        # Persisted segments (memory-mapped on first use)
+        self._segment_files: List[str] = []
+        self._segments: Optional[List[np.ndarray]] = None
+        self._segment_norms: List[np.ndarray] = []
+        self._persisted_size = 0
+
+        # Rows added since last save (growable buffer)
+        self._pending = np.empty((0, embedding_dim), dtype=np.float32)
+        self._pending_norms = np.empty(0, dtype=np.float32)
+        self._pending_len = 0
+
+        # Metadata (loaded lazily), plus journal of unsaved changes
+        self._metadata: Optional[List[Dict[str, Any]]] = None
+        self._metadata_journal: List[Dict[str, Any]] = []
+
+        # Set when an existing manifest could not be used (store started empty)
+        self.manifest_error: Optional[str] = None
+        self._read_manifest()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _read_manifest(self) -> None:
+        """Read the manifest only; vectors and metadata are loaded lazily."""
+        manifest_file = self.storage_path / self.MANIFEST
+        if not manifest_file.exists():
+            if (self.storage_path / 'store.pkl').exists():
+                self._migrate_pickle()
+            else:
+                logger.info("No existing vector store found, starting fresh")
+            return
+
+        try:
+            manifest = json.loads(manifest_file.read_text())
+            if manifest.get('embedding_dim', self.embedding_dim) != self.embedding_dim:
+                raise ValueError(
+                    f"stored dim {manifest['embedding_dim']} != {self.embedding_dim}"
+                )
+            self._segment_files = manifest.get('segments', [])
+            self._persisted_size = manifest.get('size', 0)
+            logger.info(f"📂 Found vector store with {self._persisted_size} vectors (lazy load)")
+        except Exception as e:
+            logger.warning(f"Could not read vector store manifest: {e}, starting fresh")
+            self.manifest_error = str(e)
+            self._segment_files = []
+            self._persisted_size = 0
+
+    def _ensure_loaded(self) -> None:
+        """Memory-map segments and replay metadata on first use."""
+        if self._segments is not None:
+            return
+
+        self._segments = []
+        self._segment_norms = []
+        for name in self._segment_files:
+            seg = np.memmap(self.storage_path / name, dtype=np.float32, mode='r')
+            seg = seg.reshape(-1, self.embedding_dim)
+            self._segments.append(seg)
+            self._segment_norms.append(np.einsum('ij,ij->i', seg, seg))
+
+        metadata: List[Dict[str, Any]] = []
+        metadata_file = self.storage_path / self.METADATA
+        if metadata_file.exists():
+            with open(metadata_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    i = record['i']
+                    if 'm' in record:
+                        # Records are keyed by index, so a re-added row after
+                        # an interrupted save simply overwrites the stale one
+                        if i < len(metadata):
+                            metadata[i] = record['m']
+                        else:
+                            metadata.append(record['m'])
+                    elif 'u' in record and i < len(metadata):
+                        metadata[i].update(record['u'])
+
+        # Only rows listed in the manifest count; unsaved tails are dropped
+        stored = sum(len(s) for s in self._segments)
+        if len(metadata) != stored:
+            logger.warning(f"Vector store metadata ({len(metadata)}) != vectors ({stored}), truncating")
+        self._metadata = metadata[:stored] + [{} for _ in range(stored - len(metadata))]
+        self._persisted_size = stored
+
+        logger.info(f"📂 Loaded vector store with {stored} vectors in {len(self._segments)} segments")
+
+    def _migrate_pickle(self) -> None:
+        """Convert the legacy store.pkl into segment files."""
+        try:
+            with open(self.storage_path / 'store.pkl', 'rb') as f:
+                data = pickle.load(f)
+            vectors = data.get('vectors', [])
+            self._segments = []
+            self._metadata = []
+            if vectors:
+                self.add_batch(np.asarray(vectors, dtype=np.float32), data.get('metadata', []))
+            self.save()
+            os.replace(self.storage_path / 'store.pkl', self.storage_path / 'store.pkl.migrated')
+            logger.info(f"📦 Migrated legacy vector store ({len(vectors)} vectors)")
+        except Exception as e:
+            logger.warning(f"Could not migrate legacy vector store: {e}, starting fresh")
+            self._segments = None
+            self._metadata = None
+
+    # ------------------------------------------------------------------
+    # Adding
+    # ------------------------------------------------------------------
+
+    def _reserve(self, extra: int) -> None:
+        """Grow the pending buffer geometrically."""
+        needed = self._pending_len + extra
+        if needed <= len(self._pending):
+            return
+        capacity = max(needed, 2 * len(self._pending), 64)
+        grown = np.empty((capacity, self.embedding_dim), dtype=np.float32)
+        grown[:self._pending_len] = self._pending[:self._pending_len]
+        norms = np.empty(capacity, dtype=np.float32)
+        norms[:self._pending_len] = self._pending_norms[:self._pending_len]
+        self._pending, self._pending_norms = grown, norms
+
     def add(
         self,
         embedding: np.ndarray,
@@ -68,155 +222,381 @@ class VectorStore:
     ) -> int:
         """
         Add a vector with metadata to the store.
-        
+
         Args:
             embedding: Vector embedding (numpy array)
             metadata: Associated metadata (trade details, context, outcome)
-            
+
         Returns:
             Index of added vector
         """
-        # Ensure correct shape
-        if embedding.ndim == 1:
-            embedding = embedding.reshape(1, -1)
-        
-        if embedding.shape[1] != self.embedding_dim:
-            raise ValueError(f"Embedding dimension mismatch: expected {self.embedding_dim}, got {embedding.shape[1]}")
-        
-        # Add to FAISS index if available
-        if self.use_faiss and self.faiss_index is not None:
-            self.faiss_index.add(embedding.astype('float32'))
-        
-        # Add to fallback storage
-        self.vectors.append(embedding[0])
-        self.metadata.append(metadata)
-        
-        idx = len(self.vectors) - 1
+        idx = self.add_batch(embedding, [metadata])[0]
         logger.debug(f"Added vector {idx} to store")
-        
         return idx
-    
+
+    def add_batch(
+        self,
+        embeddings: np.ndarray,
+        metadata: List[Dict[str, Any]]
+    ) -> List[int]:
+        """
+        Add many vectors at once.
+
+        Args:
+            embeddings: Array of shape (n, embedding_dim)
+            metadata: One metadata dict per row
+
+        Returns:
+            Indices of added vectors
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim == 1:
+            embeddings = embeddings.reshape(1, -1)
+
+        if embeddings.shape[1] != self.embedding_dim:
+            raise ValueError(f"Embedding dimension mismatch: expected {self.embedding_dim}, got {embeddings.shape[1]}")
+        if len(metadata) != len(embeddings):
+            raise ValueError(f"Got {len(embeddings)} embeddings but {len(metadata)} metadata records")
+
+        self._ensure_loaded()
+        start = len(self)
+        n = len(embeddings)
+
+        self._reserve(n)
+        self._pending[self._pending_len:self._pending_len + n] = embeddings
+        self._pending_norms[self._pending_len:self._pending_len + n] = np.einsum(
+            'ij,ij->i', embeddings, embeddings
+        )
+        self._pending_len += n
+
+        for offset, meta in enumerate(metadata):
+            self._metadata.append(meta)
+            self._metadata_journal.append({'i': start + offset, 'm': meta})
+
+        # Keep an already-built ANN index in sync (incremental add)
+        if self.faiss_index is not None and self._faiss_size == start:
+            self.faiss_index.add(embeddings)
+            self._faiss_size += n
+
+        return list(range(start, start + n))
+
+    def update_metadata(self, idx: int, updates: Dict[str, Any]) -> bool:
+        """
+        Merge `updates` into the metadata of vector `idx`.
+
+        Recorded as a small journal entry; nothing is rewritten on save.
+        """
+        self._ensure_loaded()
+        if not 0 <= idx < len(self._metadata):
+            return False
+        self._metadata[idx].update(updates)
+        self._metadata_journal.append({'i': idx, 'u': updates})
+        return True
+
+    @property
+    def metadata(self) -> List[Dict[str, Any]]:
+        """Metadata for every stored vector (index-aligned)."""
+        self._ensure_loaded()
+        return self._metadata
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """All vectors as one (n, dim) array (copies - avoid in hot paths)."""
+        self._ensure_loaded()
+        blocks = [block for _, block, _ in self._blocks()]
+        if not blocks:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        return np.concatenate(blocks)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _blocks(self) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """Yield (offset, rows, squared norms) for every segment and the pending buffer."""
+        offset = 0
+        for seg, norms in zip(self._segments, self._segment_norms):
+            yield offset, seg, norms
+            offset += len(seg)
+        if self._pending_len:
+            yield offset, self._pending[:self._pending_len], self._pending_norms[:self._pending_len]
+
+    def _filter_mask(self, where: Optional[MetadataFilter]) -> Optional[np.ndarray]:
+        """Boolean mask of rows whose metadata matches `where`."""
+        if where is None:
+            return None
+        if callable(where):
+            return np.fromiter((bool(where(m)) for m in self._metadata), dtype=bool, count=len(self._metadata))
+        return np.fromiter(
+            (all(m.get(key) == value for key, value in where.items()) for m in self._metadata),
+            dtype=bool,
+            count=len(self._metadata)
+        )
+
+    def _exact_search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        allowed: Optional[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Blockwise brute force; keeps only a running top-k per query."""
+        m = len(queries)
+        q_norms = np.einsum('ij,ij->i', queries, queries)
+        best_d = np.full((m, 0), np.inf, dtype=np.float32)
+        best_i = np.empty((m, 0), dtype=np.int64)
+
+        for offset, block, norms in self._blocks():
+            # ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2
+            d2 = norms[None, :] - 2.0 * (queries @ block.T) + q_norms[:, None]
+            if allowed is not None:
+                d2[:, ~allowed[offset:offset + len(block)]] = np.inf
+
+            kb = min(k, block.shape[0])
+            part = np.argpartition(d2, kb - 1, axis=1)[:, :kb]
+            best_d = np.concatenate([best_d, np.take_along_axis(d2, part, axis=1)], axis=1)
+            best_i = np.concatenate([best_i, part + offset], axis=1)
+
+            if best_d.shape[1] > k:
+                keep = np.argpartition(best_d, k - 1, axis=1)[:, :k]
+                best_d = np.take_along_axis(best_d, keep, axis=1)
+                best_i = np.take_along_axis(best_i, keep, axis=1)
+
+        order = np.argsort(best_d, axis=1)
+        best_d = np.take_along_axis(best_d, order, axis=1)
+        best_i = np.take_along_axis(best_i, order, axis=1)
+        return np.sqrt(np.maximum(best_d, 0.0)), best_i
+
+    def _ensure_ann(self) -> bool:
+        """Build or load the FAISS ANN index if configured and worthwhile."""
+        if not self.use_faiss or self.index_type == 'flat' or len(self) < self.ann_min_size:
+            return False
+        if self.faiss_index is not None and self._faiss_size == len(self):
+            return True
+
+        index_file = self.storage_path / self.FAISS_INDEX
+        if self.faiss_index is None and index_file.exists():
+            index = self.faiss.read_index(str(index_file))
+            if index.ntotal <= len(self):
+                self.faiss_index = index
+                self._faiss_size = index.ntotal
+
+        if self.faiss_index is None:
+            if self.index_type == 'hnsw':
+                self.faiss_index = self.faiss.IndexHNSWFlat(self.embedding_dim, 32)
+            else:
+                quantizer = self.faiss.IndexFlatL2(self.embedding_dim)
+                nlist = min(self.nlist, max(1, len(self) // 39))
+                self.faiss_index = self.faiss.IndexIVFFlat(quantizer, self.embedding_dim, nlist)
+                self.faiss_index.train(self.vectors)
+                self.faiss_index.nprobe = self.nprobe
+            self._faiss_size = 0
+
+        # Add rows the index has not seen yet
+        for offset, block, _ in self._blocks():
+            end = offset + len(block)
+            if end > self._faiss_size:
+                self.faiss_index.add(np.ascontiguousarray(block[self._faiss_size - offset:]))
+                self._faiss_size = end
+
+        logger.info(f"🧭 FAISS {self.index_type} index ready ({self._faiss_size} vectors)")
+        return True
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        k: int = 5,
+        where: Optional[MetadataFilter] = None,
+        ids: Optional[np.ndarray] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search k nearest vectors for several queries at once.
+
+        Args:
+            query_embeddings: Array of shape (m, embedding_dim)
+            k: Number of results per query
+            where: Metadata filter - dict of equal values or predicate
+            ids: Restrict search to these vector indices
+
+        Returns:
+            One result list per query; each result has 'id', 'metadata',
+            'distance' (L2) and 'similarity'
+        """
+        self._ensure_loaded()
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+
+        total = len(self)
+        if total == 0:
+            return [[] for _ in range(len(queries))]
+
+        allowed = self._filter_mask(where)
+        if ids is not None:
+            ids = np.asarray(ids, dtype=np.int64)
+            id_mask = np.zeros(total, dtype=bool)
+            id_mask[ids[(ids >= 0) & (ids < total)]] = True
+            allowed = id_mask if allowed is None else allowed & id_mask
+
+        candidates = total if allowed is None else int(allowed.sum())
+        k = min(k, candidates)  # Don't search for more than we have
+        if k == 0:
+            return [[] for _ in range(len(queries))]
+
+        if self._ensure_ann():
+            # Over-fetch when filtering, then drop rows outside the filter
+            fetch = k if allowed is None else min(total, k * 10)
+            distances, indices = self.faiss_index.search(queries, fetch)
+            distances = np.sqrt(np.maximum(distances, 0.0))
+        else:
+            distances, indices = self._exact_search(queries, k, allowed)
+
+        results = []
+        for dist_row, idx_row in zip(distances, indices):
+            row = []
+            for dist, idx in zip(dist_row, idx_row):
+                if idx < 0 or not np.isfinite(dist) or (allowed is not None and not allowed[idx]):
+                    continue
+                row.append({
+                    'id': int(idx),
+                    'metadata': self._metadata[idx],
+                    'distance': float(dist),
+                    'similarity': 1.0 / (1.0 + float(dist))  # Convert to similarity score
+                })
+                if len(row) == k:
+                    break
+            results.append(row)
+
+        return results
+
     def search(
         self,
         query_embedding: np.ndarray,
-        k: int = 5
+        k: int = 5,
+        where: Optional[MetadataFilter] = None,
+        ids: Optional[np.ndarray] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for k most similar vectors.
-        
+
         Args:
             query_embedding: Query vector
             k: Number of results to return
-            
+            where: Metadata filter - dict of equal values or predicate
+            ids: Restrict search to these vector indices
+
         Returns:
             List of dictionaries with 'metadata' and 'distance'
         """
-        if len(self.vectors) == 0:
-            return []
-        
-        # Ensure correct shape
-        if query_embedding.ndim == 1:
-            query_embedding = query_embedding.reshape(1, -1)
-        
-        k = min(k, len(self.vectors))  # Don't search for more than we have
-        
-        if self.use_faiss and self.faiss_index is not None:
-            # Use FAISS for search
-            distances, indices = self.faiss_index.search(
-                query_embedding.astype('float32'),
-                k
-            )
-            
-            results = []
-            for dist, idx in zip(distances[0], indices[0]):
-                if idx < len(self.metadata):  # Valid index
-                    results.append({
-                        'metadata': self.metadata[idx],
-                        'distance': float(dist),
-                        'similarity': 1.0 / (1.0 + float(dist))  # Convert to similarity score
-                    })
-        else:
-            # Fallback: compute distances manually
-            vectors_array = np.array(self.vectors)
-            distances = np.linalg.norm(vectors_array - query_embedding, axis=1)
-            
-            # Get top k indices
-            top_k_indices = np.argsort(distances)[:k]
-            
-            results = []
-            for idx in top_k_indices:
-                results.append({
-                    'metadata': self.metadata[idx],
-                    'distance': float(distances[idx]),
-                    'similarity': 1.0 / (1.0 + float(distances[idx]))
-                })
-        
+        results = self.search_batch(query_embedding, k=k, where=where, ids=ids)[0]
         logger.debug(f"Found {len(results)} similar vectors")
         return results
-    
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _write_segment(self, rows: np.ndarray, offset: int) -> str:
+        """Write rows to a new segment file atomically; return its name."""
+        name = f"seg_{offset:010d}_{len(rows):010d}.f32"
+        tmp = self.storage_path / (name + '.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(np.ascontiguousarray(rows, dtype=np.float32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.storage_path / name)
+        return name
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            'embedding_dim': self.embedding_dim,
+            'size': self._persisted_size,
+            'segments': self._segment_files,
+        }
+        tmp = self.storage_path / (self.MANIFEST + '.tmp')
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, self.storage_path / self.MANIFEST)
+
+    def _compact_segments(self) -> None:
+        """Merge all segment files into one."""
+        old_files = list(self._segment_files)
+        merged = np.concatenate(self._segments)
+        name = self._write_segment(merged, 0)
+
+        self._segment_files = [name]
+        self._write_manifest()
+        for old in old_files:
+            if old != name:
+                (self.storage_path / old).unlink(missing_ok=True)
+
+        seg = np.memmap(self.storage_path / name, dtype=np.float32, mode='r')
+        self._segments = [seg.reshape(-1, self.embedding_dim)]
+        self._segment_norms = [np.concatenate(self._segment_norms)]
+        logger.info(f"🗜️  Compacted vector store into 1 segment ({len(merged)} vectors)")
+
     def save(self) -> None:
-        """Save vector store to disk."""
+        """Persist rows and metadata changes made since the last save."""
+        if self._segments is None:
+            return  # Nothing loaded, nothing changed
+
         try:
-            # Save metadata and vectors
-            data = {
-                'vectors': self.vectors,
-                'metadata': self.metadata,
-                'embedding_dim': self.embedding_dim
-            }
-            
-            with open(self.storage_path / 'store.pkl', 'wb') as f:
-                pickle.dump(data, f)
-            
+            if self._pending_len:
+                rows = self._pending[:self._pending_len]
+                name = self._write_segment(rows, self._persisted_size)
+                self._segment_files.append(name)
+                seg = np.memmap(self.storage_path / name, dtype=np.float32, mode='r')
+                self._segments.append(seg.reshape(-1, self.embedding_dim))
+                self._segment_norms.append(self._pending_norms[:self._pending_len].copy())
+                self._persisted_size += self._pending_len
+                self._pending_len = 0
+
+            if self._metadata_journal:
+                with open(self.storage_path / self.METADATA, 'a', encoding='utf-8') as f:
+                    for record in self._metadata_journal:
+                        f.write(json.dumps(record, default=str) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._metadata_journal = []
+
+            self._write_manifest()
+
+            if len(self._segments) > self.max_segments:
+                self._compact_segments()
+
             # Save FAISS index if available
-            if self.use_faiss and self.faiss_index is not None:
+            if self.faiss_index is not None:
                 self.faiss.write_index(
                     self.faiss_index,
-                    str(self.storage_path / 'faiss.index')
+                    str(self.storage_path / self.FAISS_INDEX)
                 )
-            
+
             logger.info(f"💾 Vector store saved to {self.storage_path}")
         except Exception as e:
             logger.error(f"Failed to save vector store: {e}")
-    
-    def _load(self) -> None:
-        """Load vector store from disk."""
-        try:
-            store_file = self.storage_path / 'store.pkl'
-            if not store_file.exists():
-                logger.info("No existing vector store found, starting fresh")
-                return
-            
-            with open(store_file, 'rb') as f:
-                data = pickle.load(f)
-            
-            self.vectors = data.get('vectors', [])
-            self.metadata = data.get('metadata', [])
-            
-            # Load FAISS index if available
-            if self.use_faiss:
-                faiss_file = self.storage_path / 'faiss.index'
-                if faiss_file.exists():
-                    self.faiss_index = self.faiss.read_index(str(faiss_file))
-            
-            logger.info(f"📂 Loaded vector store with {len(self.vectors)} vectors")
-        except Exception as e:
-            logger.warning(f"Could not load vector store: {e}, starting fresh")
-    
+
     def clear(self) -> None:
-        """Clear all data from the vector store."""
-        self.vectors = []
-        self.metadata = []
-        
-        if self.use_faiss and self.faiss_index is not None:
-            self.faiss_index = self.faiss.IndexFlatL2(self.embedding_dim)
-        
+        """Clear all data from the vector store (including files on disk)."""
+        for name in self._segment_files:
+            (self.storage_path / name).unlink(missing_ok=True)
+        for name in (self.METADATA, self.FAISS_INDEX, self.MANIFEST):
+            (self.storage_path / name).unlink(missing_ok=True)
+
+        self._segment_files = []
+        self._segments = []
+        self._segment_norms = []
+        self._persisted_size = 0
+        self._pending_len = 0
+        self._metadata = []
+        self._metadata_journal = []
+        self.faiss_index = None
+        self._faiss_size = 0
+
         logger.info("🧹 Vector store cleared")
-    
+
     def __len__(self) -> int:
         """Return number of vectors in the store."""
-        return len(self.vectors)
-    
+        return self._persisted_size + self._pending_len
+
     def __repr__(self) -> str:
         """String representation."""
-        backend = "FAISS" if self.use_faiss else "Simple"
+        backend = f"FAISS-{self.index_type}" if self.use_faiss else "NumPy"
         return f"VectorStore(backend={backend}, size={len(self)}, dim={self.embedding_dim})"
@@ -1,17 +1,43 @@
-"""Machine Learning module - Model training and inference."""
-
-from .lstm_predictor import LSTMPricePredictor, PricePrediction
-from .pattern_recognizer import PatternRecognizer, Pattern, PatternSignal, PatternType, PatternSentiment
-from .risk_scorer import RiskScorer, RiskScore
-
-__all__ = [
-    'LSTMPricePredictor',
-    'PricePrediction',
-    'PatternRecognizer',
-    'Pattern',
-    'PatternSignal',
-    'PatternType',
-    'PatternSentiment',
-    'RiskScorer',
-    'RiskScore',
-]
+"""Machine Learning module - Model training and inference.
+
+Submodules are imported lazily (PEP 562): `import yunmin.ml` is cheap and
+TensorFlow / scipy / sklearn are only loaded when a class that needs them is used.
+"""
+
+import importlib
+
+_LAZY_IMPORTS = {
+    'LSTMPricePredictor': '.lstm_predictor',
+    'PricePrediction': '.lstm_predictor',
+    'FeatureBuffer': '.lstm_predictor',
+    'NumpyLSTMModel': '.lstm_inference',
+    'PatternRecognizer': '.pattern_recognizer',
+    'Pattern': '.pattern_recognizer',
+    'PatternSignal': '.pattern_recognizer',
+    'PatternType': '.pattern_recognizer',
+    'PatternSentiment': '.pattern_recognizer',
+    'RiskScorer': '.risk_scorer',
+    'RiskScore': '.risk_scorer',
+    'ModelRegistry': '.model_registry',
+    'ModelIntegrityError': '.model_registry',
+    'get_registry': '.model_registry',
+    'fork_workers': '.model_registry',
+    'TrainingOrchestrator': '.training',
+    'TrainingJob': '.training',
+    'run_training_job': '.training',
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # cache: next access skips __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,269 @@
+"""
+LSTM Inference - TensorFlow-free forward pass for LSTMPricePredictor models.
+
+Exports the stacked LSTM -> Dense network built by LSTMPricePredictor._build_model
+to plain NumPy arrays (.npz) and runs it on CPU with a handful of matmuls, so
+the live bot can predict without importing TensorFlow.
+
+Weights can be stored as float32, float16 or int8 (symmetric, per output
+column). Reduced-precision weights are dequantized to float32 once at load;
+outputs stay within PARITY_TOLERANCE of the Keras model.
+"""
+
+from typing import Any, Dict, List, Optional
+import json
+
+import numpy as np
+
+
+PRECISIONS = ('float32', 'float16', 'int8')
+
+# Max abs difference of (scaled) model outputs vs Keras accepted per precision
+PARITY_TOLERANCE = {
+    'float32': 1e-4,
+    'float16': 1e-2,
+    'int8': 5e-2,
+}
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)  # overflow-free
+
+
+def _hard_sigmoid(x: np.ndarray) -> np.ndarray:
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+_ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+    'hard_sigmoid': _hard_sigmoid,
+}
+
+
+def _activation_name(activation: Any) -> str:
+    name = activation if isinstance(activation, str) else getattr(activation, '__name__', str(activation))
+    if name not in _ACTIVATIONS:
+        raise ValueError(f"Unsupported activation for NumPy inference: {name}")
+    return name
+
+
+def quantize_int8(weights: np.ndarray) -> tuple:
+    """Symmetric per-column int8 quantization. Returns (q, scale)."""
+    scale = np.abs(weights).max(axis=0) / 127.0
+    scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+    q = np.clip(np.round(weights / scale), -127, 127).astype(np.int8)
+    return q, scale
+
+
+def _round_trip(weights: np.ndarray, precision: str) -> np.ndarray:
+    """Weights as they will be seen after save/load at `precision`."""
+    if precision == 'float16':
+        return weights.astype(np.float16).astype(np.float32)
+    if precision == 'int8':
+        q, scale = quantize_int8(weights)
+        return q.astype(np.float32) * scale
+    return weights.astype(np.float32)
+
+
+class NumpyLSTMModel:
+    """
+    Stacked LSTM + Dense network evaluated with NumPy.
+
+    Exposes predict_on_batch()/predict() like a Keras model, so it can be used
+    as LSTMPricePredictor.model directly.
+
+    Usage:
+        model = NumpyLSTMModel.from_keras(keras_model, precision='int8')
+        model.save('data/models/lstm_model.npz')
+        model = NumpyLSTMModel.load('data/models/lstm_model.npz')
+        y = model.predict_on_batch(X)        # X: (n, timesteps, features)
+    """
+
+    # Matrices subject to quantization (biases always stay float32)
+    _MATRICES = ('kernel', 'recurrent_kernel')
+
+    def __init__(self, layers: List[Dict[str, Any]], precision: str = 'float32'):
+        """
+        Args:
+            layers: Layer specs in order; 'lstm' layers carry kernel,
+                    recurrent_kernel, bias (Keras gate order i, f, c, o),
+                    'dense' layers carry kernel, bias, activation
+            precision: Storage precision used by save()
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}, got {precision}")
+        self.precision = precision
+        self.layers = []
+        for spec in layers:
+            spec = dict(spec)
+            for name in self._MATRICES + ('bias',):
+                if name in spec:
+                    values = np.asarray(spec[name], dtype=np.float32)
+                    if name in self._MATRICES:
+                        values = _round_trip(values, precision)
+                    spec[name] = np.ascontiguousarray(values)
+            self.layers.append(spec)
+
+    @classmethod
+    def from_keras(cls, model: Any, precision: str = 'float32') -> "NumpyLSTMModel":
+        """
+        Convert a Keras Sequential of LSTM / Dense / Dropout layers.
+
+        Raises:
+            ValueError: on any other layer type or configuration
+        """
+        layers = []
+        for layer in model.layers:
+            layer_type = type(layer).__name__
+            config = layer.get_config()
+            if layer_type == 'Dropout':
+                continue  # identity at inference
+            if layer_type == 'LSTM':
+                if config.get('go_backwards') or config.get('stateful') or not config.get('use_bias', True):
+                    raise ValueError(f"Unsupported LSTM configuration in layer {layer.name}")
+                kernel, recurrent_kernel, bias = layer.get_weights()
+                layers.append({
+                    'type': 'lstm',
+                    'units': int(config['units']),
+                    'return_sequences': bool(config.get('return_sequences', False)),
+                    'activation': _activation_name(config.get('activation', 'tanh')),
+                    'recurrent_activation': _activation_name(config.get('recurrent_activation', 'sigmoid')),
+                    'kernel': kernel,
+                    'recurrent_kernel': recurrent_kernel,
+                    'bias': bias,
+                })
+            elif layer_type == 'Dense':
+                weights = layer.get_weights()
+                kernel = weights[0]
+                bias = weights[1] if len(weights) > 1 else np.zeros(kernel.shape[1], dtype=np.float32)
+                layers.append({
+                    'type': 'dense',
+                    'activation': _activation_name(config.get('activation', 'linear')),
+                    'kernel': kernel,
+                    'bias': bias,
+                })
+            else:
+                raise ValueError(f"Unsupported layer for NumPy inference: {layer_type} ({layer.name})")
+        return cls(layers, precision=precision)
+
+    # ------------------------------------------------------------------
+    # Forward pass
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _lstm(x: np.ndarray, spec: Dict[str, Any]) -> np.ndarray:
+        n, timesteps, _ = x.shape
+        units = spec['units']
+        act = _ACTIVATIONS[spec['activation']]
+        rec_act = _ACTIVATIONS[spec['recurrent_activation']]
+        recurrent_kernel = spec['recurrent_kernel']
+
+        # Input projection for all timesteps in one matmul: (n, T, 4u)
+        projected = x @ spec['kernel'] + spec['bias']
+
+        h = np.zeros((n, units), dtype=np.float32)
+        c = np.zeros((n, units), dtype=np.float32)
+        outputs = np.empty((n, timesteps, units), dtype=np.float32) if spec['return_sequences'] else None
+        for t in range(timesteps):
+            z = projected[:, t] + h @ recurrent_kernel
+            i = rec_act(z[:, :units])
+            f = rec_act(z[:, units:2 * units])
+            g = act(z[:, 2 * units:3 * units])
+            o = rec_act(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * act(c)
+            if outputs is not None:
+                outputs[:, t] = h
+        return outputs if outputs is not None else h
+
+    def predict_on_batch(self, X: np.ndarray) -> np.ndarray:
+        """Forward pass for (n, timesteps, features) inputs."""
+        x = np.asarray(X, dtype=np.float32)
+        for spec in self.layers:
+            if spec['type'] == 'lstm':
+                x = self._lstm(x, spec)
+            else:
+                x = _ACTIVATIONS[spec['activation']](x @ spec['kernel'] + spec['bias'])
+        return x
+
+    def predict(self, X: np.ndarray, batch_size: Optional[int] = None, verbose: int = 0) -> np.ndarray:
+        """Keras-compatible alias (optionally in batches)."""
+        X = np.asarray(X, dtype=np.float32)
+        if not batch_size or len(X) <= batch_size:
+            return self.predict_on_batch(X)
+        return np.concatenate([
+            self.predict_on_batch(X[start:start + batch_size])
+            for start in range(0, len(X), batch_size)
+        ])
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Write weights (at self.precision) and layer config to one .npz file."""
+        arrays: Dict[str, np.ndarray] = {}
+        config = []
+        for index, spec in enumerate(self.layers):
+            config.append({k: v for k, v in spec.items() if not isinstance(v, np.ndarray)})
+            for name, values in spec.items():
+                if not isinstance(values, np.ndarray):
+                    continue
+                key = f"l{index}_{name}"
+                if name in self._MATRICES and self.precision == 'int8':
+                    arrays[key], arrays[key + '_scale'] = quantize_int8(values)
+                elif name in self._MATRICES and self.precision == 'float16':
+                    arrays[key] = values.astype(np.float16)
+                else:
+                    arrays[key] = values
+        header = {'precision': self.precision, 'layers': config}
+        arrays['config'] = np.frombuffer(json.dumps(header).encode('utf-8'), dtype=np.uint8)
+
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyLSTMModel":
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(data['config'].tobytes().decode('utf-8'))
+            layers = []
+            for index, config in enumerate(header['layers']):
+                spec = dict(config)
+                for name in cls._MATRICES + ('bias',):
+                    key = f"l{index}_{name}"
+                    if key not in data:
+                        continue
+                    values = data[key].astype(np.float32)
+                    if key + '_scale' in data:
+                        values = values * data[key + '_scale']
+                    spec[name] = values
+                layers.append(spec)
+        # Weights are already at the stored precision - keep them as they are
+        model = cls(layers, precision='float32')
+        model.precision = header['precision']
+        return model
+
+    @property
+    def nbytes(self) -> int:
+        """Stored weight size at self.precision."""
+        itemsize = {'float32': 4, 'float16': 2, 'int8': 1}[self.precision]
+        total = 0
+        for spec in self.layers:
+            for name in self._MATRICES:
+                if name in spec:
+                    total += spec[name].size * itemsize
+                    if self.precision == 'int8':
+                        total += spec[name].shape[1] * 4  # per-column scales
+            total += spec['bias'].nbytes
+        return total
+
+
+def max_output_error(reference: Any, candidate: Any, X: np.ndarray) -> float:
+    """Max abs difference between two models' outputs on the same inputs."""
+    X = np.asarray(X, dtype=np.float32)
+    expected = np.asarray(reference.predict_on_batch(X), dtype=np.float64)
+    actual = np.asarray(candidate.predict_on_batch(X), dtype=np.float64)
+    return float(np.max(np.abs(expected - actual))) if expected.size else 0.0
@@ -3,25 +3,104 @@ LSTM Price Predictor - Neural network for price prediction on 1-4 hour horizons.
 
 This module implements a TensorFlow/Keras LSTM model that predicts BTC prices
 for the next 1h, 2h, and 4h based on historical OHLCV data and technical indicators.
+
+Training needs TensorFlow; inference can run on the NumPy backend
+(yunmin.ml.lstm_inference) exported next to the Keras model, without TensorFlow.
 """
 
 import numpy as np
 import pandas as pd
 from typing import Dict, Tuple, Optional, List
 from dataclasses import dataclass
+from numpy.lib.stride_tricks import sliding_window_view
 import pickle
 import os
 from datetime import datetime
 
-try:
-    import tensorflow as tf
-    from tensorflow import keras
-    from tensorflow.keras import layers
-    from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
-except ImportError:
-    tf = None
-    keras = None
-    layers = None
+from yunmin.features.definitions import add_technical_features
+from yunmin.ml.lstm_inference import NumpyLSTMModel, PARITY_TOLERANCE, max_output_error
+
+# TensorFlow takes seconds to import - loaded on first use by _import_tensorflow()
+tf = None
+keras = None
+layers = None
+
+
+def _import_tensorflow() -> bool:
+    """Import TensorFlow/Keras into module globals. Returns False if not installed."""
+    global tf, keras, layers
+    if keras is None:
+        try:
+            import tensorflow as _tf
+            from tensorflow import keras as _keras
+            from tensorflow.keras import layers as _layers
+        except ImportError:
+            return False
+        tf, keras, layers = _tf, _keras, _layers
+    return True
+
+
+# Extra candles engineered before the prediction window: enough for the
+# 50-candle rolling features and for the EMAs to converge
+FEATURE_WARMUP = 200
+
+
+class SequenceDataset:
+    """
+    Batches of LSTM windows materialised on demand.
+    
+    Holds only the (T, features) base array; each batch copies
+    batch_size * lookback * features floats, so memory stays bounded
+    no matter how long the history is. Wrap with as_keras_sequence()
+    before passing to model.fit().
+    """
+    
+    def __init__(
+        self,
+        windows: np.ndarray,
+        targets: np.ndarray,
+        batch_size: int = 32,
+        shuffle: bool = True,
+        seed: Optional[int] = None
+    ):
+        self.windows = windows
+        self.targets = targets.astype(np.float32)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self._rng = np.random.default_rng(seed)
+        self._order = np.arange(len(targets))
+        if shuffle:
+            self._rng.shuffle(self._order)
+    
+    def __len__(self) -> int:
+        return int(np.ceil(len(self._order) / self.batch_size))
+    
+    def __getitem__(self, batch: int) -> Tuple[np.ndarray, np.ndarray]:
+        idx = self._order[batch * self.batch_size:(batch + 1) * self.batch_size]
+        return self.windows[idx], self.targets[idx]
+    
+    def on_epoch_end(self):
+        if self.shuffle:
+            self._rng.shuffle(self._order)
+    
+    def as_keras_sequence(self):
+        """Adapt to keras.utils.Sequence (imports TensorFlow)."""
+        if not _import_tensorflow():
+            raise ImportError("TensorFlow is required for LSTM predictor. Install with: pip install tensorflow")
+        
+        inner = self
+        
+        class _KerasSequence(keras.utils.Sequence):
+            def __len__(self):
+                return len(inner)
+            
+            def __getitem__(self, batch):
+                return inner[batch]
+            
+            def on_epoch_end(self):
+                inner.on_epoch_end()
+        
+        return _KerasSequence()
 
 
 @dataclass
@@ -68,15 +147,13 @@ class LSTMPricePredictor:
             dropout_rate: Dropout rate for regularization
             learning_rate: Learning rate for optimizer
         """
-        if tf is None:
-            raise ImportError("TensorFlow is required for LSTM predictor. Install with: pip install tensorflow")
-        
         self.lookback_candles = lookback_candles
         self.lstm_units = lstm_units
         self.dropout_rate = dropout_rate
         self.learning_rate = learning_rate
         
-        self.model: Optional[keras.Model] = None
+        # keras.Model after training, NumpyLSTMModel for TensorFlow-free inference
+        self.model = None
         self.scaler_x = None
         self.scaler_y = None
         self.feature_columns = None
@@ -86,91 +163,19 @@ class LSTMPricePredictor:
         """
         Engineer features from OHLCV data.
         
+        The computation lives in yunmin.features.definitions so the feature
+        store materialises exactly the same columns.
+        
         Args:
             df: DataFrame with OHLCV data
             
         Returns:
             DataFrame with engineered features
         """
-        data = df.copy()
-        
-        # Normalized price changes
-        data['price_change_pct'] = data['close'].pct_change()
-        data['high_low_pct'] = (data['high'] - data['low']) / data['close']
-        data['open_close_pct'] = (data['close'] - data['open']) / data['open']
-        
-        # RSI (Relative Strength Index)
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        data['rsi'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        exp1 = data['close'].ewm(span=12, adjust=False).mean()
-        exp2 = data['close'].ewm(span=26, adjust=False).mean()
-        data['macd'] = exp1 - exp2
-        data['macd_signal'] = data['macd'].ewm(span=9, adjust=False).mean()
-        data['macd_diff'] = data['macd'] - data['macd_signal']
-        
-        # Bollinger Bands
-        bb_period = 20
-        data['bb_middle'] = data['close'].rolling(window=bb_period).mean()
-        bb_std = data['close'].rolling(window=bb_period).std()
-        data['bb_upper'] = data['bb_middle'] + (bb_std * 2)
-        data['bb_lower'] = data['bb_middle'] - (bb_std * 2)
-        data['bb_width'] = (data['bb_upper'] - data['bb_lower']) / data['bb_middle']
-        data['bb_position'] = (data['close'] - data['bb_lower']) / (data['bb_upper'] - data['bb_lower'])
-        
-        # ATR (Average True Range)
-        high_low = data['high'] - data['low']
-        high_close = np.abs(data['high'] - data['close'].shift())
-        low_close = np.abs(data['low'] - data['close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        data['atr'] = true_range.rolling(14).mean()
-        data['atr_pct'] = data['atr'] / data['close']
-        
-        # Volume indicators
-        data['volume_sma'] = data['volume'].rolling(window=20).mean()
-        data['volume_ratio'] = data['volume'] / data['volume_sma']
-        data['volume_change_pct'] = data['volume'].pct_change()
-        
-        # Time-based features (if timestamp available)
-        if 'timestamp' in data.columns:
-            data['timestamp'] = pd.to_datetime(data['timestamp'])
-            data['hour'] = data['timestamp'].dt.hour
-            data['day_of_week'] = data['timestamp'].dt.dayofweek
-            # Cyclical encoding
-            data['hour_sin'] = np.sin(2 * np.pi * data['hour'] / 24)
-            data['hour_cos'] = np.cos(2 * np.pi * data['hour'] / 24)
-            data['day_sin'] = np.sin(2 * np.pi * data['day_of_week'] / 7)
-            data['day_cos'] = np.cos(2 * np.pi * data['day_of_week'] / 7)
-        
-        # Moving averages
-        data['sma_20'] = data['close'].rolling(window=20).mean()
-        data['sma_50'] = data['close'].rolling(window=50).mean()
-        data['sma_20_pct'] = (data['close'] - data['sma_20']) / data['sma_20']
-        data['sma_50_pct'] = (data['close'] - data['sma_50']) / data['sma_50']
-        
-        return data
+        return add_technical_features(df)
     
-    def _prepare_sequences(
-        self,
-        df: pd.DataFrame,
-        target_horizons: List[int] = [12, 24, 48]  # 1h, 2h, 4h in 5-min candles
-    ) -> Tuple[np.ndarray, np.ndarray]:
-        """
-        Prepare sequences for LSTM training.
-        
-        Args:
-            df: DataFrame with features
-            target_horizons: Future candles to predict (for 5-min data)
-            
-        Returns:
-            Tuple of (X, y) arrays
-        """
-        # Select feature columns
+    def _select_feature_columns(self, df: pd.DataFrame) -> List[str]:
+        """Pick model input columns present in the engineered frame."""
         feature_cols = [
             'open', 'high', 'low', 'close', 'volume',
             'price_change_pct', 'high_low_pct', 'open_close_pct',
@@ -185,7 +190,25 @@ class LSTMPricePredictor:
             feature_cols.extend(['hour_sin', 'hour_cos', 'day_sin', 'day_cos'])
         
         # Filter columns that exist
-        feature_cols = [col for col in feature_cols if col in df.columns]
+        return [col for col in feature_cols if col in df.columns]
+    
+    def _sequence_arrays(
+        self,
+        df: pd.DataFrame,
+        target_horizons: List[int] = [12, 24, 48]  # 1h, 2h, 4h in 5-min candles
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extract the base arrays that all training windows are views of.
+        
+        Args:
+            df: DataFrame with features
+            target_horizons: Future candles to predict (for 5-min data)
+            
+        Returns:
+            Tuple of (feature rows [T, features] float32, targets [N, horizons])
+            where window i covers rows i .. i + lookback_candles - 1
+        """
+        feature_cols = self._select_feature_columns(df)
         self.feature_columns = feature_cols
         
         # Ensure we have 'close' for targets (but not duplicated)
@@ -196,66 +219,46 @@ class LSTMPricePredictor:
         # Drop NaN values
         df_clean = df[cols_for_clean].dropna()
         
-        X_list = []
-        y_list = []
+        values = df_clean[feature_cols].to_numpy(dtype=np.float32)
+        closes = df_clean['close'].to_numpy(dtype=np.float64)
         
-        max_horizon = max(target_horizons)
+        n_samples = max(0, len(df_clean) - self.lookback_candles - max(target_horizons))
         
-        for i in range(len(df_clean) - self.lookback_candles - max_horizon):
-            # Input sequence
-            X_seq = df_clean[feature_cols].iloc[i:i + self.lookback_candles].values
-            X_list.append(X_seq)
-            
-            # Target prices at different horizons
-            # Use .item() for cleaner scalar extraction
-            current_price = float(df_clean['close'].iloc[i + self.lookback_candles - 1].item() 
-                                if hasattr(df_clean['close'].iloc[i + self.lookback_candles - 1], 'item')
-                                else df_clean['close'].iloc[i + self.lookback_candles - 1])
-            
-            y_targets = []
-            for horizon in target_horizons:
-                future_price = float(df_clean['close'].iloc[i + self.lookback_candles + horizon - 1].item()
-                                   if hasattr(df_clean['close'].iloc[i + self.lookback_candles + horizon - 1], 'item')
-                                   else df_clean['close'].iloc[i + self.lookback_candles + horizon - 1])
-                # Predict percentage change instead of absolute price
-                y_targets.append((future_price - current_price) / current_price)
-            
-            y_list.append(y_targets)
+        # Vectorised targets: percentage change from the window's last close
+        current_idx = np.arange(n_samples) + self.lookback_candles - 1
+        current = closes[current_idx]
+        y = np.empty((n_samples, len(target_horizons)), dtype=np.float64)
+        for j, horizon in enumerate(target_horizons):
+            y[:, j] = (closes[current_idx + horizon] - current) / current
         
-        return np.array(X_list), np.array(y_list)
+        return values, y
     
-    def _normalize_data(self, X: np.ndarray, y: np.ndarray, fit: bool = True):
+    def _windows(self, values: np.ndarray, n_samples: int) -> np.ndarray:
+        """
+        Zero-copy (n_samples, lookback, features) view over feature rows.
+        """
+        if n_samples == 0:
+            return np.empty((0, self.lookback_candles, values.shape[1]), dtype=values.dtype)
+        view = sliding_window_view(values, self.lookback_candles, axis=0)
+        return view[:n_samples].transpose(0, 2, 1)
+    
+    def _prepare_sequences(
+        self,
+        df: pd.DataFrame,
+        target_horizons: List[int] = [12, 24, 48]  # 1h, 2h, 4h in 5-min candles
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Normalize input and output data.
+        Prepare sequences for LSTM training.
         
         Args:
-            X: Input sequences
-            y: Target values
-            fit: Whether to fit the scalers
+            df: DataFrame with features
+            target_horizons: Future candles to predict (for 5-min data)
             
         Returns:
-            Normalized X and y
+            Tuple of (X, y) arrays; X is a read-only strided view
         """
-        from sklearn.preprocessing import StandardScaler
-        
-        # Reshape X for scaling
-        n_samples, n_timesteps, n_features = X.shape
-        X_reshaped = X.reshape(-1, n_features)
-        
-        if fit:
-            self.scaler_x = StandardScaler()
-            X_scaled = self.scaler_x.fit_transform(X_reshaped)
-            
-            self.scaler_y = StandardScaler()
-            y_scaled = self.scaler_y.fit_transform(y)
-        else:
-            X_scaled = self.scaler_x.transform(X_reshaped)
-            y_scaled = self.scaler_y.transform(y)
-        
-        # Reshape back
-        X_scaled = X_scaled.reshape(n_samples, n_timesteps, n_features)
-        
-        return X_scaled, y_scaled
+        values, y = self._sequence_arrays(df, target_horizons)
+        return self._windows(values, len(y)), y
     
     def _build_model(self, input_shape: Tuple[int, int], output_dim: int):
         """
@@ -302,7 +305,11 @@ class LSTMPricePredictor:
         epochs: int = 100,
         batch_size: int = 32,
         validation_split: float = 0.15,
-        verbose: int = 1
+        verbose: int = 1,
+        streaming: Optional[bool] = None,
+        max_in_memory_mb: float = 512.0,
+        callbacks: Optional[List] = None,
+        initial_epoch: int = 0
     ) -> Dict:
         """
         Train the LSTM model.
@@ -313,48 +320,85 @@ class LSTMPricePredictor:
             batch_size: Batch size for training
             validation_split: Validation data split ratio
             verbose: Verbosity level
+            streaming: Feed Keras from a SequenceDataset instead of one
+                       materialised array (None = auto by size)
+            max_in_memory_mb: Auto-streaming threshold for materialised windows
+            callbacks: Extra Keras callbacks (e.g. epoch checkpoints)
+            initial_epoch: Resume from this epoch; an already loaded self.model
+                           is trained further instead of being rebuilt
             
         Returns:
             Training history
         """
+        if not _import_tensorflow():
+            raise ImportError("TensorFlow is required for LSTM training. Install with: pip install tensorflow")
+        from sklearn.preprocessing import StandardScaler
+        
         # Feature engineering
         df_features = self._engineer_features(df)
         
-        # Prepare sequences
-        X, y = self._prepare_sequences(df_features)
+        # Base arrays (windows are views of `values`)
+        values, y = self._sequence_arrays(df_features)
         
-        if len(X) == 0:
+        if len(y) == 0:
             raise ValueError("Not enough data to create sequences")
         
         # Split into train/validation/test (70/15/15)
-        n_samples = len(X)
+        n_samples = len(y)
         n_train = int(n_samples * 0.70)
         n_val = int(n_samples * 0.15)
         
-        X_train = X[:n_train]
-        y_train = y[:n_train]
-        X_val = X[n_train:n_train + n_val]
-        y_val = y[n_train:n_train + n_val]
-        X_test = X[n_train + n_val:]
-        y_test = y[n_train + n_val:]
-        
-        # Normalize
-        X_train_scaled, y_train_scaled = self._normalize_data(X_train, y_train, fit=True)
-        X_val_scaled, y_val_scaled = self._normalize_data(X_val, y_val, fit=False)
-        X_test_scaled, y_test_scaled = self._normalize_data(X_test, y_test, fit=False)
+        # Normalize rows once (features are scaled per column, so scaling rows
+        # before windowing equals scaling every window). Scalers are fit on
+        # the rows covered by training windows only.
+        train_rows = n_train + self.lookback_candles - 1
+        self.scaler_x = StandardScaler().fit(values[:train_rows])
+        self.scaler_y = StandardScaler().fit(y[:n_train])
+        values_scaled = self.scaler_x.transform(values).astype(np.float32)
+        y_scaled = self.scaler_y.transform(y).astype(np.float32)
+        
+        X_all = self._windows(values_scaled, n_samples)
+        splits = {
+            'train': slice(0, n_train),
+            'val': slice(n_train, n_train + n_val),
+            'test': slice(n_train + n_val, n_samples),
+        }
         
-        # Build model
-        input_shape = (X_train_scaled.shape[1], X_train_scaled.shape[2])
-        output_dim = y_train_scaled.shape[1]
-        self._build_model(input_shape, output_dim)
+        if streaming is None:
+            materialised_mb = X_all.size * X_all.itemsize / 1e6
+            streaming = materialised_mb > max_in_memory_mb
+        
+        if streaming:
+            train_data = SequenceDataset(
+                X_all[splits['train']], y_scaled[splits['train']], batch_size
+            ).as_keras_sequence()
+            val_data = SequenceDataset(
+                X_all[splits['val']], y_scaled[splits['val']], batch_size, shuffle=False
+            ).as_keras_sequence()
+            test_data = SequenceDataset(
+                X_all[splits['test']], y_scaled[splits['test']], batch_size, shuffle=False
+            ).as_keras_sequence()
+        else:
+            X_train_scaled = np.ascontiguousarray(X_all[splits['train']])
+            y_train_scaled = y_scaled[splits['train']]
+            X_val_scaled = np.ascontiguousarray(X_all[splits['val']])
+            y_val_scaled = y_scaled[splits['val']]
+            X_test_scaled = np.ascontiguousarray(X_all[splits['test']])
+            y_test_scaled = y_scaled[splits['test']]
+        
+        # Build model (unless resuming a checkpointed Keras one)
+        if initial_epoch == 0 or not isinstance(self.model, keras.Model):
+            input_shape = (X_all.shape[1], X_all.shape[2])
+            output_dim = y_scaled.shape[1]
+            self._build_model(input_shape, output_dim)
         
         # Callbacks
-        early_stop = EarlyStopping(
+        early_stop = keras.callbacks.EarlyStopping(
             monitor='val_loss',
             patience=10,
             restore_best_weights=True
         )
-        reduce_lr = ReduceLROnPlateau(
+        reduce_lr = keras.callbacks.ReduceLROnPlateau(
             monitor='val_loss',
             factor=0.5,
             patience=5,
@@ -362,17 +406,28 @@ class LSTMPricePredictor:
         )
         
         # Train
-        history = self.model.fit(
-            X_train_scaled, y_train_scaled,
-            validation_data=(X_val_scaled, y_val_scaled),
-            epochs=epochs,
-            batch_size=batch_size,
-            callbacks=[early_stop, reduce_lr],
-            verbose=verbose
-        )
-        
-        # Evaluate on test set
-        test_loss, test_mae = self.model.evaluate(X_test_scaled, y_test_scaled, verbose=0)
+        if streaming:
+            history = self.model.fit(
+                train_data,
+                validation_data=val_data,
+                epochs=epochs,
+                initial_epoch=initial_epoch,
+                callbacks=[early_stop, reduce_lr] + list(callbacks or []),
+                verbose=verbose
+            )
+            test_loss, test_mae = self.model.evaluate(test_data, verbose=0)
+        else:
+            history = self.model.fit(
+                X_train_scaled, y_train_scaled,
+                validation_data=(X_val_scaled, y_val_scaled),
+                epochs=epochs,
+                initial_epoch=initial_epoch,
+                batch_size=batch_size,
+                callbacks=[early_stop, reduce_lr] + list(callbacks or []),
+                verbose=verbose
+            )
+            # Evaluate on test set
+            test_loss, test_mae = self.model.evaluate(X_test_scaled, y_test_scaled, verbose=0)
         
         self.is_trained = True
         
@@ -380,11 +435,73 @@ class LSTMPricePredictor:
             'history': history.history,
             'test_loss': float(test_loss),
             'test_mae': float(test_mae),
-            'train_samples': len(X_train),
-            'val_samples': len(X_val),
-            'test_samples': len(X_test)
+            'train_samples': n_train,
+            'val_samples': n_val,
+            'test_samples': n_samples - n_train - n_val,
+            'streaming': streaming
         }
     
+    def _last_window(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        """Engineer features on the tail of `df` and return the last window."""
+        # Only the tail matters: rolling windows need <= 50 rows and the
+        # EMAs have converged to float precision after FEATURE_WARMUP rows
+        df_features = self._engineer_features(df.tail(self.lookback_candles + FEATURE_WARMUP))
+        
+        if len(df_features) < self.lookback_candles:
+            return None
+        
+        last_sequence = df_features[self.feature_columns].to_numpy()[-self.lookback_candles:]
+        
+        # Check for NaN
+        if np.isnan(last_sequence).any():
+            return None
+        return last_sequence
+    
+    def _scale_windows(self, windows: np.ndarray) -> np.ndarray:
+        """Scale (n, lookback, features) windows to float32 model inputs."""
+        n, lookback, n_features = windows.shape
+        X_scaled = self.scaler_x.transform(windows.reshape(-1, n_features))
+        return X_scaled.reshape(n, lookback, n_features).astype(np.float32)
+    
+    def _predict_windows(
+        self,
+        windows: np.ndarray,
+        current_prices: np.ndarray
+    ) -> List[PricePrediction]:
+        """
+        Run one forward pass over stacked windows.
+        
+        Args:
+            windows: (n, lookback, features) unscaled feature windows
+            current_prices: (n,) last close per window
+        """
+        X_scaled = self._scale_windows(windows)
+        n = len(X_scaled)
+        
+        # Predict (predict_on_batch avoids Keras' per-call predict() overhead)
+        y_pred_scaled = np.asarray(self.model.predict_on_batch(X_scaled))
+        y_pred = self.scaler_y.inverse_transform(y_pred_scaled)
+        
+        # Convert percentage changes back to prices
+        prices = current_prices[:, None] * (1 + y_pred[:, :3])
+        
+        # Calculate confidence based on prediction variance
+        # Lower variance = higher confidence
+        pred_variance = np.var(y_pred, axis=1)
+        confidence = np.clip(1.0 / (1.0 + pred_variance * 100), 0.0, 1.0)  # Scaled confidence
+        
+        now = datetime.now()
+        return [
+            PricePrediction(
+                prediction_1h=float(prices[i, 0]),
+                prediction_2h=float(prices[i, 1]),
+                prediction_4h=float(prices[i, 2]),
+                confidence=float(confidence[i]),
+                timestamp=now
+            )
+            for i in range(n)
+        ]
+    
     def predict(self, df: pd.DataFrame) -> Optional[PricePrediction]:
         """
         Predict future prices.
@@ -398,65 +515,127 @@ class LSTMPricePredictor:
         if not self.is_trained or self.model is None:
             raise ValueError("Model must be trained before prediction")
         
-        # Feature engineering
-        df_features = self._engineer_features(df)
-        
-        # Get last sequence
-        if len(df_features) < self.lookback_candles:
+        last_sequence = self._last_window(df)
+        if last_sequence is None:
             return None
         
-        # Extract features
-        last_sequence = df_features[self.feature_columns].iloc[-self.lookback_candles:].values
-        
-        # Check for NaN
-        if np.isnan(last_sequence).any():
-            return None
+        current_price = np.array([df['close'].iloc[-1]], dtype=np.float64)
+        return self._predict_windows(last_sequence[None, ...], current_price)[0]
+    
+    def predict_batch(
+        self,
+        inputs: Dict[str, "pd.DataFrame | FeatureBuffer"]
+    ) -> Dict[str, Optional[PricePrediction]]:
+        """
+        Predict many symbols in a single forward pass.
         
-        # Reshape for model
-        X_pred = last_sequence.reshape(1, self.lookback_candles, len(self.feature_columns))
+        Args:
+            inputs: symbol -> FeatureBuffer (incremental, preferred) or
+                    DataFrame with recent OHLCV data
+            
+        Returns:
+            symbol -> PricePrediction (None if the symbol lacks clean data)
+        """
+        if not self.is_trained or self.model is None:
+            raise ValueError("Model must be trained before prediction")
         
-        # Normalize
-        X_pred_flat = X_pred.reshape(-1, len(self.feature_columns))
-        X_pred_scaled = self.scaler_x.transform(X_pred_flat)
-        X_pred_scaled = X_pred_scaled.reshape(1, self.lookback_candles, len(self.feature_columns))
+        symbols, windows, prices = [], [], []
+        for symbol, source in inputs.items():
+            if isinstance(source, FeatureBuffer):
+                window = source.window()
+                price = source.last_close
+            else:
+                window = self._last_window(source)
+                price = float(source['close'].iloc[-1]) if len(source) else None
+            if window is None:
+                continue
+            symbols.append(symbol)
+            windows.append(window)
+            prices.append(price)
+        
+        results: Dict[str, Optional[PricePrediction]] = {symbol: None for symbol in inputs}
+        if symbols:
+            predictions = self._predict_windows(
+                np.stack(windows), np.asarray(prices, dtype=np.float64)
+            )
+            results.update(zip(symbols, predictions))
+        return results
+    
+    def create_feature_buffer(self, df: pd.DataFrame) -> "FeatureBuffer":
+        """
+        Seed an incremental FeatureBuffer from recent OHLCV history.
         
-        # Predict
-        y_pred_scaled = self.model.predict(X_pred_scaled, verbose=0)
-        y_pred = self.scaler_y.inverse_transform(y_pred_scaled)[0]
+        After seeding, call buffer.update(candle) on every new candle - only
+        the newest feature row is computed.
+        """
+        if self.feature_columns is None:
+            raise ValueError("Model must be trained (or loaded) before creating feature buffers")
+        return FeatureBuffer(self, df)
+    
+    def to_numpy_backend(
+        self,
+        precision: str = 'float32',
+        sample_windows: Optional[np.ndarray] = None,
+        tolerance: Optional[float] = None
+    ) -> NumpyLSTMModel:
+        """
+        Switch inference to the TensorFlow-free NumPy backend.
         
-        # Convert percentage changes back to prices
-        current_price = df['close'].iloc[-1]
-        pred_1h = current_price * (1 + y_pred[0])
-        pred_2h = current_price * (1 + y_pred[1])
-        pred_4h = current_price * (1 + y_pred[2])
+        Args:
+            precision: Weight precision ('float32', 'float16' or 'int8')
+            sample_windows: Optional (n, lookback, features) unscaled windows
+                            to check output parity against the Keras model
+            tolerance: Max abs error on scaled outputs (default per precision)
+            
+        Returns:
+            The new NumpyLSTMModel (also set as self.model)
+            
+        Raises:
+            ValueError: if the parity check exceeds the tolerance
+        """
+        if not self.is_trained or self.model is None:
+            raise ValueError("Model must be trained before conversion")
         
-        # Calculate confidence based on prediction variance
-        # Lower variance = higher confidence
-        pred_variance = np.var(y_pred)
-        confidence = 1.0 / (1.0 + pred_variance * 100)  # Scaled confidence
-        confidence = np.clip(confidence, 0.0, 1.0)
-        
-        return PricePrediction(
-            prediction_1h=float(pred_1h),
-            prediction_2h=float(pred_2h),
-            prediction_4h=float(pred_4h),
-            confidence=float(confidence),
-            timestamp=datetime.now()
-        )
+        source = self.model
+        if isinstance(source, NumpyLSTMModel):
+            numpy_model = NumpyLSTMModel(source.layers, precision=precision)
+        else:
+            numpy_model = NumpyLSTMModel.from_keras(source, precision=precision)
+        
+        if sample_windows is not None:
+            error = max_output_error(source, numpy_model, self._scale_windows(sample_windows))
+            limit = PARITY_TOLERANCE[precision] if tolerance is None else tolerance
+            if error > limit:
+                raise ValueError(
+                    f"NumPy backend ({precision}) output error {error:.2e} exceeds tolerance {limit:.0e}"
+                )
+        
+        self.model = numpy_model
+        return numpy_model
     
-    def save_model(self, filepath: str):
+    def save_model(self, filepath: str, inference_precision: Optional[str] = 'float32'):
         """
         Save model to disk.
         
         Args:
             filepath: Path to save the model
+            inference_precision: Also export the NumPy inference backend
+                                 (<path>_model.npz) at this precision; None to skip
         """
         if not self.is_trained:
             raise ValueError("Cannot save untrained model")
         
-        # Save Keras model (use .keras format instead of .h5)
-        model_path = filepath + '_model.keras'
-        self.model.save(model_path)
+        if isinstance(self.model, NumpyLSTMModel):
+            # Loaded without TensorFlow - only the NumPy export can be written
+            self.model.save(filepath + '_model.npz')
+        else:
+            # Save Keras model (use .keras format instead of .h5)
+            model_path = filepath + '_model.keras'
+            self.model.save(model_path)
+            if inference_precision is not None:
+                NumpyLSTMModel.from_keras(self.model, precision=inference_precision).save(
+                    filepath + '_model.npz'
+                )
         
         # Save scalers and metadata
         metadata = {
@@ -474,23 +653,37 @@ class LSTMPricePredictor:
         with open(metadata_path, 'wb') as f:
             pickle.dump(metadata, f)
     
-    def load_model(self, filepath: str):
+    def load_model(self, filepath: str, backend: str = 'auto'):
         """
         Load model from disk.
         
         Args:
             filepath: Path to load the model from
+            backend: 'numpy' (TensorFlow-free inference), 'keras' (needed to
+                     continue training) or 'auto' (numpy when exported)
         """
-        # Load Keras model (try .keras first, fallback to .h5 for compatibility)
-        model_path_keras = filepath + '_model.keras'
-        model_path_h5 = filepath + '_model.h5'
-        
-        if os.path.exists(model_path_keras):
-            self.model = keras.models.load_model(model_path_keras)
-        elif os.path.exists(model_path_h5):
-            self.model = keras.models.load_model(model_path_h5)
+        if backend not in ('auto', 'numpy', 'keras'):
+            raise ValueError(f"Unknown backend: {backend}")
+        
+        model_path_numpy = filepath + '_model.npz'
+        if backend == 'numpy' or (backend == 'auto' and os.path.exists(model_path_numpy)):
+            if not os.path.exists(model_path_numpy):
+                raise FileNotFoundError(f"NumPy model export not found at {model_path_numpy}")
+            self.model = NumpyLSTMModel.load(model_path_numpy)
         else:
-            raise FileNotFoundError(f"Model file not found at {filepath}")
+            if not _import_tensorflow():
+                raise ImportError("TensorFlow is required to load LSTM models. Install with: pip install tensorflow")
+            
+            # Load Keras model (try .keras first, fallback to .h5 for compatibility)
+            model_path_keras = filepath + '_model.keras'
+            model_path_h5 = filepath + '_model.h5'
+            
+            if os.path.exists(model_path_keras):
+                self.model = keras.models.load_model(model_path_keras)
+            elif os.path.exists(model_path_h5):
+                self.model = keras.models.load_model(model_path_h5)
+            else:
+                raise FileNotFoundError(f"Model file not found at {filepath}")
         
         # Load metadata
         metadata_path = filepath + '_metadata.pkl'
@@ -505,3 +698,151 @@ class LSTMPricePredictor:
         self.dropout_rate = metadata['dropout_rate']
         self.learning_rate = metadata['learning_rate']
         self.is_trained = metadata['is_trained']
+
+
+class FeatureBuffer:
+    """
+    Rolling per-symbol feature window with O(1)-ish incremental updates.
+    
+    Mirrors LSTMPricePredictor._engineer_features for the newest row only:
+    EMAs/MACD are carried recursively, rolling stats use the last 50 raw
+    candles. Seeded once from a DataFrame, then updated per candle; a short
+    seed fills up through update() until `lookback` rows are available.
+    """
+    
+    RAW_HISTORY = 51  # sma_50 + one previous close
+    
+    def __init__(self, predictor: LSTMPricePredictor, df: pd.DataFrame):
+        if df.empty:
+            raise ValueError("FeatureBuffer needs at least one seed candle")
+        self.feature_columns = list(predictor.feature_columns)
+        self.lookback = predictor.lookback_candles
+        
+        tail = df.tail(self.lookback + FEATURE_WARMUP)
+        features = predictor._engineer_features(tail)
+        self._window = features[self.feature_columns].to_numpy(dtype=np.float64)[-self.lookback:].copy()
+        
+        self._raw = {
+            col: list(tail[col].to_numpy(dtype=np.float64)[-self.RAW_HISTORY:])
+            for col in ('open', 'high', 'low', 'close', 'volume')
+        }
+        
+        # Recursive EMA state at the last seeded row
+        close = tail['close']
+        self._ema12 = float(close.ewm(span=12, adjust=False).mean().iloc[-1])
+        self._ema26 = float(close.ewm(span=26, adjust=False).mean().iloc[-1])
+        self._macd_signal = float(features['macd_signal'].iloc[-1])
+    
+    @property
+    def last_close(self) -> float:
+        return self._raw['close'][-1]
+    
+    def window(self) -> Optional[np.ndarray]:
+        """Current (lookback, features) window, or None if it contains NaN."""
+        if len(self._window) < self.lookback or np.isnan(self._window).any():
+            return None
+        return self._window
+    
+    def update(self, candle: Dict) -> np.ndarray:
+        """
+        Append one candle and compute its feature row.
+        
+        Args:
+            candle: dict with open, high, low, close, volume and optional timestamp
+            
+        Returns:
+            The new feature row
+        """
+        for col, values in self._raw.items():
+            values.append(float(candle[col]))
+            if len(values) > self.RAW_HISTORY:
+                del values[0]
+        
+        if len(self._raw['close']) < self.RAW_HISTORY - 1:
+            # Too few candles for the rolling stats (sma_50): _engineer_features
+            # has NaN here too, so the row only keeps the EMA state moving
+            self._advance_macd(float(candle['close']))
+            new_row = np.full(len(self.feature_columns), np.nan)
+        else:
+            row = self._compute_row(candle)
+            new_row = np.array([row.get(col, np.nan) for col in self.feature_columns], dtype=np.float64)
+        
+        if len(self._window) < self.lookback:
+            self._window = np.vstack([self._window, new_row])
+        else:
+            self._window[:-1] = self._window[1:]
+            self._window[-1] = new_row
+        return new_row
+    
+    def _advance_macd(self, close: float) -> float:
+        """Step the recursive EMA12/EMA26/signal state; returns MACD."""
+        self._ema12 += (2 / 13) * (close - self._ema12)
+        self._ema26 += (2 / 27) * (close - self._ema26)
+        macd = self._ema12 - self._ema26
+        self._macd_signal += (2 / 10) * (macd - self._macd_signal)
+        return macd
+    
+    def _compute_row(self, candle: Dict) -> Dict[str, float]:
+        o = np.asarray(self._raw['open'])
+        h = np.asarray(self._raw['high'])
+        l = np.asarray(self._raw['low'])
+        c = np.asarray(self._raw['close'])
+        v = np.asarray(self._raw['volume'])
+        close = c[-1]
+        
+        row = {
+            'open': o[-1], 'high': h[-1], 'low': l[-1], 'close': close, 'volume': v[-1],
+            'price_change_pct': close / c[-2] - 1,
+            'high_low_pct': (h[-1] - l[-1]) / close,
+            'open_close_pct': (close - o[-1]) / o[-1],
+        }
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # RSI (simple 14-period means, as in _engineer_features)
+            delta = np.diff(c[-15:])
+            gain = np.where(delta > 0, delta, 0.0).mean()
+            loss = np.where(delta < 0, -delta, 0.0).mean()
+            row['rsi'] = 100 - (100 / (1 + gain / loss))
+            
+            # MACD (recursive EMAs)
+            macd = self._advance_macd(close)
+            row['macd'] = macd
+            row['macd_signal'] = self._macd_signal
+            row['macd_diff'] = macd - self._macd_signal
+            
+            # Bollinger Bands
+            last20 = c[-20:]
+            bb_middle = last20.mean()
+            bb_std = last20.std(ddof=1)
+            bb_upper = bb_middle + 2 * bb_std
+            bb_lower = bb_middle - 2 * bb_std
+            row['bb_width'] = (bb_upper - bb_lower) / bb_middle
+            row['bb_position'] = (close - bb_lower) / (bb_upper - bb_lower)
+            
+            # ATR
+            prev_close = c[-15:-1]
+            true_range = np.maximum.reduce([
+                h[-14:] - l[-14:],
+                np.abs(h[-14:] - prev_close),
+                np.abs(l[-14:] - prev_close),
+            ])
+            row['atr_pct'] = true_range.mean() / close
+            
+            # Volume
+            row['volume_ratio'] = v[-1] / v[-20:].mean()
+            row['volume_change_pct'] = v[-1] / v[-2] - 1
+            
+            # Moving averages
+            sma_20 = bb_middle
+            sma_50 = c[-50:].mean()
+            row['sma_20_pct'] = (close - sma_20) / sma_20
+            row['sma_50_pct'] = (close - sma_50) / sma_50
+        
+        if 'timestamp' in candle:
+            ts = pd.Timestamp(candle['timestamp'])
+            row['hour_sin'] = np.sin(2 * np.pi * ts.hour / 24)
+            row['hour_cos'] = np.cos(2 * np.pi * ts.hour / 24)
+            row['day_sin'] = np.sin(2 * np.pi * ts.dayofweek / 7)
+            row['day_cos'] = np.cos(2 * np.pi * ts.dayofweek / 7)
+        
+        return row
@@ -0,0 +1,382 @@
+"""
+Model Registry - Versioned, checksummed storage for ML components.
+
+Layout:
+    <root>/<name>/v0001/manifest.json   kind, init kwargs, sha256 per file, metadata
+    <root>/<name>/v0001/model*          files written by the component's save_model()
+
+Loaded models are kept in an in-process LRU, so every symbol worker (thread)
+in a process shares one copy. For worker processes, warm the registry and fork
+afterwards (fork_workers) - children inherit the loaded models copy-on-write
+instead of each loading its own.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from datetime import datetime
+import gc
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+from loguru import logger
+
+
+# kind -> (module, class); imported lazily so the registry never pulls in TensorFlow by itself
+MODEL_KINDS = {
+    'lstm': ('yunmin.ml.lstm_predictor', 'LSTMPricePredictor'),
+    'risk': ('yunmin.ml.risk_scorer', 'RiskScorer'),
+    'pattern': ('yunmin.ml.pattern_recognizer', 'PatternRecognizer'),
+}
+
+MANIFEST = 'manifest.json'
+ARTIFACT_PREFIX = 'model'
+
+
+class ModelIntegrityError(ValueError):
+    """Stored model files do not match their manifest checksums."""
+
+
+def _kind_of(model: Any) -> str:
+    for kind, (module_name, class_name) in MODEL_KINDS.items():
+        if type(model).__name__ == class_name and type(model).__module__ == module_name:
+            return kind
+    raise TypeError(f"Unsupported model type: {type(model).__name__}")
+
+
+def _init_kwargs(kind: str, model: Any) -> Dict[str, Any]:
+    """Constructor arguments needed before load_model() can run."""
+    if kind == 'risk':
+        return {'model_type': model.model_type}
+    if kind == 'pattern':
+        return {
+            'lookback_window': model.lookback_window,
+            'min_pattern_length': model.min_pattern_length,
+            'pivot_order': model.pivot_order,
+        }
+    return {}
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _checksums(directory: Path) -> Dict[str, str]:
+    return {
+        str(path.relative_to(directory)): _sha256(path)
+        for path in sorted(directory.rglob('*'))
+        if path.is_file() and path.name != MANIFEST
+    }
+
+
+class ModelRegistry:
+    """
+    Versioned on-disk model registry with lazy, cached loading.
+
+    Usage:
+        registry = get_registry()
+        version = registry.register('risk_scorer', scorer, metadata={'val_rmse': 4.2})
+        scorer = registry.load('risk_scorer')          # latest, verified, cached
+    """
+
+    def __init__(self, root: str = 'data/models', cache_size: int = 4):
+        """
+        Initialize registry.
+
+        Args:
+            root: Registry directory
+            cache_size: Loaded models kept in memory (LRU)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.cache_size = cache_size
+
+        self._cache: "OrderedDict[Tuple[str, int], Any]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._loading: Dict[Tuple[str, int], threading.Lock] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Versions / manifests
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _version_dir_name(version: int) -> str:
+        return f"v{version:04d}"
+
+    def versions(self, name: str) -> List[int]:
+        """Registered versions of a model, ascending."""
+        model_dir = self.root / name
+        if not model_dir.exists():
+            return []
+        versions = []
+        for path in model_dir.iterdir():
+            if path.is_dir() and path.name.startswith('v') and path.name[1:].isdigit():
+                if (path / MANIFEST).exists():
+                    versions.append(int(path.name[1:]))
+        return sorted(versions)
+
+    def latest_version(self, name: str) -> int:
+        versions = self.versions(name)
+        if not versions:
+            raise KeyError(f"No registered versions of model '{name}'")
+        return versions[-1]
+
+    def _resolve(self, name: str, version: Optional[int]) -> Tuple[int, Path]:
+        version = self.latest_version(name) if version is None else int(version)
+        path = self.root / name / self._version_dir_name(version)
+        if not (path / MANIFEST).exists():
+            raise KeyError(f"Model '{name}' has no version {version}")
+        return version, path
+
+    def get_manifest(self, name: str, version: Optional[int] = None) -> Dict[str, Any]:
+        """Manifest of a version (latest by default)."""
+        _, path = self._resolve(name, version)
+        with open(path / MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def list_models(self) -> Dict[str, List[int]]:
+        """All model names with their versions."""
+        return {
+            path.name: self.versions(path.name)
+            for path in sorted(self.root.iterdir())
+            if path.is_dir() and self.versions(path.name)
+        }
+
+    # ------------------------------------------------------------------
+    # Register / verify / load
+    # ------------------------------------------------------------------
+
+    def register(self, name: str, model: Any, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Save a trained component as a new version.
+
+        The component writes its own files via save_model(); the registry adds
+        checksums and publishes the version with an atomic rename.
+
+        Returns:
+            New version number
+        """
+        kind = _kind_of(model)
+        model_dir = self.root / name
+        model_dir.mkdir(parents=True, exist_ok=True)
+
+        staging = model_dir / f".staging-{uuid.uuid4().hex}"
+        staging.mkdir()
+        try:
+            model.save_model(str(staging / ARTIFACT_PREFIX))
+            manifest = {
+                'name': name,
+                'kind': kind,
+                'init_kwargs': _init_kwargs(kind, model),
+                'created_at': datetime.now().isoformat(),
+                'files': _checksums(staging),
+                'metadata': metadata or {},
+            }
+
+            # Another process may publish the same number first - take the next one
+            while True:
+                version = (self.versions(name) or [0])[-1] + 1
+                manifest['version'] = version
+                with open(staging / MANIFEST, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f, indent=2, default=str)
+                try:
+                    os.rename(staging, model_dir / self._version_dir_name(version))
+                    break
+                except OSError:
+                    if not (model_dir / self._version_dir_name(version)).exists():
+                        raise
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.info(f"📦 Registered model {name} v{version} ({kind}, {len(manifest['files'])} files)")
+        return version
+
+    def verify(self, name: str, version: Optional[int] = None) -> bool:
+        """
+        Check stored files against the manifest.
+
+        Raises:
+            ModelIntegrityError: on missing, extra or modified files
+        """
+        version, path = self._resolve(name, version)
+        expected = self.get_manifest(name, version)['files']
+        actual = _checksums(path)
+        if actual != expected:
+            changed = sorted(
+                f for f in set(expected) | set(actual) if expected.get(f) != actual.get(f)
+            )
+            raise ModelIntegrityError(f"Model {name} v{version} checksum mismatch: {changed}")
+        return True
+
+    def load(self, name: str, version: Optional[int] = None, verify: bool = True) -> Any:
+        """
+        Get a loaded model (latest version by default).
+
+        Loaded once per process and shared by every caller; concurrent callers
+        for the same version wait for a single load.
+        """
+        version, path = self._resolve(name, version)
+        key = (name, version)
+
+        with self._lock:
+            model = self._cache.get(key)
+            if model is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return model
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                model = self._cache.get(key)
+                if model is not None:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return model
+                self.misses += 1
+
+            model = self._load_from_disk(name, version, path, verify)
+
+            with self._lock:
+                self._cache[key] = model
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    evicted, _ = self._cache.popitem(last=False)
+                    logger.debug(f"Evicted model {evicted[0]} v{evicted[1]} from cache")
+                self._loading.pop(key, None)
+        return model
+
+    def _load_from_disk(self, name: str, version: int, path: Path, verify: bool) -> Any:
+        if verify:
+            self.verify(name, version)
+        manifest = self.get_manifest(name, version)
+        module_name, class_name = MODEL_KINDS[manifest['kind']]
+        cls = getattr(importlib.import_module(module_name), class_name)
+
+        model = cls(**manifest.get('init_kwargs', {}))
+        model.load_model(str(path / ARTIFACT_PREFIX))
+        logger.info(f"✅ Loaded model {name} v{version}")
+        return model
+
+    def preload(self, names: Sequence[str]) -> None:
+        """Warm the cache with the latest version of each model."""
+        for name in names:
+            self.load(name)
+
+    def evict(self, name: str, version: Optional[int] = None) -> None:
+        """Drop a model (all versions if version is None) from the cache."""
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == name and (version is None or k[1] == version)]:
+                del self._cache[key]
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'cached': [f"{name}:v{version}" for name, version in self._cache],
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry(root: Optional[str] = None, cache_size: int = 4) -> ModelRegistry:
+    """
+    Process-wide shared registry.
+
+    The first call creates it (root defaults to $YUNMIN_MODEL_REGISTRY or
+    data/models); later calls return the same instance.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(
+                root=root or os.getenv('YUNMIN_MODEL_REGISTRY', 'data/models'),
+                cache_size=cache_size
+            )
+        return _registry
+
+
+def fork_workers(
+    target: Callable[..., Any],
+    worker_args: Sequence[tuple],
+    models: Sequence[str] = (),
+    registry: Optional[ModelRegistry] = None
+) -> List[multiprocessing.Process]:
+    """
+    Fork-after-load: warm the registry, then start one process per args tuple.
+
+    Children inherit the already loaded models copy-on-write, so N workers
+    cost roughly one model in memory and skip the load on startup. The
+    target should fetch models with get_registry().load(name).
+    Only available where the 'fork' start method exists (Linux/macOS).
+
+    TensorFlow is not fork-safe: LSTM versions must have the NumPy export
+    (save_model(inference_precision=...)), and forking is refused once
+    TensorFlow has been imported in this process.
+
+    Returns:
+        Started processes (caller joins them)
+
+    Raises:
+        RuntimeError: A model would need TensorFlow, or TensorFlow is loaded
+    """
+    global _registry
+    registry = registry if registry is not None else get_registry()
+
+    for name in models:
+        version, path = registry._resolve(name, None)
+        if (registry.get_manifest(name, version)['kind'] == 'lstm'
+                and not (path / f'{ARTIFACT_PREFIX}_model.npz').exists()):
+            raise RuntimeError(
+                f"Cannot fork with {name} v{version}: it has no NumPy export and "
+                f"loading it would import TensorFlow, which is not fork-safe"
+            )
+    registry.preload(models)
+    if 'tensorflow' in sys.modules:
+        raise RuntimeError("Cannot fork workers after TensorFlow has been imported")
+
+    # Move loaded objects out of the GC's tracked generations so collections in
+    # the children do not touch (and copy) their pages
+    gc.collect()
+    gc.freeze()
+
+    context = multiprocessing.get_context('fork')
+    processes = []
+    # Children's get_registry() returns the warm instance passed in. The lock
+    # is not held across fork() - the children would inherit it locked
+    with _registry_lock:
+        previous, _registry = _registry, registry
+    try:
+        for args in worker_args:
+            process = context.Process(target=target, args=args, daemon=True)
+            process.start()
+            processes.append(process)
+    finally:
+        with _registry_lock:
+            _registry = previous
+        gc.unfreeze()
+
+    logger.info(f"Forked {len(processes)} workers sharing {len(models)} preloaded models")
+    return processes
@@ -8,15 +8,15 @@ Flags, and Triangles.
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
 from datetime import datetime
-from scipy.signal import find_peaks, argrelextrema
-from scipy.spatial.distance import euclidean
-from sklearn.ensemble import RandomForestClassifier
 import pickle
 
+# sklearn is imported where used - it adds ~1s to `import yunmin.ml`
+
 
 class PatternType(Enum):
     """Types of chart patterns."""
@@ -88,6 +88,153 @@ class PatternSignal:
         }
 
 
+def find_pivots(values: np.ndarray, order: int = 5, mode: str = 'max') -> np.ndarray:
+    """
+    Indices of strict local extrema within +-order points.
+    
+    Same result as scipy.signal.argrelextrema(values, np.greater/np.less, order)
+    (neighbours beyond the ends are clipped), without importing scipy.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    cmp = np.greater if mode == 'max' else np.less
+    idx = np.arange(n)
+    result = np.ones(n, dtype=bool)
+    for shift in range(1, order + 1):
+        result &= cmp(values, values[np.minimum(idx + shift, n - 1)])
+        result &= cmp(values, values[np.maximum(idx - shift, 0)])
+    return np.nonzero(result)[0]
+
+
+def _tail_pivots(values, end: int, order: int, mode: str) -> List[int]:
+    """
+    Provisional pivots among the last `order` bars before `end` - their right
+    side is incomplete, so they compare only against the bars seen so far.
+    
+    `values` is indexable by absolute bar index in [end - 2 * order - 1, end).
+    """
+    result = []
+    for i in range(max(1, end - order), end - 1):
+        v = values[i]
+        neighbours = [values[j] for j in range(max(0, i - order), end) if j != i]
+        if mode == 'max':
+            if all(v > x for x in neighbours):
+                result.append(i)
+        elif all(v < x for x in neighbours):
+            result.append(i)
+    return result
+
+
+@dataclass
+class PriceWindow:
+    """OHLC arrays of one lookback window plus its shared pivot set."""
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    pivot_highs: np.ndarray  # pivots of `high`, indices into the window
+    pivot_lows: np.ndarray   # pivots of `low`, indices into the window
+
+
+class PivotTracker:
+    """
+    Incremental pivot highs/lows, updated once per candle.
+    
+    A bar becomes a confirmed pivot when `order` newer candles have arrived;
+    the last `order` bars are reported as provisional pivots against the
+    candles seen so far (the same answer argrelextrema gives at the end of a
+    series). Each update costs O(order).
+    
+    Usage:
+        tracker = recognizer.create_pivot_tracker(df)
+        tracker.update(candle['high'], candle['low'])
+        patterns = recognizer.detect_patterns(df, tracker=tracker)
+    """
+    
+    def __init__(self, order: int = 5, max_pivots: int = 1000):
+        """
+        Args:
+            order: Bars on each side a pivot must exceed
+            max_pivots: Confirmed pivots kept per side
+        """
+        self.order = order
+        self.count = 0
+        self._highs = deque(maxlen=2 * order + 1)
+        self._lows = deque(maxlen=2 * order + 1)
+        self._pivot_highs = deque(maxlen=max_pivots)
+        self._pivot_lows = deque(maxlen=max_pivots)
+    
+    def _value(self, buffer: deque, bar: int) -> float:
+        return buffer[bar - (self.count - len(buffer))]
+    
+    def update(self, high: float, low: float) -> None:
+        """Add one candle and confirm the bar `order` candles back."""
+        self._highs.append(float(high))
+        self._lows.append(float(low))
+        self.count += 1
+        
+        candidate = self.count - 1 - self.order
+        if candidate < 1:  # bar 0 is compared with itself (clip) - never a pivot
+            return
+        first = max(0, candidate - self.order)
+        window = range(first, self.count)
+        high_c = self._value(self._highs, candidate)
+        low_c = self._value(self._lows, candidate)
+        if all(high_c > self._value(self._highs, j) for j in window if j != candidate):
+            self._pivot_highs.append(candidate)
+        if all(low_c < self._value(self._lows, j) for j in window if j != candidate):
+            self._pivot_lows.append(candidate)
+    
+    def extend(self, highs: Iterable[float], lows: Iterable[float]) -> None:
+        """Add many candles; vectorised when the tracker is empty (warm-up)."""
+        highs = np.asarray(highs, dtype=float)
+        lows = np.asarray(lows, dtype=float)
+        if self.count > 0:
+            for high, low in zip(highs.tolist(), lows.tolist()):
+                self.update(high, low)
+            return
+        
+        n = len(highs)
+        confirmed_end = n - self.order  # bars < confirmed_end have full right side
+        self._pivot_highs.extend(int(i) for i in find_pivots(highs, self.order, 'max') if i < confirmed_end)
+        self._pivot_lows.extend(int(i) for i in find_pivots(lows, self.order, 'min') if i < confirmed_end)
+        self._highs.extend(highs[-self._highs.maxlen:].tolist())
+        self._lows.extend(lows[-self._lows.maxlen:].tolist())
+        self.count = n
+    
+    def pivots(self, start: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pivot bar indices >= start (confirmed + provisional).
+        
+        Returns:
+            Tuple of (pivot_highs, pivot_lows) as absolute bar indices
+        """
+        first = self.count - len(self._highs)
+        highs = _PivotBuffer(self._highs, first)
+        lows = _PivotBuffer(self._lows, first)
+        result = []
+        for confirmed, buffer, mode in (
+            (self._pivot_highs, highs, 'max'),
+            (self._pivot_lows, lows, 'min'),
+        ):
+            tail = _tail_pivots(buffer, self.count, self.order, mode)
+            bars = [i for i in confirmed if i >= start] + [i for i in tail if i >= start]
+            result.append(np.asarray(bars, dtype=np.int64))
+        return result[0], result[1]
+
+
+class _PivotBuffer:
+    """Absolute-index view over a deque holding the newest bars."""
+    
+    def __init__(self, buffer: deque, first: int):
+        self._buffer = buffer
+        self._first = first
+    
+    def __getitem__(self, bar: int) -> float:
+        return self._buffer[bar - self._first]
+
+
 class PatternRecognizer:
     """
     Chart pattern recognition system.
@@ -96,17 +243,24 @@ class PatternRecognizer:
     for pattern validation based on historical success rates.
     """
     
-    def __init__(self, lookback_window: int = 100, min_pattern_length: int = 10):
+    def __init__(
+        self,
+        lookback_window: int = 100,
+        min_pattern_length: int = 10,
+        pivot_order: int = 5
+    ):
         """
         Initialize pattern recognizer.
         
         Args:
             lookback_window: Number of candles to analyze
             min_pattern_length: Minimum candles for a valid pattern
+            pivot_order: Candles on each side a pivot high/low must exceed
         """
         self.lookback_window = lookback_window
         self.min_pattern_length = min_pattern_length
-        self.classifier: Optional[RandomForestClassifier] = None
+        self.pivot_order = pivot_order
+        self.classifier = None  # sklearn RandomForestClassifier once trained
         self.pattern_success_rates = {}
         self.is_trained = False
         
@@ -122,25 +276,59 @@ class PatternRecognizer:
             Tuple of (pivot_highs_indices, pivot_lows_indices)
         """
         # Find local maxima (pivot highs)
-        pivot_highs = argrelextrema(prices, np.greater, order=order)[0]
+        pivot_highs = find_pivots(prices, order, 'max')
         
         # Find local minima (pivot lows)
-        pivot_lows = argrelextrema(prices, np.less, order=order)[0]
+        pivot_lows = find_pivots(prices, order, 'min')
         
         return pivot_highs, pivot_lows
     
-    def _detect_double_top(self, df: pd.DataFrame) -> Optional[Pattern]:
+    def create_pivot_tracker(self, df: Optional[pd.DataFrame] = None) -> PivotTracker:
+        """
+        Create a PivotTracker for live detection, warmed up on df if given.
+        
+        Feed each new candle with tracker.update(high, low) and pass the
+        tracker to detect_patterns() instead of recomputing pivots per bar.
+        """
+        tracker = PivotTracker(order=self.pivot_order)
+        if df is not None and len(df) > 0:
+            tracker.extend(df['high'].values, df['low'].values)
+        return tracker
+    
+    def _make_window(self, df: pd.DataFrame, tracker: Optional[PivotTracker] = None) -> PriceWindow:
+        """
+        Arrays + shared pivots for one window.
+        
+        Without a tracker pivots are computed on the window itself (as before);
+        with one they come from the tracker, which must have seen the candles
+        df ends with.
+        """
+        high = df['high'].values.astype(float)
+        low = df['low'].values.astype(float)
+        close = df['close'].values.astype(float)
+        
+        if tracker is not None and tracker.count >= len(df):
+            offset = tracker.count - len(df)
+            pivot_highs, pivot_lows = tracker.pivots(start=offset)
+            pivot_highs, pivot_lows = pivot_highs - offset, pivot_lows - offset
+        else:
+            pivot_highs = find_pivots(high, self.pivot_order, 'max')
+            pivot_lows = find_pivots(low, self.pivot_order, 'min')
+        
+        return PriceWindow(high, low, close, pivot_highs, pivot_lows)
+    
+    def _detect_double_top(self, window: PriceWindow) -> Optional[Pattern]:
         """
         Detect double top pattern.
         
         Args:
-            df: DataFrame with OHLCV data
+            window: Price arrays with shared pivots
             
         Returns:
             Pattern object if detected, None otherwise
         """
-        prices = df['high'].values
-        pivot_highs, _ = self._find_pivot_points(prices)
+        prices = window.high
+        pivot_highs = window.pivot_highs
         
         if len(pivot_highs) < 2:
             return None
@@ -183,18 +371,18 @@ class PatternRecognizer:
         
         return None
     
-    def _detect_double_bottom(self, df: pd.DataFrame) -> Optional[Pattern]:
+    def _detect_double_bottom(self, window: PriceWindow) -> Optional[Pattern]:
         """
         Detect double bottom pattern.
         
         Args:
-            df: DataFrame with OHLCV data
+            window: Price arrays with shared pivots
             
         Returns:
             Pattern object if detected, None otherwise
         """
-        prices = df['low'].values
-        _, pivot_lows = self._find_pivot_points(prices)
+        prices = window.low
+        pivot_lows = window.pivot_lows
         
         if len(pivot_lows) < 2:
             return None
@@ -212,7 +400,7 @@ class PatternRecognizer:
             price_diff_pct = abs(price1 - price2) / price1
             if price_diff_pct < 0.02:
                 # Check if there's a peak between them
-                middle_section = df['high'].values[idx1:idx2]
+                middle_section = window.high[idx1:idx2]
                 if len(middle_section) > 0:
                     peak_price = np.max(middle_section)
                     peak_idx = idx1 + np.argmax(middle_section)
@@ -237,18 +425,18 @@ class PatternRecognizer:
         
         return None
     
-    def _detect_head_shoulders(self, df: pd.DataFrame) -> Optional[Pattern]:
+    def _detect_head_shoulders(self, window: PriceWindow) -> Optional[Pattern]:
         """
         Detect head and shoulders pattern.
         
         Args:
-            df: DataFrame with OHLCV data
+            window: Price arrays with shared pivots
             
         Returns:
             Pattern object if detected, None otherwise
         """
-        prices = df['high'].values
-        pivot_highs, _ = self._find_pivot_points(prices)
+        prices = window.high
+        pivot_highs = window.pivot_highs
         
         if len(pivot_highs) < 3:
             return None
@@ -287,18 +475,18 @@ class PatternRecognizer:
         
         return None
     
-    def _detect_inverse_head_shoulders(self, df: pd.DataFrame) -> Optional[Pattern]:
+    def _detect_inverse_head_shoulders(self, window: PriceWindow) -> Optional[Pattern]:
         """
         Detect inverse head and shoulders pattern.
         
         Args:
-            df: DataFrame with OHLCV data
+            window: Price arrays with shared pivots
             
         Returns:
             Pattern object if detected, None otherwise
         """
-        prices = df['low'].values
-        _, pivot_lows = self._find_pivot_points(prices)
+        prices = window.low
+        pivot_lows = window.pivot_lows
         
         if len(pivot_lows) < 3:
             return None
@@ -337,21 +525,21 @@ class PatternRecognizer:
         
         return None
     
-    def _detect_flag(self, df: pd.DataFrame, bullish: bool = True) -> Optional[Pattern]:
+    def _detect_flag(self, window: PriceWindow, bullish: bool = True) -> Optional[Pattern]:
         """
         Detect bull or bear flag pattern.
         
         Args:
-            df: DataFrame with OHLCV data
+            window: Price arrays with shared pivots
             bullish: Whether to detect bull flag (True) or bear flag (False)
             
         Returns:
             Pattern object if detected, None otherwise
         """
-        if len(df) < 20:
+        if len(window.close) < 20:
             return None
         
-        prices = df['close'].values
+        prices = window.close
         
         # Look for strong initial move (pole)
         pole_length = 10
@@ -400,35 +588,35 @@ class PatternRecognizer:
         
         return None
     
-    def _detect_triangle(self, df: pd.DataFrame) -> Optional[Pattern]:
+    def _detect_triangle(self, window: PriceWindow) -> Optional[Pattern]:
         """
         Detect triangle patterns (ascending, descending, symmetrical).
         
         Args:
-            df: DataFrame with OHLCV data
+            window: Price arrays with shared pivots
             
         Returns:
             Pattern object if detected, None otherwise
         """
-        if len(df) < 20:
+        n = len(window.close)
+        if n < 20:
             return None
         
-        highs = df['high'].values[-20:]
-        lows = df['low'].values[-20:]
+        highs = window.high[-20:]
+        lows = window.low[-20:]
         
-        # Fit trend lines to highs and lows
-        x = np.arange(len(highs))
+        # Fit trend lines to highs and lows (least-squares slope, closed form)
+        x = np.arange(len(highs)) - (len(highs) - 1) / 2.0
+        sxx = np.dot(x, x)
         
         # Upper trend line (resistance)
-        upper_coef = np.polyfit(x, highs, 1)
-        upper_slope = upper_coef[0]
+        upper_slope = np.dot(x, highs) / sxx
         
         # Lower trend line (support)
-        lower_coef = np.polyfit(x, lows, 1)
-        lower_slope = lower_coef[0]
+        lower_slope = np.dot(x, lows) / sxx
         
         # Normalize slopes by price level
-        avg_price = np.mean(df['close'].values[-20:])
+        avg_price = np.mean(window.close[-20:])
         upper_slope_pct = upper_slope / avg_price
         lower_slope_pct = lower_slope / avg_price
         
@@ -438,11 +626,11 @@ class PatternRecognizer:
                 pattern_type=PatternType.ASCENDING_TRIANGLE,
                 sentiment=PatternSentiment.BULLISH,
                 reliability_score=min(0.8, lower_slope_pct * 200),
-                start_idx=len(df) - 20,
-                end_idx=len(df) - 1,
+                start_idx=n - 20,
+                end_idx=n - 1,
                 key_points=[
-                    (len(df) - 20, float(highs[0])),
-                    (len(df) - 1, float(highs[-1]))
+                    (n - 20, float(highs[0])),
+                    (n - 1, float(highs[-1]))
                 ]
             )
         
@@ -452,11 +640,11 @@ class PatternRecognizer:
                 pattern_type=PatternType.DESCENDING_TRIANGLE,
                 sentiment=PatternSentiment.BEARISH,
                 reliability_score=min(0.8, abs(upper_slope_pct) * 200),
-                start_idx=len(df) - 20,
-                end_idx=len(df) - 1,
+                start_idx=n - 20,
+                end_idx=n - 1,
                 key_points=[
-                    (len(df) - 20, float(highs[0])),
-                    (len(df) - 1, float(highs[-1]))
+                    (n - 20, float(highs[0])),
+                    (n - 1, float(highs[-1]))
                 ]
             )
         
@@ -467,31 +655,32 @@ class PatternRecognizer:
                 pattern_type=PatternType.SYMMETRICAL_TRIANGLE,
                 sentiment=PatternSentiment.NEUTRAL,
                 reliability_score=min(0.7, convergence * 100),
-                start_idx=len(df) - 20,
-                end_idx=len(df) - 1,
+                start_idx=n - 20,
+                end_idx=n - 1,
                 key_points=[
-                    (len(df) - 20, float(highs[0])),
-                    (len(df) - 1, float(highs[-1]))
+                    (n - 20, float(highs[0])),
+                    (n - 1, float(highs[-1]))
                 ]
             )
         
         return None
     
-    def _detect_rectangle(self, df: pd.DataFrame) -> Optional[Pattern]:
+    def _detect_rectangle(self, window: PriceWindow) -> Optional[Pattern]:
         """
         Detect rectangle (trading range) pattern.
         
         Args:
-            df: DataFrame with OHLCV data
+            window: Price arrays with shared pivots
             
         Returns:
             Pattern object if detected, None otherwise
         """
-        if len(df) < 20:
+        n = len(window.close)
+        if n < 20:
             return None
         
-        highs = df['high'].values[-20:]
-        lows = df['low'].values[-20:]
+        highs = window.high[-20:]
+        lows = window.low[-20:]
         
         # Check if highs and lows are relatively flat
         high_range = (np.max(highs) - np.min(highs)) / np.mean(highs)
@@ -500,39 +689,25 @@ class PatternRecognizer:
         # Both should be tight (less than 2%)
         if high_range < 0.02 and low_range < 0.02:
             # Check that there's a meaningful channel width
-            channel_width = (np.mean(highs) - np.mean(lows)) / np.mean(df['close'].values[-20:])
+            channel_width = (np.mean(highs) - np.mean(lows)) / np.mean(window.close[-20:])
             
             if channel_width > 0.01:  # At least 1% channel
                 return Pattern(
                     pattern_type=PatternType.RECTANGLE,
                     sentiment=PatternSentiment.NEUTRAL,
                     reliability_score=min(0.7, (0.02 - high_range) * 20),
-                    start_idx=len(df) - 20,
-                    end_idx=len(df) - 1,
+                    start_idx=n - 20,
+                    end_idx=n - 1,
                     key_points=[
-                        (len(df) - 20, float(np.mean(highs))),
-                        (len(df) - 1, float(np.mean(lows)))
+                        (n - 20, float(np.mean(highs))),
+                        (n - 1, float(np.mean(lows)))
                     ]
                 )
         
         return None
     
-    def detect_patterns(self, df: pd.DataFrame) -> List[Pattern]:
-        """
-        Detect all patterns in the given data.
-        
-        Args:
-            df: DataFrame with OHLCV data
-            
-        Returns:
-            List of detected patterns
-        """
-        if len(df) < self.min_pattern_length:
-            return []
-        
-        # Use only the lookback window
-        df_window = df.iloc[-self.lookback_window:] if len(df) > self.lookback_window else df
-        
+    def _scan_window(self, window: PriceWindow) -> List[Pattern]:
+        """Run every template against one window and its shared pivot set."""
         patterns = []
         
         # Detect all pattern types
@@ -541,15 +716,15 @@ class PatternRecognizer:
             self._detect_double_bottom,
             self._detect_head_shoulders,
             self._detect_inverse_head_shoulders,
-            lambda df: self._detect_flag(df, bullish=True),
-            lambda df: self._detect_flag(df, bullish=False),
+            lambda w: self._detect_flag(w, bullish=True),
+            lambda w: self._detect_flag(w, bullish=False),
             self._detect_triangle,
             self._detect_rectangle
         ]
         
         for detector in pattern_detectors:
             try:
-                pattern = detector(df_window)
+                pattern = detector(window)
                 if pattern is not None:
                     patterns.append(pattern)
             except Exception:
@@ -557,10 +732,138 @@ class PatternRecognizer:
         
         return patterns
     
+    def detect_patterns(self, df: pd.DataFrame, tracker: Optional[PivotTracker] = None) -> List[Pattern]:
+        """
+        Detect all patterns in the given data.
+        
+        Args:
+            df: DataFrame with OHLCV data
+            tracker: Optional PivotTracker fed with the same candles; pivots are
+                then taken from it instead of being recomputed
+            
+        Returns:
+            List of detected patterns
+        """
+        if len(df) < self.min_pattern_length:
+            return []
+        
+        # Use only the lookback window
+        df_window = df.iloc[-self.lookback_window:] if len(df) > self.lookback_window else df
+        
+        return self._scan_window(self._make_window(df_window, tracker))
+    
+    def scan_history(self, df: pd.DataFrame, step: int = 1, unique: bool = True) -> pd.DataFrame:
+        """
+        Historical mode: run the scanner at every bar of a series in one pass.
+        
+        Pivots are computed once for the whole series; at each bar the window
+        gets the pivots that were confirmed by then plus the provisional tail,
+        so results match a live PivotTracker fed bar by bar.
+        
+        Args:
+            df: DataFrame with OHLCV data (full history)
+            step: Scan every `step`-th bar
+            unique: Keep only the first detection of each (type, start, end)
+            
+        Returns:
+            DataFrame with columns: bar, time, pattern_type, sentiment,
+            reliability_score, start_idx, end_idx (absolute bar indices)
+        """
+        columns = ['bar', 'time', 'pattern_type', 'sentiment', 'reliability_score', 'start_idx', 'end_idx']
+        n = len(df)
+        if n < self.min_pattern_length:
+            return pd.DataFrame(columns=columns)
+        
+        high = df['high'].values.astype(float)
+        low = df['low'].values.astype(float)
+        close = df['close'].values.astype(float)
+        order = self.pivot_order
+        all_highs = find_pivots(high, order, 'max')
+        all_lows = find_pivots(low, order, 'min')
+        
+        # find_pivots on the full series treats the last `order` bars as
+        # provisional; anything earlier is final and can be sliced per bar
+        all_highs = all_highs[all_highs < n - order]
+        all_lows = all_lows[all_lows < n - order]
+        
+        rows = []
+        seen = set()
+        for end in range(self.min_pattern_length, n + 1, step):
+            start = max(0, end - self.lookback_window)
+            pivot_highs, pivot_lows = [], []
+            for confirmed, values, mode, out in (
+                (all_highs, high, 'max', pivot_highs),
+                (all_lows, low, 'min', pivot_lows),
+            ):
+                lo, hi = np.searchsorted(confirmed, [start, end - order])
+                out.extend(confirmed[lo:hi].tolist())
+                out.extend(i for i in _tail_pivots(values, end, order, mode) if i >= start)
+            
+            window = PriceWindow(
+                high[start:end], low[start:end], close[start:end],
+                np.asarray(pivot_highs, dtype=np.int64) - start,
+                np.asarray(pivot_lows, dtype=np.int64) - start,
+            )
+            for pattern in self._scan_window(window):
+                key = (pattern.pattern_type, start + pattern.start_idx, start + pattern.end_idx)
+                if unique:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                rows.append((
+                    end - 1,
+                    df.index[end - 1],
+                    pattern.pattern_type.value,
+                    pattern.sentiment.value,
+                    pattern.reliability_score,
+                    key[1],
+                    key[2],
+                ))
+        
+        return pd.DataFrame(rows, columns=columns)
+    
+    def pattern_training_data(self, df: pd.DataFrame, horizon: int = 10) -> List[Dict]:
+        """
+        Label historical detections for train_classifier().
+        
+        A bullish (bearish) pattern counts as a success if the close `horizon`
+        bars after detection is above (below) the close at detection.
+        Neutral patterns and detections without enough future bars are skipped.
+        
+        Returns:
+            List of {'pattern_type', 'features', 'success'} records
+        """
+        detections = self.scan_history(df)
+        if detections.empty:
+            return []
+        
+        close = df['close'].values.astype(float)
+        bars = detections['bar'].to_numpy()
+        valid = (bars + horizon < len(close)) & (detections['sentiment'] != PatternSentiment.NEUTRAL.value).to_numpy()
+        detections = detections[valid]
+        bars = bars[valid]
+        
+        forward = close[bars + horizon] / close[bars] - 1
+        direction = np.where(detections['sentiment'] == PatternSentiment.BULLISH.value, 1.0, -1.0)
+        success = forward * direction > 0
+        length = (detections['end_idx'] - detections['start_idx']).to_numpy() / self.lookback_window
+        
+        return [
+            {
+                'pattern_type': pattern_type,
+                'features': [float(reliability), float(rel_length), float(sign)],
+                'success': bool(ok),
+            }
+            for pattern_type, reliability, rel_length, sign, ok in zip(
+                detections['pattern_type'], detections['reliability_score'], length, direction, success
+            )
+        ]
+    
     def generate_signal(
         self,
         df: pd.DataFrame,
-        current_trend: Optional[str] = None
+        current_trend: Optional[str] = None,
+        tracker: Optional[PivotTracker] = None
     ) -> Optional[PatternSignal]:
         """
         Generate trading signal based on detected patterns.
@@ -568,11 +871,12 @@ class PatternRecognizer:
         Args:
             df: DataFrame with OHLCV data
             current_trend: Current market trend ('uptrend', 'downtrend', None)
+            tracker: Optional PivotTracker (see detect_patterns)
             
         Returns:
             PatternSignal or None
         """
-        patterns = self.detect_patterns(df)
+        patterns = self.detect_patterns(df, tracker=tracker)
         
         if not patterns:
             return None
@@ -635,6 +939,8 @@ class PatternRecognizer:
                 y.append(1 if record['success'] else 0)
         
         if len(X) > 0:
+            from sklearn.ensemble import RandomForestClassifier
+            
             self.classifier = RandomForestClassifier(n_estimators=100, random_state=42)
             self.classifier.fit(X, y)
             self.is_trained = True
@@ -658,6 +964,7 @@ class PatternRecognizer:
             'pattern_success_rates': self.pattern_success_rates,
             'lookback_window': self.lookback_window,
             'min_pattern_length': self.min_pattern_length,
+            'pivot_order': self.pivot_order,
             'is_trained': self.is_trained
         }
         
@@ -673,4 +980,5 @@ class PatternRecognizer:
         self.pattern_success_rates = data['pattern_success_rates']
         self.lookback_window = data['lookback_window']
         self.min_pattern_length = data['min_pattern_length']
+        self.pivot_order = data.get('pivot_order', 5)
         self.is_trained = data['is_trained']
@@ -6,8 +6,10 @@ adaptive strategy recommendations.
 """
 
 from typing import Dict, Any, Optional, Tuple
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
+import math
 import pandas as pd
 import numpy as np
 from loguru import logger
@@ -41,6 +43,29 @@ class RegimeAnalysis:
     position_sizing_recommendation: float  # Multiplier 0.25-1.0
 
 
+_TREND_CODES = {1: TrendDirection.BULLISH, -1: TrendDirection.BEARISH, 0: TrendDirection.SIDEWAYS}
+
+
+def _wilder(values: np.ndarray, period: int, start: int = 0, partial: bool = False) -> np.ndarray:
+    """
+    Wilder smoothing of values[start:]: SMA of the first `period` values, then
+    s[t] = s[t-1] + (x[t] - s[t-1]) / period. NaN before the seed, or with
+    partial=True the running mean of the values seen so far.
+    """
+    out = np.full(len(values), np.nan)
+    seed_end = start + period
+    if partial:
+        warm = values[start:seed_end - 1]
+        out[start:start + len(warm)] = np.cumsum(warm) / np.arange(1, len(warm) + 1)
+    if len(values) < seed_end:
+        return out
+    seed = values[start:seed_end].mean()
+    # ewm(adjust=False) with alpha=1/period is exactly the Wilder recursion
+    series = pd.Series(np.concatenate([[seed], values[seed_end:]]))
+    out[seed_end - 1:] = series.ewm(alpha=1.0 / period, adjust=False).mean().to_numpy()
+    return out
+
+
 class RegimeDetector:
     """
     Market regime detector using technical indicators.
@@ -101,22 +126,46 @@ class RegimeDetector:
             RegimeAnalysis with detected regime and recommendations
         """
         if df.empty or len(df) < max(self.adx_period, self.bb_period) + 1:
-            return RegimeAnalysis(
-                regime=MarketRegime.UNKNOWN,
-                trend_direction=TrendDirection.SIDEWAYS,
-                trend_strength=0.0,
-                volatility=0.0,
-                confidence=0.0,
-                reasoning="Insufficient data for regime detection",
-                metrics={},
-                position_sizing_recommendation=0.5
-            )
+            return self._unknown_analysis()
+        
+        values = self._indicator_arrays(
+            df['high'].to_numpy(dtype=float),
+            df['low'].to_numpy(dtype=float),
+            df['close'].to_numpy(dtype=float)
+        )
+        return self._make_analysis(
+            values['adx'][-1],
+            values['bb_width'][-1],
+            _TREND_CODES[int(values['trend'][-1])],
+            values['pattern_score'][-1]
+        )
+    
+    def _unknown_analysis(self) -> RegimeAnalysis:
+        return RegimeAnalysis(
+            regime=MarketRegime.UNKNOWN,
+            trend_direction=TrendDirection.SIDEWAYS,
+            trend_strength=0.0,
+            volatility=0.0,
+            confidence=0.0,
+            reasoning="Insufficient data for regime detection",
+            metrics={},
+            position_sizing_recommendation=0.5
+        )
+    
+    def _make_analysis(
+        self,
+        adx_value: float,
+        bb_width: float,
+        trend_direction: TrendDirection,
+        pattern_score: float
+    ) -> RegimeAnalysis:
+        """Classify indicator values (shared by batch, streaming and detect_regime)."""
+        if np.isnan(adx_value) or np.isnan(bb_width):
+            return self._unknown_analysis()
         
-        # Calculate indicators
-        adx_value = self._calculate_adx(df)
-        bb_width = self._calculate_bb_width(df)
-        trend_direction = self._detect_trend_direction(df)
-        pattern_score = self._detect_price_patterns(df)
+        adx_value = float(adx_value)
+        bb_width = float(bb_width)
+        pattern_score = float(pattern_score)
         
         # Classify regime
         regime, confidence = self._classify_regime(adx_value, bb_width, pattern_score)
@@ -143,138 +192,169 @@ class RegimeDetector:
             position_sizing_recommendation=position_multiplier
         )
     
-    def _calculate_adx(self, df: pd.DataFrame) -> float:
-        """
-        Calculate Average Directional Index (ADX).
-        
-        Args:
-            df: OHLCV DataFrame
-            
-        Returns:
-            ADX value (0-100)
-        """
-        high = df['high'].values
-        low = df['low'].values
-        close = df['close'].values
-        
-        # Calculate True Range
-        tr1 = high - low
-        # Use proper shift for previous close
-        prev_close = np.concatenate([[close[0]], close[:-1]])
-        tr2 = np.abs(high - prev_close)
-        tr3 = np.abs(low - prev_close)
-        tr = np.maximum(tr1, np.maximum(tr2, tr3))
-        
-        # Calculate +DM and -DM (directional movement)
-        # Use proper shift for previous high/low
-        prev_high = np.concatenate([[high[0]], high[:-1]])
-        prev_low = np.concatenate([[low[0]], low[:-1]])
-        
-        high_diff = high - prev_high
-        low_diff = prev_low - low
-        
-        plus_dm = np.where((high_diff > low_diff) & (high_diff > 0), high_diff, 0)
-        minus_dm = np.where((low_diff > high_diff) & (low_diff > 0), low_diff, 0)
-        
-        # Smooth TR, +DM, -DM
-        atr = pd.Series(tr).rolling(window=self.adx_period).mean()
-        plus_di = 100 * (pd.Series(plus_dm).rolling(window=self.adx_period).mean() / atr)
-        minus_di = 100 * (pd.Series(minus_dm).rolling(window=self.adx_period).mean() / atr)
-        
-        # Calculate DX and ADX
-        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
-        adx = dx.rolling(window=self.adx_period).mean()
-        
-        return adx.iloc[-1]
-    
-    def _calculate_bb_width(self, df: pd.DataFrame) -> float:
+    def _indicator_arrays(
+        self,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray
+    ) -> Dict[str, np.ndarray]:
         """
-        Calculate Bollinger Band width as percentage.
+        All regime indicators for every bar, vectorised.
         
-        Args:
-            df: OHLCV DataFrame
-            
         Returns:
-            BB width as percentage
+            Dict with 'adx', 'bb_width', 'pattern_score' (NaN during warm-up)
+            and 'trend' (+1 bullish, -1 bearish, 0 sideways)
         """
-        close = df['close']
-        
-        # Calculate Bollinger Bands
-        sma = close.rolling(window=self.bb_period).mean()
-        std = close.rolling(window=self.bb_period).std()
-        
-        upper_band = sma + (self.bb_std * std)
-        lower_band = sma - (self.bb_std * std)
-        
-        # BB width as percentage of price
-        bb_width = ((upper_band - lower_band) / sma).iloc[-1]
+        n = len(close)
+        period = self.adx_period
+        
+        # ADX (Wilder). True range / directional movement start at bar 1
+        tr = np.zeros(n)
+        plus_dm = np.zeros(n)
+        minus_dm = np.zeros(n)
+        if n > 1:
+            prev_close = close[:-1]
+            tr[1:] = np.maximum(
+                high[1:] - low[1:],
+                np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close))
+            )
+            up = high[1:] - high[:-1]
+            down = low[:-1] - low[1:]
+            plus_dm[1:] = np.where((up > down) & (up > 0), up, 0.0)
+            minus_dm[1:] = np.where((down > up) & (down > 0), down, 0.0)
+        
+        atr = _wilder(tr, period, start=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di = 100 * _wilder(plus_dm, period, start=1) / atr
+            minus_di = 100 * _wilder(minus_dm, period, start=1) / atr
+            di_sum = plus_di + minus_di
+            dx = np.where(di_sum > 0, 100 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+        dx[np.isnan(atr)] = np.nan
+        # Full Wilder seed needs 2*period bars; before that use the mean DX so far
+        adx = _wilder(dx, period, start=period, partial=True)
+        
+        # Bollinger Band width as a fraction of the SMA
+        close_s = pd.Series(close)
+        sma = close_s.rolling(window=self.bb_period).mean().to_numpy()
+        std = close_s.rolling(window=self.bb_period).std().to_numpy()
+        bb_width = 2 * self.bb_std * std / sma
+        
+        # Price action over the last `pattern_lookback` candles (fewer at the start)
+        lookback = self.pattern_lookback
+        diffs = max(lookback - 1, 0)
+        bars = np.arange(n)
+        window_start = np.maximum(bars - diffs, 0)
+        
+        def window_count(flags: np.ndarray) -> np.ndarray:
+            # flags[j] compares bar j+1 with bar j
+            cumulative = np.concatenate([[0], np.cumsum(flags)])
+            return cumulative[bars] - cumulative[window_start]
+        
+        bullish = window_count(high[1:] > high[:-1]) + window_count(low[1:] > low[:-1])
+        bearish = window_count(high[1:] < high[:-1]) + window_count(low[1:] < low[:-1])
+        trend = np.select([bullish > bearish * 1.5, bearish > bullish * 1.5], [1, -1], 0)
+        
+        momentum = (close - close[window_start]) / close[window_start]
+        returns = pd.Series(np.diff(close) / close[:-1])
+        returns_std = np.full(n, np.nan)
+        if n > 1 and diffs > 0:
+            returns_std[1:] = returns.rolling(window=diffs, min_periods=1).std(ddof=0).to_numpy()
+        consistency = 1 - np.minimum(returns_std, 1.0)
+        pattern_score = np.clip(momentum * 10 * consistency, -1.0, 1.0)
         
-        return bb_width
+        return {
+            'adx': adx,
+            'bb_width': bb_width,
+            'pattern_score': pattern_score,
+            'trend': trend,
+        }
     
-    def _detect_trend_direction(self, df: pd.DataFrame) -> TrendDirection:
+    def label_history(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Detect trend direction using price action.
+        Batch mode: regime label for every bar of a series (backtests, training).
+        
+        Uses the same recursions as RegimeStream, so row t equals what a stream
+        fed with bars 0..t reports.
         
         Args:
             df: OHLCV DataFrame
             
         Returns:
-            Trend direction
+            DataFrame (same index) with adx, bb_width, pattern_score, trend,
+            regime, confidence, position_multiplier
         """
-        # Use last N candles for pattern detection
-        lookback = min(self.pattern_lookback, len(df))
-        recent_df = df.tail(lookback)
-        
-        highs = recent_df['high'].values
-        lows = recent_df['low'].values
-        
-        # Count higher highs and higher lows (bullish)
-        higher_highs = sum(highs[i] > highs[i-1] for i in range(1, len(highs)))
-        higher_lows = sum(lows[i] > lows[i-1] for i in range(1, len(lows)))
-        
-        # Count lower highs and lower lows (bearish)
-        lower_highs = sum(highs[i] < highs[i-1] for i in range(1, len(highs)))
-        lower_lows = sum(lows[i] < lows[i-1] for i in range(1, len(lows)))
-        
-        bullish_score = higher_highs + higher_lows
-        bearish_score = lower_highs + lower_lows
+        values = self._indicator_arrays(
+            df['high'].to_numpy(dtype=float),
+            df['low'].to_numpy(dtype=float),
+            df['close'].to_numpy(dtype=float)
+        )
+        adx = values['adx']
+        bb = values['bb_width']
+        score = values['pattern_score']
+        
+        unknown = np.isnan(adx) | np.isnan(bb)
+        volatile = ~unknown & (bb > self.bb_volatility_threshold)
+        trending = ~unknown & ~volatile & (adx > self.adx_trending_threshold)
+        ranging = ~unknown & ~volatile & ~trending & (adx < self.adx_ranging_threshold)
+        transitional = ~unknown & ~volatile & ~trending & ~ranging
+        transitional_trend = transitional & (np.abs(score) > 0.5)
+        
+        with np.errstate(invalid='ignore'):
+            regime = np.select(
+                [unknown, volatile, trending | transitional_trend, ranging | transitional],
+                [MarketRegime.UNKNOWN.value, MarketRegime.VOLATILE.value,
+                 MarketRegime.TRENDING.value, MarketRegime.RANGING.value],
+                MarketRegime.UNKNOWN.value
+            )
+            confidence = np.select(
+                [unknown, volatile, trending, ranging, transitional_trend, transitional],
+                [
+                    0.0,
+                    np.minimum(bb / self.bb_volatility_threshold * 0.8, 0.95),
+                    np.minimum(0.6 + (adx - self.adx_trending_threshold) / 100, 0.95),
+                    np.minimum(0.6 + (self.adx_ranging_threshold - adx) / 100, 0.95),
+                    0.5,
+                    0.4,
+                ]
+            )
+            position = np.select(
+                [unknown, volatile, trending | transitional_trend, ranging | transitional],
+                [
+                    0.5,
+                    np.maximum(0.25, 0.50 - np.minimum((bb - self.bb_volatility_threshold) / 0.04, 0.25)),
+                    0.75 + np.minimum((adx - self.adx_trending_threshold) / 100, 0.25),
+                    np.clip(0.50 + np.maximum((self.adx_ranging_threshold - adx) / 100, 0) * 0.25, 0.50, 0.75),
+                ],
+                0.5
+            )
         
-        if bullish_score > bearish_score * 1.5:
-            return TrendDirection.BULLISH
-        elif bearish_score > bullish_score * 1.5:
-            return TrendDirection.BEARISH
-        else:
-            return TrendDirection.SIDEWAYS
+        return pd.DataFrame(
+            {
+                'adx': adx,
+                'bb_width': bb,
+                'pattern_score': score,
+                'trend': [_TREND_CODES[int(code)].value for code in values['trend']],
+                'regime': regime,
+                'confidence': confidence,
+                'position_multiplier': position,
+            },
+            index=df.index
+        )
     
-    def _detect_price_patterns(self, df: pd.DataFrame) -> float:
+    def create_stream(self, df: Optional[pd.DataFrame] = None) -> 'RegimeStream':
         """
-        Detect price action patterns and return pattern strength score.
-        
-        Args:
-            df: OHLCV DataFrame
-            
-        Returns:
-            Pattern score (-1.0 to 1.0, negative=bearish, positive=bullish)
+        Create a RegimeStream with this detector's parameters, optionally
+        warmed up on historical candles.
         """
-        lookback = min(self.pattern_lookback, len(df))
-        recent_df = df.tail(lookback)
-        
-        closes = recent_df['close'].values
-        
-        # Calculate momentum
-        momentum = (closes[-1] - closes[0]) / closes[0]
-        
-        # Calculate consistency (lower std = more consistent trend)
-        returns = np.diff(closes) / closes[:-1]
-        consistency = 1 - min(np.std(returns), 1.0)
-        
-        # Combine momentum and consistency
-        pattern_score = momentum * 10 * consistency
-        
-        # Clamp to -1.0 to 1.0
-        pattern_score = max(-1.0, min(1.0, pattern_score))
-        
-        return pattern_score
+        stream = RegimeStream(self)
+        if df is not None:
+            for high, low, close in zip(
+                df['high'].to_numpy(dtype=float).tolist(),
+                df['low'].to_numpy(dtype=float).tolist(),
+                df['close'].to_numpy(dtype=float).tolist()
+            ):
+                stream.update(high, low, close, analyze=False)
+        return stream
     
     def _classify_regime(
         self, 
@@ -490,3 +570,191 @@ class RegimeDetector:
             'bb_volatility_threshold': self.bb_volatility_threshold,
             'pattern_lookback': self.pattern_lookback
         }
+
+
+class _RollingMoments:
+    """
+    Mean / std over the last `window` values in O(1) per push.
+    
+    Sums are kept relative to a reference value and rebuilt from the window
+    every `window` pushes, so float drift stays bounded (amortised O(1)).
+    """
+    
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque = deque(maxlen=window)
+        self._ref = 0.0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._pushes = 0
+    
+    def push(self, value: float) -> None:
+        if len(self.values) == self.window:
+            old = self.values[0] - self._ref
+            self._sum -= old
+            self._sumsq -= old * old
+        self.values.append(value)
+        delta = value - self._ref
+        self._sum += delta
+        self._sumsq += delta * delta
+        
+        self._pushes += 1
+        if self._pushes % self.window == 0:
+            self._ref = value
+            self._sum = 0.0
+            self._sumsq = 0.0
+            for v in self.values:
+                delta = v - value
+                self._sum += delta
+                self._sumsq += delta * delta
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def mean(self) -> float:
+        return self._ref + self._sum / len(self.values)
+    
+    def std(self, ddof: int = 1) -> float:
+        n = len(self.values)
+        if n - ddof <= 0:
+            return float('nan')
+        variance = (self._sumsq - self._sum * self._sum / n) / (n - ddof)
+        return math.sqrt(max(variance, 0.0))
+
+
+class _WilderAverage:
+    """Wilder smoothing fed one value at a time (SMA seed, then recursive)."""
+    
+    def __init__(self, period: int, partial: bool = False):
+        self.period = period
+        self.partial = partial
+        self.alpha = 1.0 / period
+        self.value = float('nan')
+        self._seed_sum = 0.0
+        self._seen = 0
+    
+    def push(self, x: float) -> float:
+        if self._seen < self.period:
+            self._seed_sum += x
+            self._seen += 1
+            if self._seen == self.period or self.partial:
+                self.value = self._seed_sum / self._seen
+        else:
+            # Same form as pandas ewm(adjust=False) used by the batch path
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+
+class RegimeStream:
+    """
+    Streaming regime detection: O(1) state update per candle.
+    
+    Wilder-smoothed ADX, rolling BB width and price-action counters are
+    updated recursively and agree with RegimeDetector.label_history() on the
+    same candles (to floating point rounding).
+    
+    Usage:
+        stream = detector.create_stream(history_df)
+        analysis = stream.update(candle['high'], candle['low'], candle['close'])
+    """
+    
+    def __init__(self, detector: RegimeDetector):
+        self.detector = detector
+        period = detector.adx_period
+        
+        self.bars = 0
+        self._prev: Optional[Tuple[float, float, float]] = None
+        self._atr = _WilderAverage(period)
+        self._plus_dm = _WilderAverage(period)
+        self._minus_dm = _WilderAverage(period)
+        self._adx = _WilderAverage(period, partial=True)
+        self._closes = _RollingMoments(detector.bb_period)
+        
+        # Price action over the last pattern_lookback candles
+        diffs = max(detector.pattern_lookback - 1, 1)
+        self._flags: deque = deque(maxlen=diffs)
+        self._bullish = 0
+        self._bearish = 0
+        self._returns = _RollingMoments(diffs)
+        self._pattern_closes: deque = deque(maxlen=detector.pattern_lookback)
+        
+        self.adx = float('nan')
+        self.bb_width = float('nan')
+        self.pattern_score = float('nan')
+        self.trend_direction = TrendDirection.SIDEWAYS
+    
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+        analyze: bool = True
+    ) -> Optional[RegimeAnalysis]:
+        """
+        Add one candle.
+        
+        Args:
+            high, low, close: Candle prices
+            analyze: Build a RegimeAnalysis (skip during warm-up replays)
+            
+        Returns:
+            RegimeAnalysis for the latest bar, or None if analyze=False
+        """
+        detector = self.detector
+        
+        if self._prev is not None:
+            prev_high, prev_low, prev_close = self._prev
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            up = high - prev_high
+            down = prev_low - low
+            atr = self._atr.push(tr)
+            plus = self._plus_dm.push(up if (up > down and up > 0) else 0.0)
+            minus = self._minus_dm.push(down if (down > up and down > 0) else 0.0)
+            
+            if not math.isnan(atr):
+                plus_di = 100 * plus / atr if atr else float('nan')
+                minus_di = 100 * minus / atr if atr else float('nan')
+                di_sum = plus_di + minus_di
+                dx = 100 * abs(plus_di - minus_di) / di_sum if di_sum > 0 else 0.0
+                self.adx = self._adx.push(dx)
+            
+            # Higher/lower highs and lows
+            if len(self._flags) == self._flags.maxlen:
+                old_bull, old_bear = self._flags[0]
+                self._bullish -= old_bull
+                self._bearish -= old_bear
+            bull = int(high > prev_high) + int(low > prev_low)
+            bear = int(high < prev_high) + int(low < prev_low)
+            self._flags.append((bull, bear))
+            self._bullish += bull
+            self._bearish += bear
+            
+            self._returns.push((close - prev_close) / prev_close)
+        
+        self._prev = (high, low, close)
+        self.bars += 1
+        
+        # Bollinger Band width
+        self._closes.push(close)
+        if len(self._closes) == detector.bb_period:
+            self.bb_width = 2 * detector.bb_std * self._closes.std(ddof=1) / self._closes.mean()
+        
+        # Trend direction and pattern score
+        if self._bullish > self._bearish * 1.5:
+            self.trend_direction = TrendDirection.BULLISH
+        elif self._bearish > self._bullish * 1.5:
+            self.trend_direction = TrendDirection.BEARISH
+        else:
+            self.trend_direction = TrendDirection.SIDEWAYS
+        
+        self._pattern_closes.append(close)
+        first = self._pattern_closes[0]
+        momentum = (close - first) / first
+        returns_std = self._returns.std(ddof=0) if len(self._returns) else float('nan')
+        consistency = 1 - min(returns_std, 1.0)
+        score = momentum * 10 * consistency
+        self.pattern_score = score if math.isnan(score) else max(-1.0, min(1.0, score))
+        
+        if not analyze:
+            return None
+        return detector._make_analysis(self.adx, self.bb_width, self.trend_direction, self.pattern_score)
@@ -7,17 +7,27 @@ that scores the risk of each trade based on position parameters and market condi
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime
 import pickle
+import importlib
+import importlib.util
 
-try:
-    import xgboost as xgb
-    import lightgbm as lgb
-except ImportError:
-    xgb = None
-    lgb = None
+# Boosting libraries are imported on first training run, not at module import
+_BOOSTERS = {
+    'xgboost': ('xgboost', "XGBoost not installed. Install with: pip install xgboost"),
+    'lightgbm': ('lightgbm', "LightGBM not installed. Install with: pip install lightgbm"),
+}
+
+
+def _import_booster(model_type: str):
+    """Import the gradient boosting library for model_type."""
+    module_name, message = _BOOSTERS[model_type]
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(message) from e
 
 
 @dataclass
@@ -72,10 +82,23 @@ class RiskScorer:
         self.feature_names = None
         self.is_trained = False
         
-        if model_type == 'xgboost' and xgb is None:
-            raise ImportError("XGBoost not installed. Install with: pip install xgboost")
-        if model_type == 'lightgbm' and lgb is None:
-            raise ImportError("LightGBM not installed. Install with: pip install lightgbm")
+        # Availability check without importing the library
+        if model_type in _BOOSTERS:
+            module_name, message = _BOOSTERS[model_type]
+            if importlib.util.find_spec(module_name) is None:
+                raise ImportError(message)
+    
+    # Raw input columns and the value used when a column is absent
+    RAW_DEFAULTS = {
+        'position_size_pct': 0.0,
+        'stop_loss_distance_pct': 0.0,
+        'current_volatility': 0.0,
+        'market_regime': 'ranging',
+        'time_since_last_trade_minutes': 0.0,
+        'portfolio_drawdown_pct': 0.0,
+        'current_price': 1.0,
+    }
+    OPTIONAL_INPUTS = ('atr', 'volume_ratio', 'trend_strength')
     
     def _extract_features(
         self,
@@ -108,44 +131,115 @@ class RiskScorer:
         Returns:
             Dictionary of features
         """
-        features = {
+        columns = {
             'position_size_pct': position_size_pct,
             'stop_loss_distance_pct': stop_loss_distance_pct,
             'current_volatility': current_volatility,
+            'market_regime': market_regime,
             'time_since_last_trade_minutes': time_since_last_trade_minutes,
             'portfolio_drawdown_pct': portfolio_drawdown_pct,
+            'current_price': current_price,
+            'atr': atr,
+            'volume_ratio': volume_ratio,
+            'trend_strength': trend_strength,
+        }
+        columns = {k: v for k, v in columns.items() if v is not None}
+        return {name: float(value) for name, value in self._feature_columns(columns).items()}
+    
+    @classmethod
+    def _feature_columns(cls, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Columnar feature builder - one numpy expression per feature.
+        
+        Args:
+            columns: Raw inputs as scalars or equal-length arrays. Missing required
+                inputs take RAW_DEFAULTS; missing optional inputs drop their features.
+            
+        Returns:
+            Ordered dict feature name -> float array (scalars give 0-d arrays)
+        """
+        def col(name):
+            value = columns.get(name)
+            if value is None:
+                value = cls.RAW_DEFAULTS[name]
+            return np.asarray(value, dtype=float)
+        
+        def flag(mask, source):
+            # Rows without the source input (NaN) get NaN, i.e. no factor
+            return np.where(np.isnan(source), np.nan, mask.astype(float))
+        
+        position = col('position_size_pct')
+        stop_loss = col('stop_loss_distance_pct')
+        volatility = col('current_volatility')
+        idle = col('time_since_last_trade_minutes')
+        drawdown = col('portfolio_drawdown_pct')
+        regime = columns.get('market_regime')
+        regime = np.asarray(cls.RAW_DEFAULTS['market_regime'] if regime is None else regime, dtype=object)
+        
+        features = {
+            'position_size_pct': position,
+            'stop_loss_distance_pct': stop_loss,
+            'current_volatility': volatility,
+            'time_since_last_trade_minutes': idle,
+            'portfolio_drawdown_pct': drawdown,
             
             # Market regime encoding
-            'regime_trending': 1.0 if market_regime == 'trending' else 0.0,
-            'regime_ranging': 1.0 if market_regime == 'ranging' else 0.0,
-            'regime_volatile': 1.0 if market_regime == 'volatile' else 0.0,
+            'regime_trending': (regime == 'trending').astype(float),
+            'regime_ranging': (regime == 'ranging').astype(float),
+            'regime_volatile': (regime == 'volatile').astype(float),
             
             # Derived features
-            'risk_reward_ratio': stop_loss_distance_pct / max(position_size_pct, 0.01),
-            'volatility_adjusted_position': position_size_pct * current_volatility,
-            'drawdown_severity': max(0, portfolio_drawdown_pct) / 10.0,  # Normalize
+            'risk_reward_ratio': stop_loss / np.maximum(position, 0.01),
+            'volatility_adjusted_position': position * volatility,
+            'drawdown_severity': np.where(drawdown > 0, drawdown, 0.0) / 10.0,  # Normalize
             
             # Time-based risk
-            'rapid_trading': 1.0 if time_since_last_trade_minutes < 30 else 0.0,
-            'consecutive_trading': 1.0 if time_since_last_trade_minutes < 60 else 0.0,
+            'rapid_trading': (idle < 30).astype(float),
+            'consecutive_trading': (idle < 60).astype(float),
         }
         
         # Optional features
-        if atr is not None:
+        if columns.get('atr') is not None:
+            atr = col('atr')
             features['atr'] = atr
-            features['atr_pct'] = atr / current_price
+            features['atr_pct'] = atr / col('current_price')
         
-        if volume_ratio is not None:
+        if columns.get('volume_ratio') is not None:
+            volume_ratio = col('volume_ratio')
             features['volume_ratio'] = volume_ratio
-            features['low_volume'] = 1.0 if volume_ratio < 0.5 else 0.0
-            features['high_volume'] = 1.0 if volume_ratio > 1.5 else 0.0
+            features['low_volume'] = flag(volume_ratio < 0.5, volume_ratio)
+            features['high_volume'] = flag(volume_ratio > 1.5, volume_ratio)
         
-        if trend_strength is not None:
+        if columns.get('trend_strength') is not None:
+            trend_strength = col('trend_strength')
             features['trend_strength'] = trend_strength
-            features['weak_trend'] = 1.0 if trend_strength < 30 else 0.0
+            features['weak_trend'] = flag(trend_strength < 30, trend_strength)
         
         return features
     
+    def extract_features_frame(self, trades: Union[pd.DataFrame, Sequence[Dict]]) -> pd.DataFrame:
+        """
+        Build the feature matrix for many trades at once (no per-row Python).
+        
+        Args:
+            trades: DataFrame (or list of dicts) with the raw input columns
+                of score_trade(); extra columns are ignored
+            
+        Returns:
+            DataFrame of features, one row per trade
+        """
+        if not isinstance(trades, pd.DataFrame):
+            trades = pd.DataFrame(list(trades))
+        names = list(self.RAW_DEFAULTS) + list(self.OPTIONAL_INPUTS)
+        columns = {name: trades[name].to_numpy() for name in names if name in trades.columns}
+        # Defaults must broadcast to the frame length
+        n = len(trades)
+        features = {
+            name: np.broadcast_to(values, (n,))
+            for name, values in self._feature_columns(columns).items()
+        }
+        return pd.DataFrame(features, index=trades.index)
+    
     def _create_training_labels(
         self,
         trade_outcomes: pd.DataFrame
@@ -159,24 +253,17 @@ class RiskScorer:
         Returns:
             Series with risk labels
         """
-        labels = []
-        
-        for pnl_pct in trade_outcomes['pnl_pct']:
-            if pnl_pct < -3.0:
-                # High risk: significant loss
-                labels.append(80)
-            elif pnl_pct < -1.5:
-                # Medium-high risk: moderate loss
-                labels.append(60)
-            elif pnl_pct < -0.5:
-                # Medium risk: small loss
-                labels.append(40)
-            elif pnl_pct < 1.0:
-                # Low-medium risk: small profit or breakeven
-                labels.append(30)
-            else:
-                # Low risk: good profit
-                labels.append(20)
+        pnl_pct = trade_outcomes['pnl_pct'].to_numpy(dtype=float)
+        labels = np.select(
+            [
+                pnl_pct < -3.0,   # High risk: significant loss
+                pnl_pct < -1.5,   # Medium-high risk: moderate loss
+                pnl_pct < -0.5,   # Medium risk: small loss
+                pnl_pct < 1.0,    # Low-medium risk: small profit or breakeven
+            ],
+            [80, 60, 40, 30],
+            default=20            # Low risk: good profit
+        )
         
         return pd.Series(labels)
     
@@ -184,7 +271,9 @@ class RiskScorer:
         self,
         historical_trades: pd.DataFrame,
         epochs: Optional[int] = None,
-        verbose: bool = True
+        verbose: bool = True,
+        init_model: Optional[Any] = None,
+        n_jobs: Optional[int] = None
     ) -> Dict:
         """
         Train the risk scoring model.
@@ -194,6 +283,9 @@ class RiskScorer:
                 Required columns: all feature columns + 'pnl_pct'
             epochs: Number of boosting rounds (None for auto)
             verbose: Whether to print training progress
+            init_model: Previously trained regressor to continue boosting from
+                (adds `epochs` more rounds; used for checkpointed training)
+            n_jobs: Booster thread count (None = library default)
             
         Returns:
             Training metrics
@@ -202,23 +294,7 @@ class RiskScorer:
             raise ValueError("historical_trades must contain 'pnl_pct' column")
         
         # Extract features
-        feature_data = []
-        for _, row in historical_trades.iterrows():
-            features = self._extract_features(
-                position_size_pct=row.get('position_size_pct', 0),
-                stop_loss_distance_pct=row.get('stop_loss_distance_pct', 0),
-                current_volatility=row.get('current_volatility', 0),
-                market_regime=row.get('market_regime', 'ranging'),
-                time_since_last_trade_minutes=row.get('time_since_last_trade_minutes', 0),
-                portfolio_drawdown_pct=row.get('portfolio_drawdown_pct', 0),
-                current_price=row.get('current_price', 1),
-                atr=row.get('atr'),
-                volume_ratio=row.get('volume_ratio'),
-                trend_strength=row.get('trend_strength')
-            )
-            feature_data.append(features)
-        
-        X = pd.DataFrame(feature_data)
+        X = self.extract_features_frame(historical_trades).reset_index(drop=True)
         self.feature_names = list(X.columns)
         
         # Create labels
@@ -242,12 +318,16 @@ class RiskScorer:
                 'colsample_bytree': 0.8,
                 'random_state': 42
             }
+            if n_jobs is not None:
+                params['n_jobs'] = n_jobs
             
+            xgb = _import_booster('xgboost')
             self.model = xgb.XGBRegressor(**params)
             self.model.fit(
                 X_train, y_train,
                 eval_set=[(X_val, y_val)],
-                verbose=verbose
+                verbose=verbose,
+                xgb_model=init_model.get_booster() if init_model is not None else None
             )
             
         else:  # lightgbm
@@ -261,12 +341,16 @@ class RiskScorer:
                 'random_state': 42,
                 'verbose': -1 if not verbose else 1
             }
+            if n_jobs is not None:
+                params['n_jobs'] = n_jobs
             
+            lgb = _import_booster('lightgbm')
             self.model = lgb.LGBMRegressor(**params)
             self.model.fit(
                 X_train, y_train,
                 eval_set=[(X_val, y_val)],
-                eval_metric='rmse'
+                eval_metric='rmse',
+                init_model=init_model.booster_ if init_model is not None else None
             )
         
         # Evaluate
@@ -341,19 +425,28 @@ class RiskScorer:
             trend_strength=trend_strength
         )
         
+        score = float(self._score_features({k: np.asarray([v]) for k, v in features.items()})[0])
+        return self._make_risk_score(score, features, datetime.now())
+    
+    def _score_features(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        """Model (or heuristic) scores for columnar features, clipped to 0-100."""
         if self.is_trained and self.model is not None:
-            # Use trained model
-            # Ensure all feature_names exist in features, using 0 for missing optional features
-            feature_dict = {fname: features.get(fname, 0.0) for fname in self.feature_names}
-            X = pd.DataFrame([feature_dict])
-            score = float(self.model.predict(X)[0])
+            # Missing optional features (and NaNs from absent inputs) score as 0
+            n = len(next(iter(features.values())))
+            X = np.zeros((n, len(self.feature_names)))
+            for j, name in enumerate(self.feature_names):
+                if name in features:
+                    X[:, j] = features[name]
+            X[np.isnan(X)] = 0.0
+            scores = np.asarray(
+                self.model.predict(pd.DataFrame(X, columns=self.feature_names)), dtype=float
+            )
         else:
-            # Use heuristic scoring
-            score = self._heuristic_score(features)
-        
-        # Ensure score is in 0-100 range
-        score = float(np.clip(score, 0, 100))
-        
+            scores = self._heuristic_score(features)
+        return np.clip(scores, 0, 100)
+    
+    def _make_risk_score(self, score: float, factors: Dict[str, float], timestamp: datetime) -> RiskScore:
+        """Wrap a numeric score into a RiskScore with level and actions."""
         # Determine risk level
         if score < 30:
             risk_level = 'LOW'
@@ -373,66 +466,97 @@ class RiskScorer:
             risk_level=risk_level,
             should_skip=should_skip,
             requires_higher_confidence=requires_higher_confidence,
-            factors=features,
-            timestamp=datetime.now()
+            factors=factors,
+            timestamp=timestamp
         )
     
-    def _heuristic_score(self, features: Dict[str, float]) -> float:
+    def score_array(self, candidates: Union[pd.DataFrame, Sequence[Dict]]) -> np.ndarray:
+        """
+        Risk scores (0-100) for many candidate trades - the fast path.
+        
+        Args:
+            candidates: DataFrame or list of dicts with score_trade() inputs
+            
+        Returns:
+            float array, one score per candidate
+        """
+        if len(candidates) == 0:
+            return np.empty(0)
+        frame = self.extract_features_frame(candidates)
+        return self._score_features({name: frame[name].to_numpy() for name in frame.columns})
+    
+    def score_batch(self, candidates: Union[pd.DataFrame, Sequence[Dict]]) -> List[RiskScore]:
+        """
+        Score many candidate trades in one model call.
+        
+        Same result as calling score_trade() per candidate, but features are
+        built column-wise and the model predicts the whole batch at once.
+        
+        Args:
+            candidates: DataFrame or list of dicts with score_trade() inputs
+            
+        Returns:
+            List of RiskScore in input order
+        """
+        if len(candidates) == 0:
+            return []
+        frame = self.extract_features_frame(candidates)
+        names = list(frame.columns)
+        values = frame.to_numpy(dtype=float)
+        scores = self._score_features({name: values[:, j] for j, name in enumerate(names)})
+        
+        now = datetime.now()
+        results = []
+        for i, score in enumerate(scores.tolist()):
+            row = values[i]
+            # Absent optional inputs (NaN) are left out, as in score_trade()
+            factors = {name: v for name, v in zip(names, row.tolist()) if v == v}
+            results.append(self._make_risk_score(score, factors, now))
+        return results
+    
+    def _heuristic_score(self, features: Mapping[str, Any]) -> np.ndarray:
         """
         Calculate risk score using heuristics when model is not trained.
         
         Args:
-            features: Dictionary of features
+            features: Feature name -> scalar or array (columnar)
             
         Returns:
-            Risk score 0-100
+            Risk score 0-100 (array shaped like the inputs)
         """
+        def f(name):
+            return np.asarray(features[name], dtype=float)
+        
         score = 20.0  # Base score
         
         # Position size contribution
-        pos_size = features['position_size_pct']
-        if pos_size > 30:
-            score += 25
-        elif pos_size > 20:
-            score += 15
-        elif pos_size > 10:
-            score += 5
-        
-        # Volatility contribution
-        volatility = features['current_volatility']
-        if volatility > 0.05:  # >5% volatility
-            score += 20
-        elif volatility > 0.03:
-            score += 10
+        pos_size = f('position_size_pct')
+        score = score + np.select([pos_size > 30, pos_size > 20, pos_size > 10], [25, 15, 5], 0)
+        
+        # Volatility contribution (>5% volatility)
+        volatility = f('current_volatility')
+        score = score + np.select([volatility > 0.05, volatility > 0.03], [20, 10], 0)
         
         # Stop loss contribution
-        stop_loss = features['stop_loss_distance_pct']
-        if stop_loss > 5:
-            score += 15
-        elif stop_loss > 3:
-            score += 8
+        stop_loss = f('stop_loss_distance_pct')
+        score = score + np.select([stop_loss > 5, stop_loss > 3], [15, 8], 0)
         
         # Drawdown contribution
-        drawdown_severity = features['drawdown_severity']
-        score += drawdown_severity * 2  # Up to 20 points
+        score = score + f('drawdown_severity') * 2  # Up to 20 points
         
         # Rapid trading penalty
-        if features['rapid_trading'] > 0:
-            score += 10
+        score = score + np.where(f('rapid_trading') > 0, 10, 0)
         
         # Market regime
-        if features['regime_volatile'] > 0:
-            score += 15
-        elif features['regime_ranging'] > 0:
-            score += 5
+        score = score + np.select([f('regime_volatile') > 0, f('regime_ranging') > 0], [15, 5], 0)
         
         # Volume considerations
-        if 'low_volume' in features and features['low_volume'] > 0:
-            score += 8
+        if 'low_volume' in features:
+            score = score + np.where(f('low_volume') > 0, 8, 0)
         
         # Weak trend penalty
-        if 'weak_trend' in features and features['weak_trend'] > 0:
-            score += 7
+        if 'weak_trend' in features:
+            score = score + np.where(f('weak_trend') > 0, 7, 0)
         
         return score
     
@@ -452,28 +576,8 @@ class RiskScorer:
         if not self.is_trained:
             raise ValueError("Model must be trained before evaluation")
         
-        scores = []
-        outcomes = []
-        
-        for _, row in historical_trades.iterrows():
-            risk_score = self.score_trade(
-                position_size_pct=row.get('position_size_pct', 0),
-                stop_loss_distance_pct=row.get('stop_loss_distance_pct', 0),
-                current_volatility=row.get('current_volatility', 0),
-                market_regime=row.get('market_regime', 'ranging'),
-                time_since_last_trade_minutes=row.get('time_since_last_trade_minutes', 0),
-                portfolio_drawdown_pct=row.get('portfolio_drawdown_pct', 0),
-                current_price=row.get('current_price', 1),
-                atr=row.get('atr'),
-                volume_ratio=row.get('volume_ratio'),
-                trend_strength=row.get('trend_strength')
-            )
-            
-            scores.append(risk_score.score)
-            outcomes.append(row['pnl_pct'])
-        
-        scores = np.array(scores)
-        outcomes = np.array(outcomes)
+        scores = self.score_array(historical_trades)
+        outcomes = historical_trades['pnl_pct'].to_numpy(dtype=float)
         
         # Calculate metrics
         high_risk_mask = scores > self.high_risk_threshold
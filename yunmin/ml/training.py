@@ -0,0 +1,356 @@
+"""
+Training Orchestrator - Parallel, resumable per-symbol model training.
+
+Each TrainingJob (one model for one symbol) runs in its own worker process with
+capped BLAS / TensorFlow thread pools, checkpoints as it goes (Keras epochs,
+boosting-round chunks) and publishes the finished model to the ModelRegistry.
+
+Job state lives in <checkpoint_dir>/<job_id>/state.json, so re-running the same
+job list after a crash skips finished jobs and resumes the interrupted ones
+from their last checkpoint.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+import json
+import multiprocessing
+import os
+import shutil
+import time
+import traceback
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+
+# Environment read by numpy/BLAS/TensorFlow when a worker process starts
+_THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+    'TF_NUM_INTRAOP_THREADS',
+    'TF_NUM_INTEROP_THREADS',
+)
+
+
+@dataclass
+class TrainingJob:
+    """
+    One model to train.
+
+    Attributes:
+        kind: 'lstm' or 'risk'
+        symbol: Trading pair (part of the job id and registry metadata)
+        data: Training data - DataFrame or path to .csv / .parquet / .pkl
+        name: Registry model name (default '<kind>_<SYMBOL>')
+        init_kwargs: Constructor arguments for the model class
+        train_kwargs: Extra arguments for model.train()
+        epochs: Keras epochs (lstm) or boosting rounds (risk)
+        checkpoint_every: Boosting rounds per checkpoint (risk only)
+    """
+    kind: str
+    symbol: str
+    data: Union[str, pd.DataFrame]
+    name: Optional[str] = None
+    init_kwargs: Dict[str, Any] = field(default_factory=dict)
+    train_kwargs: Dict[str, Any] = field(default_factory=dict)
+    epochs: int = 100
+    checkpoint_every: int = 25
+
+    @property
+    def job_id(self) -> str:
+        return self.name or f"{self.kind}_{self.symbol.replace('/', '-')}"
+
+
+def _load_data(data: Union[str, pd.DataFrame]) -> pd.DataFrame:
+    if isinstance(data, pd.DataFrame):
+        return data
+    path = Path(data)
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    if path.suffix in ('.pkl', '.pickle'):
+        return pd.read_pickle(path)
+    return pd.read_csv(path)
+
+
+class _JobState:
+    """state.json of one job (status, progress, timings)."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.path = directory / 'state.json'
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        else:
+            self.data = {'status': 'pending', 'progress': 0}
+
+    def save(self, **updates) -> None:
+        self.data.update(updates)
+        self.data['updated_at'] = datetime.now().isoformat()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, default=str)
+        os.replace(tmp, self.path)
+
+
+def _limit_tensorflow_threads(threads: int) -> None:
+    from yunmin.ml import lstm_predictor
+
+    if lstm_predictor._import_tensorflow():
+        tf = lstm_predictor.tf
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+            tf.config.threading.set_inter_op_parallelism_threads(max(1, threads // 2))
+        except RuntimeError:
+            pass  # already initialised in this process
+
+
+def _train_lstm(job: TrainingJob, df: pd.DataFrame, state: _JobState, threads: int):
+    from yunmin.ml import lstm_predictor
+    from yunmin.ml.lstm_predictor import LSTMPricePredictor
+
+    if not lstm_predictor._import_tensorflow():
+        raise ImportError("TensorFlow is required for LSTM training. Install with: pip install tensorflow")
+    _limit_tensorflow_threads(threads)
+    predictor = LSTMPricePredictor(**job.init_kwargs)
+    keras = lstm_predictor.keras
+
+    checkpoint = state.directory / 'checkpoint.keras'
+    initial_epoch = 0
+    if checkpoint.exists() and state.data.get('progress', 0) > 0:
+        predictor.model = keras.models.load_model(checkpoint)
+        initial_epoch = state.data['progress']
+        logger.info(f"↩️  {job.job_id}: resuming from epoch {initial_epoch}")
+
+    class EpochCheckpoint(keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self._started = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            tmp = state.directory / 'checkpoint.tmp.keras'
+            self.model.save(tmp)
+            os.replace(tmp, checkpoint)
+            epoch_times = state.data.get('epoch_seconds', []) + [time.perf_counter() - self._started]
+            state.save(progress=epoch + 1, epoch_seconds=epoch_times)
+
+    train_kwargs = {'verbose': 0, **job.train_kwargs}
+    metrics = predictor.train(
+        df,
+        epochs=job.epochs,
+        callbacks=[EpochCheckpoint()],
+        initial_epoch=initial_epoch,
+        **train_kwargs
+    )
+    metrics.pop('history', None)
+    return predictor, metrics
+
+
+def _train_risk(job: TrainingJob, df: pd.DataFrame, state: _JobState, threads: int):
+    from yunmin.ml.risk_scorer import RiskScorer
+
+    scorer = RiskScorer(**job.init_kwargs)
+    checkpoint = state.directory / 'checkpoint.pkl'
+    done = 0
+    if checkpoint.exists() and state.data.get('progress', 0) > 0:
+        scorer.load_model(str(checkpoint))
+        done = state.data['progress']
+        logger.info(f"↩️  {job.job_id}: resuming from round {done}")
+
+    # Keep the booster inside the worker's thread budget
+    train_kwargs = {'verbose': False, 'n_jobs': threads, **job.train_kwargs}
+    metrics: Dict[str, Any] = {}
+    while done < job.epochs:
+        rounds = min(job.checkpoint_every, job.epochs - done)
+        started = time.perf_counter()
+        metrics = scorer.train(
+            df,
+            epochs=rounds,
+            init_model=scorer.model if done > 0 else None,
+            **train_kwargs
+        )
+        done += rounds
+
+        tmp = state.directory / 'checkpoint.tmp.pkl'
+        scorer.save_model(str(tmp))
+        os.replace(tmp, checkpoint)
+        chunk_times = state.data.get('chunk_seconds', []) + [time.perf_counter() - started]
+        state.save(progress=done, chunk_seconds=chunk_times)
+
+    return scorer, metrics
+
+
+_TRAINERS = {
+    'lstm': _train_lstm,
+    'risk': _train_risk,
+}
+
+
+def run_training_job(
+    job: TrainingJob,
+    checkpoint_dir: str,
+    registry_root: str,
+    threads: int = 1
+) -> Dict[str, Any]:
+    """
+    Train one job to completion (resuming if possible) and register the model.
+
+    Runs inside a worker process; also usable directly for a single job.
+
+    Returns:
+        Result dict: job_id, status, version, metrics, timings
+    """
+    from yunmin.ml.model_registry import ModelRegistry
+
+    state = _JobState(Path(checkpoint_dir) / job.job_id)
+    if state.data.get('status') == 'done':
+        return {'job_id': job.job_id, **state.data, 'skipped': True}
+
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    state.save(status='running', pid=os.getpid(), kind=job.kind, symbol=job.symbol)
+    try:
+        t0 = time.perf_counter()
+        df = _load_data(job.data)
+        timings['load_seconds'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        model, metrics = _TRAINERS[job.kind](job, df, state, threads)
+        timings['train_seconds'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        registry = ModelRegistry(registry_root)
+        version = registry.register(job.job_id, model, metadata={
+            'symbol': job.symbol,
+            'kind': job.kind,
+            'metrics': metrics,
+            'timings': timings,
+            'rows': len(df),
+        })
+        timings['register_seconds'] = time.perf_counter() - t0
+        timings['total_seconds'] = time.perf_counter() - started
+
+        state.save(status='done', version=version, metrics=metrics, timings=timings)
+        # Checkpoints are superseded by the registered version
+        for path in state.directory.glob('checkpoint*'):
+            path.unlink()
+    except Exception as e:
+        state.save(status='failed', error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+        logger.error(f"❌ Training job {job.job_id} failed: {e}")
+    return {'job_id': job.job_id, **state.data}
+
+
+@contextmanager
+def _thread_env(threads: int):
+    """Set thread-count env vars so spawned workers start with capped pools."""
+    saved = {name: os.environ.get(name) for name in _THREAD_ENV_VARS}
+    for name in _THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+class TrainingOrchestrator:
+    """
+    Run many per-symbol training jobs in a process pool.
+
+    Usage:
+        orchestrator = TrainingOrchestrator(max_workers=4)
+        jobs = [TrainingJob('lstm', s, f'data/{s.replace("/", "-")}_5m.parquet') for s in symbols]
+        results = orchestrator.run(jobs)     # re-run after a crash to resume
+    """
+
+    def __init__(
+        self,
+        registry_root: str = 'data/models',
+        checkpoint_dir: str = 'data/training',
+        max_workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None
+    ):
+        """
+        Initialize orchestrator.
+
+        Args:
+            registry_root: ModelRegistry directory for finished models
+            checkpoint_dir: Job state and checkpoints
+            max_workers: Worker processes (default: CPUs // threads_per_worker)
+            threads_per_worker: BLAS/TF threads per worker (default: 1)
+        """
+        cpus = os.cpu_count() or 1
+        self.threads_per_worker = max(1, threads_per_worker or 1)
+        self.max_workers = max_workers or max(1, cpus // self.threads_per_worker)
+        self.registry_root = registry_root
+        self.checkpoint_dir = checkpoint_dir
+        Path(checkpoint_dir).mkdir(parents=True, exist_ok=True)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """State of every job seen in checkpoint_dir."""
+        result = {}
+        for path in sorted(Path(self.checkpoint_dir).glob('*/state.json')):
+            with open(path, 'r', encoding='utf-8') as f:
+                result[path.parent.name] = json.load(f)
+        return result
+
+    def reset(self, job_id: str) -> None:
+        """Forget a job's state and checkpoints (next run starts from zero)."""
+        shutil.rmtree(Path(self.checkpoint_dir) / job_id, ignore_errors=True)
+
+    def run(self, jobs: Sequence[TrainingJob], retrain: bool = False) -> List[Dict[str, Any]]:
+        """
+        Train all jobs; finished ones are skipped unless retrain=True.
+
+        Returns:
+            One result dict per job, in completion order
+        """
+        job_ids = [job.job_id for job in jobs]
+        if len(set(job_ids)) != len(job_ids):
+            raise ValueError("Duplicate job ids in training batch")
+        if retrain:
+            for job_id in job_ids:
+                self.reset(job_id)
+
+        started = time.perf_counter()
+        results = []
+        # spawn: each worker gets a fresh interpreter (no inherited TF/BLAS thread pools)
+        context = multiprocessing.get_context('spawn')
+        with _thread_env(self.threads_per_worker):
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context) as pool:
+                futures = {
+                    pool.submit(
+                        run_training_job, job, self.checkpoint_dir,
+                        self.registry_root, self.threads_per_worker
+                    ): job
+                    for job in jobs
+                }
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:  # worker crashed (e.g. OOM kill)
+                        result = {'job_id': job.job_id, 'status': 'failed', 'error': str(e)}
+                    results.append(result)
+                    logger.info(
+                        f"🏁 {result['job_id']}: {result.get('status')}"
+                        + (f" v{result['version']}" if result.get('version') else "")
+                    )
+
+        done = sum(1 for r in results if r.get('status') == 'done')
+        logger.info(
+            f"Training batch finished: {done}/{len(jobs)} done in "
+            f"{time.perf_counter() - started:.1f}s ({self.max_workers} workers x "
+            f"{self.threads_per_worker} threads)"
+        )
+        return results
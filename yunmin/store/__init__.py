@@ -13,7 +13,10 @@ from .state_manager import StateManager
 
 # Database опционально (требует sqlalchemy)
 try:
-    from .database import init_db, get_session, close_db, get_engine
+    from .database import (
+        init_db, init_read_db, get_session, close_db, get_engine,
+        get_read_session, read_session, get_read_engine
+    )
     from .models import Position, Trade, PortfolioSnapshot, GrokDecision, PositionSide, PositionStatus
     from .repository import (
         PositionRepository,
@@ -21,14 +24,19 @@ try:
         PortfolioRepository,
         GrokDecisionRepository
     )
+    from .write_behind import WriteBehindWriter
     HAS_DATABASE = True
 except ImportError:
     HAS_DATABASE = False
     # Заглушки для отсутствующих функций
     init_db = None
+    init_read_db = None
     get_session = None
     close_db = None
     get_engine = None
+    get_read_session = None
+    read_session = None
+    get_read_engine = None
     Position = None
     Trade = None
     PortfolioSnapshot = None
@@ -39,13 +47,18 @@ except ImportError:
     TradeRepository = None
     PortfolioRepository = None
     GrokDecisionRepository = None
+    WriteBehindWriter = None
 
 __all__ = [
     # Database
     'init_db',
+    'init_read_db',
     'get_session',
     'close_db',
     'get_engine',
+    'get_read_session',
+    'read_session',
+    'get_read_engine',
     # Models
     'Position',
     'Trade',
@@ -58,4 +71,5 @@ __all__ = [
     'TradeRepository',
     'PortfolioRepository',
     'GrokDecisionRepository',
+    'WriteBehindWriter',
 ]
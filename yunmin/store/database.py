@@ -1,8 +1,17 @@
 """
 Database setup and session management using SQLAlchemy
+
+Файловая SQLite по умолчанию работает в tuned-режиме:
+- WAL: читатели не блокируют писателя и наоборот
+- synchronous=NORMAL: fsync на checkpoint, а не на каждый commit
+- mmap / page cache / temp_store в памяти
+- отдельный read-only пул соединений для API и отчётов (get_read_session)
 """
 
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from typing import Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
 from sqlalchemy.pool import StaticPool
 from pathlib import Path
@@ -15,17 +24,109 @@ Base = declarative_base()
 # Global session factory
 _SessionFactory = None
 _engine = None
+_ReadSessionFactory = None
+_read_engine = None
+
+# Pragmas for every connection in tuned mode (cache_size < 0 is KiB)
+SQLITE_PRAGMAS: Dict[str, object] = {
+    'busy_timeout': 5000,
+    'cache_size': -65536,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+
+# Writer-only pragmas (journal_mode is persistent in the file)
+SQLITE_WRITE_PRAGMAS: Dict[str, object] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'wal_autocheckpoint': 1000,
+}
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def _apply_pragmas(engine, pragmas: Dict[str, object]) -> None:
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_sqlite_engines(
+    database_url: str,
+    echo: bool = False,
+    read_pool_size: int = 4,
+    pragmas: Optional[Dict[str, object]] = None
+):
+    """
+    Tuned engines for a file SQLite database.
+    
+    Returns:
+        (write_engine, read_engine); read_engine opens the file read-only
+        (mode=ro, query_only) with its own connection pool
+    """
+    url = make_url(database_url)
+    base_pragmas = {**SQLITE_PRAGMAS, **(pragmas or {})}
+    
+    write_engine = create_engine(
+        url,
+        echo=echo,
+        connect_args={'check_same_thread': False, 'timeout': 30},
+        pool_size=2,          # сессия бота + write-behind writer
+        max_overflow=4
+    )
+    _apply_pragmas(write_engine, {**SQLITE_WRITE_PRAGMAS, **base_pragmas})
+    
+    # Создать файл и включить WAL до открытия read-only соединений
+    with write_engine.connect():
+        pass
+    
+    read_engine = create_sqlite_read_engine(database_url, echo, read_pool_size, pragmas)
+    return write_engine, read_engine
+
+
+def create_sqlite_read_engine(
+    database_url: str,
+    echo: bool = False,
+    pool_size: int = 4,
+    pragmas: Optional[Dict[str, object]] = None
+):
+    """Read-only engine for a file SQLite database (mode=ro, query_only)"""
+    path = Path(make_url(database_url).database).resolve()
+    read_engine = create_engine(
+        f"sqlite:///file:{path}?mode=ro&uri=true",
+        echo=echo,
+        connect_args={'check_same_thread': False, 'timeout': 30},
+        pool_size=pool_size,
+        max_overflow=pool_size
+    )
+    _apply_pragmas(read_engine, {**SQLITE_PRAGMAS, **(pragmas or {}), 'query_only': 'ON'})
+    return read_engine
 
 
-def init_db(database_url: str = None, echo: bool = False) -> None:
+def init_db(
+    database_url: str = None,
+    echo: bool = False,
+    tuned: bool = True,
+    read_pool_size: int = 4
+) -> None:
     """
     Инициализировать базу данных
     
     Args:
         database_url: URL базы данных (default: sqlite:///data/yunmin.db)
         echo: Логировать SQL запросы (для отладки)
+        tuned: WAL + pragmas + read-only пул для файловой SQLite
+               (False - одно общее соединение, настройки SQLite по умолчанию)
+        read_pool_size: Соединений в read-only пуле
     """
-    global _SessionFactory, _engine
+    global _SessionFactory, _engine, _ReadSessionFactory, _read_engine
     
     if database_url is None:
         # Default: SQLite в папке data/
@@ -34,14 +135,22 @@ def init_db(database_url: str = None, echo: bool = False) -> None:
         database_url = f'sqlite:///{data_dir}/yunmin.db'
     
     # Создать engine
+    _read_engine = None
     if database_url.startswith('sqlite'):
-        # SQLite специфичные настройки
-        _engine = create_engine(
-            database_url,
-            echo=echo,
-            connect_args={'check_same_thread': False},
-            poolclass=StaticPool
-        )
+        url = make_url(database_url)
+        if tuned and not _is_memory_sqlite(url):
+            Path(url.database).parent.mkdir(parents=True, exist_ok=True)
+            _engine, _read_engine = create_sqlite_engines(
+                database_url, echo=echo, read_pool_size=read_pool_size
+            )
+        else:
+            # SQLite специфичные настройки
+            _engine = create_engine(
+                database_url,
+                echo=echo,
+                connect_args={'check_same_thread': False},
+                poolclass=StaticPool
+            )
     else:
         _engine = create_engine(database_url, echo=echo)
     
@@ -53,7 +162,38 @@ def init_db(database_url: str = None, echo: bool = False) -> None:
     # Создать все таблицы
     Base.metadata.create_all(_engine)
     
-    logger.info(f"Database initialized: {database_url}")
+    # create_all пропускает существующие таблицы - добавить новые индексы в старые БД
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(_engine, checkfirst=True)
+    
+    # Read-only сессии (без read-пула - тот же engine)
+    _ReadSessionFactory = sessionmaker(
+        bind=_read_engine or _engine, autoflush=False, autocommit=False
+    )
+    
+    mode = 'tuned WAL + read pool' if _read_engine is not None else 'default'
+    logger.info(f"Database initialized: {database_url} ({mode})")
+
+
+def init_read_db(database_url: str, echo: bool = False, read_pool_size: int = 4) -> None:
+    """
+    Только чтение чужой БД (дашборд в отдельном процессе)
+    
+    Без write-engine и без DDL: схему создаёт и мигрирует бот. Доступны
+    get_read_session() / read_session(); get_session() - нет.
+    Файловая SQLite открывается read-only (mode=ro, query_only).
+    """
+    global _ReadSessionFactory, _read_engine
+    
+    url = make_url(database_url)
+    if url.get_backend_name() == 'sqlite' and not _is_memory_sqlite(url):
+        _read_engine = create_sqlite_read_engine(database_url, echo, read_pool_size)
+    else:
+        _read_engine = create_engine(database_url, echo=echo)
+    
+    _ReadSessionFactory = sessionmaker(bind=_read_engine, autoflush=False, autocommit=False)
+    logger.info(f"Database opened read-only: {database_url}")
 
 
 def get_session():
@@ -74,14 +214,44 @@ def get_session():
     return _SessionFactory()
 
 
+def get_read_session():
+    """
+    Сессия для чтения (API, отчёты, дашборд)
+    
+    В tuned-режиме работает на отдельном read-only пуле и не ждёт
+    записей бота. Вызывающий закрывает сессию (или использует read_session()).
+    """
+    if _ReadSessionFactory is None:
+        raise RuntimeError(
+            "Database not initialized. Call init_db() first."
+        )
+    
+    return _ReadSessionFactory()
+
+
+@contextmanager
+def read_session():
+    """Context manager вокруг get_read_session()"""
+    session = get_read_session()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
 def close_db() -> None:
     """Закрыть соединение с БД"""
-    global _SessionFactory, _engine
+    global _SessionFactory, _engine, _ReadSessionFactory, _read_engine
     
     if _SessionFactory:
         _SessionFactory.remove()
         _SessionFactory = None
     
+    _ReadSessionFactory = None
+    if _read_engine:
+        _read_engine.dispose()
+        _read_engine = None
+    
     if _engine:
         _engine.dispose()
         _engine = None
@@ -94,3 +264,10 @@ def get_engine():
     if _engine is None:
         raise RuntimeError("Database not initialized")
     return _engine
+
+
+def get_read_engine():
+    """Read-only engine (или основной, если read-пула нет)"""
+    if _engine is None and _read_engine is None:
+        raise RuntimeError("Database not initialized")
+    return _read_engine or _engine
@@ -4,7 +4,7 @@ SQLAlchemy models для персистентности данных
 
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, Boolean, 
-    ForeignKey, Text, Enum as SQLEnum
+    ForeignKey, Text, Index, Enum as SQLEnum
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -32,6 +32,11 @@ class Position(Base):
     Сохраняет открытые и закрытые позиции
     """
     __tablename__ = 'positions'
+    __table_args__ = (
+        # get_open_positions(symbol) / фильтр по статусу с сортировкой по времени
+        Index('ix_positions_symbol_status_opened', 'symbol', 'status', 'opened_at'),
+        Index('ix_positions_status_closed', 'status', 'closed_at'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     
@@ -105,6 +110,10 @@ class Trade(Base):
     Одна позиция может иметь несколько trades (частичное исполнение)
     """
     __tablename__ = 'trades'
+    __table_args__ = (
+        # get_recent_trades(symbol) и объём за период без чтения таблицы
+        Index('ix_trades_symbol_executed_total', 'symbol', 'executed_at', 'total'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     
@@ -229,6 +238,10 @@ class GrokDecision(Base):
     Решения Grok AI (для анализа качества)
     """
     __tablename__ = 'grok_decisions'
+    __table_args__ = (
+        # Покрывающий индекс для get_accuracy_stats (index-only агрегат)
+        Index('ix_grok_decided_pnl', 'decided_at', 'actual_pnl', 'approved', 'confidence'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     
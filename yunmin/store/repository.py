@@ -2,11 +2,15 @@
 Repository pattern для работы с БД
 
 Абстракция над SQLAlchemy для удобного доступа к данным
+
+С WriteBehindWriter записи не коммитятся построчно: create()/close() ставят
+их в очередь фонового writer'а, а чтения объединяют БД с ещё не
+сброшенными записями (read-your-writes).
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta, UTC
-from sqlalchemy import desc, and_, or_, func
+from sqlalchemy import desc, and_, or_, func, case, select
 from sqlalchemy.orm import Session
 from loguru import logger
 
@@ -14,15 +18,71 @@ from .models import (
     Position, Trade, PortfolioSnapshot, GrokDecision,
     PositionSide, PositionStatus
 )
+from .write_behind import WriteBehindWriter
+
+
+def _time_key(attr: str) -> Callable[[Any], datetime]:
+    """Sort key for DateTime columns: objects from the DB are naive UTC, pending ones aware."""
+    def key(obj: Any) -> datetime:
+        value = getattr(obj, attr)
+        if value is None:
+            return datetime.min
+        return value.replace(tzinfo=None) if value.tzinfo else value
+    return key
+
 
+def _as_naive(value: datetime) -> datetime:
+    return value.replace(tzinfo=None) if value.tzinfo else value
 
-class PositionRepository:
+
+class BaseRepository:
     """
-    Repository для работы с позициями
+    Общая логика записи: сразу (commit на строку) или через WriteBehindWriter
     """
     
-    def __init__(self, session: Session):
+    model = None
+    
+    def __init__(self, session: Session, writer: Optional[WriteBehindWriter] = None):
         self.session = session
+        self.writer = writer
+    
+    def _add(self, obj: Any) -> Any:
+        if self.writer is not None:
+            return self.writer.insert(obj)
+        self.session.add(obj)
+        self.session.commit()
+        return obj
+    
+    def _changed(self, obj: Any, columns: List[str]) -> Any:
+        if self.writer is not None:
+            return self.writer.update(obj, columns)
+        self.session.commit()
+        return obj
+    
+    def _remove(self, obj: Any) -> None:
+        if self.writer is not None:
+            self.writer.delete(obj)
+        else:
+            self.session.delete(obj)
+            self.session.commit()
+    
+    def _pending(self) -> Dict[int, Any]:
+        """Snapshot несброшенных записей (брать ДО запроса к БД)."""
+        return self.writer.pending(self.model) if self.writer is not None else {}
+    
+    def _get(self, obj_id: int) -> Optional[Any]:
+        pending = self._pending()
+        if obj_id in pending:
+            return pending[obj_id]
+        return self.session.query(self.model).filter(self.model.id == obj_id).first()
+
+
+class PositionRepository(BaseRepository):
+    """
+    Repository для работы с позициями
+    """
+    
+    model = Position
     
     def create(
         self,
@@ -51,8 +111,7 @@ class PositionRepository:
             opened_at=datetime.now(UTC)
         )
         
-        self.session.add(position)
-        self.session.commit()
+        self._add(position)
         
         logger.info(
             f"Created position: {symbol} {side.value} "
@@ -100,7 +159,9 @@ class PositionRepository:
         position.status = PositionStatus.CLOSED
         position.closed_at = datetime.now(UTC)
         
-        self.session.commit()
+        self._changed(position, [
+            'exit_price', 'exit_fee', 'realized_pnl', 'realized_pnl_pct', 'status', 'closed_at'
+        ])
         
         logger.info(
             f"Closed position {position_id}: "
@@ -111,15 +172,14 @@ class PositionRepository:
     
     def get_by_id(self, position_id: int) -> Optional[Position]:
         """Получить позицию по ID"""
-        return self.session.query(Position).filter(
-            Position.id == position_id
-        ).first()
+        return self._get(position_id)
     
     def get_open_positions(
         self,
         symbol: Optional[str] = None
     ) -> List[Position]:
         """Получить все открытые позиции"""
+        pending = self._pending()
         query = self.session.query(Position).filter(
             Position.status == PositionStatus.OPEN
         )
@@ -127,7 +187,12 @@ class PositionRepository:
         if symbol:
             query = query.filter(Position.symbol == symbol)
         
-        return query.order_by(Position.opened_at).all()
+        return WriteBehindWriter.merge(
+            pending,
+            query.order_by(Position.opened_at).all(),
+            lambda p: p.status == PositionStatus.OPEN and (not symbol or p.symbol == symbol),
+            sort_key=_time_key('opened_at')
+        )
     
     def get_closed_positions(
         self,
@@ -135,6 +200,7 @@ class PositionRepository:
         limit: int = 100
     ) -> List[Position]:
         """Получить закрытые позиции"""
+        pending = self._pending()
         query = self.session.query(Position).filter(
             Position.status == PositionStatus.CLOSED
         )
@@ -142,9 +208,12 @@ class PositionRepository:
         if symbol:
             query = query.filter(Position.symbol == symbol)
         
-        return query.order_by(
-            desc(Position.closed_at)
-        ).limit(limit).all()
+        return WriteBehindWriter.merge(
+            pending,
+            query.order_by(desc(Position.closed_at)).limit(limit + len(pending)).all(),
+            lambda p: p.status == PositionStatus.CLOSED and (not symbol or p.symbol == symbol),
+            sort_key=_time_key('closed_at'), reverse=True, limit=limit
+        )
     
     def get_all_positions(
         self,
@@ -153,6 +222,7 @@ class PositionRepository:
         limit: int = 100
     ) -> List[Position]:
         """Получить все позиции с фильтрацией"""
+        pending = self._pending()
         query = self.session.query(Position)
         
         if symbol:
@@ -161,29 +231,30 @@ class PositionRepository:
         if status:
             query = query.filter(Position.status == status)
         
-        return query.order_by(
-            desc(Position.opened_at)
-        ).limit(limit).all()
+        return WriteBehindWriter.merge(
+            pending,
+            query.order_by(desc(Position.opened_at)).limit(limit + len(pending)).all(),
+            lambda p: (not symbol or p.symbol == symbol) and (not status or p.status == status),
+            sort_key=_time_key('opened_at'), reverse=True, limit=limit
+        )
     
     def delete(self, position_id: int) -> bool:
         """Удалить позицию (для тестов)"""
         position = self.get_by_id(position_id)
         
         if position:
-            self.session.delete(position)
-            self.session.commit()
+            self._remove(position)
             return True
         
         return False
 
 
-class TradeRepository:
+class TradeRepository(BaseRepository):
     """
     Repository для работы со сделками
     """
     
-    def __init__(self, session: Session):
-        self.session = session
+    model = Trade
     
     def create(
         self,
@@ -216,8 +287,7 @@ class TradeRepository:
             notes=notes
         )
         
-        self.session.add(trade)
-        self.session.commit()
+        self._add(trade)
         
         logger.debug(
             f"Created trade: {symbol} {side} "
@@ -228,15 +298,18 @@ class TradeRepository:
     
     def get_by_id(self, trade_id: int) -> Optional[Trade]:
         """Получить сделку по ID"""
-        return self.session.query(Trade).filter(
-            Trade.id == trade_id
-        ).first()
+        return self._get(trade_id)
     
     def get_by_position(self, position_id: int) -> List[Trade]:
         """Получить все сделки позиции"""
-        return self.session.query(Trade).filter(
+        pending = self._pending()
+        rows = self.session.query(Trade).filter(
             Trade.position_id == position_id
         ).order_by(Trade.executed_at).all()
+        return WriteBehindWriter.merge(
+            pending, rows, lambda t: t.position_id == position_id,
+            sort_key=_time_key('executed_at')
+        )
     
     def get_recent_trades(
         self,
@@ -244,14 +317,18 @@ class TradeRepository:
         limit: int = 100
     ) -> List[Trade]:
         """Получить последние сделки"""
+        pending = self._pending()
         query = self.session.query(Trade)
         
         if symbol:
             query = query.filter(Trade.symbol == symbol)
         
-        return query.order_by(
-            desc(Trade.executed_at)
-        ).limit(limit).all()
+        return WriteBehindWriter.merge(
+            pending,
+            query.order_by(desc(Trade.executed_at)).limit(limit + len(pending)).all(),
+            lambda t: not symbol or t.symbol == symbol,
+            sort_key=_time_key('executed_at'), reverse=True, limit=limit
+        )
     
     def get_total_volume(
         self,
@@ -259,6 +336,7 @@ class TradeRepository:
         since: Optional[datetime] = None
     ) -> float:
         """Получить общий объём торговли"""
+        pending = self._pending()
         query = self.session.query(func.sum(Trade.total))
         
         if symbol:
@@ -267,17 +345,26 @@ class TradeRepository:
         if since:
             query = query.filter(Trade.executed_at >= since)
         
-        result = query.scalar()
+        if pending:
+            # Несброшенные сделки считаются по overlay, не дважды
+            query = query.filter(Trade.id.notin_(list(pending)))
+        
+        result = query.scalar() or 0.0
+        result += sum(
+            t.total for t in pending.values()
+            if t is not None
+            and (not symbol or t.symbol == symbol)
+            and (not since or _as_naive(t.executed_at) >= _as_naive(since))
+        )
         return result if result else 0.0
 
 
-class PortfolioRepository:
+class PortfolioRepository(BaseRepository):
     """
     Repository для работы с portfolio snapshots
     """
     
-    def __init__(self, session: Session):
-        self.session = session
+    model = PortfolioSnapshot
     
     def create_snapshot(
         self,
@@ -313,8 +400,7 @@ class PortfolioRepository:
             notes=notes
         )
         
-        self.session.add(snapshot)
-        self.session.commit()
+        self._add(snapshot)
         
         logger.debug(
             f"Created portfolio snapshot: "
@@ -325,9 +411,8 @@ class PortfolioRepository:
     
     def get_latest(self) -> Optional[PortfolioSnapshot]:
         """Получить последний snapshot"""
-        return self.session.query(PortfolioSnapshot).order_by(
-            desc(PortfolioSnapshot.snapshot_at)
-        ).first()
+        history = self.get_history(limit=1)
+        return history[0] if history else None
     
     def get_history(
         self,
@@ -335,40 +420,87 @@ class PortfolioRepository:
         limit: int = 100
     ) -> List[PortfolioSnapshot]:
         """Получить историю snapshots"""
+        pending = self._pending()
         query = self.session.query(PortfolioSnapshot)
         
         if since:
             query = query.filter(PortfolioSnapshot.snapshot_at >= since)
         
-        return query.order_by(
-            desc(PortfolioSnapshot.snapshot_at)
-        ).limit(limit).all()
+        return WriteBehindWriter.merge(
+            pending,
+            query.order_by(desc(PortfolioSnapshot.snapshot_at)).limit(limit + len(pending)).all(),
+            lambda s: not since or _as_naive(s.snapshot_at) >= _as_naive(since),
+            sort_key=_time_key('snapshot_at'), reverse=True, limit=limit
+        )
+    
+    def get_equity_series(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Tuple[datetime, float]]:
+        """
+        (snapshot_at, total_capital) по возрастанию времени в [start, end), время naive UTC
+        
+        Читает только две колонки (без ORM-объектов) - для графиков за длинный период.
+        """
+        query = self.session.query(PortfolioSnapshot.snapshot_at, PortfolioSnapshot.total_capital)
+        if start:
+            query = query.filter(PortfolioSnapshot.snapshot_at >= _as_naive(start))
+        if end:
+            query = query.filter(PortfolioSnapshot.snapshot_at < _as_naive(end))
+        rows = [(at, capital) for at, capital in query.order_by(PortfolioSnapshot.snapshot_at).all()]
+        
+        pending = [
+            (_as_naive(s.snapshot_at), s.total_capital) for s in self._pending().values()
+            if s is not None
+            and (not start or _as_naive(s.snapshot_at) >= _as_naive(start))
+            and (not end or _as_naive(s.snapshot_at) < _as_naive(end))
+        ]
+        if pending:
+            rows = sorted(rows + pending, key=lambda row: row[0])
+        return rows
     
     def get_daily_snapshots(self, days: int = 30) -> List[PortfolioSnapshot]:
-        """Получить дневные snapshots (последние N дней)"""
+        """Получить дневные snapshots (последние N дней, новые первыми)"""
         since = datetime.now(UTC) - timedelta(days=days)
+        pending = self._pending()
         
-        # Группировка по дням (берём последний snapshot каждого дня)
-        # Это упрощённая версия, в production использовать SQL window functions
-        snapshots = self.get_history(since=since, limit=days * 10)
+        # Последний snapshot каждого дня: MAX(snapshot_at) по дням считается
+        # только по индексу snapshot_at, из таблицы читается одна строка на день
+        day_last = select(
+            func.max(PortfolioSnapshot.snapshot_at).label('last_at')
+        ).where(
+            PortfolioSnapshot.snapshot_at >= since
+        ).group_by(func.date(PortfolioSnapshot.snapshot_at)).subquery()
         
-        # Группировать по дням
-        daily_snapshots = {}
-        for snapshot in snapshots:
-            day = snapshot.snapshot_at.date()
-            if day not in daily_snapshots:
-                daily_snapshots[day] = snapshot
+        last_ids = select(func.max(PortfolioSnapshot.id)).join(
+            day_last, PortfolioSnapshot.snapshot_at == day_last.c.last_at
+        ).group_by(PortfolioSnapshot.snapshot_at)  # при равном времени - последний id
+        
+        snapshots = self.session.query(PortfolioSnapshot).filter(
+            PortfolioSnapshot.id.in_(last_ids)
+        ).order_by(desc(PortfolioSnapshot.snapshot_at)).all()
         
+        if not pending:
+            return snapshots
+        
+        # Несброшенные snapshots (write-behind) могут быть новее последнего за день
+        daily_snapshots = {}
+        candidates = [s for s in snapshots if s.id not in pending] + [
+            s for s in pending.values()
+            if s is not None and _as_naive(s.snapshot_at) >= _as_naive(since)
+        ]
+        for snapshot in sorted(candidates, key=_time_key('snapshot_at'), reverse=True):
+            daily_snapshots.setdefault(_as_naive(snapshot.snapshot_at).date(), snapshot)
         return list(daily_snapshots.values())
 
 
-class GrokDecisionRepository:
+class GrokDecisionRepository(BaseRepository):
     """
     Repository для решений Grok AI
     """
     
-    def __init__(self, session: Session):
-        self.session = session
+    model = GrokDecision
     
     def create(
         self,
@@ -398,8 +530,7 @@ class GrokDecisionRepository:
             decided_at=datetime.now(UTC)
         )
         
-        self.session.add(decision)
-        self.session.commit()
+        self._add(decision)
         
         return decision
     
@@ -410,29 +541,52 @@ class GrokDecisionRepository:
         actual_pnl: float
     ) -> Optional[GrokDecision]:
         """Обновить результат решения (после закрытия позиции)"""
-        decision = self.session.query(GrokDecision).filter(
-            GrokDecision.id == decision_id
-        ).first()
+        decision = self._get(decision_id)
         
         if decision:
             decision.position_id = position_id
             decision.actual_pnl = actual_pnl
-            self.session.commit()
+            self._changed(decision, ['position_id', 'actual_pnl'])
         
         return decision
     
     def get_accuracy_stats(self, days: int = 30) -> Dict[str, Any]:
         """Получить статистику точности Grok решений"""
         since = datetime.now(UTC) - timedelta(days=days)
-        
-        decisions = self.session.query(GrokDecision).filter(
+        pending = self._pending()
+        
+        # Один агрегатный запрос (index-only по ix_grok_decided_pnl)
+        query = self.session.query(
+            func.count(GrokDecision.id),
+            func.coalesce(func.sum(case((GrokDecision.approved, 1), else_=0)), 0),
+            func.coalesce(func.sum(case(
+                (and_(GrokDecision.approved, GrokDecision.actual_pnl > 0), 1), else_=0
+            )), 0),
+            func.coalesce(func.sum(case(
+                (and_(~GrokDecision.approved, GrokDecision.actual_pnl < 0), 1), else_=0
+            )), 0),
+            func.coalesce(func.sum(GrokDecision.confidence), 0.0),
+        ).filter(
             and_(
                 GrokDecision.decided_at >= since,
                 GrokDecision.actual_pnl.isnot(None)  # Только завершённые
             )
-        ).all()
-        
-        if not decisions:
+        )
+        if pending:
+            query = query.filter(GrokDecision.id.notin_(list(pending)))
+        total, approved, approved_wins, vetoed_losses, confidence_sum = query.one()
+        
+        # Несброшенные решения (write-behind)
+        for d in pending.values():
+            if d is None or d.actual_pnl is None or _as_naive(d.decided_at) < _as_naive(since):
+                continue
+            total += 1
+            approved += 1 if d.approved else 0
+            approved_wins += 1 if d.approved and d.actual_pnl > 0 else 0
+            vetoed_losses += 1 if not d.approved and d.actual_pnl < 0 else 0
+            confidence_sum += d.confidence or 0.0
+        
+        if not total:
             return {
                 'total_decisions': 0,
                 'approved_count': 0,
@@ -442,29 +596,16 @@ class GrokDecisionRepository:
                 'avg_confidence': 0.0
             }
         
-        approved = [d for d in decisions if d.approved]
-        vetoed = [d for d in decisions if not d.approved]
-        
-        # Win rate одобренных сигналов
-        approved_wins = sum(1 for d in approved if d.actual_pnl > 0)
-        approved_win_rate = (
-            (approved_wins / len(approved) * 100) if approved else 0.0
-        )
-        
-        # Сколько из vetoed были бы убыточными
-        vetoed_losses = sum(1 for d in vetoed if d.actual_pnl < 0)
-        vetoed_would_have_lost = (
-            (vetoed_losses / len(vetoed) * 100) if vetoed else 0.0
-        )
-        
-        # Средняя уверенность
-        avg_confidence = sum(d.confidence for d in decisions) / len(decisions)
+        vetoed = total - approved
         
         return {
-            'total_decisions': len(decisions),
-            'approved_count': len(approved),
-            'vetoed_count': len(vetoed),
-            'approved_win_rate': approved_win_rate,
-            'vetoed_would_have_lost': vetoed_would_have_lost,
-            'avg_confidence': avg_confidence * 100
+            'total_decisions': total,
+            'approved_count': approved,
+            'vetoed_count': vetoed,
+            # Win rate одобренных сигналов
+            'approved_win_rate': (approved_wins / approved * 100) if approved else 0.0,
+            # Сколько из vetoed были бы убыточными
+            'vetoed_would_have_lost': (vetoed_losses / vetoed * 100) if vetoed else 0.0,
+            # Средняя уверенность
+            'avg_confidence': confidence_sum / total * 100
         }
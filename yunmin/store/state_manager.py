@@ -1,16 +1,58 @@
 """
 State Manager - сохранение состояния бота
 Решает критическую проблему потери данных при перезапуске
+
+Хранение: append-only журнал (state.journal, одна компактная JSON-строка на
+событие) + периодический снапшот (state.snapshot.json, атомарный rename).
+Сохранение сделки дописывает одну строку вместо перезаписи всей истории;
+восстановление = снапшот + replay журнала. Оборванная последняя строка
+(падение во время записи) отбрасывается.
 """
 
 import json
 import os
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from loguru import logger
 
 
+def _fsync_dir(path: Path) -> None:
+    """fsync каталога: делает rename/создание файла в нём durable (POSIX)"""
+    if os.name != 'posix':
+        return  # Windows: каталог не открыть для fsync, NTFS журналирует метаданные сам
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _trade_record(trade) -> Dict[str, Any]:
+    """Trade object -> JSON-совместимый dict"""
+    return {
+        'symbol': trade.symbol,
+        'side': trade.side,
+        'entry_price': trade.entry_price,
+        'exit_price': trade.exit_price,
+        'amount': trade.amount,
+        'entry_fee': trade.entry_fee,
+        'exit_fee': trade.exit_fee,
+        'pnl': trade.pnl,
+        'pnl_pct': trade.pnl_pct,
+        'opened_at': trade.opened_at.isoformat() if hasattr(trade.opened_at, 'isoformat') else str(trade.opened_at),
+        'closed_at': trade.closed_at.isoformat() if hasattr(trade.closed_at, 'isoformat') else str(trade.closed_at)
+    }
+
+
+def _position_record(pos: Dict) -> Dict[str, Any]:
+    pos_copy = pos.copy()
+    if 'opened_at' in pos_copy and isinstance(pos_copy['opened_at'], datetime):
+        pos_copy['opened_at'] = pos_copy['opened_at'].isoformat()
+    return pos_copy
+
+
 class StateManager:
     """
     Управление состоянием бота
@@ -22,43 +64,208 @@ class StateManager:
     - Настройки риска
     """
     
-    def __init__(self, state_dir: str = "data"):
+    def __init__(
+        self,
+        state_dir: str = "data",
+        snapshot_every: int = 1000,
+        fsync: bool = True
+    ):
         """
         Args:
             state_dir: Директория для файлов состояния
+            snapshot_every: Записей журнала между снапшотами
+            fsync: fsync после каждой записи (durability при падении ОС)
         """
         self.state_dir = Path(state_dir)
         self.state_dir.mkdir(exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
         
+        self.journal_file = self.state_dir / "state.journal"
+        self.snapshot_file = self.state_dir / "state.snapshot.json"
+        
+        # Файлы старого формата (полная перезапись JSON) - импортируются один раз
         self.positions_file = self.state_dir / "positions.json"
         self.trades_file = self.state_dir / "trades.json"
         self.stats_file = self.state_dir / "statistics.json"
         
+        self._lock = threading.RLock()
+        self._positions: Dict[str, Dict] = {}
+        self._trades: List[Dict] = []
+        self._stats: Dict = {}
+        self._seq = 0
+        self._journal_records = 0
+        self._journal = None
+        
+        self._recover()
+        
         logger.info(f"StateManager initialized: {self.state_dir.absolute()}")
         
+    # ------------------------------------------------------------------
+    # Журнал / снапшоты
+    # ------------------------------------------------------------------
+    
+    def _apply(self, record: Dict) -> None:
+        """Применить одну запись журнала к состоянию в памяти"""
+        kind = record['t']
+        if kind == 'pos':
+            self._positions[record['k']] = record['v']
+        elif kind == 'pos_del':
+            self._positions.pop(record['k'], None)
+        elif kind == 'trade':
+            self._trades.append(record['v'])
+        elif kind == 'trades':
+            self._trades = list(record['v'])
+        elif kind == 'stats':
+            self._stats = record['v']
+            
+    def _recover(self) -> None:
+        """Снапшот + replay журнала (или импорт файлов старого формата)"""
+        snapshot_seq = 0
+        if self.snapshot_file.exists():
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            snapshot_seq = snapshot['seq']
+            self._positions = snapshot.get('positions', {})
+            self._trades = snapshot.get('trades', [])
+            self._stats = snapshot.get('statistics', {})
+        elif not self.journal_file.exists():
+            self._import_legacy_files()
+        self._seq = snapshot_seq
+        
+        replayed = 0
+        valid_bytes = 0
+        if self.journal_file.exists():
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b'\n'):
+                            raise ValueError("incomplete record")
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"⚠️  Discarding torn journal tail at byte {valid_bytes}")
+                        break
+                    valid_bytes += len(line)
+                    if record['seq'] <= snapshot_seq:
+                        continue  # уже в снапшоте (падение между rename и truncate)
+                    self._apply(record)
+                    self._seq = record['seq']
+                    replayed += 1
+            if valid_bytes < self.journal_file.stat().st_size:
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(valid_bytes)
+        self._journal_records = replayed
+        
+        if replayed or snapshot_seq:
+            logger.info(
+                f"✅ State recovered: {len(self._positions)} positions, {len(self._trades)} trades "
+                f"(snapshot seq {snapshot_seq} + {replayed} journal records)"
+            )
+            
+    def _import_legacy_files(self) -> None:
+        imported = False
+        for path, attr in (
+            (self.positions_file, '_positions'),
+            (self.trades_file, '_trades'),
+            (self.stats_file, '_stats'),
+        ):
+            if path.exists():
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        setattr(self, attr, json.load(f))
+                    imported = True
+                except Exception as e:
+                    logger.error(f"❌ Failed to import {path}: {e}")
+        if imported:
+            self._write_snapshot()
+            logger.info("✅ Imported legacy JSON state into snapshot")
+            
+    def _append(self, records: List[Dict]) -> None:
+        """Дописать записи в журнал (одна строка на запись) и применить их"""
+        if not records:
+            return
+        lines = []
+        for record in records:
+            self._seq += 1
+            record['seq'] = self._seq
+            lines.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            self._apply(record)
+            
+        if self._journal is None:
+            self._journal = open(self.journal_file, 'a', encoding='utf-8')
+        self._journal.write('\n'.join(lines) + '\n')
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+            
+        self._journal_records += len(records)
+        if self._journal_records >= self.snapshot_every:
+            self._write_snapshot()
+            
+    def _write_snapshot(self) -> None:
+        """Компактный снапшот: tmp + fsync + атомарный rename, затем новый журнал"""
+        tmp = self.snapshot_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'seq': self._seq,
+                'created_at': datetime.now().isoformat(),
+                'positions': self._positions,
+                'trades': self._trades,
+                'statistics': self._stats,
+            }, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_file)
+        # Rename должен пережить сбой питания раньше, чем журнал будет обрезан,
+        # иначе теряются и новый снапшот, и записи журнала
+        _fsync_dir(self.snapshot_file.parent)
+        
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        # Записи журнала уже в снапшоте (seq <= snapshot seq)
+        open(self.journal_file, 'w').close()
+        self._journal_records = 0
+        
+    def compact(self) -> None:
+        """Принудительно записать снапшот и очистить журнал"""
+        with self._lock:
+            self._write_snapshot()
+            
+    def close(self) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+                
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    
     def save_positions(self, positions: Dict) -> bool:
         """
         Сохранить открытые позиции
         
+        В журнал пишутся только изменённые / закрытые позиции.
+        
         Args:
             positions: {symbol: {side, entry_price, amount, ...}}
-        
+            
         Returns:
             True если успешно
         """
         try:
-            # Конвертировать datetime в строки
-            positions_serializable = {}
-            for symbol, pos in positions.items():
-                pos_copy = pos.copy()
-                if 'opened_at' in pos_copy and isinstance(pos_copy['opened_at'], datetime):
-                    pos_copy['opened_at'] = pos_copy['opened_at'].isoformat()
-                positions_serializable[symbol] = pos_copy
-            
-            with open(self.positions_file, 'w', encoding='utf-8') as f:
-                json.dump(positions_serializable, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"✅ Saved {len(positions)} positions to {self.positions_file}")
+            with self._lock:
+                records = []
+                for symbol, pos in positions.items():
+                    pos_copy = _position_record(pos)
+                    if self._positions.get(symbol) != pos_copy:
+                        records.append({'t': 'pos', 'k': symbol, 'v': pos_copy})
+                for symbol in self._positions.keys() - positions.keys():
+                    records.append({'t': 'pos_del', 'k': symbol})
+                self._append(records)
+                
+            logger.info(f"✅ Saved {len(positions)} positions ({len(records)} changes journaled)")
             return True
             
         except Exception as e:
@@ -73,19 +280,19 @@ class StateManager:
             Словарь позиций или пустой dict
         """
         try:
-            if not self.positions_file.exists():
-                logger.info("No positions file found, starting fresh")
+            with self._lock:
+                positions = {symbol: dict(pos) for symbol, pos in self._positions.items()}
+                
+            if not positions:
+                logger.info("No saved positions, starting fresh")
                 return {}
-            
-            with open(self.positions_file, 'r', encoding='utf-8') as f:
-                positions = json.load(f)
-            
+                
             # Конвертировать строки обратно в datetime
             for symbol, pos in positions.items():
                 if 'opened_at' in pos and isinstance(pos['opened_at'], str):
                     pos['opened_at'] = datetime.fromisoformat(pos['opened_at'])
-            
-            logger.info(f"✅ Loaded {len(positions)} positions from {self.positions_file}")
+                    
+            logger.info(f"✅ Loaded {len(positions)} positions")
             return positions
             
         except Exception as e:
@@ -96,35 +303,30 @@ class StateManager:
         """
         Сохранить историю сделок
         
+        История append-only: журналируются только сделки после последней
+        сохранённой (O(новых сделок)). Если история изменилась иначе,
+        записывается полная замена.
+        
         Args:
             trades: Список Trade объектов
-        
+            
         Returns:
             True если успешно
         """
         try:
-            # Конвертировать Trade objects в dict
-            trades_serializable = []
-            for trade in trades:
-                trade_dict = {
-                    'symbol': trade.symbol,
-                    'side': trade.side,
-                    'entry_price': trade.entry_price,
-                    'exit_price': trade.exit_price,
-                    'amount': trade.amount,
-                    'entry_fee': trade.entry_fee,
-                    'exit_fee': trade.exit_fee,
-                    'pnl': trade.pnl,
-                    'pnl_pct': trade.pnl_pct,
-                    'opened_at': trade.opened_at.isoformat() if hasattr(trade.opened_at, 'isoformat') else str(trade.opened_at),
-                    'closed_at': trade.closed_at.isoformat() if hasattr(trade.closed_at, 'isoformat') else str(trade.closed_at)
-                }
-                trades_serializable.append(trade_dict)
-            
-            with open(self.trades_file, 'w', encoding='utf-8') as f:
-                json.dump(trades_serializable, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"✅ Saved {len(trades)} trades to {self.trades_file}")
+            with self._lock:
+                saved = len(self._trades)
+                appended = (
+                    len(trades) >= saved
+                    and (saved == 0 or _trade_record(trades[saved - 1]) == self._trades[-1])
+                )
+                if appended:
+                    records = [{'t': 'trade', 'v': _trade_record(t)} for t in trades[saved:]]
+                else:
+                    records = [{'t': 'trades', 'v': [_trade_record(t) for t in trades]}]
+                self._append(records)
+                
+            logger.info(f"✅ Saved {len(trades)} trades ({len(records)} records journaled)")
             return True
             
         except Exception as e:
@@ -138,28 +340,22 @@ class StateManager:
         Returns:
             Список dict с данными сделок
         """
-        try:
-            if not self.trades_file.exists():
-                logger.info("No trades file found, starting fresh")
-                return []
-            
-            with open(self.trades_file, 'r', encoding='utf-8') as f:
-                trades = json.load(f)
-            
-            logger.info(f"✅ Loaded {len(trades)} trades from {self.trades_file}")
-            return trades
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to load trades: {e}")
-            return []
-            
+        with self._lock:
+            trades = [dict(t) for t in self._trades]
+            
+        if not trades:
+            logger.info("No saved trades, starting fresh")
+        else:
+            logger.info(f"✅ Loaded {len(trades)} trades")
+        return trades
+        
     def save_statistics(self, stats: Dict) -> bool:
         """
         Сохранить статистику
         
         Args:
             stats: Словарь со статистикой
-        
+            
         Returns:
             True если успешно
         """
@@ -167,10 +363,10 @@ class StateManager:
             stats_copy = stats.copy()
             stats_copy['last_updated'] = datetime.now().isoformat()
             
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(stats_copy, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"✅ Saved statistics to {self.stats_file}")
+            with self._lock:
+                self._append([{'t': 'stats', 'v': stats_copy}])
+                
+            logger.info("✅ Saved statistics")
             return True
             
         except Exception as e:
@@ -184,21 +380,15 @@ class StateManager:
         Returns:
             Словарь со статистикой или пустой dict
         """
-        try:
-            if not self.stats_file.exists():
-                logger.info("No statistics file found, starting fresh")
-                return {}
-            
-            with open(self.stats_file, 'r', encoding='utf-8') as f:
-                stats = json.load(f)
-            
-            logger.info(f"✅ Loaded statistics from {self.stats_file}")
-            return stats
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to load statistics: {e}")
-            return {}
-            
+        with self._lock:
+            stats = dict(self._stats)
+            
+        if not stats:
+            logger.info("No saved statistics, starting fresh")
+        else:
+            logger.info("✅ Loaded statistics")
+        return stats
+        
     def clear_all(self) -> bool:
         """
         Очистить все сохранённые данные
@@ -207,11 +397,19 @@ class StateManager:
             True если успешно
         """
         try:
-            for file in [self.positions_file, self.trades_file, self.stats_file]:
-                if file.exists():
-                    file.unlink()
-                    logger.info(f"🗑️ Deleted {file}")
-            
+            with self._lock:
+                self.close()
+                for file in [
+                    self.journal_file, self.snapshot_file,
+                    self.positions_file, self.trades_file, self.stats_file
+                ]:
+                    if file.exists():
+                        file.unlink()
+                        logger.info(f"🗑️ Deleted {file}")
+                self._positions, self._trades, self._stats = {}, [], {}
+                self._seq = 0
+                self._journal_records = 0
+                
             logger.info("✅ All state files cleared")
             return True
             
@@ -225,22 +423,23 @@ class StateManager:
         
         Args:
             backup_name: Название бэкапа (default: timestamp)
-        
+            
         Returns:
             True если успешно
         """
         try:
             if backup_name is None:
                 backup_name = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
+                
             backup_dir = self.state_dir / "backups" / backup_name
             backup_dir.mkdir(parents=True, exist_ok=True)
             
             import shutil
-            for file in [self.positions_file, self.trades_file, self.stats_file]:
-                if file.exists():
-                    shutil.copy2(file, backup_dir / file.name)
-            
+            with self._lock:
+                # Снапшот содержит всё состояние - журнал после него пуст
+                self._write_snapshot()
+                shutil.copy2(self.snapshot_file, backup_dir / self.snapshot_file.name)
+                
             logger.info(f"✅ Backup created: {backup_dir}")
             return True
             
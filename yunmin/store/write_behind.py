@@ -0,0 +1,452 @@
+"""
+Write-behind persistence для репозиториев
+
+Горячий путь (торговый поток) только ставит записи в очередь; фоновый
+writer сбрасывает их пачками, одной транзакцией на пачку:
+- задержка ограничена (flush_interval) и размер пачки ограничен (max_batch)
+- ID выдаются сразу при create() (max(id) + 1), поэтому position.id можно
+  использовать до записи в БД (например, для trade.position_id)
+- несброшенные записи видны репозиториям этого же writer'а (overlay)
+- flush() - барьер: True только если все ранее поставленные записи
+  закоммичены
+- временные ошибки БД (OperationalError: lock, disk full) не теряют записи:
+  пачка возвращается в начало очереди (и остаётся в overlay) и повторяется
+  с экспоненциальной задержкой; отбрасываются только операции, которые
+  сама БД отвергает (IntegrityError и т.п.)
+- stop() / atexit сбрасывают очередь перед выходом
+
+Предполагается один процесс-писатель на БД (ID выдаются локально).
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from collections import deque
+import atexit
+import threading
+import time
+
+from sqlalchemy import create_engine, func, select, insert, update, delete
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+from loguru import logger
+
+from .database import get_engine
+
+
+_INSERT = 'insert'
+_UPDATE = 'update'
+_DELETE = 'delete'
+
+
+def _column_values(obj: Any, columns: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Column values of a mapped object (all columns by default)."""
+    mapper = sa_inspect(type(obj))
+    names = columns if columns is not None else [attr.key for attr in mapper.column_attrs]
+    return {name: getattr(obj, name) for name in names}
+
+
+def _apply_defaults(obj: Any) -> None:
+    """Fill Python-side column defaults the ORM would apply on INSERT."""
+    for attr in sa_inspect(type(obj)).column_attrs:
+        column = attr.columns[0]
+        if getattr(obj, attr.key) is None and column.default is not None and not column.primary_key:
+            default = column.default
+            if default.is_scalar:
+                setattr(obj, attr.key, default.arg)
+            elif default.is_callable:
+                setattr(obj, attr.key, default.arg(None))
+
+
+def _writer_engine(engine):
+    """
+    Engine with a connection of the writer's own.
+
+    StaticPool hands every user the same DBAPI connection, so a session
+    rollback on the trading thread would roll back a batch in flight.
+    Returns None for in-memory SQLite (no second connection possible).
+    """
+    url = engine.url
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return None
+        if isinstance(engine.pool, StaticPool):
+            return create_engine(url, connect_args={'check_same_thread': False})
+    return engine
+
+
+class WriteBehindWriter:
+    """
+    Фоновый batched writer для ORM-объектов
+
+    Usage:
+        writer = WriteBehindWriter(flush_interval=0.2).start()
+        repo = PositionRepository(session, writer=writer)
+        position = repo.create(...)     # в очереди, position.id уже известен
+        writer.flush()                  # дождаться коммита (опционально)
+        writer.stop()                   # сбросить всё и остановить поток
+    """
+
+    def __init__(
+        self,
+        engine=None,
+        flush_interval: float = 0.2,
+        max_batch: int = 500,
+        max_pending: int = 10_000,
+        max_retries: int = 5,
+        max_backoff: float = 5.0
+    ):
+        """
+        Args:
+            engine: SQLAlchemy engine (default: get_engine())
+            flush_interval: Макс. задержка записи, секунды
+            max_batch: Макс. операций в одной транзакции
+            max_pending: Предел очереди; create() блокируется при переполнении
+            max_retries: Повторы пачки перед поштучной записью
+            max_backoff: Макс. пауза между повторами при недоступной БД, секунды
+        """
+        source = engine or get_engine()
+        self.engine = _writer_engine(source)
+        # In-memory SQLite: писать синхронно в потоке вызывающего
+        self.inline = self.engine is None
+        if self.inline:
+            self.engine = source
+            logger.warning("Write-behind disabled for in-memory SQLite - writes are committed inline")
+
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+
+        # lock защищает очередь и overlay; коммит пачки идёт без него,
+        # поэтому горячий путь не ждёт fsync
+        self.lock = threading.RLock()
+        self._wakeup = threading.Condition(self.lock)
+        self._queue: deque = deque()
+        self._overlay: Dict[Tuple[str, int], Tuple[int, str, Any]] = {}
+        self._next_ids: Dict[str, int] = {}
+        self._seq = 0
+        self._committed_seq = 0
+        self._flush_waiters = 0
+        self._write_lock = threading.Lock()  # один писатель за раз
+        # БД временно недоступна: голова очереди ждёт до _retry_at
+        self._retry_at = 0.0
+        self._backoff = 0.0
+        self._dropped_seqs: List[int] = []
+
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Статистика
+        self.batches = 0
+        self.ops_written = 0
+        self.failed_ops: List[Tuple[str, Any]] = []
+        self.requeued_batches = 0
+        self.max_commit_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "WriteBehindWriter":
+        if self._thread is None and not self.inline:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+            logger.info(
+                f"💾 Write-behind writer started "
+                f"(interval={self.flush_interval * 1000:.0f}ms, batch={self.max_batch})"
+            )
+        return self
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """Сбросить очередь и остановить фоновый поток."""
+        if self._thread is None:
+            self.flush()
+            return
+        if not self.flush(timeout=timeout):
+            logger.error(f"❌ Write-behind stopped with {len(self._queue)} unwritten operations")
+        with self.lock:
+            self._running = False
+            self._wakeup.notify_all()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        atexit.unregister(self.stop)
+        logger.info(f"💾 Write-behind writer stopped ({self.ops_written} ops in {self.batches} batches)")
+
+    def __enter__(self) -> "WriteBehindWriter":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Hot path
+    # ------------------------------------------------------------------
+
+    def _allocate_id(self, table) -> int:
+        name = table.name
+        if name not in self._next_ids:
+            with self.engine.connect() as conn:
+                current = conn.execute(select(func.max(table.c.id))).scalar()
+            self._next_ids[name] = (current or 0) + 1
+        value = self._next_ids[name]
+        self._next_ids[name] += 1
+        return value
+
+    def _enqueue(self, kind: str, obj: Any, values: Dict[str, Any]) -> None:
+        table = sa_inspect(type(obj)).local_table
+        with self.lock:
+            while len(self._queue) >= self.max_pending and self._running:
+                self._wakeup.wait(0.05)  # backpressure
+            self._seq += 1
+            self._queue.append((self._seq, kind, table, values))
+            self._overlay[(table.name, obj.id)] = (self._seq, kind, obj)
+            if len(self._queue) == 1 or len(self._queue) >= self.max_batch:
+                self._wakeup.notify_all()
+        if self.inline:
+            self._drain()
+
+    def insert(self, obj: Any) -> Any:
+        """Поставить INSERT в очередь; присваивает obj.id сразу."""
+        table = sa_inspect(type(obj)).local_table
+        with self.lock:
+            if obj.id is None:
+                obj.id = self._allocate_id(table)
+            _apply_defaults(obj)
+        self._enqueue(_INSERT, obj, _column_values(obj))
+        return obj
+
+    def update(self, obj: Any, columns: Iterable[str]) -> Any:
+        """Поставить UPDATE изменённых колонок в очередь."""
+        self._enqueue(_UPDATE, obj, _column_values(obj, ['id', *columns]))
+        return obj
+
+    def delete(self, obj: Any) -> None:
+        """Поставить DELETE в очередь."""
+        self._enqueue(_DELETE, obj, {'id': obj.id})
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Дождаться коммита всех поставленных операций.
+
+        Returns:
+            False если что-то из поставленного не записано: таймаут, БД
+            недоступна (без timeout - сразу при первой неудачной попытке;
+            записи остаются в очереди) или операция отвергнута БД
+        """
+        with self.lock:
+            start = self._committed_seq
+            target = self._seq
+
+        if self._thread is None:
+            self._drain()
+            return self._written_through(start, target)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            self._flush_waiters += 1
+            self._wakeup.notify_all()
+            try:
+                while self._committed_seq < target:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    if remaining is None and self._retry_at:
+                        return False  # БД недоступна - не ждать бесконечно
+                    self._wakeup.wait(0.1 if remaining is None else min(remaining, 0.1))
+            finally:
+                self._flush_waiters -= 1
+            return self._written_through(start, target)
+
+    def _written_through(self, start: int, target: int) -> bool:
+        """All operations in (start, target] committed (none queued or dropped)."""
+        with self.lock:
+            if self._committed_seq < target:
+                return False
+            return not any(start < seq <= target for seq in self._dropped_seqs)
+
+    # ------------------------------------------------------------------
+    # Read-your-writes
+    # ------------------------------------------------------------------
+
+    def pending(self, model: Any) -> Dict[int, Optional[Any]]:
+        """
+        Snapshot of unflushed rows of a model: id -> obj (None = deleted).
+
+        Take the snapshot BEFORE querying the DB: a batch is removed from the
+        overlay only after its commit, so snapshot + later query never miss a
+        row, and merging by id (snapshot wins) never counts one twice.
+        """
+        table_name = model.__table__.name
+        with self.lock:
+            return {
+                obj_id: (None if kind == _DELETE else obj)
+                for (name, obj_id), (_, kind, obj) in self._overlay.items()
+                if name == table_name
+            }
+
+    @staticmethod
+    def merge(
+        pending: Dict[int, Optional[Any]],
+        rows: List[Any],
+        predicate: Callable[[Any], bool],
+        sort_key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+        limit: Optional[int] = None
+    ) -> List[Any]:
+        """Объединить результат запроса к БД со snapshot'ом pending()."""
+        if not pending:
+            return rows
+        merged = [row for row in rows if row.id not in pending]
+        merged.extend(obj for obj in pending.values() if obj is not None and predicate(obj))
+        if sort_key is not None:
+            merged.sort(key=sort_key, reverse=reverse)
+        return merged[:limit] if limit is not None else merged
+
+    # ------------------------------------------------------------------
+    # Background writer
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            with self.lock:
+                while self._running and not self._queue:
+                    self._wakeup.wait()
+                if not self._running and not self._queue:
+                    return
+                # После временной ошибки - выждать backoff
+                while time.monotonic() < self._retry_at:
+                    self._wakeup.wait(self._retry_at - time.monotonic())
+                # Копим пачку не дольше flush_interval от первой операции
+                deadline = time.monotonic() + self.flush_interval
+                while (
+                    self._running
+                    and not self._flush_waiters
+                    and len(self._queue) < self.max_batch
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+            self._drain()
+
+    def _drain(self) -> None:
+        """Write everything queued so far."""
+        with self._write_lock:
+            while True:
+                with self.lock:
+                    if not self._queue or time.monotonic() < self._retry_at:
+                        return
+                    batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+                    self._wakeup.notify_all()  # место в очереди освободилось
+
+                requeue = self._write_batch(batch)
+                written = batch[:len(batch) - len(requeue)]
+
+                with self.lock:
+                    if written:
+                        last_seq = written[-1][0]
+                        for _, _, table, values in written:
+                            key = (table.name, values['id'])
+                            entry = self._overlay.get(key)
+                            if entry is not None and entry[0] <= last_seq:
+                                del self._overlay[key]
+                        self._committed_seq = last_seq
+                    if requeue:
+                        # Вернуть в начало очереди (порядок сохраняется), overlay не трогаем
+                        self._queue.extendleft(reversed(requeue))
+                        self._backoff = min(max(self._backoff * 2, 0.1), self.max_backoff)
+                        self._retry_at = time.monotonic() + self._backoff
+                        self.requeued_batches += 1
+                    else:
+                        self._backoff = 0.0
+                        self._retry_at = 0.0
+                    self._wakeup.notify_all()
+                if requeue:
+                    return
+
+    @staticmethod
+    def _statements(batch: List[tuple]) -> List[tuple]:
+        """Group consecutive same-table inserts into one executemany."""
+        statements = []
+        for _, kind, table, values in batch:
+            if kind == _INSERT:
+                if statements and statements[-1][0] == _INSERT and statements[-1][1] is table:
+                    statements[-1][2].append(values)
+                else:
+                    statements.append((_INSERT, table, [values]))
+            else:
+                statements.append((kind, table, values))
+        return statements
+
+    @staticmethod
+    def _execute(conn, kind: str, table, values) -> None:
+        if kind == _INSERT:
+            conn.execute(insert(table), values)
+        elif kind == _UPDATE:
+            changes = {k: v for k, v in values.items() if k != 'id'}
+            conn.execute(update(table).where(table.c.id == values['id']).values(**changes))
+        else:
+            conn.execute(delete(table).where(table.c.id == values['id']))
+
+    def _write_batch(self, batch: List[tuple]) -> List[tuple]:
+        """
+        Commit a batch.
+
+        Returns:
+            Unwritten tail of the batch to requeue (БД временно недоступна)
+        """
+        statements = self._statements(batch)
+        error: Optional[Exception] = None
+        for attempt in range(self.max_retries):
+            started = time.perf_counter()
+            try:
+                with self.engine.begin() as conn:
+                    for kind, table, values in statements:
+                        self._execute(conn, kind, table, values)
+                self.max_commit_ms = max(self.max_commit_ms, (time.perf_counter() - started) * 1000)
+                self.batches += 1
+                self.ops_written += len(batch)
+                return []
+            except Exception as e:
+                error = e
+                logger.warning(f"Write-behind batch failed (attempt {attempt + 1}/{self.max_retries}): {e}")
+                time.sleep(min(0.05 * 2 ** attempt, 1.0))
+
+        if isinstance(error, OperationalError):
+            # lock / disk full / нет соединения: ничего не записано, повторить позже
+            logger.error(f"❌ Write-behind: database unavailable, {len(batch)} operations requeued: {error}")
+            return batch
+
+        # Пачка не проходит - писать поштучно, чтобы изолировать плохую операцию
+        for position, (seq, kind, table, values) in enumerate(batch):
+            try:
+                with self.engine.begin() as conn:
+                    self._execute(conn, kind, table, [values] if kind == _INSERT else values)
+                self.ops_written += 1
+            except OperationalError as e:
+                logger.error(f"❌ Write-behind: database unavailable, {len(batch) - position} operations requeued: {e}")
+                self.batches += 1
+                return batch[position:]
+            except Exception as e:
+                # Операцию отвергла сама БД - повтор не поможет
+                self.failed_ops.append((kind, values))
+                self._dropped_seqs.append(seq)
+                logger.error(f"❌ Write-behind {kind} into {table.name} dropped: {e}")
+        self.batches += 1
+        return []
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'pending': len(self._queue),
+                'overlay': len(self._overlay),
+                'batches': self.batches,
+                'ops_written': self.ops_written,
+                'failed_ops': len(self.failed_ops),
+                'requeued_batches': self.requeued_batches,
+                'retrying': self._retry_at > 0,
+                'max_commit_ms': self.max_commit_ms,
+            }
@@ -18,6 +18,7 @@ from loguru import logger
 
 from yunmin.strategy.base import BaseStrategy, Signal, SignalType
 from yunmin.llm.openai_analyzer import OpenAIAnalyzer
+from yunmin.llm.model_router import ModelRouter
 
 
 class DualBrainTrader(BaseStrategy):
@@ -45,7 +46,8 @@ class DualBrainTrader(BaseStrategy):
         strategic_model: str = "o3-mini",  # or "gpt-5.1"
         tactical_model: str = "gpt-5-mini",
         strategic_interval_minutes: int = 60,  # Раз в час
-        enable_reasoning: bool = True
+        enable_reasoning: bool = True,
+        router: Optional[ModelRouter] = None
     ):
         """
         Инициализация двухмозговой системы.
@@ -55,12 +57,14 @@ class DualBrainTrader(BaseStrategy):
             tactical_model: Модель для оперативных решений (gpt-5-mini)
             strategic_interval_minutes: Как часто обновлять стратегию (30-60 мин)
             enable_reasoning: Показывать рассуждения ИИ
+            router: Общий ModelRouter для обоих мозгов (модель выбирается
+                    по бюджету токенов; стратегия = high-stakes запрос)
         """
         super().__init__("Dual_Brain_AI")
         
         # Создать два "мозга"
-        self.strategic_brain = OpenAIAnalyzer(model=strategic_model)
-        self.tactical_brain = OpenAIAnalyzer(model=tactical_model)
+        self.strategic_brain = OpenAIAnalyzer(model=strategic_model, router=router)
+        self.tactical_brain = OpenAIAnalyzer(model=tactical_model, router=router)
         
         self.strategic_interval = timedelta(minutes=strategic_interval_minutes)
         self.enable_reasoning = enable_reasoning
@@ -166,12 +170,14 @@ CONFIDENCE: [0-100]%
             'context': strategic_prompt,
             'price': current_price,
             'trend': 'analyzing',
-            'volume': {'ratio': current_volume / avg_volume}
+            'volume': {'ratio': current_volume / avg_volume},
+            'high_stakes': True
         })
         
         # Извлечь стратегию из ответа
         if isinstance(response, dict):
-            reasoning_text = response.get('reasoning', str(response))
+            # Full reply: 'reasoning' is cut down to the REASONING: line
+            reasoning_text = response.get('raw_response') or response.get('reasoning', str(response))
         else:
             reasoning_text = str(response)
         
@@ -290,7 +296,8 @@ ENTRY_PRICE: ${current_price:,.2f}
         
         # Парсинг решения
         if isinstance(response, dict):
-            reasoning_text = response.get('reasoning', str(response))
+            # Full reply: 'reasoning' is cut down to the REASONING: line
+            reasoning_text = response.get('raw_response') or response.get('reasoning', str(response))
         else:
             reasoning_text = str(response)
         
@@ -0,0 +1,238 @@
+"""
+Prompt Compiler - Compact, token-efficient prompts for AI strategies
+
+Снимок рынка считается векторно (numpy) за один проход по последним N свечам,
+а промпт рендерится в компактный шаблон с постоянной инструкцией.
+Каждый скомпилированный промпт несёт оценку числа токенов.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # tiktoken is optional
+    _ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count prompt tokens (tiktoken if installed, otherwise ~4 UTF-8 bytes per token).
+    """
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+def find_pivot_levels(values: np.ndarray, window: int = 5, mode: str = "max") -> np.ndarray:
+    """
+    Find local extrema that are the max/min of a centred (2*window+1) window.
+
+    Args:
+        values: 1-D price array (highs for resistance, lows for support)
+        window: Candles on each side
+        mode: 'max' or 'min'
+
+    Returns:
+        Unique levels sorted ascending
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2 * window + 1:
+        return np.empty(0)
+
+    windows = sliding_window_view(values, 2 * window + 1)
+    extreme = windows.max(axis=1) if mode == "max" else windows.min(axis=1)
+    centre = values[window:len(values) - window]
+    return np.unique(centre[centre == extreme])
+
+
+TREND_LABELS = {
+    "strong_up": "📈 Strong Uptrend",
+    "up": "🟢 Uptrend",
+    "strong_down": "📉 Strong Downtrend",
+    "down": "🔴 Downtrend",
+    "sideways": "↔️  Sideways / Consolidation",
+}
+
+
+def detect_trend(closes: np.ndarray, window: int = 20) -> str:
+    """Trend key by share of rising closes over the last `window` candles."""
+    rising = int(np.count_nonzero(np.diff(closes[-window:]) > 0))
+    if rising >= 14:  # 70%+ ростущих
+        return "strong_up"
+    if rising >= 11:  # 55%+ ростущих
+        return "up"
+    if rising <= 6:  # 30%- ростущих
+        return "strong_down"
+    if rising <= 9:  # 45%- ростущих
+        return "down"
+    return "sideways"
+
+
+def _pct_change(current: float, past: float) -> float:
+    return (current - past) / past * 100 if past else 0.0
+
+
+def compute_snapshot_features(
+    df: pd.DataFrame,
+    lookback: int = 100,
+    symbol: str = "BTC/USDT",
+    timeframe: str = "5m",
+    n_candles: int = 10,
+    pivot_window: int = 5,
+) -> Dict[str, Any]:
+    """
+    Compute the market snapshot from the last `lookback` candles.
+
+    Reads each OHLCV column once as a numpy array; no per-row pandas access.
+
+    Returns:
+        Snapshot dict (same schema as PureAIAgent._prepare_market_snapshot)
+    """
+    recent = df.tail(lookback)
+    opens = recent["open"].to_numpy(dtype=float)
+    highs = recent["high"].to_numpy(dtype=float)
+    lows = recent["low"].to_numpy(dtype=float)
+    closes = recent["close"].to_numpy(dtype=float)
+    volumes = recent["volume"].to_numpy(dtype=float)
+
+    current_price = closes[-1]
+    high_24h = highs.max()
+    low_24h = lows.min()
+
+    returns = closes[1:] / closes[:-1] - 1
+    volatility = returns.std(ddof=1) * 100 if len(returns) > 1 else 0.0
+
+    avg_volume = volumes.mean()
+    current_volume = volumes[-1]
+    volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1.0
+
+    resistance = find_pivot_levels(highs, pivot_window, "max")[::-1]
+    support = find_pivot_levels(lows, pivot_window, "min")
+
+    trend_key = detect_trend(closes)
+
+    # Последние N свечей
+    tail = slice(-n_candles, None)
+    if "timestamp" in recent.columns:
+        times = recent["timestamp"].iloc[tail].astype(str).tolist()
+    else:
+        times = [f"T{i}" for i in range(-min(n_candles, len(recent)), 0)]
+    o, h, l, c = (np.round(a[tail], 2) for a in (opens, highs, lows, closes))
+    bullish = closes[tail] > opens[tail]
+    bodies = np.round(np.abs(closes[tail] - opens[tail]), 2)
+    last_candles = [
+        {
+            'time': times[k],
+            'open': float(o[k]),
+            'high': float(h[k]),
+            'low': float(l[k]),
+            'close': float(c[k]),
+            'type': "🟢 Bullish" if bullish[k] else "🔴 Bearish",
+            'body_size': float(bodies[k]),
+        }
+        for k in range(len(c))
+    ]
+
+    return {
+        'timestamp': pd.Timestamp.now().isoformat(),
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'current_price': round(float(current_price), 2),
+        'price_change': {
+            '1h': round(_pct_change(current_price, closes[-12]), 2) if len(closes) >= 12 else 0.0,
+            '4h': round(_pct_change(current_price, closes[-48]), 2) if len(closes) >= 48 else 0.0,
+            '24h': round(_pct_change(current_price, closes[0]), 2),
+        },
+        'range_24h': {
+            'high': round(float(high_24h), 2),
+            'low': round(float(low_24h), 2),
+            'range_pct': round((high_24h - low_24h) / low_24h * 100, 2) if low_24h else 0.0,
+        },
+        'volatility_pct': round(float(volatility), 2),
+        'volume': {
+            'current': int(current_volume),
+            'average': int(avg_volume),
+            'ratio': round(float(volume_ratio), 2),
+            'activity': 'High' if volume_ratio > 1.5 else 'Normal' if volume_ratio > 0.8 else 'Low',
+        },
+        'key_levels': {
+            'resistance': [round(float(r), 2) for r in resistance[:3]],
+            'support': [round(float(s), 2) for s in support[:3]],
+        },
+        'trend': TREND_LABELS[trend_key],
+        'trend_key': trend_key,
+        'last_10_candles': last_candles,
+    }
+
+
+@dataclass
+class CompiledPrompt:
+    """Rendered prompt with its token count."""
+    text: str
+    tokens: int
+    instruction_tokens: int
+
+
+class PromptCompiler:
+    """
+    Render market snapshots into a compact prompt.
+
+    The instruction block is constant and counted once; only the data block
+    changes per decision.
+    """
+
+    INSTRUCTIONS = (
+        "Crypto futures trader. Decide BUY (long), SELL (short) or HOLD from the data. "
+        "If unsure, HOLD.\n"
+        "Reply exactly:\n"
+        "DECISION: BUY|SELL|HOLD\n"
+        "CONFIDENCE: 0-100%\n"
+        "REASONING: 1-2 sentences\n"
+        "ENTRY_PRICE: <price>\n"
+        "STOP_LOSS: <price>\n"
+        "TAKE_PROFIT: <price>"
+    )
+
+    def __init__(self, instructions: Optional[str] = None):
+        self.instructions = instructions or self.INSTRUCTIONS
+        self.instruction_tokens = count_tokens(self.instructions)
+
+    @staticmethod
+    def render_data(snapshot: Dict[str, Any]) -> str:
+        """Render the per-decision data block."""
+        chg = snapshot['price_change']
+        rng = snapshot['range_24h']
+        vol = snapshot['volume']
+        levels = snapshot['key_levels']
+        trend = snapshot.get('trend_key', snapshot['trend'])
+
+        lines = [
+            f"{snapshot['symbol']} {snapshot['timeframe']} px={snapshot['current_price']:.2f}",
+            f"chg% 1h={chg['1h']:+.2f} 4h={chg['4h']:+.2f} 24h={chg['24h']:+.2f}",
+            f"range H={rng['high']:.2f} L={rng['low']:.2f} ({rng['range_pct']:.2f}%) "
+            f"volat%={snapshot['volatility_pct']:.2f}",
+            f"vol x{vol['ratio']:.2f} {vol['activity']} trend={trend}",
+            f"R={','.join(f'{x:.2f}' for x in levels['resistance']) or '-'} "
+            f"S={','.join(f'{x:.2f}' for x in levels['support']) or '-'}",
+            "candles o,h,l,c (old->new):",
+        ]
+        lines.extend(
+            f"{c['open']:.2f},{c['high']:.2f},{c['low']:.2f},{c['close']:.2f}"
+            for c in snapshot['last_10_candles']
+        )
+        return "\n".join(lines)
+
+    def compile(self, snapshot: Dict[str, Any]) -> CompiledPrompt:
+        """Render instructions + data and count tokens."""
+        text = f"{self.instructions}\n\n{self.render_data(snapshot)}"
+        return CompiledPrompt(
+            text=text,
+            tokens=count_tokens(text),
+            instruction_tokens=self.instruction_tokens,
+        )
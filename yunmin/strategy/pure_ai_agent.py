@@ -17,6 +17,14 @@ from loguru import logger
 from datetime import datetime
 
 from yunmin.strategy.base import BaseStrategy, Signal, SignalType
+from yunmin.strategy.prompt_compiler import (
+    TREND_LABELS,
+    PromptCompiler,
+    compute_snapshot_features,
+    count_tokens,
+    detect_trend,
+    find_pivot_levels,
+)
 
 
 class PureAIAgent(BaseStrategy):
@@ -42,7 +50,8 @@ class PureAIAgent(BaseStrategy):
         lookback_candles: int = 100,
         max_response_tokens: int = 800,
         temperature: float = 0.3,  # Низкая = более консервативный
-        enable_reasoning: bool = True  # Показывать цепочку рассуждений
+        enable_reasoning: bool = True,  # Показывать цепочку рассуждений
+        compact_prompt: bool = True  # Компактный шаблон вместо прозы
     ):
         """
         Инициализация Pure AI Agent.
@@ -53,6 +62,8 @@ class PureAIAgent(BaseStrategy):
             max_response_tokens: Макс. токенов для ответа ИИ
             temperature: 0.0-1.0, насколько креативен ИИ (0.3 = консервативный)
             enable_reasoning: Включить подробные рассуждения ИИ
+            compact_prompt: Компактный токен-эффективный промпт (False = старый
+                            развёрнутый промпт на русском)
         """
         super().__init__("Pure_AI_Agent")
         
@@ -61,9 +72,13 @@ class PureAIAgent(BaseStrategy):
         self.max_tokens = max_response_tokens
         self.temperature = temperature
         self.enable_reasoning = enable_reasoning
+        self.compact_prompt = compact_prompt
+        self.prompt_compiler = PromptCompiler()
         
         # Счётчики для статистики
         self.decisions_made = 0
+        self.prompt_tokens_total = 0
+        self.last_prompt_tokens = 0
         self.ai_reasoning_history = []
         
         if not self.llm or not self.llm.enabled:
@@ -86,131 +101,43 @@ class PureAIAgent(BaseStrategy):
         - Волатильность
         - Тренд и импульс
         - Объём и ликвидность
-        """
-        # Взять последние N свечей
-        recent_data = df.tail(self.lookback_candles).copy()
-        
-        # Текущие значения
-        current_price = recent_data['close'].iloc[-1]
-        open_price = recent_data['open'].iloc[-1]
-        high_24h = recent_data['high'].max()
-        low_24h = recent_data['low'].min()
-        
-        # Изменение цены
-        price_change_1h = ((current_price - recent_data['close'].iloc[-12]) / recent_data['close'].iloc[-12]) * 100
-        price_change_4h = ((current_price - recent_data['close'].iloc[-48]) / recent_data['close'].iloc[-48]) * 100
-        price_change_24h = ((current_price - recent_data['close'].iloc[0]) / recent_data['close'].iloc[0]) * 100
-        
-        # Волатильность (стандартное отклонение)
-        volatility = recent_data['close'].pct_change().std() * 100
-        
-        # Уровни поддержки/сопротивления (локальные экстремумы)
-        resistance_levels = self._find_resistance_levels(recent_data)
-        support_levels = self._find_support_levels(recent_data)
-        
-        # Объём
-        avg_volume = recent_data['volume'].mean()
-        current_volume = recent_data['volume'].iloc[-1]
-        volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1.0
-        
-        # Направление тренда (простой анализ)
-        trend_direction = self._detect_simple_trend(recent_data)
         
-        # Последние 10 свечей для паттернов
-        last_10_candles = []
-        for i in range(-10, 0):
-            candle = recent_data.iloc[i]
-            candle_type = "🟢 Bullish" if candle['close'] > candle['open'] else "🔴 Bearish"
-            candle_size = abs(candle['close'] - candle['open'])
-            last_10_candles.append({
-                'time': str(candle.get('timestamp', f"T{i}")),
-                'open': round(candle['open'], 2),
-                'high': round(candle['high'], 2),
-                'low': round(candle['low'], 2),
-                'close': round(candle['close'], 2),
-                'type': candle_type,
-                'body_size': round(candle_size, 2)
-            })
-        
-        return {
-            'timestamp': datetime.now().isoformat(),
-            'symbol': 'BTC/USDT',
-            'timeframe': '5m',
-            'current_price': round(current_price, 2),
-            'price_change': {
-                '1h': round(price_change_1h, 2),
-                '4h': round(price_change_4h, 2),
-                '24h': round(price_change_24h, 2)
-            },
-            'range_24h': {
-                'high': round(high_24h, 2),
-                'low': round(low_24h, 2),
-                'range_pct': round((high_24h - low_24h) / low_24h * 100, 2)
-            },
-            'volatility_pct': round(volatility, 2),
-            'volume': {
-                'current': int(current_volume),
-                'average': int(avg_volume),
-                'ratio': round(volume_ratio, 2),
-                'activity': 'High' if volume_ratio > 1.5 else 'Normal' if volume_ratio > 0.8 else 'Low'
-            },
-            'key_levels': {
-                'resistance': [round(r, 2) for r in resistance_levels[:3]],
-                'support': [round(s, 2) for s in support_levels[:3]]
-            },
-            'trend': trend_direction,
-            'last_10_candles': last_10_candles
-        }
+        Все признаки считаются векторно (см. prompt_compiler.compute_snapshot_features).
+        """
+        return compute_snapshot_features(df, lookback=self.lookback_candles)
     
     def _find_resistance_levels(self, df: pd.DataFrame) -> list:
         """Найти уровни сопротивления (локальные максимумы)."""
-        highs = df['high'].values
-        resistance = []
-        
-        for i in range(5, len(highs) - 5):
-            if highs[i] == max(highs[i-5:i+6]):
-                resistance.append(highs[i])
-        
-        # Сгруппировать близкие уровни
-        resistance = sorted(set(resistance), reverse=True)
-        return resistance
+        return find_pivot_levels(df['high'].to_numpy(), mode='max')[::-1].tolist()
     
     def _find_support_levels(self, df: pd.DataFrame) -> list:
         """Найти уровни поддержки (локальные минимумы)."""
-        lows = df['low'].values
-        support = []
-        
-        for i in range(5, len(lows) - 5):
-            if lows[i] == min(lows[i-5:i+6]):
-                support.append(lows[i])
-        
-        # Сгруппировать близкие уровни
-        support = sorted(set(support))
-        return support
+        return find_pivot_levels(df['low'].to_numpy(), mode='min').tolist()
     
     def _detect_simple_trend(self, df: pd.DataFrame) -> str:
         """Определить направление тренда (простой метод)."""
-        recent = df.tail(20)
-        
-        # Посчитать, сколько свечей закрылись выше/ниже
-        closes = recent['close'].values
-        highs_count = sum(1 for i in range(1, len(closes)) if closes[i] > closes[i-1])
-        
-        if highs_count >= 14:  # 70%+ ростущих
-            return "📈 Strong Uptrend"
-        elif highs_count >= 11:  # 55%+ ростущих
-            return "🟢 Uptrend"
-        elif highs_count <= 6:  # 30%- ростущих
-            return "📉 Strong Downtrend"
-        elif highs_count <= 9:  # 45%- ростущих
-            return "🔴 Downtrend"
-        else:
-            return "↔️  Sideways / Consolidation"
+        return TREND_LABELS[detect_trend(df['close'].to_numpy())]
     
     def _build_ai_prompt(self, market_snapshot: Dict[str, Any]) -> str:
         """
         Построить промпт для ИИ-агента.
         
+        По умолчанию - компактный шаблон PromptCompiler; число токенов
+        сохраняется в self.last_prompt_tokens.
+        """
+        if self.compact_prompt:
+            compiled = self.prompt_compiler.compile(market_snapshot)
+            self.last_prompt_tokens = compiled.tokens
+            return compiled.text
+        
+        prompt = self._build_verbose_prompt(market_snapshot)
+        self.last_prompt_tokens = count_tokens(prompt)
+        return prompt
+    
+    def _build_verbose_prompt(self, market_snapshot: Dict[str, Any]) -> str:
+        """
+        Развёрнутый промпт на русском (до PromptCompiler).
+        
         Промпт объясняет ИИ его роль и даёт полный контекст рынка.
         """
         prompt = f"""Вы — профессиональный криптовалютный трейдер с опытом торговли фьючерсами.
@@ -391,13 +318,12 @@ TAKE_PROFIT: [Целевая цена]
             ai_prompt = self._build_ai_prompt(market_snapshot)
             
             if self.enable_reasoning:
-                logger.info(f"📝 AI Prompt preview:\n{ai_prompt[:300]}...")
+                logger.info(f"📝 AI Prompt (~{self.last_prompt_tokens} tokens) preview:\n{ai_prompt[:300]}...")
             
             # 3. Спросить ИИ
             logger.info(f"🤖 Asking AI: What should we do at ${market_snapshot['current_price']:,.2f}?")
             
-            # Для OpenAI используем analyze_market вместо analyze_text
-            # Преобразуем prompt в market_data формат
+            # Скомпилированный промпт уходит в модель как 'context'
             ai_response_data = self.llm.analyze_market({
                 'context': ai_prompt,
                 'price': market_snapshot['current_price'],
@@ -405,8 +331,16 @@ TAKE_PROFIT: [Целевая цена]
                 'volume': market_snapshot['volume']
             })
             
-            # Если вернулся словарь с полями signal/confidence/reasoning
-            if isinstance(ai_response_data, dict) and 'signal' in ai_response_data:
+            # Реальное число токенов промпта из usage, если API его вернул
+            if isinstance(ai_response_data, dict) and ai_response_data.get('prompt_tokens'):
+                self.last_prompt_tokens = ai_response_data['prompt_tokens']
+            self.prompt_tokens_total += self.last_prompt_tokens
+            
+            if isinstance(ai_response_data, dict) and ai_response_data.get('raw_response'):
+                # Ответ в формате промпта (DECISION/CONFIDENCE/.../TAKE_PROFIT)
+                ai_response = ai_response_data['raw_response']
+            elif isinstance(ai_response_data, dict) and 'signal' in ai_response_data:
+                # Если вернулся словарь с полями signal/confidence/reasoning
                 # Преобразовать в текстовый формат для парсинга
                 ai_response = f"""DECISION: {ai_response_data['signal']}
 CONFIDENCE: {int(ai_response_data['confidence'] * 100)}%
@@ -435,7 +369,8 @@ ENTRY_PRICE: {market_snapshot['current_price']}
                 'price': market_snapshot['current_price'],
                 'decision': signal.type.value,
                 'confidence': signal.confidence,
-                'reasoning': signal.reason
+                'reasoning': signal.reason,
+                'prompt_tokens': self.last_prompt_tokens
             })
             
             # Ограничить историю последними 100 решениями
@@ -473,5 +408,6 @@ ENTRY_PRICE: {market_snapshot['current_price']}
             'sell_signals': sell_count,
             'hold_signals': hold_count,
             'avg_confidence': round(avg_confidence, 2),
+            'avg_prompt_tokens': round(self.prompt_tokens_total / self.decisions_made, 1) if self.decisions_made else 0,
             'last_decision': self.ai_reasoning_history[-1] if self.ai_reasoning_history else None
         }
@@ -5,19 +5,25 @@ Provides REST API and WebSocket endpoints for real-time monitoring
 
 import asyncio
 import json
+import os
 from datetime import datetime, timedelta, UTC
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from loguru import logger
 
+from yunmin.web.charts import ChartDataService
+from yunmin.web.pubsub import PubSubHub
+from yunmin.web.read_models import create_dashboard_read_models
+from yunmin.web.state_bridge import StateBridgeReader
+
 
 # ===== Data Models =====
 
@@ -129,40 +135,45 @@ class SystemStatus(BaseModel):
 # ===== WebSocket Connection Manager =====
 
 class ConnectionManager:
-    """Manages WebSocket connections for real-time updates"""
+    """Manages WebSocket connections for real-time updates (fan-out via PubSubHub)"""
     
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, hub: Optional[PubSubHub] = None):
+        self.hub = hub or PubSubHub()
     
-    async def connect(self, websocket: WebSocket):
-        """Accept new WebSocket connection"""
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        """Currently subscribed clients"""
+        return list(self.hub.subscribers)
+    
+    async def connect(
+        self,
+        websocket: WebSocket,
+        topics: Optional[List[str]] = None,
+        encoding: str = "json"
+    ):
+        """Accept new WebSocket connection and subscribe it to topics"""
         await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"WebSocket client connected. Total: {len(self.active_connections)}")
+        await self.hub.subscribe(websocket, topics, encoding=encoding)
+        logger.info(f"WebSocket client connected. Total: {len(self.hub.subscribers)}")
     
     def disconnect(self, websocket: WebSocket):
         """Remove WebSocket connection"""
-        self.active_connections.remove(websocket)
-        logger.info(f"WebSocket client disconnected. Total: {len(self.active_connections)}")
+        self.hub.unsubscribe(websocket)
+        logger.info(f"WebSocket client disconnected. Total: {len(self.hub.subscribers)}")
     
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients"""
-        if not self.active_connections:
-            return
-        
-        message_json = json.dumps(message, default=str)
-        disconnected = []
+    async def broadcast(self, message: dict) -> int:
+        """
+        Broadcast message to all clients subscribed to its type.
         
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message_json)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
-        
-        # Clean up disconnected clients
-        for conn in disconnected:
-            self.disconnect(conn)
+        The message is encoded once and queued to every client; per-client
+        sender tasks deliver concurrently with a per-send timeout, so a slow
+        client never delays the others. Returns the number of recipients.
+        """
+        return self.hub.publish(message.get("type", "message"), message)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Fan-out counters and latency percentiles"""
+        return self.hub.get_stats()
 
 
 # ===== Dashboard Data Provider =====
@@ -178,6 +189,8 @@ class DashboardDataProvider:
         self.position_monitor = None
         self.pnl_tracker = None
         self.alert_manager = None
+        self.state_bridge: Optional[StateBridgeReader] = None
+        self.charts = ChartDataService()
     
     def set_portfolio_manager(self, portfolio_manager):
         """Set portfolio manager reference"""
@@ -195,8 +208,26 @@ class DashboardDataProvider:
         """Set alert manager reference"""
         self.alert_manager = alert_manager
     
+    def set_candle_store(self, candle_store, feature_set: str = "technical"):
+        """Set FeatureStore whose raw OHLCV columns back the candle chart"""
+        self.charts.set_candle_store(candle_store, feature_set)
+    
+    def set_state_bridge(self, state_bridge: StateBridgeReader):
+        """Read bot state from shared-memory snapshots (bot runs in another process)"""
+        self.state_bridge = state_bridge
+    
+    def _bridged(self, section: str) -> Any:
+        """Section of the latest bridge snapshot (last known state if the bot stopped)"""
+        if self.state_bridge is None:
+            return None
+        return (self.state_bridge.snapshot() or {}).get(section)
+    
     def get_portfolio_metrics(self) -> PortfolioMetrics:
         """Get current portfolio metrics"""
+        bridged = self._bridged('portfolio')
+        if bridged is not None:
+            return PortfolioMetrics(**bridged)
+        
         # Mock data for now - replace with actual implementation
         if self.portfolio_manager:
             current_equity = getattr(self.portfolio_manager, 'equity', 15000.0)
@@ -223,6 +254,10 @@ class DashboardDataProvider:
     
     def get_open_positions(self) -> List[PositionInfo]:
         """Get list of open positions"""
+        bridged = self._bridged('positions')
+        if bridged is not None:
+            return [PositionInfo(**p) for p in bridged]
+        
         # Mock data - replace with actual implementation
         if self.position_monitor:
             positions = getattr(self.position_monitor, 'positions', {})
@@ -243,11 +278,19 @@ class DashboardDataProvider:
     
     def get_recent_trades(self, limit: int = 10) -> List[TradeInfo]:
         """Get recent completed trades"""
+        bridged = self._bridged('trades')
+        if bridged is not None:
+            return [TradeInfo(**t) for t in bridged[-limit:]] if limit > 0 else []
+        
         # Mock data - replace with actual implementation
         return []
     
     def get_performance_metrics(self) -> PerformanceMetrics:
         """Get performance breakdown"""
+        bridged = self._bridged('performance')
+        if bridged is not None:
+            return PerformanceMetrics(**bridged)
+        
         return PerformanceMetrics(
             daily_pnl=125.50,
             weekly_pnl=450.75,
@@ -275,20 +318,21 @@ class DashboardDataProvider:
             return result
         return []
     
-    def get_equity_curve(self, days: int = 7) -> List[Dict[str, Any]]:
-        """Get equity curve data points"""
-        # Mock data - replace with actual implementation
-        now = datetime.now(UTC)
-        data = []
-        for i in range(days * 24):  # Hourly data
-            timestamp = now - timedelta(hours=days * 24 - i)
-            # Simple mock growth
-            equity = 15000 + (i * 10) + (i % 12 - 6) * 50  # Some variance
-            data.append({
-                "timestamp": timestamp.isoformat(),
-                "equity": equity
-            })
-        return data
+    def get_equity_curve(
+        self,
+        days: int = 7,
+        max_points: int = 500,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Get equity curve from portfolio snapshots (LTTB-downsampled)"""
+        end = end or datetime.now(UTC)
+        start = start or end - timedelta(days=days)
+        try:
+            return self.charts.equity_curve(start, end, max_points=max_points)
+        except RuntimeError as e:  # database not initialized
+            logger.debug(f"Equity curve unavailable: {e}")
+            return []
     
     def get_ai_brain_status(self) -> Dict[str, AIBrainStatus]:
         """Get AI brain status for strategic and tactical brains"""
@@ -368,6 +412,13 @@ class DashboardDataProvider:
     
     def get_system_status(self) -> SystemStatus:
         """Get system status information"""
+        bridged = self._bridged('status')
+        if bridged is not None:
+            if self.state_bridge.age() > self.state_bridge.stale_after:
+                # Bot stopped publishing (crashed or closed the bridge)
+                bridged = {**bridged, 'bot_state': 'STOPPED'}
+            return SystemStatus(**bridged)
+        
         now = datetime.now(UTC)
         
         # Mock data - replace with actual system status
@@ -416,6 +467,61 @@ templates = Jinja2Templates(directory=str(templates_dir))
 # Global data provider and connection manager
 data_provider = DashboardDataProvider()
 ws_manager = ConnectionManager()
+read_models = create_dashboard_read_models(data_provider)
+
+# Upper bound on points per chart response
+MAX_CHART_POINTS = 5000
+
+# Views backed by state bridge sections, rebuilt when a new snapshot arrives
+BRIDGED_VIEWS = ('portfolio', 'positions', 'trades', 'performance', 'status', 'metrics')
+_bridge_generation = -1
+
+# Set by dashboard_server.py --state-bridge / --db-url / --candle-store
+# (inherited by every worker process)
+if os.environ.get("YUNMIN_DASHBOARD_STATE_BRIDGE"):
+    data_provider.set_state_bridge(StateBridgeReader(os.environ["YUNMIN_DASHBOARD_STATE_BRIDGE"]))
+if os.environ.get("YUNMIN_DASHBOARD_DB_URL"):
+    # Equity curve reads portfolio_snapshots; read-only, the bot owns the schema
+    from yunmin.store.database import init_read_db
+    init_read_db(os.environ["YUNMIN_DASHBOARD_DB_URL"])
+if os.environ.get("YUNMIN_DASHBOARD_CANDLE_STORE"):
+    from yunmin.features.store import FeatureStore
+    data_provider.set_candle_store(FeatureStore(root=os.environ["YUNMIN_DASHBOARD_CANDLE_STORE"]))
+
+
+def sync_state_bridge():
+    """Invalidate bridged read models once per new bot snapshot (one header read)"""
+    global _bridge_generation
+    if data_provider.state_bridge is None:
+        return
+    generation = data_provider.state_bridge.generation()
+    if generation != _bridge_generation:
+        _bridge_generation = generation
+        read_models.invalidate(*BRIDGED_VIEWS)
+
+
+def cached_response(request: Request, view_name: str, **params) -> Response:
+    """Serve a materialised read model, honouring If-None-Match / If-Modified-Since"""
+    sync_state_bridge()
+    view = read_models.get(view_name, **params)
+    headers = view.headers()
+    if read_models.not_modified(
+        view,
+        request.headers.get("if-none-match"),
+        request.headers.get("if-modified-since")
+    ):
+        return Response(status_code=304, headers=headers)
+    return Response(content=view.body, media_type="application/json", headers=headers)
+
+
+def notify_dashboard_event(event: str):
+    """
+    Invalidate dashboard read models after a bot event.
+    
+    Args:
+        event: 'fill', 'price', 'alert', 'ai' or 'status'
+    """
+    read_models.on_event(event)
 
 
 # ===== REST API Endpoints =====
@@ -437,132 +543,149 @@ async def health_check():
 
 
 @app.get("/api/portfolio")
-async def get_portfolio():
+async def get_portfolio(request: Request):
     """Get current portfolio metrics"""
     try:
-        metrics = data_provider.get_portfolio_metrics()
-        return JSONResponse(content=metrics.model_dump(mode='json'))
+        return cached_response(request, "portfolio")
     except Exception as e:
         logger.error(f"Error getting portfolio metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/positions")
-async def get_positions():
+async def get_positions(request: Request):
     """Get open positions"""
     try:
-        positions = data_provider.get_open_positions()
-        return JSONResponse(content=[p.model_dump(mode='json') for p in positions])
+        return cached_response(request, "positions")
     except Exception as e:
         logger.error(f"Error getting positions: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/trades")
-async def get_trades(limit: int = 10):
+async def get_trades(request: Request, limit: int = 10):
     """Get recent trades"""
     try:
-        trades = data_provider.get_recent_trades(limit=limit)
-        return JSONResponse(content=[t.model_dump(mode='json') for t in trades])
+        return cached_response(request, "trades", limit=limit)
     except Exception as e:
         logger.error(f"Error getting trades: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/performance")
-async def get_performance():
+async def get_performance(request: Request):
     """Get performance metrics"""
     try:
-        metrics = data_provider.get_performance_metrics()
-        return JSONResponse(content=metrics.model_dump(mode='json'))
+        return cached_response(request, "performance")
     except Exception as e:
         logger.error(f"Error getting performance: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/alerts")
-async def get_alerts(limit: int = 20):
+async def get_alerts(request: Request, limit: int = 20):
     """Get recent alerts"""
     try:
-        alerts = data_provider.get_recent_alerts(limit=limit)
-        return JSONResponse(content=[a.model_dump(mode='json') for a in alerts])
+        return cached_response(request, "alerts", limit=limit)
     except Exception as e:
         logger.error(f"Error getting alerts: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/ai-status")
-async def get_ai_status():
+async def get_ai_status(request: Request):
     """Get AI brain status (strategic and tactical)"""
     try:
-        status = data_provider.get_ai_brain_status()
-        return JSONResponse(content={
-            "strategic": status["strategic"].model_dump(mode='json'),
-            "tactical": status["tactical"].model_dump(mode='json')
-        })
+        return cached_response(request, "ai_status")
     except Exception as e:
         logger.error(f"Error getting AI status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/ai-decisions")
-async def get_ai_decisions(limit: int = 20):
+async def get_ai_decisions(request: Request, limit: int = 20):
     """Get AI decision history"""
     try:
-        decisions = data_provider.get_ai_decision_history(limit=limit)
-        return JSONResponse(content=[d.model_dump(mode='json') for d in decisions])
+        return cached_response(request, "ai_decisions", limit=limit)
     except Exception as e:
         logger.error(f"Error getting AI decisions: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/token-usage")
-async def get_token_usage():
+async def get_token_usage(request: Request):
     """Get OpenAI token usage statistics"""
     try:
-        usage = data_provider.get_token_usage()
-        return JSONResponse(content=usage.model_dump(mode='json'))
+        return cached_response(request, "token_usage")
     except Exception as e:
         logger.error(f"Error getting token usage: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/status")
-async def get_system_status():
+async def get_system_status(request: Request):
     """Get system status"""
     try:
-        status = data_provider.get_system_status()
-        return JSONResponse(content=status.model_dump(mode='json'))
+        return cached_response(request, "status")
     except Exception as e:
         logger.error(f"Error getting system status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/metrics")
-async def get_all_metrics():
+async def get_all_metrics(request: Request):
     """Get all dashboard metrics in a single call"""
     try:
-        return JSONResponse(content={
-            "portfolio": data_provider.get_portfolio_metrics().model_dump(mode='json'),
-            "performance": data_provider.get_performance_metrics().model_dump(mode='json'),
-            "ai_status": {
-                k: v.model_dump(mode='json') 
-                for k, v in data_provider.get_ai_brain_status().items()
-            },
-            "token_usage": data_provider.get_token_usage().model_dump(mode='json'),
-            "system_status": data_provider.get_system_status().model_dump(mode='json'),
-            "positions": [p.model_dump(mode='json') for p in data_provider.get_open_positions()],
-        })
+        return cached_response(request, "metrics")
     except Exception as e:
         logger.error(f"Error getting metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/read-model-stats")
+async def get_read_model_stats():
+    """Read model cache statistics (hits, rebuilds, 304s)"""
+    return JSONResponse(content=read_models.get_stats())
+
+
+@app.get("/api/state-bridge-stats")
+async def get_state_bridge_stats():
+    """State bridge reader statistics (generation, snapshot age, retries)"""
+    if data_provider.state_bridge is None:
+        return JSONResponse(content={"enabled": False})
+    return JSONResponse(content={"enabled": True, **data_provider.state_bridge.get_stats()})
+
+
+@app.get("/api/ws-stats")
+async def get_ws_stats():
+    """WebSocket fan-out statistics (clients, drops, latency percentiles)"""
+    return JSONResponse(content=ws_manager.get_stats())
+
+
 @app.get("/api/equity-curve")
-async def get_equity_curve(days: int = 7):
-    """Get equity curve data"""
+async def get_equity_curve(
+    request: Request,
+    days: int = 7,
+    max_points: int = 500,
+    start: Optional[int] = None,
+    end: Optional[int] = None
+):
+    """
+    Get equity curve data: [{timestamp, equity}, ...]
+    
+    Last `days` by default, or [start, end) in unix seconds; at most
+    max_points points (LTTB).
+    """
     try:
-        data = data_provider.get_equity_curve(days=days)
+        max_points = max(3, min(max_points, MAX_CHART_POINTS))
+        if start is None and end is None:
+            return cached_response(request, "equity_curve", days=days, max_points=max_points)
+        data = data_provider.get_equity_curve(
+            days=days,
+            max_points=max_points,
+            start=datetime.fromtimestamp(start, UTC) if start is not None else None,
+            end=datetime.fromtimestamp(end, UTC) if end is not None else None
+        )
         return JSONResponse(content=data)
     except Exception as e:
         logger.error(f"Error getting equity curve: {e}")
@@ -570,49 +693,40 @@ async def get_equity_curve(days: int = 7):
 
 
 @app.get("/api/candles")
-async def get_candles(symbol: str = "BTC/USDT", interval: str = "5m", limit: int = 200):
+async def get_candles(
+    symbol: str = "BTC/USDT",
+    interval: str = "5m",
+    limit: int = 200,
+    start: Optional[int] = None,
+    end: Optional[int] = None
+):
     """
-    Get historical candles for chart.
+    Get historical candles for chart from the candle store.
+    
+    interval: resolution ('1m' ... '1w'), resampled from stored bars, or
+    'auto' to pick one that fits [start, end) into `limit` candles.
+    start/end: unix seconds. The newest `limit` candles of the range are
+    returned; X-Has-More / X-Next-End headers page back (pass as end=).
+    
     Returns: [{time, open, high, low, close, volume}, ...]
     """
     try:
-        # Generate mock candlestick data for demo
-        # In production, this would fetch from exchange or database
-        import time
-        now = int(time.time())
-        candles = []
-        price = 50000.0
-        
-        # Calculate interval in seconds
-        interval_seconds = {
-            '1m': 60,
-            '5m': 300,
-            '15m': 900,
-            '1h': 3600,
-            '4h': 14400,
-            '1d': 86400
-        }.get(interval, 300)
-        
-        for i in range(limit, 0, -1):
-            timestamp = now - (i * interval_seconds)
-            open_price = price
-            change = (hash(str(timestamp)) % 1000 - 500) / 100  # Deterministic "random"
-            close_price = open_price + change
-            high_price = max(open_price, close_price) + abs(hash(str(timestamp + 1)) % 100) / 10
-            low_price = min(open_price, close_price) - abs(hash(str(timestamp + 2)) % 100) / 10
-            volume = abs(hash(str(timestamp + 3)) % 100) + 50
-            
-            candles.append({
-                "time": timestamp,
-                "open": round(open_price, 2),
-                "high": round(high_price, 2),
-                "low": round(low_price, 2),
-                "close": round(close_price, 2),
-                "volume": round(volume, 2)
-            })
-            price = close_price
-        
-        return JSONResponse(content=candles)
+        page = data_provider.charts.candles(
+            symbol,
+            interval=interval,
+            start=start,
+            end=end,
+            limit=max(1, min(limit, MAX_CHART_POINTS))
+        )
+        headers = {
+            "X-Interval": page["interval"],
+            "X-Has-More": "true" if page["has_more"] else "false",
+        }
+        if page["next_end"] is not None:
+            headers["X-Next-End"] = str(page["next_end"])
+        return JSONResponse(content=page["candles"], headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting candles: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -620,43 +734,70 @@ async def get_candles(symbol: str = "BTC/USDT", interval: str = "5m", limit: int
 
 # ===== WebSocket Endpoint =====
 
+# Single background task building the realtime state for all clients
+_state_publisher: Optional[asyncio.Task] = None
+
+
+def build_realtime_state() -> Dict[str, Any]:
+    """Portfolio + positions sections of the 'update' topic (built once per tick)"""
+    sync_state_bridge()
+    return {
+        "portfolio": read_models.payload("portfolio"),
+        "positions": read_models.payload("positions"),
+    }
+
+
+def _ensure_state_publisher():
+    global _state_publisher
+    if _state_publisher is None or _state_publisher.done():
+        _state_publisher = asyncio.create_task(
+            ws_manager.hub.run_state_publisher("update", build_realtime_state, interval=1.0)
+        )
+
+
+def _handle_client_message(websocket: WebSocket, data: str):
+    """Control messages: ping, {"type": "subscribe"|"unsubscribe", "payload": {"topics": [...]}}"""
+    if data == "ping":
+        ws_manager.hub.send_to(websocket, "pong")
+        return
+    try:
+        message = json.loads(data)
+    except json.JSONDecodeError:
+        return
+    if not isinstance(message, dict):
+        return
+    payload = message.get("payload") or {}
+    topics = payload.get("topics") if isinstance(payload, dict) else None
+    if message.get("type") in ("subscribe", "unsubscribe") and isinstance(topics, list):
+        mode = "add" if message["type"] == "subscribe" else "remove"
+        ws_manager.hub.set_topics(websocket, [str(t) for t in topics], mode=mode)
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates"""
-    await ws_manager.connect(websocket)
+    """
+    WebSocket endpoint for real-time updates.
+    
+    Push-based: state deltas and events arrive as they are published.
+    Optional ?topics=update,alert limits the subscription, ?encoding=deflate
+    (zlib-compressed JSON) or ?encoding=msgpack switches to binary frames.
+    """
+    topics = websocket.query_params.get("topics")
+    encoding = websocket.query_params.get("encoding", "json")
+    await ws_manager.connect(websocket, topics.split(",") if topics else None, encoding=encoding)
+    _ensure_state_publisher()
     
     try:
         while True:
-            # Wait for messages from client (ping/pong)
-            try:
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=1.0)
-                if data == "ping":
-                    await websocket.send_text("pong")
-            except asyncio.TimeoutError:
-                # Send periodic updates every second
-                await send_realtime_update(websocket)
-            except WebSocketDisconnect:
-                break
+            _handle_client_message(websocket, await websocket.receive_text())
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
         ws_manager.disconnect(websocket)
 
 
-async def send_realtime_update(websocket: WebSocket):
-    """Send real-time update to WebSocket client"""
-    try:
-        update = {
-            "type": "update",
-            "timestamp": datetime.now(UTC).isoformat(),
-            "portfolio": data_provider.get_portfolio_metrics().model_dump(),
-            "positions": [p.model_dump() for p in data_provider.get_open_positions()]
-        }
-        await websocket.send_json(update)
-    except Exception as e:
-        logger.error(f"Error sending update: {e}")
-
-
 # ===== Broadcast Functions =====
 
 async def broadcast_trade(trade_info: dict):
@@ -666,6 +807,7 @@ async def broadcast_trade(trade_info: dict):
         "timestamp": datetime.now(UTC).isoformat(),
         "data": trade_info
     }
+    notify_dashboard_event("fill")
     await ws_manager.broadcast(message)
 
 
@@ -676,6 +818,7 @@ async def broadcast_position_update(position_info: dict):
         "timestamp": datetime.now(UTC).isoformat(),
         "data": position_info
     }
+    notify_dashboard_event("price")
     await ws_manager.broadcast(message)
 
 
@@ -686,6 +829,7 @@ async def broadcast_alert(alert_info: dict):
         "timestamp": datetime.now(UTC).isoformat(),
         "data": alert_info
     }
+    notify_dashboard_event("alert")
     await ws_manager.broadcast(message)
 
 
@@ -922,7 +1066,14 @@ def get_dashboard_html() -> str:
 
         // Update dashboard
         function updateDashboard(data) {
+            // Updates are deltas: only changed sections are present
+            if (data.positions !== undefined) {
+                updatePositionsTable(data.positions);
+            }
             const portfolio = data.portfolio;
+            if (!portfolio) {
+                return;
+            }
             
             // Update metrics
             document.getElementById('equity').textContent = 
@@ -937,9 +1088,6 @@ def get_dashboard_html() -> str:
             
             document.getElementById('open-positions').textContent = portfolio.open_positions;
             document.getElementById('win-rate').textContent = `${portfolio.win_rate.toFixed(1)}%`;
-            
-            // Update positions table
-            updatePositionsTable(data.positions);
         }
 
         function updatePositionsTable(positions) {
@@ -1037,7 +1185,9 @@ def create_app(
     portfolio_manager=None,
     position_monitor=None,
     pnl_tracker=None,
-    alert_manager=None
+    alert_manager=None,
+    candle_store=None,
+    state_bridge: Optional[str] = None
 ) -> FastAPI:
     """
     Create and configure FastAPI app with data sources
@@ -1047,6 +1197,9 @@ def create_app(
         position_monitor: Position monitor instance
         pnl_tracker: P&L tracker instance
         alert_manager: Alert manager instance
+        candle_store: FeatureStore with stored candles for the chart
+        state_bridge: Shared-memory name the bot publishes its state to
+            (when the bot runs in another process)
     
     Returns:
         Configured FastAPI application
@@ -1059,6 +1212,11 @@ def create_app(
         data_provider.set_pnl_tracker(pnl_tracker)
     if alert_manager:
         data_provider.set_alert_manager(alert_manager)
+    if candle_store:
+        data_provider.set_candle_store(candle_store)
+    if state_bridge:
+        data_provider.set_state_bridge(StateBridgeReader(state_bridge))
+    read_models.invalidate()
     
     return app
 
@@ -0,0 +1,400 @@
+"""
+Chart Data - real OHLCV and equity series for the dashboard charts
+
+Candles come from the raw OHLCV columns of the FeatureStore, equity from
+portfolio_snapshots. Both are downsampled to the requested resolution so a
+chart can zoom across a year of 1m data with a few hundred points per
+response:
+
+- candles: OHLC resampling (open first, high max, low min, close last,
+  volume sum) to a standard interval, chosen from the visible range when
+  interval='auto'
+- equity: Largest-Triangle-Three-Buckets (LTTB), which keeps peaks and
+  drawdowns that plain striding would drop
+
+Series are built in tiles aligned to the epoch (tile_points buckets each)
+and kept in an LRU cache: finished tiles for good, the newest candle tile
+until another bar is appended. Panning and re-zooming only builds the edges.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, UTC
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Chart resolutions (seconds), finest first
+RESOLUTIONS = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '1h': 3600,
+    '2h': 7200,
+    '4h': 14400,
+    '6h': 21600,
+    '12h': 43200,
+    '1d': 86400,
+    '1w': 604800,
+}
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+# Equity snapshots newer than this may still be in the write-behind queue
+EQUITY_SETTLE_SECONDS = 60
+
+
+def interval_seconds(interval: str) -> int:
+    """Seconds of a chart interval ('5m', '1h', ...)."""
+    if interval not in RESOLUTIONS:
+        raise ValueError(f"Unsupported interval: {interval} (use one of {', '.join(RESOLUTIONS)})")
+    return RESOLUTIONS[interval]
+
+
+def choose_resolution(span_seconds: float, max_points: int, min_seconds: int = 60) -> str:
+    """Finest resolution >= min_seconds that fits the span into max_points buckets."""
+    candidates = [name for name, seconds in RESOLUTIONS.items() if seconds >= min_seconds]
+    if not candidates:
+        return list(RESOLUTIONS)[-1]
+    for name in candidates:
+        if span_seconds / RESOLUTIONS[name] <= max_points:
+            return name
+    return candidates[-1]
+
+
+def resample_ohlcv(times: np.ndarray, columns: Dict[str, np.ndarray], step: int) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Aggregate sorted bars into `step`-second buckets aligned to the epoch.
+
+    Args:
+        times: Bar open times (unix seconds, ascending)
+        columns: open/high/low/close/volume arrays
+        step: Bucket size in seconds
+
+    Returns:
+        (bucket open times, aggregated columns)
+    """
+    if len(times) == 0:
+        return times, columns
+    buckets = times - times % step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    lasts = np.r_[starts[1:], len(times)] - 1
+    return buckets[starts], {
+        'open': columns['open'][starts],
+        'high': np.maximum.reduceat(columns['high'], starts),
+        'low': np.minimum.reduceat(columns['low'], starts),
+        'close': columns['close'][lasts],
+        'volume': np.add.reduceat(columns['volume'], starts),
+    }
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns:
+        Indices of the kept points (first and last always kept)
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        kept[i + 1] = a
+    kept[-1] = n - 1
+    return kept
+
+
+class TileCache:
+    """LRU cache of immutable chart tiles."""
+
+    def __init__(self, max_tiles: int = 512):
+        self.max_tiles = max_tiles
+        self._tiles: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                self.misses += 1
+                return None
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+
+    def put(self, key: Tuple, tile: Any) -> None:
+        with self._lock:
+            self._tiles[key] = tile
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tiles.clear()
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+
+def _load_equity_from_db(start: datetime, end: datetime) -> List[Tuple[datetime, float]]:
+    """Default equity source: portfolio_snapshots via the read-only session."""
+    from yunmin.store.database import read_session
+    from yunmin.store.repository import PortfolioRepository
+
+    with read_session() as session:
+        return PortfolioRepository(session).get_equity_series(start, end)
+
+
+class ChartDataService:
+    """
+    Tiled, downsampled chart series.
+
+    Usage:
+        charts = ChartDataService(candle_store=FeatureStore())
+        page = charts.candles('BTC/USDT', interval='auto', start=t0, end=t1, limit=500)
+        page = charts.candles('BTC/USDT', interval='5m', limit=200)       # latest 200
+        points = charts.equity_curve(start, end, max_points=500)
+    """
+
+    def __init__(
+        self,
+        candle_store: Any = None,
+        feature_set: str = 'technical',
+        equity_source: Optional[Callable[[datetime, datetime], List[Tuple[datetime, float]]]] = None,
+        tile_points: int = 500,
+        max_tiles: int = 512
+    ):
+        """
+        Args:
+            candle_store: FeatureStore holding raw OHLCV columns
+            feature_set: Feature set whose partitions are read
+            equity_source: (start, end) -> [(naive UTC datetime, equity)];
+                           defaults to portfolio_snapshots
+            tile_points: Buckets per tile
+            max_tiles: Immutable tiles kept in memory
+        """
+        self.candle_store = candle_store
+        self.feature_set = feature_set
+        self.equity_source = equity_source or _load_equity_from_db
+        self.tile_points = tile_points
+        self.tiles = TileCache(max_tiles)
+
+    def set_candle_store(self, candle_store: Any, feature_set: Optional[str] = None) -> None:
+        self.candle_store = candle_store
+        if feature_set:
+            self.feature_set = feature_set
+        self.tiles.clear()
+
+    # ------------------------------------------------------------------
+    # Candles
+    # ------------------------------------------------------------------
+
+    def _stored(self, symbol: str) -> List[Tuple[str, int]]:
+        """(timeframe, seconds) with stored bars, finest first."""
+        if self.candle_store is None:
+            return []
+        stored = []
+        for timeframe in self.candle_store.timeframes(self.feature_set, symbol):
+            if timeframe in RESOLUTIONS:
+                stored.append((timeframe, RESOLUTIONS[timeframe]))
+        return sorted(stored, key=lambda item: item[1])
+
+    @staticmethod
+    def _base_for(stored: List[Tuple[str, int]], step: int) -> Tuple[str, int]:
+        """Coarsest stored timeframe that divides `step` (fewest rows to read)."""
+        usable = [item for item in stored if item[1] <= step and step % item[1] == 0]
+        return usable[-1] if usable else stored[0]
+
+    def _bounds(self, symbol: str, timeframe: str) -> Tuple[int, int]:
+        """(first, last) stored bar open time in unix seconds."""
+        info = self.candle_store.info(self.feature_set, symbol, timeframe)
+        return tuple(
+            int(datetime.fromisoformat(info[key]).replace(tzinfo=UTC).timestamp())
+            for key in ('first_timestamp', 'last_timestamp')
+        )
+
+    def _candle_tile(self, symbol: str, base: Tuple[str, int], step: int, index: int, last_bar: int) -> Dict[str, np.ndarray]:
+        span = self.tile_points * step
+        tile_start, tile_end = index * span, (index + 1) * span
+        # Bars are appended in time order: once a newer bar exists the tile is
+        # final; the open tile is keyed by the last bar and rebuilt on append
+        final = last_bar >= tile_end
+        key = ('candles', self.feature_set, symbol, base[0], step, index, None if final else last_bar)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            return tile
+
+        frame = self.candle_store.read(
+            self.feature_set, symbol, base[0],
+            start=datetime.fromtimestamp(tile_start, UTC).replace(tzinfo=None),
+            end=datetime.fromtimestamp(tile_end, UTC).replace(tzinfo=None),
+            columns=list(OHLCV)
+        )
+        times = (frame.index.asi8 // 1_000_000_000).astype(np.int64)
+        columns = {col: frame[col].to_numpy(dtype=np.float64) for col in OHLCV}
+        if step != base[1]:
+            times, columns = resample_ohlcv(times, columns, step)
+        tile = {'time': times, **columns}
+        self.tiles.put(key, tile)
+        return tile
+
+    def candles(
+        self,
+        symbol: str,
+        interval: str = 'auto',
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: int = 500
+    ) -> Dict[str, Any]:
+        """
+        OHLCV bars for a chart.
+
+        Args:
+            symbol: Trading pair
+            interval: Resolution ('1m' ... '1w') or 'auto' (chosen so that
+                      [start, end) fits into `limit` bars)
+            start, end: Range in unix seconds, [start, end); end defaults to
+                        the latest stored bar
+            limit: Max bars returned; the newest `limit` bars of the range
+                   are returned and has_more/next_end page further back
+
+        Returns:
+            {'interval', 'candles': [{time, open, high, low, close, volume}],
+             'has_more', 'next_end'}
+        """
+        limit = max(1, limit)
+        stored = self._stored(symbol)
+        if not stored:
+            return {'interval': interval, 'candles': [], 'has_more': False, 'next_end': None}
+
+        bounds = [self._bounds(symbol, timeframe) for timeframe, _ in stored]
+        first_bar = min(first for first, _ in bounds)
+        last_bar = max(last for _, last in bounds)
+        finest = stored[0]
+        end = last_bar + finest[1] if end is None else int(end)
+
+        if interval == 'auto':
+            span = end - int(start) if start is not None else limit * finest[1]
+            interval = choose_resolution(span, limit, finest[1])
+        elif interval_seconds(interval) < finest[1]:
+            interval = finest[0]  # no upsampling
+        step = RESOLUTIONS[interval]
+        base = self._base_for(stored, step)
+
+        # Newest `limit` buckets of [start, end); a partial last bucket is included
+        end_bucket = -(-end // step) * step
+        range_start = end_bucket - limit * step
+        if start is not None:
+            range_start = max(range_start, int(start) - int(start) % step)
+
+        span = self.tile_points * step
+        times, columns = [], {col: [] for col in OHLCV}
+        for index in range(range_start // span, (end_bucket - 1) // span + 1):
+            tile = self._candle_tile(symbol, base, step, index, last_bar)
+            mask = (tile['time'] >= range_start) & (tile['time'] < end_bucket)
+            times.append(tile['time'][mask])
+            for col in OHLCV:
+                columns[col].append(tile[col][mask])
+
+        times = np.concatenate(times) if times else np.empty(0, dtype=np.int64)
+        values = {col: np.concatenate(parts) if parts else np.empty(0) for col, parts in columns.items()}
+        candles = [
+            {'time': t, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for t, o, h, l, c, v in zip(
+                times.tolist(), *(values[col].tolist() for col in OHLCV)
+            )
+        ]
+
+        lower = max(first_bar, int(start)) if start is not None else first_bar
+        has_more = range_start > lower - lower % step
+        return {
+            'interval': interval,
+            'candles': candles,
+            'has_more': has_more,
+            'next_end': range_start if has_more else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Equity
+    # ------------------------------------------------------------------
+
+    def _equity_tile(self, step: int, index: int, now: float) -> Tuple[np.ndarray, np.ndarray]:
+        span = self.tile_points * step
+        tile_start, tile_end = index * span, (index + 1) * span
+        key = ('equity', step, index)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            return tile
+
+        rows = self.equity_source(
+            datetime.fromtimestamp(tile_start, UTC).replace(tzinfo=None),
+            datetime.fromtimestamp(tile_end, UTC).replace(tzinfo=None)
+        )
+        times = np.array([at for at, _ in rows], dtype='datetime64[us]').astype(np.int64) / 1e6
+        equity = np.array([value for _, value in rows], dtype=np.float64)
+        kept = lttb(times, equity, self.tile_points)
+        tile = (times[kept], equity[kept])
+
+        if tile_end <= now - EQUITY_SETTLE_SECONDS:
+            self.tiles.put(key, tile)
+        return tile
+
+    def equity_curve(
+        self,
+        start: datetime,
+        end: Optional[datetime] = None,
+        max_points: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Equity points [{timestamp (ISO, UTC), equity}] in [start, end),
+        LTTB-downsampled to at most max_points.
+        """
+        end = end or datetime.now(UTC)
+        start_s = (start if start.tzinfo else start.replace(tzinfo=UTC)).timestamp()
+        end_s = (end if end.tzinfo else end.replace(tzinfo=UTC)).timestamp()
+        if end_s <= start_s:
+            return []
+
+        step = RESOLUTIONS[choose_resolution(end_s - start_s, max(max_points, 3))]
+        span = self.tile_points * step
+        now = time.time()
+        times, equity = [], []
+        for index in range(int(start_s // span), int((end_s - 1) // span) + 1):
+            tile_times, tile_equity = self._equity_tile(step, index, now)
+            mask = (tile_times >= start_s) & (tile_times < end_s)
+            times.append(tile_times[mask])
+            equity.append(tile_equity[mask])
+
+        times = np.concatenate(times) if times else np.empty(0)
+        equity = np.concatenate(equity) if equity else np.empty(0)
+        kept = lttb(times, equity, max_points)
+        return [
+            {'timestamp': datetime.fromtimestamp(t, UTC).isoformat(), 'equity': value}
+            for t, value in zip(times[kept].tolist(), equity[kept].tolist())
+        ]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {'tiles': len(self.tiles), 'tile_hits': self.tiles.hits, 'tile_misses': self.tiles.misses}
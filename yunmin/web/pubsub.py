@@ -0,0 +1,443 @@
+"""
+Pub/Sub Hub for dashboard WebSocket clients
+
+Push-based fan-out: every message is serialised once and queued to each
+subscriber of its topic. Each client has a bounded queue drained by its own
+sender task, so clients are served concurrently and a slow client is dropped
+(queue full) instead of delaying everyone else.
+
+State topics (e.g. 'update') are published as deltas: only the top-level
+sections that changed since the previous publish are sent, new subscribers
+get the full snapshot first.
+
+A published message becomes one Frame whose encodings are computed once and
+shared by all subscribers: 'json' (text frames, default), 'deflate' (zlib
+compressed JSON, binary frames) or 'msgpack' (binary, needs the optional
+msgpack package). Sends are bounded by a per-send timeout, and delivery /
+broadcast latencies are tracked for percentiles.
+
+Wire format (JSON text frames):
+    {"type": "update", "timestamp": ..., "seq": 12, "delta": true,
+     "portfolio": {...}, "removed": []}
+    {"type": "trade", "timestamp": ..., "data": {...}}
+"""
+
+import asyncio
+import importlib
+import json
+import time
+import zlib
+from collections import deque
+from datetime import datetime, UTC
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Union
+
+from loguru import logger
+
+
+# Topics a client receives unless it asks for specific ones
+DEFAULT_TOPICS = frozenset({
+    'update', 'trade', 'trade_executed', 'position_update',
+    'price_update', 'ai_update', 'alert',
+})
+
+# Close code used when a client can't keep up (RFC 6455: try again later)
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+ENCODINGS = ('json', 'deflate', 'msgpack')
+
+# Latency samples kept for percentiles
+LATENCY_WINDOW = 4096
+
+_MISSING = object()
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """Serialise a message once for all subscribers."""
+    return json.dumps(message, default=str, separators=(',', ':'))
+
+
+def _import_msgpack():
+    """msgpack is optional - imported on first use."""
+    try:
+        return importlib.import_module('msgpack')
+    except ImportError as e:
+        raise ImportError("msgpack not installed. Install with: pip install msgpack") from e
+
+
+def percentiles(samples: Iterable[float], qs: Iterable[float] = (0.5, 0.95, 0.99)) -> Dict[str, float]:
+    """Nearest-rank percentiles, e.g. {'p50': ..., 'p95': ..., 'p99': ...}."""
+    ordered = sorted(samples)
+    result = {}
+    for q in qs:
+        value = ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+        result[f"p{int(q * 100)}"] = round(value, 3)
+    return result
+
+
+class Frame:
+    """
+    One published message, encoded lazily once per encoding and shared by
+    every subscriber it is queued for.
+    """
+
+    __slots__ = ('message', 'created', 'remaining', 'tracked', '_encoded')
+
+    def __init__(self, message: Optional[Dict[str, Any]] = None, text: Optional[str] = None, tracked: bool = True):
+        """
+        Args:
+            message: Message dict to encode
+            text: Pre-encoded text sent as-is for every encoding (e.g. 'pong')
+            tracked: Count this frame in broadcast latency stats
+        """
+        self.message = message
+        self.created = time.perf_counter()
+        self.remaining = 0
+        self.tracked = tracked
+        self._encoded: Dict[str, Union[str, bytes]] = {}
+        if text is not None:
+            self._encoded = {encoding: text for encoding in ENCODINGS}
+
+    def encoded(self, encoding: str = 'json') -> Union[str, bytes]:
+        if encoding not in self._encoded:
+            if encoding == 'json':
+                self._encoded['json'] = encode_message(self.message)
+            elif encoding == 'deflate':
+                self._encoded['deflate'] = zlib.compress(self.encoded('json').encode('utf-8'), 6)
+            else:
+                self._encoded[encoding] = _import_msgpack().packb(self.message, default=str)
+        return self._encoded[encoding]
+
+
+class Subscriber:
+    """One connected client: topic filter, encoding + bounded outbound queue."""
+
+    def __init__(self, websocket: Any, topics: Iterable[str], queue_size: int, encoding: str = 'json'):
+        self.websocket = websocket
+        self.topics = set(topics)
+        self.encoding = encoding
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.closed = False
+
+    def wants(self, topic: str) -> bool:
+        return topic in self.topics or '*' in self.topics
+
+
+class PubSubHub:
+    """
+    Topic-based WebSocket fan-out with bounded per-client queues.
+
+    Must be used from the event loop thread (publish() is synchronous and
+    never awaits a socket).
+
+    Usage:
+        hub = PubSubHub()
+        sub = await hub.subscribe(websocket, topics=['update', 'alert'])
+        hub.publish('alert', {"type": "alert", "data": {...}})
+        hub.publish_state('update', {"portfolio": {...}, "positions": [...]})
+        hub.unsubscribe(websocket)
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 64,
+        default_topics: Iterable[str] = DEFAULT_TOPICS,
+        send_timeout: float = 5.0
+    ):
+        """
+        Args:
+            queue_size: Max queued messages per client before it is dropped
+            default_topics: Topics for clients that don't specify any
+            send_timeout: Seconds a single send may take before the client is dropped
+        """
+        self.queue_size = queue_size
+        self.default_topics = frozenset(default_topics)
+        self.send_timeout = send_timeout
+        self.subscribers: Dict[Any, Subscriber] = {}
+
+        # Last full state, sequence number and cached snapshot frame per state topic
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._seq: Dict[str, int] = {}
+        self._snapshots: Dict[str, Frame] = {}
+
+        self._stats = {
+            'published': 0,
+            'enqueued': 0,
+            'sent': 0,
+            'dropped_clients': 0,
+            'send_timeouts': 0,
+            'skipped_states': 0,
+        }
+        # Publish -> sent to one client, and publish -> sent to all recipients (ms)
+        self._delivery_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._broadcast_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._fanout_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    async def subscribe(
+        self,
+        websocket: Any,
+        topics: Optional[Iterable[str]] = None,
+        encoding: str = 'json'
+    ) -> Subscriber:
+        """
+        Register an (already accepted) websocket and start its sender task.
+
+        Args:
+            encoding: 'json', 'deflate' or 'msgpack' (falls back to json if
+                      unknown or msgpack is not installed)
+        """
+        if encoding not in ENCODINGS:
+            encoding = 'json'
+        elif encoding == 'msgpack':
+            try:
+                _import_msgpack()
+            except ImportError as e:
+                logger.warning(f"{e} - falling back to JSON")
+                encoding = 'json'
+        subscriber = Subscriber(
+            websocket,
+            self.default_topics if not topics else topics,
+            self.queue_size,
+            encoding
+        )
+        self.subscribers[websocket] = subscriber
+        subscriber.task = asyncio.create_task(self._sender(subscriber))
+        self._send_snapshots(subscriber, subscriber.topics)
+        return subscriber
+
+    def unsubscribe(self, websocket: Any) -> None:
+        """Remove a client and stop its sender task (idempotent)."""
+        subscriber = self.subscribers.pop(websocket, None)
+        if subscriber is None:
+            return
+        subscriber.closed = True
+        if subscriber.task is not None and subscriber.task is not asyncio.current_task():
+            subscriber.task.cancel()
+
+    def set_topics(self, websocket: Any, topics: Iterable[str], mode: str = 'set') -> None:
+        """
+        Change a client's subscriptions.
+
+        Args:
+            mode: 'set' (replace), 'add' or 'remove'
+        """
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is None:
+            return
+        topics = set(topics)
+        added = topics - subscriber.topics
+        if mode == 'add':
+            subscriber.topics |= topics
+        elif mode == 'remove':
+            subscriber.topics -= topics
+            added = set()
+        else:
+            subscriber.topics = topics
+        self._send_snapshots(subscriber, added)
+
+    def has_subscribers(self, topic: str) -> bool:
+        return any(s.wants(topic) for s in self.subscribers.values())
+
+    def send_to(self, websocket: Any, text: str) -> bool:
+        """Queue a frame for one client (e.g. 'pong'), keeping its send order."""
+        subscriber = self.subscribers.get(websocket)
+        return subscriber is not None and self._offer(subscriber, Frame(text=text, tracked=False))
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self, topic: str, message: Dict[str, Any]) -> int:
+        """
+        Send an event message to all subscribers of `topic`.
+
+        Returns:
+            Number of clients the message was queued for
+        """
+        self._stats['published'] += 1
+        if not self.subscribers:
+            return 0
+        return self._fanout(topic, Frame(message))
+
+    def publish_state(self, topic: str, state: Dict[str, Any]) -> int:
+        """
+        Publish a state snapshot as a delta against the previous one.
+
+        Sections are compared by value; unchanged sections are not sent and
+        nothing is sent at all if no section changed.
+
+        Returns:
+            Number of clients the delta was queued for
+        """
+        previous = self._states.get(topic, {})
+        changed = {key: value for key, value in state.items() if previous.get(key, _MISSING) != value}
+        removed = [key for key in previous if key not in state]
+        if not changed and not removed:
+            self._stats['skipped_states'] += 1
+            return 0
+
+        self._states[topic] = dict(state)
+        self._seq[topic] = self._seq.get(topic, 0) + 1
+        self._snapshots.pop(topic, None)
+        self._stats['published'] += 1
+        if not self.subscribers:
+            return 0
+
+        message = self._envelope(topic, changed, delta=True)
+        if removed:
+            message['removed'] = removed
+        return self._fanout(topic, Frame(message))
+
+    def _envelope(self, topic: str, sections: Dict[str, Any], delta: bool) -> Dict[str, Any]:
+        # Sections sit at the top level, as in the original 'update' message
+        message = {
+            "type": topic,
+            "timestamp": datetime.now(UTC).isoformat(),
+            "seq": self._seq.get(topic, 0),
+            "delta": delta,
+        }
+        message.update(sections)
+        return message
+
+    def _snapshot(self, topic: str) -> Frame:
+        if topic not in self._snapshots:
+            self._snapshots[topic] = Frame(
+                self._envelope(topic, self._states[topic], delta=False),
+                tracked=False
+            )
+        return self._snapshots[topic]
+
+    def _send_snapshots(self, subscriber: Subscriber, topics: Iterable[str]) -> None:
+        for topic in topics:
+            if topic in self._states:
+                self._offer(subscriber, self._snapshot(topic))
+
+    def _fanout(self, topic: str, frame: Frame) -> int:
+        queued = 0
+        for subscriber in list(self.subscribers.values()):
+            if subscriber.wants(topic) and self._offer(subscriber, frame):
+                queued += 1
+        # Senders only run once we yield, so the count is complete here
+        frame.remaining = queued
+        self._fanout_ms.append((time.perf_counter() - frame.created) * 1000)
+        return queued
+
+    def _offer(self, subscriber: Subscriber, frame: Frame) -> bool:
+        try:
+            subscriber.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self._drop(subscriber, "send queue full")
+            return False
+        self._stats['enqueued'] += 1
+        return True
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    async def _sender(self, subscriber: Subscriber) -> None:
+        """Drain one client's queue; runs concurrently with all other clients."""
+        websocket = subscriber.websocket
+        while True:
+            try:
+                frame = await subscriber.queue.get()
+            except asyncio.CancelledError:
+                return
+            delivered = False
+            try:
+                data = frame.encoded(subscriber.encoding)
+                send = websocket.send_text if isinstance(data, str) else websocket.send_bytes
+                async with asyncio.timeout(self.send_timeout):
+                    await send(data)
+                delivered = True
+                subscriber.sent += 1
+                self._stats['sent'] += 1
+            except asyncio.CancelledError:
+                return
+            except TimeoutError:
+                self._stats['send_timeouts'] += 1
+                self._drop(subscriber, f"send timed out after {self.send_timeout}s")
+                return
+            except Exception as e:
+                logger.debug(f"WebSocket send failed, dropping client: {e}")
+                self._drop(subscriber, "send failed", close=False)
+                return
+            finally:
+                self._frame_done(frame, delivered)
+
+    def _frame_done(self, frame: Frame, delivered: bool) -> None:
+        if not frame.tracked:
+            return
+        elapsed_ms = (time.perf_counter() - frame.created) * 1000
+        if delivered:
+            self._delivery_ms.append(elapsed_ms)
+        frame.remaining -= 1
+        if frame.remaining == 0:
+            self._broadcast_ms.append(elapsed_ms)
+
+    def _drop(self, subscriber: Subscriber, reason: str, close: bool = True) -> None:
+        if subscriber.closed:
+            return
+        self._stats['dropped_clients'] += 1
+        logger.warning(f"Dropping WebSocket client: {reason}")
+        self.unsubscribe(subscriber.websocket)
+        # Frames still queued for this client will never be sent
+        while not subscriber.queue.empty():
+            self._frame_done(subscriber.queue.get_nowait(), delivered=False)
+        if close:
+            asyncio.create_task(self._close(subscriber.websocket, reason))
+
+    @staticmethod
+    async def _close(websocket: Any, reason: str) -> None:
+        try:
+            await websocket.close(code=SLOW_CLIENT_CLOSE_CODE, reason=reason)
+        except Exception:
+            pass  # already gone
+
+    async def run_state_publisher(
+        self,
+        topic: str,
+        build_state: Callable[[], Dict[str, Any]],
+        interval: float = 1.0
+    ) -> None:
+        """
+        Build the state once per interval and publish it as a delta.
+
+        The state is only built while someone subscribes to `topic`, so the
+        cost is independent of the number of clients.
+        """
+        while True:
+            if self.has_subscribers(topic):
+                try:
+                    self.publish_state(topic, build_state())
+                except Exception as e:
+                    logger.error(f"Error publishing {topic} state: {e}")
+            await asyncio.sleep(interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Hub counters, queue depths and latency percentiles (ms):
+        fanout_ms - publish() call (enqueue to all clients),
+        delivery_ms - publish to sent, per client,
+        broadcast_ms - publish to sent to every recipient.
+        """
+        depths: List[int] = [s.queue.qsize() for s in self.subscribers.values()]
+        encodings: Dict[str, int] = {}
+        for subscriber in self.subscribers.values():
+            encodings[subscriber.encoding] = encodings.get(subscriber.encoding, 0) + 1
+        return {
+            **self._stats,
+            'clients': len(self.subscribers),
+            'encodings': encodings,
+            'max_queue_depth': max(depths, default=0),
+            'state_topics': {topic: self._seq[topic] for topic in self._states},
+            'fanout_ms': percentiles(self._fanout_ms),
+            'delivery_ms': percentiles(self._delivery_ms),
+            'broadcast_ms': percentiles(self._broadcast_ms),
+        }
+
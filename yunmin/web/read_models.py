@@ -0,0 +1,256 @@
+"""
+Read Models - materialised dashboard views with HTTP validators
+
+Each /api/* view is built once, encoded once and served from memory until an
+event (fill, price tick, alert, AI decision) invalidates it or its TTL runs
+out. Every view carries an ETag and Last-Modified, so polling clients get a
+304 without a body while nothing changed.
+
+A rebuild that produces the same content (ignoring per-view volatile fields
+such as 'timestamp') keeps the previous body, ETag and Last-Modified.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, UTC
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+
+
+# Views invalidated by each dashboard event
+EVENT_VIEWS = {
+    'fill': ('portfolio', 'positions', 'trades', 'performance', 'equity_curve', 'metrics'),
+    'price': ('portfolio', 'positions', 'metrics'),
+    'alert': ('alerts',),
+    'ai': ('ai_status', 'ai_decisions', 'token_usage', 'metrics'),
+    'status': ('status', 'metrics'),
+}
+
+
+def _strip(value: Any, keys: frozenset) -> Any:
+    """Drop volatile keys (at any depth) before fingerprinting."""
+    if isinstance(value, dict):
+        return {k: _strip(v, keys) for k, v in value.items() if k not in keys}
+    if isinstance(value, list):
+        return [_strip(v, keys) for v in value]
+    return value
+
+
+class CachedView:
+    """One materialised response: payload, encoded body and validators."""
+
+    __slots__ = ('payload', 'body', 'etag', 'last_modified', 'fingerprint', 'built_at', 'dirty')
+
+    def __init__(self):
+        self.payload: Any = None
+        self.body: bytes = b''
+        self.etag = ''
+        self.last_modified: Optional[datetime] = None
+        self.fingerprint = ''
+        self.built_at = 0.0
+        self.dirty = True
+
+    def headers(self) -> Dict[str, str]:
+        """Validator headers; clients must revalidate (cheap 304) before reuse."""
+        return {
+            'ETag': self.etag,
+            'Last-Modified': format_datetime(self.last_modified, usegmt=True),
+            'Cache-Control': 'no-cache',
+        }
+
+
+class ReadModel:
+    """A named view, materialised per parameter set (e.g. limit=20)."""
+
+    def __init__(
+        self,
+        name: str,
+        build: Callable[..., Any],
+        ttl: float = 1.0,
+        volatile: Iterable[str] = (),
+        max_variants: int = 32
+    ):
+        """
+        Args:
+            name: View name
+            build: Returns a JSON-serialisable payload (called with view params)
+            ttl: Seconds before an un-invalidated view is rebuilt (0 = events only)
+            volatile: Keys ignored when deciding whether content changed
+            max_variants: Parameter sets kept per view
+        """
+        self.name = name
+        self.build = build
+        self.ttl = ttl
+        self.volatile = frozenset(volatile)
+        self.max_variants = max_variants
+        self.variants: Dict[Tuple, CachedView] = {}
+
+    def invalidate(self) -> None:
+        for view in self.variants.values():
+            view.dirty = True
+
+    def stale(self, view: CachedView, now: float) -> bool:
+        return view.dirty or (self.ttl > 0 and now - view.built_at >= self.ttl)
+
+    def refresh(self, view: CachedView, params: Dict[str, Any], now: float) -> bool:
+        """Rebuild `view`; returns True if its content changed."""
+        payload = self.build(**params)
+        stable = _strip(payload, self.volatile) if self.volatile else payload
+        fingerprint = hashlib.blake2b(
+            json.dumps(stable, default=str, sort_keys=True).encode('utf-8'), digest_size=12
+        ).hexdigest()
+
+        view.built_at = now
+        view.dirty = False
+        if fingerprint == view.fingerprint:
+            return False
+        view.payload = payload
+        view.body = json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8')
+        view.fingerprint = fingerprint
+        view.etag = f'"{self.name}-{fingerprint}"'
+        view.last_modified = datetime.now(UTC).replace(microsecond=0)
+        return True
+
+
+class ReadModelStore:
+    """
+    Registry of read models with event invalidation and conditional GET.
+
+    Usage:
+        store = ReadModelStore()
+        store.register('portfolio', build_portfolio, ttl=1.0, volatile=('timestamp',))
+        view = store.get('portfolio')
+        if store.not_modified(view, if_none_match, if_modified_since):
+            ...  # 304
+        store.on_event('fill')
+    """
+
+    def __init__(self):
+        self.models: Dict[str, ReadModel] = {}
+        self._lock = threading.RLock()
+        self._stats = {'hits': 0, 'builds': 0, 'unchanged_builds': 0, 'not_modified': 0, 'errors': 0}
+
+    def register(self, name: str, build: Callable[..., Any], **kwargs) -> ReadModel:
+        model = ReadModel(name, build, **kwargs)
+        self.models[name] = model
+        return model
+
+    def get(self, name: str, **params) -> CachedView:
+        """Current materialised view, rebuilt only if invalidated or expired."""
+        model = self.models[name]
+        key = tuple(sorted(params.items()))
+        now = time.monotonic()
+        with self._lock:
+            view = model.variants.get(key)
+            if view is None:
+                if len(model.variants) >= model.max_variants:
+                    model.variants.pop(next(iter(model.variants)))
+                view = model.variants[key] = CachedView()
+            if not model.stale(view, now):
+                self._stats['hits'] += 1
+                return view
+            try:
+                changed = model.refresh(view, params, now)
+            except Exception:
+                self._stats['errors'] += 1
+                if view.last_modified is None:
+                    del model.variants[key]
+                    raise
+                # Keep serving the last good version
+                logger.exception(f"Read model {name} rebuild failed, serving cached view")
+                return view
+            self._stats['builds'] += 1
+            if not changed:
+                self._stats['unchanged_builds'] += 1
+            return view
+
+    def payload(self, name: str, **params) -> Any:
+        return self.get(name, **params).payload
+
+    def invalidate(self, *names: str) -> None:
+        """Mark views for rebuild on next read (all views if none given)."""
+        for name in names or tuple(self.models):
+            model = self.models.get(name)
+            if model is not None:
+                model.invalidate()
+
+    def on_event(self, event: str) -> None:
+        """Invalidate the views affected by a dashboard event (see EVENT_VIEWS)."""
+        self.invalidate(*EVENT_VIEWS.get(event, ()))
+
+    def not_modified(
+        self,
+        view: CachedView,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[str] = None
+    ) -> bool:
+        """
+        Evaluate conditional GET headers (If-None-Match takes precedence).
+        """
+        result = False
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            result = '*' in tags or view.etag in tags or f"W/{view.etag}" in tags
+        elif if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+                result = since.tzinfo is not None and view.last_modified <= since
+            except (TypeError, ValueError):
+                result = False
+        if result:
+            self._stats['not_modified'] += 1
+        return result
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, 'views': sum(len(m.variants) for m in self.models.values())}
+
+
+def create_dashboard_read_models(data_provider: Any) -> ReadModelStore:
+    """
+    Register the dashboard views on top of a DashboardDataProvider.
+
+    TTLs bound staleness for sources that don't emit events; events
+    invalidate immediately.
+    """
+    store = ReadModelStore()
+
+    def dump(model):
+        return model.model_dump(mode='json')
+
+    store.register('portfolio', lambda: dump(data_provider.get_portfolio_metrics()),
+                   ttl=1.0, volatile=('timestamp',))
+    store.register('positions', lambda: [dump(p) for p in data_provider.get_open_positions()],
+                   ttl=1.0)
+    store.register('trades', lambda limit=10: [dump(t) for t in data_provider.get_recent_trades(limit=limit)],
+                   ttl=5.0)
+    store.register('performance', lambda: dump(data_provider.get_performance_metrics()),
+                   ttl=5.0)
+    store.register('alerts', lambda limit=20: [dump(a) for a in data_provider.get_recent_alerts(limit=limit)],
+                   ttl=2.0)
+    store.register('ai_status', lambda: {k: dump(v) for k, v in data_provider.get_ai_brain_status().items()},
+                   ttl=5.0, volatile=('last_update',))
+    store.register('ai_decisions', lambda limit=20: [dump(d) for d in data_provider.get_ai_decision_history(limit=limit)],
+                   ttl=5.0, volatile=('timestamp',))
+    store.register('token_usage', lambda: dump(data_provider.get_token_usage()),
+                   ttl=10.0, volatile=('last_request_time',))
+    store.register('status', lambda: dump(data_provider.get_system_status()),
+                   ttl=1.0, volatile=('last_heartbeat',))
+    store.register('equity_curve',
+                   lambda days=7, max_points=500: data_provider.get_equity_curve(days=days, max_points=max_points),
+                   ttl=60.0)
+
+    # Composite of the materialised views above - nothing is recomputed
+    store.register('metrics', lambda: {
+        "portfolio": store.payload('portfolio'),
+        "performance": store.payload('performance'),
+        "ai_status": store.payload('ai_status'),
+        "token_usage": store.payload('token_usage'),
+        "system_status": store.payload('status'),
+        "positions": store.payload('positions'),
+    }, ttl=1.0, volatile=('timestamp', 'last_update', 'last_request_time', 'last_heartbeat'))
+
+    return store
@@ -0,0 +1,455 @@
+"""
+State Bridge - shared-memory snapshots from the trading process to the dashboard
+
+The bot publishes a compact JSON snapshot of its state (portfolio, positions,
+trades, performance, status) at a fixed rate into a named shared-memory
+segment. Any number of dashboard API processes attach to it read-only, so
+the dashboard never calls into the trading loop and the bot never waits for
+a reader.
+
+Lock-free single writer / many readers (seqlock over two slots):
+    - the writer fills the inactive slot, bumping its seq to odd before and
+      back to even after the copy, then flips 'active' and bumps 'generation'
+    - a reader copies the active slot and retries if the seq was odd or
+      changed during the copy, or the crc32 doesn't match
+
+Layout:
+    header (64 bytes): magic, version, active slot, payload capacity,
+                       writer pid (0 = closed), generation, published_at
+    slot x 2:          seq, length, crc32, payload[capacity]
+
+Readers cache the decoded snapshot per generation: checking for a new one
+is a single header read. A writer that republishes identical content only
+refreshes published_at (heartbeat), so readers keep their cache.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+try:
+    import _posixshmem
+except ImportError:  # Windows
+    _posixshmem = None
+
+
+DEFAULT_BRIDGE_NAME = 'yunmin_state'
+DEFAULT_CAPACITY = 1 << 20  # 1 MiB per slot
+
+_MAGIC = b'YMSB'
+_VERSION = 1
+
+# magic, version, active, capacity, pid, generation, published_at
+_HEADER = struct.Struct('<4sHHIIQd')
+_HEADER_SIZE = 64
+_ACTIVE_OFFSET = 6
+_CAPACITY_OFFSET = 8
+_PID_OFFSET = 12
+_GENERATION_OFFSET = 16
+_PUBLISHED_AT_OFFSET = 24
+
+# seq, length, crc32
+_SLOT = struct.Struct('<QII')
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+_F64 = struct.Struct('<d')
+
+# Reader retries before giving up on one read (writer lapping the reader)
+_MAX_READ_RETRIES = 64
+
+
+def encode_snapshot(snapshot: Dict[str, Any]) -> bytes:
+    """Compact JSON, datetimes as ISO strings."""
+    return json.dumps(snapshot, default=str, separators=(',', ':')).encode('utf-8')
+
+
+def _segment_size(capacity: int) -> int:
+    return _HEADER_SIZE + 2 * (_SLOT.size + capacity)
+
+
+def _slot_offset(slot: int, capacity: int) -> int:
+    return _HEADER_SIZE + slot * (_SLOT.size + capacity)
+
+
+class _ReadOnlySegment:
+    """
+    Read-only mapping of an existing segment.
+
+    SharedMemory(create=False) registers the segment with the resource
+    tracker on POSIX, which unlinks it when the reader's process tree exits
+    and complains when several workers unregister the same name - so
+    readers map it directly.
+    """
+
+    def __init__(self, name: str):
+        if _posixshmem is None:
+            self._shm = shared_memory.SharedMemory(name=name, create=False)
+            self._mmap = None
+            self.buf, self.size = self._shm.buf, self._shm.size
+            return
+        self._shm = None
+        fd = _posixshmem.shm_open('/' + name.lstrip('/'), os.O_RDONLY, mode=0o600)
+        try:
+            self.size = os.fstat(fd).st_size
+            self._mmap = mmap.mmap(fd, self.size, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        self.buf = memoryview(self._mmap)
+
+    def close(self) -> None:
+        self.buf.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        else:
+            self._shm.close()
+
+
+class StateBridgeWriter:
+    """
+    Single writer side of the bridge (owned by the trading process).
+
+    Usage:
+        writer = StateBridgeWriter('yunmin_state')
+        writer.publish(encode_snapshot({'portfolio': {...}}))
+        writer.close()
+    """
+
+    def __init__(self, name: str = DEFAULT_BRIDGE_NAME, capacity: int = DEFAULT_CAPACITY):
+        """
+        Args:
+            name: Shared-memory segment name
+            capacity: Max encoded snapshot size in bytes
+        """
+        self.name = name
+        self.capacity = capacity
+        self._shm = self._open(name, capacity)
+        self._buf = self._shm.buf
+        self._last_payload: Optional[bytes] = None
+
+        header = _HEADER.unpack_from(self._buf, 0)
+        if header[0] == _MAGIC and header[1] == _VERSION and header[3] == capacity:
+            # Reused segment (previous run): readers stay attached
+            self._active, self._generation = header[2], header[5]
+        else:
+            self._active, self._generation = 0, 0
+            for slot in (0, 1):
+                _SLOT.pack_into(self._buf, _slot_offset(slot, capacity), 0, 0, 0)
+        _HEADER.pack_into(
+            self._buf, 0, _MAGIC, _VERSION, self._active, capacity,
+            os.getpid(), self._generation, time.time()
+        )
+        logger.info(f"State bridge '{name}' opened ({capacity} bytes per slot)")
+
+    @staticmethod
+    def _open(name: str, capacity: int) -> shared_memory.SharedMemory:
+        size = _segment_size(capacity)
+        try:
+            return shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            pass
+        # Left over from a previous run - reuse it if the layout fits
+        existing = shared_memory.SharedMemory(name=name, create=False)
+        if existing.size >= size:
+            return existing
+        existing.close()
+        existing.unlink()
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def publish(self, payload: bytes) -> bool:
+        """
+        Publish an encoded snapshot.
+
+        Returns:
+            False if the payload doesn't fit (nothing is written)
+        """
+        if payload == self._last_payload:
+            _F64.pack_into(self._buf, _PUBLISHED_AT_OFFSET, time.time())
+            return True
+        if len(payload) > self.capacity:
+            return False
+
+        slot = 1 - self._active
+        offset = _slot_offset(slot, self.capacity)
+        seq = _U64.unpack_from(self._buf, offset)[0]
+
+        _U64.pack_into(self._buf, offset, seq + 1)  # odd: write in progress
+        start = offset + _SLOT.size
+        self._buf[start:start + len(payload)] = payload
+        _SLOT.pack_into(self._buf, offset, seq + 1, len(payload), zlib.crc32(payload))
+        _U64.pack_into(self._buf, offset, seq + 2)
+
+        # 'active' before 'generation': a reader that sees the new generation
+        # also sees the new slot
+        self._active = slot
+        self._generation += 1
+        _U16.pack_into(self._buf, _ACTIVE_OFFSET, slot)
+        _U64.pack_into(self._buf, _GENERATION_OFFSET, self._generation)
+        _F64.pack_into(self._buf, _PUBLISHED_AT_OFFSET, time.time())
+        self._last_payload = payload
+        return True
+
+    def close(self, unlink: bool = True) -> None:
+        """Mark the bridge closed (pid = 0) and release the segment."""
+        if self._shm is None:
+            return
+        _U32.pack_into(self._buf, _PID_OFFSET, 0)
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._shm = None
+        logger.info(f"State bridge '{self.name}' closed")
+
+
+class StateBridgeReader:
+    """
+    Reader side of the bridge (any number of processes).
+
+    Attaches lazily and re-attaches when the writer closed the segment or
+    stopped publishing, so the dashboard can start before the bot and
+    survive bot restarts.
+
+    Usage:
+        reader = StateBridgeReader('yunmin_state')
+        snapshot = reader.snapshot()   # None until the bot publishes
+        if reader.age() > 5: ...       # bot stalled
+    """
+
+    def __init__(
+        self,
+        name: str = DEFAULT_BRIDGE_NAME,
+        stale_after: float = 5.0,
+        retry_interval: float = 1.0
+    ):
+        """
+        Args:
+            name: Shared-memory segment name
+            stale_after: Seconds without a publish before the snapshot is stale
+            retry_interval: Min seconds between attach attempts
+        """
+        self.name = name
+        self.stale_after = stale_after
+        self.retry_interval = retry_interval
+        self._shm: Optional[_ReadOnlySegment] = None
+        self._capacity = 0
+        self._next_attach = 0.0
+        self._generation = -1
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._stats = {'reads': 0, 'decodes': 0, 'retries': 0, 'failed_reads': 0, 'attaches': 0}
+
+    def _ensure_attached(self) -> bool:
+        if self._shm is not None:
+            return True
+        now = time.monotonic()
+        if now < self._next_attach:
+            return False
+        self._next_attach = now + self.retry_interval
+        try:
+            shm = _ReadOnlySegment(self.name)
+        except (FileNotFoundError, ValueError):  # ValueError: empty segment
+            return False
+        header = _HEADER.unpack_from(shm.buf, 0)
+        if header[0] != _MAGIC or header[1] != _VERSION or shm.size < _segment_size(header[3]):
+            shm.close()
+            return False
+        self._shm, self._capacity = shm, header[3]
+        self._generation = -1
+        self._stats['attaches'] += 1
+        logger.debug(f"Attached to state bridge '{self.name}' (writer pid {header[4]})")
+        return True
+
+    def _detach(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+    @property
+    def attached(self) -> bool:
+        return self._shm is not None
+
+    def generation(self) -> int:
+        """Generation of the latest snapshot (-1 if not attached) - one header read."""
+        with self._lock:
+            if not self._ensure_attached():
+                return -1
+            return _U64.unpack_from(self._shm.buf, _GENERATION_OFFSET)[0]
+
+    def published_at(self) -> Optional[float]:
+        """Unix time of the last publish or heartbeat."""
+        with self._lock:
+            if not self._ensure_attached():
+                return None
+            return _F64.unpack_from(self._shm.buf, _PUBLISHED_AT_OFFSET)[0]
+
+    def age(self) -> float:
+        """Seconds since the last publish (inf if never)."""
+        published = self.published_at()
+        return float('inf') if published is None else max(0.0, time.time() - published)
+
+    def _read_payload(self, buf) -> Optional[bytes]:
+        for _ in range(_MAX_READ_RETRIES):
+            active = _U16.unpack_from(buf, _ACTIVE_OFFSET)[0]
+            offset = _slot_offset(active, self._capacity)
+            seq, length, crc = _SLOT.unpack_from(buf, offset)
+            if seq & 1 or length > self._capacity:
+                self._stats['retries'] += 1
+                continue
+            start = offset + _SLOT.size
+            payload = bytes(buf[start:start + length])
+            if _U64.unpack_from(buf, offset)[0] == seq and zlib.crc32(payload) == crc:
+                return payload
+            self._stats['retries'] += 1
+        self._stats['failed_reads'] += 1
+        return None
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Latest snapshot (decoded once per generation), None before the
+        first publish.
+        """
+        with self._lock:
+            if not self._ensure_attached():
+                return self._snapshot
+            buf = self._shm.buf
+            pid = _U32.unpack_from(buf, _PID_OFFSET)[0]
+            capacity = _U32.unpack_from(buf, _CAPACITY_OFFSET)[0]
+            published_at = _F64.unpack_from(buf, _PUBLISHED_AT_OFFSET)[0]
+            if pid == 0 or capacity != self._capacity or time.time() - published_at > self.stale_after:
+                # Writer closed, re-laid out or stalled: a restarted bot may
+                # have created a new segment under the same name
+                self._detach()
+                if self._ensure_attached():
+                    buf = self._shm.buf
+                else:
+                    return self._snapshot
+
+            self._stats['reads'] += 1
+            generation = _U64.unpack_from(buf, _GENERATION_OFFSET)[0]
+            if generation == self._generation or generation == 0:
+                return self._snapshot
+            payload = self._read_payload(buf)
+            if payload is None:
+                return self._snapshot
+            try:
+                self._snapshot = json.loads(payload)
+            except ValueError:
+                logger.warning(f"State bridge '{self.name}': undecodable snapshot")
+                return self._snapshot
+            self._generation = generation
+            self._stats['decodes'] += 1
+            return self._snapshot
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            'name': self.name,
+            'attached': self.attached,
+            'generation': self._generation,
+            'age_seconds': round(self.age(), 3),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._detach()
+
+
+class StateBridgePublisher:
+    """
+    Publishes snapshot_fn() into the bridge at a fixed rate from a daemon
+    thread, off the trading loop.
+
+    Usage:
+        publisher = StateBridgePublisher(bot.dashboard_snapshot, interval=0.25).start()
+        ...
+        publisher.stop()
+    """
+
+    def __init__(
+        self,
+        snapshot_fn: Callable[[], Dict[str, Any]],
+        name: str = DEFAULT_BRIDGE_NAME,
+        interval: float = 0.25,
+        capacity: int = DEFAULT_CAPACITY
+    ):
+        """
+        Args:
+            snapshot_fn: Returns the JSON-serialisable state snapshot
+            name: Shared-memory segment name
+            interval: Seconds between publishes
+            capacity: Max encoded snapshot size in bytes
+        """
+        self.snapshot_fn = snapshot_fn
+        self.interval = interval
+        self.writer = StateBridgeWriter(name, capacity)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'publishes': 0, 'errors': 0, 'oversize': 0, 'last_build_ms': 0.0}
+
+    def start(self) -> 'StateBridgePublisher':
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='state-bridge', daemon=True)
+            self._thread.start()
+        return self
+
+    def publish_now(self) -> bool:
+        """Build and publish one snapshot."""
+        started = time.perf_counter()
+        try:
+            payload = encode_snapshot(self.snapshot_fn())
+        except Exception as e:
+            # Builder raced a mutation in the trading thread - next tick retries
+            self._stats['errors'] += 1
+            logger.debug(f"State bridge snapshot failed: {e}")
+            return False
+        self._stats['last_build_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        if not self.writer.publish(payload):
+            self._stats['oversize'] += 1
+            if self._stats['oversize'] == 1:
+                logger.warning(
+                    f"State bridge snapshot ({len(payload)} bytes) exceeds capacity "
+                    f"({self.writer.capacity} bytes)"
+                )
+            return False
+        self._stats['publishes'] += 1
+        return True
+
+    def _run(self) -> None:
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            self.publish_now()
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:  # fell behind - don't burst to catch up
+                next_tick, delay = time.monotonic(), 0
+            self._stop.wait(delay)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Publish a final snapshot, then close (and unlink) the segment."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.publish_now()
+        self.writer.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, 'generation': self.writer.generation}
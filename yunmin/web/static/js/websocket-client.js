@@ -4,13 +4,25 @@
  */
 
 export class DashboardWebSocket {
-    constructor(url = null) {
+    /**
+     * @param {string|null} url - WebSocket URL (auto-detected if null)
+     * @param {Object} options - { encoding: 'json' | 'deflate' }
+     */
+    constructor(url = null, options = {}) {
         // Auto-detect WebSocket URL
         if (!url) {
             const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
             url = `${protocol}//${window.location.host}/ws`;
         }
         
+        // Compressed binary frames need DecompressionStream support
+        this.encoding = options.encoding === 'deflate' && typeof DecompressionStream !== 'undefined'
+            ? 'deflate'
+            : 'json';
+        if (this.encoding !== 'json') {
+            url += `${url.includes('?') ? '&' : '?'}encoding=${this.encoding}`;
+        }
+        
         this.url = url;
         this.ws = null;
         this.handlers = {};
@@ -36,6 +48,7 @@ export class DashboardWebSocket {
         
         try {
             this.ws = new WebSocket(this.url);
+            this.ws.binaryType = 'arraybuffer';
             
             this.ws.onopen = () => {
                 console.log('WebSocket connected');
@@ -47,13 +60,22 @@ export class DashboardWebSocket {
                 this.startHeartbeat();
             };
             
+            // Frames are decoded in arrival order (deltas depend on it)
+            this.inbox = Promise.resolve();
             this.ws.onmessage = (event) => {
-                try {
-                    const data = JSON.parse(event.data);
-                    this.handleMessage(data);
-                } catch (error) {
-                    console.error('Error parsing WebSocket message:', error);
-                }
+                this.inbox = this.inbox.then(async () => {
+                    try {
+                        const text = typeof event.data === 'string'
+                            ? event.data
+                            : await this.inflate(event.data);
+                        if (text === 'pong') {
+                            return;
+                        }
+                        this.handleMessage(JSON.parse(text));
+                    } catch (error) {
+                        console.error('Error parsing WebSocket message:', error);
+                    }
+                });
             };
             
             this.ws.onerror = (error) => {
@@ -86,6 +108,16 @@ export class DashboardWebSocket {
         }
     }
     
+    /**
+     * Decompress a zlib (deflate) binary frame to text
+     * @param {ArrayBuffer} buffer - Compressed frame
+     * @returns {Promise<string>}
+     */
+    async inflate(buffer) {
+        const stream = new Blob([buffer]).stream().pipeThrough(new DecompressionStream('deflate'));
+        return await new Response(stream).text();
+    }
+    
     /**
      * Handle incoming WebSocket message
      */